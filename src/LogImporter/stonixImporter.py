@@ -27,18 +27,49 @@ Created on Dec 5, 2013
 This utility should be installed on the server that receives and processes the
 STONIX reports. It processes the XML and inserts the results into a database.
 
+Reports are parsed by a pool of worker processes and the results are loaded
+into the database in batches, one transaction per batch.
+
 @author: dkennel
+@change: 2015/10/18 dkennel parse reports in a process pool with iterparse
+and load them in batched transactions
+@change: 2015/10/18 dkennel a batch that fails is retried one report at a
+time and the reports that still fail are moved to ERRORDIR
 '''
 
-# from xml.dom.minidom import parseString
-import xml.etree.ElementTree as ET
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 import os
 import errno
+import gzip
 import sys
-import MySQLdb as mdb
 import traceback
 import time
 import shutil
+import multiprocessing
+try:
+    import MySQLdb as mdb
+except ImportError:
+    mdb = None
+
+REPORTDIR = '/var/www/html/stonix/results'
+ARCHIVEDIR = '/var/local/stonix-server/'
+# Reports that could not be loaded into the database
+ERRORDIR = '/var/local/stonix-server/errors/'
+# Number of reports loaded in a single transaction
+BATCHSIZE = 500
+# Number of reports handed to a parser process at a time
+CHUNKSIZE = 16
+# First bytes of a gzip compressed report
+GZIPMAGIC = '\x1f\x8b'
+# Placeholder used in queries for each DB-API paramstyle we support
+PLACEHOLDERS = {'format': '%s', 'qmark': '?'}
+METACOLUMNS = ['RunTime', 'Hostname', 'UploadAddress', 'IPAddress', 'OS',
+               'PropertyNumber', 'SystemSerialNo', 'ChassisSerialNo',
+               'SystemManufacturer', 'ChassisManufacturer', 'UUID',
+               'MACAddress', 'xmlFileName', 'STONIXversion', 'RuleCount']
 
 
 class ReportParser(object):
@@ -55,42 +86,101 @@ class ReportParser(object):
         @author: dkennel
         '''
         self.path = path
-        self.tree = ''
-        if self.path is not None:
-            self.tree = ET.parse(self.path)
 
     def openreport(self, path):
-        '''ReportParser.openReport will open a report file and load the data
-        for processing.
+        '''ReportParser.openReport will set the report file to be processed.
+        The file is not read until parsereport is called.
 
         @param path: path to the report file
         @author: dkennel
+        @change: 2015/10/18 dkennel the report is read by parsereport
         '''
-        if os.path.exists(path):
-            self.tree = ET.parse(path)
+        self.path = path
 
     def parsereport(self):
         '''ReportParser.parseReport() will parse the xml report and return a
-        dictionary of key:value pairs for the contents of the report.
+        dictionary of key:value pairs for the contents of the report. The
+        report is read incrementally and elements are discarded once they
+        have been processed so large reports are never held in memory.
+
+        Reports may be gzip compressed and may hold more than one metadata
+        or findings section.
 
         @author: dkennel
+        @change: 2015/10/18 dkennel use iterparse instead of building the
+        whole tree, accept gzip compressed reports
         '''
         repdict = {}
         findings = {}
-        elem = self.tree.getroot()
-        for child in elem:
-            if child.tag == 'metadata':
-                for grandchild in child:
-                    repdict[grandchild.tag] = grandchild.attrib['val']
-            if child.tag == 'findings':
-                for grandchild in child:
-                    findings[grandchild.tag] = grandchild.attrib['val']
-        # print repdict
-        # print findings
+        section = None
+        depth = 0
+        handle = open(self.path, 'rb')
+        try:
+            if handle.read(2) == GZIPMAGIC:
+                handle.close()
+                handle = gzip.open(self.path, 'rb')
+            else:
+                handle.seek(0)
+            for event, elem in ET.iterparse(handle, events=('start', 'end')):
+                if event == 'start':
+                    depth = depth + 1
+                    if depth == 2:
+                        section = elem.tag
+                    continue
+                depth = depth - 1
+                if depth == 2:
+                    if section == 'metadata':
+                        repdict[elem.tag] = elem.attrib['val']
+                    elif section == 'findings':
+                        findings[elem.tag] = elem.attrib['val']
+                    elem.clear()
+                elif depth == 1:
+                    section = None
+                    elem.clear()
+        finally:
+            handle.close()
 
         return [repdict, findings]
 
 
+def metadatarow(metadata):
+    '''Return the RunMetaData column values for a report in METACOLUMNS
+    order. Reports from older clients that do not record a RuleCount are
+    stored with a RuleCount of 999999.
+
+    @param metadata: dict dictionary of metadata elements for the run
+    @return: tuple
+    @author: dkennel
+    '''
+    row = []
+    for column in METACOLUMNS:
+        if column == 'RuleCount' and column not in metadata:
+            row.append('999999')
+        else:
+            row.append(metadata[column])
+    return tuple(row)
+
+
+def readreport(repfile):
+    '''Parse a single report file. This is run in the parser processes so it
+    only returns picklable data and never raises.
+
+    @param repfile: path to the report file
+    @return: tuple of (repfile, metadata row, list of (rule, finding)
+        tuples, error). error is None when the report could be parsed.
+    @author: dkennel
+    '''
+    try:
+        parser = ReportParser(repfile)
+        metadata, findings = parser.parsereport()
+        reportfile = os.path.basename(repfile)
+        metadata['UploadAddress'] = reportfile.split('-')[0]
+        metadata['xmlFileName'] = reportfile
+        return (repfile, metadatarow(metadata), findings.items(), None)
+    except Exception:
+        return (repfile, None, None, traceback.format_exc())
+
+
 class DBhandler(object):
     '''
     The dbhandler class handles the work of managing the db connection and
@@ -98,110 +188,95 @@ class DBhandler(object):
 
     @author: dkennel
     '''
-    def __init__(self):
+    def __init__(self, con=None, paramstyle='format'):
         '''
-        dbhandler constructor
+        dbhandler constructor. By default a connection to the stonix MySQL
+        database is opened. Any other DB-API connection, for instance a
+        sqlite3 connection, may be passed in along with the paramstyle of its
+        module.
 
+        @param con: DB-API connection to use instead of the MySQL database
+        @param paramstyle: string paramstyle of the module that created con
         @author: dkennel
+        @change: 2015/10/18 dkennel allow the connection to be passed in
         '''
-        self.con = None
-        try:
-            self.con = mdb.Connect('localhost', 'stonixdb',
-                                   '********', 'stonix')
-        except mdb.Error, err:
-            print "Error %d: %s" % (err.args[0], err.args[1])
-            sys.exit(1)
+        self.con = con
+        if self.con is None:
+            if mdb is None:
+                print "Error: MySQLdb is not available"
+                sys.exit(1)
+            try:
+                self.con = mdb.Connect('localhost', 'stonixdb',
+                                       '********', 'stonix')
+            except mdb.Error, err:
+                print "Error %d: %s" % (err.args[0], err.args[1])
+                sys.exit(1)
+        marker = PLACEHOLDERS[paramstyle]
+        self.metainsert = "INSERT INTO RunMetaData(" + \
+            ", ".join(METACOLUMNS) + ") VALUES(" + \
+            ", ".join([marker] * len(METACOLUMNS)) + ")"
+        self.datainsert = "INSERT INTO RunData(MetaDataId, Rule, Finding) " + \
+            "VALUES(" + ", ".join([marker] * 3) + ")"
 
     def loaddata(self, metadata, findings):
         '''
-        This is the main worker of the dbhandler. It requires the metadata
-        dictonary and the findings list of tuples.
+        Load a single report. It requires the metadata dictonary and the
+        findings dictionary.
 
         @param metadata: dict dictionary of metadata elements for the run
-        @param findings: list of tuples containing findings for the run
+        @param findings: dict of findings for the run keyed by rule
+        @author: dkennel
+        @change: 2015/10/18 dkennel load through loadbatch
+        '''
+        self.loadbatch([(metadatarow(metadata), findings.items())])
+
+    def loadbatch(self, reports):
+        '''
+        This is the main worker of the dbhandler. Each report is inserted in
+        to RunMetaData and the findings of all of the reports are inserted
+        with a single executemany. The batch is committed as one transaction
+        and rolled back if any of it fails.
+
+        @param reports: list of (metadata row, list of (rule, finding)
+            tuples) as returned by metadatarow and readreport
         @author: dkennel
         '''
+        cur = self.con.cursor()
         try:
-            if 'RuleCount' in metadata:
-                cur = self.con.cursor()
-                cur.execute("""INSERT INTO RunMetaData(RunTime, HostName,
-                UploadAddress, IPAddress, OS, PropertyNumber,
-                SystemSerialNo, ChassisSerialNo, SystemManufacturer,
-                ChassisManufacturer, UUID, MacAddress, xmlFileName, STONIXversion,
-                RuleCount)
-                VALUES(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (metadata['RunTime'],
-                 metadata['Hostname'],
-                 metadata['UploadAddress'],
-                 metadata['IPAddress'],
-                 metadata['OS'],
-                 metadata['PropertyNumber'],
-                 metadata['SystemSerialNo'],
-                 metadata['ChassisSerialNo'],
-                 metadata['SystemManufacturer'],
-                 metadata['ChassisManufacturer'],
-                 metadata['UUID'],
-                 metadata['MACAddress'],
-                 metadata['xmlFileName'],
-                 metadata['STONIXversion'],
-                 metadata['RuleCount']))
-    
-                cur.execute("SELECT RowId from RunMetaData WHERE xmlFileName = %s",
-                            metadata['xmlFileName'])
-                row = cur.fetchone()
-                runid = row[0]
-    
-                for key in findings:
-                    # print key
-                    # print findings[key]
-                    cur.execute("""INSERT INTO RunData(MetaDataId, Rule, Finding)
-                    VALUES(%s, %s, %s)""",
-                    (runid,
-                     key,
-                     findings[key]))
-            else:
-                cur = self.con.cursor()
-                cur.execute("""INSERT INTO RunMetaData(RunTime, HostName,
-                UploadAddress, IPAddress, OS, PropertyNumber,
-                SystemSerialNo, ChassisSerialNo, SystemManufacturer,
-                ChassisManufacturer, UUID, MacAddress, xmlFileName, STONIXversion,
-                RuleCount)
-                VALUES(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (metadata['RunTime'],
-                 metadata['Hostname'],
-                 metadata['UploadAddress'],
-                 metadata['IPAddress'],
-                 metadata['OS'],
-                 metadata['PropertyNumber'],
-                 metadata['SystemSerialNo'],
-                 metadata['ChassisSerialNo'],
-                 metadata['SystemManufacturer'],
-                 metadata['ChassisManufacturer'],
-                 metadata['UUID'],
-                 metadata['MACAddress'],
-                 metadata['xmlFileName'],
-                 metadata['STONIXversion'],
-                 '999999'))
-    
-                cur.execute("SELECT RowId from RunMetaData WHERE xmlFileName = %s",
-                            metadata['xmlFileName'])
-                row = cur.fetchone()
-                runid = row[0]
-    
-                for key in findings:
-                    # print key
-                    # print findings[key]
-                    cur.execute("""INSERT INTO RunData(MetaDataId, Rule, Finding)
-                    VALUES(%s, %s, %s)""",
-                    (runid,
-                     key,
-                     findings[key]))
-
-        except mdb.Error, err:
-            # print "Error %d: %s" % (err.args[0], err.args[1])
-            if self.con:
-                self.con.close()
-            sys.exit(1)
+            rows = []
+            for metadata, findings in reports:
+                cur.execute(self.metainsert, metadata)
+                runid = cur.lastrowid
+                for rule, finding in findings:
+                    rows.append((runid, rule, finding))
+            if rows:
+                cur.executemany(self.datainsert, rows)
+            self.con.commit()
+        except Exception:
+            self.con.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def isalive(self):
+        '''
+        Return True if the database connection can still run a query. Used to
+        tell a report that can not be loaded apart from a database that is
+        not working.
+
+        @return: bool
+        @author: dkennel
+        '''
+        try:
+            cur = self.con.cursor()
+            try:
+                cur.execute('SELECT 1')
+                cur.fetchall()
+            finally:
+                cur.close()
+        except Exception:
+            return False
+        return True
 
     def close(self):
         '''Instruct the DBhandler to close the database connection. Attempts
@@ -213,18 +288,127 @@ class DBhandler(object):
             self.con.close()
 
 
+def importreports(reportdir, destdir, stonixdb, processes=None,
+                  batchsize=BATCHSIZE, errordir=ERRORDIR):
+    '''
+    Parse every report in reportdir, load them into stonixdb and move them to
+    destdir. Reports that can not be parsed are moved without being loaded.
+    Reports that can not be loaded are moved to errordir, see archivebatch.
+    If the database itself stops working the exception is raised, leaving
+    the reports not yet loaded in place to be picked up by the next run.
+
+    @param reportdir: directory holding the uploaded reports
+    @param destdir: directory processed reports are moved to
+    @param stonixdb: DBhandler instance
+    @param processes: int number of parser processes, defaults to one per cpu
+    @param batchsize: int number of reports loaded per transaction
+    @param errordir: directory reports that can not be loaded are moved to
+    @return: int number of reports loaded
+    @author: dkennel
+    '''
+    repfiles = [os.path.join(reportdir, reportfile) for reportfile in
+                os.listdir(reportdir)]
+    loaded = 0
+    pool = multiprocessing.Pool(processes)
+    try:
+        batch = []
+        batchfiles = []
+        for repfile, metadata, findings, error in \
+                pool.imap_unordered(readreport, repfiles, CHUNKSIZE):
+            if error is not None:
+                print error
+                shutil.move(repfile, destdir)
+                continue
+            batch.append((metadata, findings))
+            batchfiles.append(repfile)
+            if len(batch) >= batchsize:
+                loaded = loaded + archivebatch(stonixdb, batch, batchfiles,
+                                               destdir, errordir)
+                batch = []
+                batchfiles = []
+        if batch:
+            loaded = loaded + archivebatch(stonixdb, batch, batchfiles,
+                                           destdir, errordir)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return loaded
+
+
+def archivebatch(stonixdb, batch, batchfiles, destdir, errordir=ERRORDIR):
+    '''
+    Load a batch of parsed reports and move the report files to destdir once
+    the batch has been committed. If the batch fails it is retried one
+    report at a time so that a single bad report does not hold back the
+    rest. Reports that fail on their own are moved to errordir, unless the
+    database no longer answers, in which case the error is raised and the
+    remaining reports are left in place.
+
+    @param stonixdb: DBhandler instance
+    @param batch: list of (metadata row, findings) tuples
+    @param batchfiles: list of the report files the batch was read from
+    @param destdir: directory processed reports are moved to
+    @param errordir: directory reports that can not be loaded are moved to
+    @return: int number of reports loaded
+    @author: dkennel
+    '''
+    try:
+        stonixdb.loadbatch(batch)
+    except Exception:
+        if not stonixdb.isalive():
+            raise
+    else:
+        for repfile in batchfiles:
+            movereport(repfile, destdir)
+        return len(batch)
+    loaded = 0
+    for report, repfile in zip(batch, batchfiles):
+        try:
+            stonixdb.loadbatch([report])
+        except Exception, err:
+            if not stonixdb.isalive():
+                raise
+            print 'Unable to load ' + repfile + ': ' + str(err)
+            movereport(repfile, errordir)
+            continue
+        movereport(repfile, destdir)
+        loaded = loaded + 1
+    return loaded
+
+
+def movereport(repfile, destdir):
+    '''
+    Move a report file to destdir, creating destdir if needed.
+
+    @param repfile: path of the report file
+    @param destdir: directory to move the report to
+    @author: dkennel
+    '''
+    if not os.path.exists(repfile):
+        return
+    if not os.path.isdir(destdir):
+        try:
+            os.makedirs(destdir)
+        except OSError as exc:
+            if exc.errno != errno.EEXIST or not os.path.isdir(destdir):
+                raise
+    shutil.move(repfile, destdir)
+
+
 def main():
     '''
     Main program loop. Flow is as follows: Instantiate objects and variables.
-    List report files uploaded.
+    List report files uploaded, parse them and load them into the database.
 
     @author: dkennel
+    @change: 2015/10/18 dkennel moved the work to importreports
     '''
-    parser = ReportParser()
     stonixdb = DBhandler()
     now = time.localtime()
-    destdir = os.path.join('/var/local/stonix-server/', str(now[0]),
-                           str(now[1]), str(now[2]))
+    destdir = os.path.join(ARCHIVEDIR, str(now[0]), str(now[1]), str(now[2]))
     if not os.path.exists(destdir):
         try:
             os.makedirs(destdir)
@@ -233,35 +417,13 @@ def main():
                 pass
             else:
                 raise
-    reportdir = '/var/www/html/stonix/results'
-    reportfiles = os.listdir(reportdir)
-    for reportfile in reportfiles:
-        repfile = os.path.join(reportdir, reportfile)
-        try:
-            parser.openreport(repfile)
-            reportdata = parser.parsereport()
-            metadata = reportdata[0]
-            findings = reportdata[1]
-        except Exception, err:
-            detailedresults = traceback.format_exc()
-            print err
-            print detailedresults
-            shutil.move(repfile, destdir)
-            continue
-        uploadip = reportfile.split('-')
-        uploadip = uploadip[0]
-        metadata['UploadAddress'] = uploadip
-        metadata['xmlFileName'] = reportfile
-        # print metadata
-        try:
-            stonixdb.loaddata(metadata, findings)
-        except Exception, err:
-            print err
-            print metadata
-            shutil.move(repfile, destdir)
-            continue
-        if os.path.exists(repfile):
-            shutil.move(repfile, destdir)
+    try:
+        importreports(REPORTDIR, destdir, stonixdb)
+    except Exception, err:
+        print err
+        print traceback.format_exc()
+        stonixdb.close()
+        sys.exit(1)
     stonixdb.close()
 
 if __name__ == '__main__':
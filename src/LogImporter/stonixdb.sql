@@ -33,8 +33,9 @@ CREATE TABLE IF NOT EXISTS `RunData` (
   `Rule` varchar(100) COLLATE utf8_unicode_ci DEFAULT NULL,
   `Finding` mediumtext COLLATE utf8_unicode_ci,
   `RowId` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
-  UNIQUE KEY `RowId` (`RowId`)
-) ENGINE=MyISAM  DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci AUTO_INCREMENT=97 ;
+  UNIQUE KEY `RowId` (`RowId`),
+  KEY `MetaDataId` (`MetaDataId`)
+) ENGINE=InnoDB  DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci AUTO_INCREMENT=97 ;
 
 -- --------------------------------------------------------
 
@@ -61,8 +62,17 @@ CREATE TABLE IF NOT EXISTS `RunMetaData` (
   `RuleCount` varchar(10) DEFAULT NULL,
   PRIMARY KEY (`RowId`),
   UNIQUE KEY `RowId` (`RowId`),
-  KEY `RunTime` (`RunTime`,`Hostname`,`IPAddress`)
-) ENGINE=MyISAM  DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci AUTO_INCREMENT=6 ;
+  KEY `RunTime` (`RunTime`,`Hostname`,`IPAddress`),
+  KEY `xmlFileName` (`xmlFileName`)
+) ENGINE=InnoDB  DEFAULT CHARSET=utf8 COLLATE=utf8_unicode_ci AUTO_INCREMENT=6 ;
+
+--
+-- The importer loads reports in transactions and looks runs up by file name.
+-- Existing databases can be brought up to date with:
+--
+-- ALTER TABLE `RunData` ENGINE=InnoDB, ADD KEY `MetaDataId` (`MetaDataId`);
+-- ALTER TABLE `RunMetaData` ENGINE=InnoDB, ADD KEY `xmlFileName` (`xmlFileName`);
+--
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
 /*!40101 SET CHARACTER_SET_RESULTS=@OLD_CHARACTER_SET_RESULTS */;
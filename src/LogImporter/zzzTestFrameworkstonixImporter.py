@@ -0,0 +1,186 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import stonixImporter
+
+# SQLite stand in for the tables in stonixdb.sql
+SCHEMA = '''
+CREATE TABLE RunMetaData (RowId INTEGER PRIMARY KEY AUTOINCREMENT,
+    RunTime TEXT NOT NULL, Hostname TEXT, UploadAddress TEXT,
+    IPAddress TEXT, OS TEXT, PropertyNumber TEXT, SystemSerialNo TEXT,
+    ChassisSerialNo TEXT, SystemManufacturer TEXT, ChassisManufacturer TEXT,
+    UUID TEXT, MACAddress TEXT, xmlFileName TEXT, STONIXversion TEXT,
+    RuleCount TEXT);
+CREATE INDEX xmlFileName ON RunMetaData(xmlFileName);
+CREATE TABLE RunData (MetaDataId INTEGER NOT NULL, Rule TEXT, Finding TEXT,
+    RowId INTEGER PRIMARY KEY AUTOINCREMENT);
+CREATE INDEX MetaDataId ON RunData(MetaDataId);
+'''
+
+METADATA = ['RunTime', 'Hostname', 'IPAddress', 'OS', 'PropertyNumber',
+            'SystemSerialNo', 'ChassisSerialNo', 'SystemManufacturer',
+            'ChassisManufacturer', 'UUID', 'MACAddress', 'STONIXversion']
+
+
+class zzzTestFrameworkstonixImporter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.reportdir = os.path.join(self.tmpdir, 'results')
+        self.destdir = os.path.join(self.tmpdir, 'archive')
+        self.errordir = os.path.join(self.tmpdir, 'errors')
+        os.mkdir(self.reportdir)
+        os.mkdir(self.destdir)
+        self.con = sqlite3.connect(os.path.join(self.tmpdir, 'stonix.db'))
+        self.con.executescript(SCHEMA)
+        self.stonixdb = stonixImporter.DBhandler(self.con,
+                                                 sqlite3.paramstyle)
+
+    def tearDown(self):
+        self.stonixdb.close()
+        shutil.rmtree(self.tmpdir)
+
+    def writereport(self, name, host, rules, rulecount=True):
+        meta = ''
+        for tag in METADATA:
+            value = host
+            if tag == 'RunTime':
+                value = '2015-10-18 12:00:00'
+            meta = meta + '<%s val="%s" />' % (tag, value)
+        if rulecount:
+            meta = meta + '<RuleCount val="%d" />' % len(rules)
+        findings = ''
+        for rule in rules:
+            findings = findings + '<%s val="%s compliant" />' % (rule, rule)
+        whandle = open(os.path.join(self.reportdir, name), 'w')
+        whandle.write('<run><metadata>' + meta + '</metadata><findings>' +
+                      findings + '</findings></run>')
+        whandle.close()
+
+    def testParseReport(self):
+        self.writereport('10.0.0.1-1.xml', 'host1', ['SecureSSH', 'SetNTP'])
+        parser = stonixImporter.ReportParser()
+        parser.openreport(os.path.join(self.reportdir, '10.0.0.1-1.xml'))
+        metadata, findings = parser.parsereport()
+        self.assertEqual(metadata['Hostname'], 'host1')
+        self.assertEqual(metadata['RuleCount'], '2')
+        self.assertEqual(findings, {'SecureSSH': 'SecureSSH compliant',
+                                    'SetNTP': 'SetNTP compliant'})
+
+    def testParseCompressed(self):
+        repfile = os.path.join(self.reportdir, '10.0.0.1-1.xml')
+        whandle = gzip.open(repfile, 'wb')
+        whandle.write('<run>\n<metadata>\n<Hostname val="host1" />\n' +
+                      '</metadata>\n<findings>\n<SecureSSH val="ok" />\n' +
+                      '</findings>\n<metadata>\n<RuleCount val="1" />\n' +
+                      '</metadata>\n</run>\n')
+        whandle.close()
+        metadata, findings = stonixImporter.ReportParser(
+            repfile).parsereport()
+        self.assertEqual(metadata, {'Hostname': 'host1', 'RuleCount': '1'})
+        self.assertEqual(findings, {'SecureSSH': 'ok'})
+
+    def testImportReports(self):
+        for num in range(7):
+            self.writereport('10.0.0.%d-%d.xml' % (num, num), 'host%d' % num,
+                             ['SecureSSH', 'SetNTP', 'Rule%d' % num],
+                             num != 3)
+        self.writereport('10.0.0.9-9.xml', 'host9', ['SecureSSH'])
+        whandle = open(os.path.join(self.reportdir, '10.0.0.8-8.xml'), 'w')
+        whandle.write('<run><metadata>')
+        whandle.close()
+        loaded = stonixImporter.importreports(self.reportdir, self.destdir,
+                                              self.stonixdb, 2, 3)
+        self.assertEqual(loaded, 8)
+        self.assertEqual(os.listdir(self.reportdir), [])
+        self.assertEqual(len(os.listdir(self.destdir)), 9)
+        cur = self.con.cursor()
+        cur.execute('SELECT count(*) FROM RunMetaData')
+        self.assertEqual(cur.fetchone()[0], 8)
+        cur.execute('SELECT count(*) FROM RunData')
+        self.assertEqual(cur.fetchone()[0], 22)
+        cur.execute('''SELECT RunMetaData.Hostname, RunMetaData.UploadAddress,
+        RunMetaData.RuleCount, RunData.Rule FROM RunData JOIN RunMetaData ON
+        RunData.MetaDataId = RunMetaData.RowId WHERE RunData.Rule = 'Rule3'
+        ''')
+        self.assertEqual(cur.fetchall(),
+                         [('host3', '10.0.0.3', '999999', 'Rule3')])
+
+    def testRollback(self):
+        self.writereport('10.0.0.1-1.xml', 'host1', ['SecureSSH'])
+        row = stonixImporter.readreport(os.path.join(self.reportdir,
+                                                     '10.0.0.1-1.xml'))[1]
+        self.assertRaises(sqlite3.Error, self.stonixdb.loadbatch,
+                          [(row, [('SecureSSH', 'ok')]),
+                           (row[:-1], [('SetNTP', 'ok')])])
+        cur = self.con.cursor()
+        cur.execute('SELECT count(*) FROM RunMetaData')
+        self.assertEqual(cur.fetchone()[0], 0)
+        cur.execute('SELECT count(*) FROM RunData')
+        self.assertEqual(cur.fetchone()[0], 0)
+
+    def testBadReportInBatch(self):
+        for num in range(5):
+            self.writereport('10.0.0.%d-%d.xml' % (num, num), 'host%d' % num,
+                             ['SecureSSH'])
+        # The database rejects host2's report only
+        self.con.execute('''CREATE TRIGGER rejectbad BEFORE INSERT ON
+RunMetaData WHEN NEW.Hostname = 'host2' BEGIN
+SELECT RAISE(ABORT, 'bad report'); END''')
+        loaded = stonixImporter.importreports(self.reportdir, self.destdir,
+                                              self.stonixdb, 2, 3,
+                                              self.errordir)
+        self.assertEqual(loaded, 4)
+        self.assertEqual(os.listdir(self.reportdir), [])
+        self.assertEqual(os.listdir(self.errordir), ['10.0.0.2-2.xml'])
+        self.assertEqual(len(os.listdir(self.destdir)), 4)
+        cur = self.con.cursor()
+        cur.execute('SELECT count(*) FROM RunMetaData')
+        self.assertEqual(cur.fetchone()[0], 4)
+
+    def testDatabaseDown(self):
+        self.writereport('10.0.0.1-1.xml', 'host1', ['SecureSSH'])
+        self.con.close()
+        self.assertRaises(sqlite3.Error, stonixImporter.importreports,
+                          self.reportdir, self.destdir, self.stonixdb, 1, 3,
+                          self.errordir)
+        self.assertEqual(os.listdir(self.reportdir), ['10.0.0.1-1.xml'])
+        self.assertFalse(os.path.exists(self.errordir))
+        self.stonixdb.con = None
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -90,6 +90,7 @@ The following options control the running of the script:
  -h  --help  or no arguments will display this help message and exit.
  -v  --verbose print verbose information about what stor is doing.
  -R  --rule run a single stonix rule. Requires -f, -X or -r.
+ -j  --jobs N  Run up to N rules at the same time during full system runs.
 
 WARNING! If run with the -f flag THIS PROGAM WILL MODIFY
 SYSTEM SETTINGS!
@@ -123,6 +124,7 @@ import re
 import traceback
 import time
 import subprocess
+import threading
 
 # Local imports
 
@@ -132,7 +134,13 @@ from stonix_resources.environment import Environment
 from stonix_resources.StateChgLogger import StateChgLogger
 from stonix_resources.logdispatcher import LogPriority, LogDispatcher
 from stonix_resources.program_arguments import ProgramArguments
+from stonix_resources.RuleScheduler import RuleScheduler
+from stonix_resources.RuleManifest import RuleManifest
+from stonix_resources.RuleRegistry import RuleRegistry
+from stonix_resources.ResultStore import ResultStore, formatresults
 from stonix_resources.cli import Cli
+from stonix_resources import pkghelper
+from stonix_resources import SHsystemctl, SHchkconfig, SHrcupdate
 try:
     from stonix_resources.gui import GUI
     from PyQt4 import QtCore, QtGui
@@ -155,6 +163,11 @@ class Controller(Observable):
         self.pcf = False
         self.pcs = False
         self.list = False
+        self.jobs = 1
+        self.prune = 0
+        self.progresslock = threading.Lock()
+        self.registry = RuleRegistry()
+        self.installedrules = []
         if not self.safetycheck():
             self.logger.log(LogPriority.CRITICAL,
                             ['SafetyCheck',
@@ -180,11 +193,12 @@ class Controller(Observable):
         self.config = Configuration(self.environ)
         self.numrulesrunning = 0
         self.numrulescomplete = 0
-        self.currulename = ''
-        self.currulenum = 0
+        # The rule each thread is running, rules may run in parallel
+        self.currentrule = threading.local()
         self.logger = LogDispatcher(self.environ)
         self.logger.log(LogPriority.DEBUG,
                         'Logging Started')
+        self.results = ResultStore(self.logger, self.environ)
         self.tryacquirelock()
 
         if self.mode == 'gui':
@@ -232,7 +246,7 @@ class Controller(Observable):
         etime = time.time() - starttime
         self.logger.log(LogPriority.DEBUG,
                         'Rules Processed in ' + str(etime))
-        self.installedrules = self.findapplicable(allrules)
+        self.setinstalledrules(self.findapplicable(allrules))
         etime = time.time() - starttime
         self.logger.log(LogPriority.DEBUG,
                         'Rules Applicable in ' + str(etime))
@@ -271,8 +285,6 @@ class Controller(Observable):
         @author: D. Kennel
         """
         instruleclasses = []
-        validrulefiles = []
-        initlist = ['__init__.py', '__init__.pyc', '__init__.pyo']
 
         stonixPath = self.environ.get_resources_path()
         self.logger.log(LogPriority.DEBUG,
@@ -288,22 +300,16 @@ class Controller(Observable):
             self.logger.log(LogPriority.DEBUG,
                             ['Sys Path Element:', str(path)])
 
-        rulefiles = os.listdir(str(rulesPath))
-        # print str(rulefiles)
-
-        for rfile in rulefiles:
-            if rfile in initlist:
-                continue
-            else:
-                validrulefiles.append(rfile)
-        self.logger.log(LogPriority.DEBUG,
-                        ['validrulefiles:', str(validrulefiles)])
-
-        # This is a list comprehension to build a list of module names to
-        # import based on the names of valid rule files from stonix/rules
-        # destination list = [ *transform* *source* *filter* ]
-        modulenames = [mod.replace('.py', '') for mod in validrulefiles
-                        if re.search("\.py$", mod)]
+        # The rule manifest lets us skip importing rules that cannot apply
+        # to this platform. Rules that decide applicability for themselves
+        # are always returned by getloadable.
+        manifest = RuleManifest(rulesPath, self.logger)
+        modulenames = manifest.getloadable(environ)
+        if self.runrule and self.mode == 'cli':
+            entry = manifest.getentry(self.runrule)
+            if entry is not None:
+                modulenames = [mod for mod in modulenames
+                               if mod == entry['module']]
         self.logger.log(LogPriority.DEBUG,
                         ['Module names:', str(modulenames)])
 
@@ -390,6 +396,29 @@ class Controller(Observable):
                                 + trace)
         return applicablerules
 
+    def setinstalledrules(self, rules):
+        """
+        Set the list of rules for this run. The rule registry is rebuilt at
+        the same time so lookups by number, name and category stay in sync
+        with the installed rules. Any reload of the rule set must come
+        through here.
+
+        @param rules: List of instantiated rule objects
+        @author: D. Kennel
+        """
+        self.installedrules = rules
+        self.registry.load(rules)
+
+    def getregistry(self):
+        """
+        Return the RuleRegistry indexing the installed rules. The same
+        instance is kept for the life of the controller.
+
+        @return: RuleRegistry
+        @author: D. Kennel
+        """
+        return self.registry
+
     def getallrulesdata(self):
         """
         This method returns a dictionary of lists containing the data for all
@@ -423,12 +452,7 @@ class Controller(Observable):
         match is found.
         @author: D. Kennel
         """
-        rulenum = 0
-        for rule in self.installedrules:
-            rulename = rule.getrulename()
-            if rulename == name:
-                rulenum = rule.getrulenum()
-        return rulenum
+        return self.registry.getnumbyname(name)
 
     def getrulenamebynum(self, rulenum):
         """
@@ -441,110 +465,163 @@ class Controller(Observable):
         no match is found.
         @author: D. Kennel
         """
-        rulename = None
-        for rule in self.installedrules:
-            ruleid = rule.getrulenum()
-            if rulenum == ruleid:
-                rulename = rule.getrulename()
-        return rulename
+        return self.registry.getnamebynum(rulenum)
 
     def hardensystem(self):
         """
-        Call all rules in fix(harden) mode
+        Call all rules in fix(harden) mode. When more than one job has been
+        requested rules that do not share resources are run concurrently.
+        Rules that conflict keep their original order.
 
         @return void :
         @author D. Kennel
         """
+        self.__startrun()
         self.numrulesrunning = self.numexecutingrules
         self.numrulescomplete = 0
-        for rule in self.installedrules:
-            self.currulenum = rule.getrulenum()
-            self.currulename = rule.getrulename()
-            try:
-                starttime = time.time()
-                rule.report()
-                if not rule.getrulesuccess():
-                    self.logger.log(LogPriority.ERROR,
-                                    [rule.getrulename(),
-                                     rule.getdetailedresults()])
-                elif not rule.iscompliant():
-                    rule.fix()
-                    if rule.getrulesuccess():
-                        rule.report()
-                        if not rule.getrulesuccess():
-                            self.logger.log(LogPriority.ERROR,
-                                            [rule.getrulename(),
-                                             rule.getdetailedresults()])
-                        elif not rule.iscompliant():
-                            self.logger.log(LogPriority.WARNING,
-                                            [rule.getrulename(),
-                                            rule.getdetailedresults()])
-                        else:
-                            self.logger.log(LogPriority.INFO,
-                                            [rule.getrulename(),
-                                            rule.getdetailedresults()])
-                else:
-                    self.logger.log(LogPriority.INFO,
-                                    [rule.getrulename(),
-                                    rule.getdetailedresults()])
-                etime = time.time() - starttime
-                self.logger.log(LogPriority.DEBUG,
-                                [rule.getrulename(),
-                                'Elapsed Time: ' + str(etime)])
-            except (KeyboardInterrupt, SystemExit):
-            # User initiated exit
-                raise
-            except Exception:
-                trace = traceback.format_exc()
-                self.logger.log(LogPriority.ERROR, [rule.getrulename(),
-                                "Controller caught rule death: "
-                                + trace])
-            self.numrulescomplete = self.numrulescomplete + 1
-            self.set_dirty()
-            self.notify_check()
+        scheduler = RuleScheduler(self.logger, self.jobs)
+        scheduler.run(self.installedrules, self.__hardenrule, ordered=True)
 
-    def auditsystem(self):
+    def __hardenrule(self, rule):
         """
-        Call all rules in audit(report) mode
+        Private method that runs a single rule in fix(harden) mode as part of
+        a full system run and updates the progress counters.
 
+        @param rule: Rule instance
         @return void :
         @author D. Kennel
         """
-        self.numrulesrunning = self.numexecutingrules
-        self.numrulescomplete = 0
-        for rule in self.installedrules:
-            self.currulenum = rule.getrulenum()
-            self.currulename = rule.getrulename()
-            try:
-                starttime = time.time()
-                rule.report()
-                etime = time.time() - starttime
-                self.logger.log(LogPriority.DEBUG,
-                                [rule.getrulename(),
-                                'Elapsed Time: ' + str(etime)])
-            except (KeyboardInterrupt, SystemExit):
-                # User initiated exit
-                raise
-            except Exception:
-                trace = traceback.format_exc()
-                self.logger.log(LogPriority.ERROR, [rule.getrulename(),
-                                "Controller caught rule death: "
-                                + trace])
-            self.numrulescomplete = self.numrulescomplete + 1
+        self.__setcurrentrule(rule)
+        starttime = time.time()
+        try:
+            rule.report()
             if not rule.getrulesuccess():
                 self.logger.log(LogPriority.ERROR,
                                 [rule.getrulename(),
-                                rule.getdetailedresults()])
-            if not rule.iscompliant():
-                self.logger.log(LogPriority.WARNING,
-                                [rule.getrulename(),
-                                rule.getdetailedresults()])
+                                 rule.getdetailedresults()])
+            elif not rule.iscompliant():
+                self.statechglogger.startbatch()
+                try:
+                    rule.fix()
+                finally:
+                    self.statechglogger.endbatch()
+                if rule.getrulesuccess():
+                    rule.report()
+                    if not rule.getrulesuccess():
+                        self.logger.log(LogPriority.ERROR,
+                                        [rule.getrulename(),
+                                         rule.getdetailedresults()])
+                    elif not rule.iscompliant():
+                        self.logger.log(LogPriority.WARNING,
+                                        [rule.getrulename(),
+                                        rule.getdetailedresults()])
+                    else:
+                        self.logger.log(LogPriority.INFO,
+                                        [rule.getrulename(),
+                                        rule.getdetailedresults()])
             else:
                 self.logger.log(LogPriority.INFO,
                                 [rule.getrulename(),
                                 rule.getdetailedresults()])
+            etime = time.time() - starttime
+            self.logger.log(LogPriority.DEBUG,
+                            [rule.getrulename(),
+                            'Elapsed Time: ' + str(etime)])
+        except (KeyboardInterrupt, SystemExit):
+        # User initiated exit
+            raise
+        except Exception:
+            trace = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, [rule.getrulename(),
+                            "Controller caught rule death: "
+                            + trace])
+        self.results.record(rule, 'fix', time.time() - starttime)
+        self.__rulecomplete()
+
+    def auditsystem(self):
+        """
+        Call all rules in audit(report) mode. When more than one job has been
+        requested rules that do not share resources are run concurrently.
+
+        @return void :
+        @author D. Kennel
+        """
+        self.__startrun()
+        self.numrulesrunning = self.numexecutingrules
+        self.numrulescomplete = 0
+        scheduler = RuleScheduler(self.logger, self.jobs)
+        scheduler.run(self.installedrules, self.__auditrule)
+
+    def __auditrule(self, rule):
+        """
+        Private method that runs a single rule in audit(report) mode as part
+        of a full system run and updates the progress counters.
+
+        @param rule: Rule instance
+        @return void :
+        @author D. Kennel
+        """
+        self.__setcurrentrule(rule)
+        starttime = time.time()
+        try:
+            rule.report()
+            etime = time.time() - starttime
+            self.logger.log(LogPriority.DEBUG,
+                            [rule.getrulename(),
+                            'Elapsed Time: ' + str(etime)])
+        except (KeyboardInterrupt, SystemExit):
+            # User initiated exit
+            raise
+        except Exception:
+            trace = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, [rule.getrulename(),
+                            "Controller caught rule death: "
+                            + trace])
+        self.results.record(rule, 'report', time.time() - starttime)
+        if not rule.getrulesuccess():
+            self.logger.log(LogPriority.ERROR,
+                            [rule.getrulename(),
+                            rule.getdetailedresults()])
+        if not rule.iscompliant():
+            self.logger.log(LogPriority.WARNING,
+                            [rule.getrulename(),
+                            rule.getdetailedresults()])
+        else:
+            self.logger.log(LogPriority.INFO,
+                            [rule.getrulename(),
+                            rule.getdetailedresults()])
+        self.__rulecomplete()
+
+    def __startrun(self):
+        """
+        Private method to clear the state cached by a previous run. The GUI
+        keeps the controller and the helper modules loaded between runs and
+        the packages installed and services configured may have changed
+        since.
+
+        @return void :
+        @author D. Kennel
+        """
+        pkghelper.resetcache()
+        SHsystemctl.resetsnapshot()
+        SHchkconfig.resetsnapshot()
+        SHrcupdate.resetsnapshot()
+
+    def __rulecomplete(self):
+        """
+        Private method to count a finished rule and notify listeners. Rules
+        may finish on worker threads so the counter is updated under a lock.
+
+        @return void :
+        @author D. Kennel
+        """
+        self.progresslock.acquire()
+        try:
+            self.numrulescomplete = self.numrulescomplete + 1
             self.set_dirty()
             self.notify_check()
+        finally:
+            self.progresslock.release()
 
     def runruleharden(self, ruleid):
         """
@@ -554,80 +631,85 @@ class Controller(Observable):
         @return void :
         @author D. Kennel
         """
+        self.__startrun()
         self.numrulesrunning = 1
         self.numrulescomplete = 0
         self.logger.log(LogPriority.DEBUG, ['RunRuleHarden',
                          'Attempting to run ' + str(ruleid)])
 
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
-                if rule.getisrootrequired() and self.environ.geteuid() != 0:
-                    self.numrulescomplete = self.numrulescomplete + 1
-                    message = "Could not run rule: insufficient privilege level"
+        rule = self.registry.getbynum(ruleid)
+        if rule is not None:
+            if rule.getisrootrequired() and self.environ.geteuid() != 0:
+                self.numrulescomplete = self.numrulescomplete + 1
+                message = "Could not run rule: insufficient privilege level"
+                self.logger.log(LogPriority.ERROR,
+                                [rule.getrulename(), message])
+            else:
+                starttime = time.time()
+                try:
+                    rule.report()
+                except (KeyboardInterrupt, SystemExit):
+                    # User initiated exit
+                    raise
+                except Exception:
+                    trace = traceback.format_exc()
+                    self.logger.log(LogPriority.ERROR, [rule.getrulename(),
+                                    "Controller caught rule death: "
+                                    + trace])
+                if not rule.getrulesuccess():
                     self.logger.log(LogPriority.ERROR,
-                                    [rule.getrulename(), message])
-                else:
-                    starttime = time.time()
+                                    [rule.getrulename(),
+                                    rule.getdetailedresults()])
+                    self.logger.log(LogPriority.INFO,
+                                    [rule.getrulename(),
+                                     'Rule failed: Rule config in unknown state. Skipping rule'])
+                    self.numrulescomplete = self.numrulescomplete + 1
+                elif not rule.iscompliant():
+                    self.statechglogger.startbatch()
                     try:
-                        rule.report()
+                        rule.fix()
                     except (KeyboardInterrupt, SystemExit):
                         # User initiated exit
                         raise
                     except Exception:
                         trace = traceback.format_exc()
-                        self.logger.log(LogPriority.ERROR, [rule.getrulename(),
+                        self.logger.log(LogPriority.ERROR,
+                                        [rule.getrulename(),
                                         "Controller caught rule death: "
                                         + trace])
+                    finally:
+                        self.statechglogger.endbatch()
                     if not rule.getrulesuccess():
                         self.logger.log(LogPriority.ERROR,
+                                        [rule.getrulename(),
+                                         rule.getdetailedresults()])
+                    try:
+                        rule.report()
+                    except (KeyboardInterrupt, SystemExit):
+                        # User initiated exit
+                        raise
+                    except Exception:
+                        trace = traceback.format_exc()
+                        self.logger.log(LogPriority.ERROR,
+                                        [rule.getrulename(),
+                                         "Controller caught rule death: "
+                                        + trace])
+                    if not rule.iscompliant():
+                        self.logger.log(LogPriority.WARNING,
                                         [rule.getrulename(),
                                         rule.getdetailedresults()])
+                    else:
                         self.logger.log(LogPriority.INFO,
                                         [rule.getrulename(),
-                                         'Rule failed: Rule config in unknown state. Skipping rule'])
-                        self.numrulescomplete = self.numrulescomplete + 1
-                    elif not rule.iscompliant():
-                        try:
-                            rule.fix()
-                        except (KeyboardInterrupt, SystemExit):
-                            # User initiated exit
-                            raise
-                        except Exception:
-                            trace = traceback.format_exc()
-                            self.logger.log(LogPriority.ERROR,
-                                            [rule.getrulename(),
-                                            "Controller caught rule death: "
-                                            + trace])
-                        if not rule.getrulesuccess():
-                            self.logger.log(LogPriority.ERROR,
-                                            [rule.getrulename(),
-                                             rule.getdetailedresults()])
-                        try:
-                            rule.report()
-                        except (KeyboardInterrupt, SystemExit):
-                            # User initiated exit
-                            raise
-                        except Exception:
-                            trace = traceback.format_exc()
-                            self.logger.log(LogPriority.ERROR,
-                                            [rule.getrulename(),
-                                             "Controller caught rule death: "
-                                            + trace])
-                        if not rule.iscompliant():
-                            self.logger.log(LogPriority.WARNING,
-                                            [rule.getrulename(),
-                                            rule.getdetailedresults()])
-                        else:
-                            self.logger.log(LogPriority.INFO,
-                                            [rule.getrulename(),
-                                            rule.getdetailedresults()])
-                    self.numrulescomplete = self.numrulescomplete + 1
-                    etime = time.time() - starttime
-                    self.logger.log(LogPriority.DEBUG,
-                                    [rule.getrulename(),
-                                     'Elapsed Time: ' + str(etime)])
-                    self.set_dirty()
-                    self.notify_check()
+                                        rule.getdetailedresults()])
+                self.numrulescomplete = self.numrulescomplete + 1
+                etime = time.time() - starttime
+                self.logger.log(LogPriority.DEBUG,
+                                [rule.getrulename(),
+                                 'Elapsed Time: ' + str(etime)])
+                self.results.record(rule, 'fix', etime)
+                self.set_dirty()
+                self.notify_check()
         if self.numrulescomplete == 0:
             message = "Could not find rule! Searched for ruleid =" \
             + str(ruleid)
@@ -645,49 +727,67 @@ class Controller(Observable):
         message = "Controller:runruleaudit: Entering with rule id " + \
         str(ruleid)
         self.logger.log(LogPriority.DEBUG, message)
+        self.__startrun()
         self.numrulesrunning = 1
         self.numrulescomplete = 0
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
-                message = "Controller:runruleaudit: Matched ruleid"
-                self.logger.log(LogPriority.DEBUG, message)
-                if rule.getisrootrequired() and self.environ.geteuid() != 0:
-                    self.numrulescomplete = self.numrulescomplete + 1
-                    message = "Could not run rule: insufficient privilege level"
+        rule = self.registry.getbynum(ruleid)
+        if rule is not None:
+            message = "Controller:runruleaudit: Matched ruleid"
+            self.logger.log(LogPriority.DEBUG, message)
+            if rule.getisrootrequired() and self.environ.geteuid() != 0:
+                self.numrulescomplete = self.numrulescomplete + 1
+                message = "Could not run rule: insufficient privilege level"
+                self.logger.log(LogPriority.ERROR,
+                                [rule.getrulename(), message])
+            else:
+                starttime = time.time()
+                try:
+                    rule.report()
+                except (KeyboardInterrupt, SystemExit):
+                    # User initiated exit
+                    raise
+                except Exception:
+                    trace = traceback.format_exc()
+                    self.logger.log(LogPriority.ERROR,
+                                    [rule.getrulename(),
+                                    "Controller caught rule death: "
+                                    + trace])
+                self.numrulescomplete = self.numrulescomplete + 1
+                if not rule.getrulesuccess():
                     self.logger.log(LogPriority.ERROR,
-                                    [rule.getrulename(), message])
+                                    [rule.getrulename(),
+                                    rule.getdetailedresults()])
+                if not rule.iscompliant():
+                    self.logger.log(LogPriority.WARNING,
+                                    [rule.getrulename(),
+                                    rule.getdetailedresults()])
                 else:
-                    starttime = time.time()
-                    try:
-                        rule.report()
-                    except (KeyboardInterrupt, SystemExit):
-                        # User initiated exit
-                        raise
-                    except Exception:
-                        trace = traceback.format_exc()
-                        self.logger.log(LogPriority.ERROR,
-                                        [rule.getrulename(),
-                                        "Controller caught rule death: "
-                                        + trace])
-                    self.numrulescomplete = self.numrulescomplete + 1
-                    if not rule.getrulesuccess():
-                        self.logger.log(LogPriority.ERROR,
-                                        [rule.getrulename(),
-                                        rule.getdetailedresults()])
-                    if not rule.iscompliant():
-                        self.logger.log(LogPriority.WARNING,
-                                        [rule.getrulename(),
-                                        rule.getdetailedresults()])
-                    else:
-                        self.logger.log(LogPriority.INFO,
-                                        [rule.getrulename(),
-                                        rule.getdetailedresults()])
-                    etime = time.time() - starttime
-                    self.logger.log(LogPriority.DEBUG,
+                    self.logger.log(LogPriority.INFO,
                                     [rule.getrulename(),
-                                     'Elapsed Time: ' + str(etime)])
-                    self.set_dirty()
-                    self.notify_check()
+                                    rule.getdetailedresults()])
+                etime = time.time() - starttime
+                self.logger.log(LogPriority.DEBUG,
+                                [rule.getrulename(),
+                                 'Elapsed Time: ' + str(etime)])
+                self.results.record(rule, 'report', etime)
+                self.set_dirty()
+                self.notify_check()
+
+    def prunearchive(self, keep):
+        """
+        Remove archived file versions beyond the newest keep versions of each
+        file along with blobs that are no longer needed.
+
+        @param int keep : number of versions to keep per file
+        @return void :
+        @author D. Kennel
+        """
+        if self.environ.geteuid() != 0:
+            self.logger.log(LogPriority.ERROR,
+                            ['Controller.prunearchive',
+                             'Pruning the archive requires root privileges'])
+            return
+        self.statechglogger.prunearchive(keep)
 
     def undochangessystem(self):
         """
@@ -696,11 +796,12 @@ class Controller(Observable):
         @return void :
         @author D. Kennel
         """
+        self.__startrun()
         self.numrulesrunning = self.numexecutingrules
         self.numrulescomplete = 0
         for rule in self.installedrules:
-            self.currulenum = rule.getrulenum()
-            self.currulename = rule.getrulename()
+            self.__setcurrentrule(rule)
+            starttime = time.time()
             try:
                 rule.undo()
             except (KeyboardInterrupt, SystemExit):
@@ -721,6 +822,7 @@ class Controller(Observable):
                 self.logger.log(LogPriority.INFO,
                                 [rule.getrulename(),
                                  rule.getdetailedresults()])
+            self.results.record(rule, 'undo', time.time() - starttime)
             self.set_dirty()
             self.notify_check()
 
@@ -733,38 +835,41 @@ class Controller(Observable):
         @return void :
         @author D. Kennel
         """
+        self.__startrun()
         self.numrulesrunning = 1
         self.numrulescomplete = 0
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
-                if rule.getisrootrequired() and self.environ.geteuid() != 0:
-                    self.numrulescomplete = self.numrulescomplete + 1
-                    message = "Could not run rule: insufficient privilege level"
+        rule = self.registry.getbynum(ruleid)
+        if rule is not None:
+            if rule.getisrootrequired() and self.environ.geteuid() != 0:
+                self.numrulescomplete = self.numrulescomplete + 1
+                message = "Could not run rule: insufficient privilege level"
+                self.logger.log(LogPriority.ERROR,
+                                [rule.getrulename(), message])
+            else:
+                starttime = time.time()
+                try:
+                    rule.undo()
+                except (KeyboardInterrupt, SystemExit):
+                    # User initiated exit
+                    raise
+                except Exception:
+                    trace = traceback.format_exc()
+                    self.logger.log(LogPriority.ERROR,
+                                    [rule.getrulename(),
+                                    "Controller caught rule death: "
+                                    + trace])
+                self.numrulescomplete = self.numrulescomplete + 1
+                if not rule.getrulesuccess():
                     self.logger.log(LogPriority.ERROR,
-                                    [rule.getrulename(), message])
+                                    [rule.getrulename(),
+                                    rule.getdetailedresults()])
                 else:
-                    try:
-                        rule.undo()
-                    except (KeyboardInterrupt, SystemExit):
-                        # User initiated exit
-                        raise
-                    except Exception:
-                        trace = traceback.format_exc()
-                        self.logger.log(LogPriority.ERROR,
-                                        [rule.getrulename(),
-                                        "Controller caught rule death: "
-                                        + trace])
-                    self.numrulescomplete = self.numrulescomplete + 1
-                    if not rule.getrulesuccess():
-                        self.logger.log(LogPriority.ERROR,
-                                        [rule.getrulename(),
-                                        rule.getdetailedresults()])
-                    else:
-                        self.logger.log(LogPriority.INFO,
-                                        [rule.getrulename(),
-                                        rule.getdetailedresults()])
-                    self.set_dirty()
-                    self.notify_check()
+                    self.logger.log(LogPriority.INFO,
+                                    [rule.getrulename(),
+                                    rule.getdetailedresults()])
+                self.results.record(rule, 'undo', time.time() - starttime)
+                self.set_dirty()
+                self.notify_check()
 
     def getrulehelp(self, ruleid):
         """
@@ -775,9 +880,9 @@ class Controller(Observable):
         @author D. Kennel
         """
         helptxt = []
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
-                helptxt = rule.gethelptext()
+        rule = self.registry.getbynum(ruleid)
+        if rule is not None:
+            helptxt = rule.gethelptext()
         return helptxt
 
     def updatedbs(self):
@@ -787,30 +892,25 @@ class Controller(Observable):
         @return void :
         @author D. Kennel
         """
-        numdbrules = 0
+        dbrules = self.registry.getcategory('database')
         self.numrulescomplete = 0
-        for rule in self.installedrules:
-            if rule.isdatabaserule():
-                numdbrules = numdbrules + 1
-        self.numrulesrunning = numdbrules
-        for rule in self.installedrules:
-            if rule.isdatabaserule():
-                self.currulenum = rule.getrulenum()
-                self.currulename = rule.getrulename()
-                try:
-                    rule.fix()
-                except (KeyboardInterrupt, SystemExit):
-                    # User initiated exit
-                    raise
-                except Exception:
-                    trace = traceback.format_exc()
-                    self.logger.log(LogPriority.ERROR,
-                                    [rule.getrulename(),
-                                    "Controller caught rule death: "
-                                    + trace])
-                self.numrulescomplete = self.numrulescomplete + 1
-                self.set_dirty()
-                self.notify_check()
+        self.numrulesrunning = len(dbrules)
+        for rule in dbrules:
+            self.__setcurrentrule(rule)
+            try:
+                rule.fix()
+            except (KeyboardInterrupt, SystemExit):
+                # User initiated exit
+                raise
+            except Exception:
+                trace = traceback.format_exc()
+                self.logger.log(LogPriority.ERROR,
+                                [rule.getrulename(),
+                                "Controller caught rule death: "
+                                + trace])
+            self.numrulescomplete = self.numrulescomplete + 1
+            self.set_dirty()
+            self.notify_check()
 
     def getconfigoptions(self):
         """
@@ -843,9 +943,9 @@ class Controller(Observable):
         @author D. Kennel
         """
         cilist = []
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
-                cilist = rule.getconfigitems()
+        rule = self.registry.getbynum(ruleid)
+        if rule is not None:
+            cilist = rule.getconfigitems()
         return cilist
 
     def regenerateconfig(self, simpleconf):
@@ -874,16 +974,30 @@ class Controller(Observable):
         """
         pass
 
+    def __setcurrentrule(self, rule):
+        """
+        Private method to record the rule the calling thread is about to run.
+
+        @param rule: Rule instance
+        @return void :
+        @author D. Kennel
+        """
+        self.currentrule.rulenum = rule.getrulenum()
+        self.currentrule.rulename = rule.getrulename()
+
     def getcurrentrule(self):
         """
         This method returns the rule name for the currently executing rule.
         This method only returns valid data when called while the whole rule
-        stack is running.
+        stack is running. Rules may run in parallel so the answer is the rule
+        being run by the calling thread. Observers are notified on that
+        thread.
 
         @return string : rulename
         @author D. Kennel
+        @change: 2015/10/18 dkennel the current rule is kept per thread
         """
-        return self.currulename
+        return getattr(self.currentrule, 'rulename', '')
 
     def getrulecompstatus(self, ruleid):
         """
@@ -895,8 +1009,12 @@ class Controller(Observable):
         @author: D. Kennel
         """
         compliant = False
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
+        result = self.results.getresult(ruleid)
+        if result is not None:
+            compliant = result['compliant']
+        else:
+            rule = self.registry.getbynum(ruleid)
+            if rule is not None:
                 compliant = rule.iscompliant()
         return compliant
 
@@ -910,11 +1028,35 @@ class Controller(Observable):
         @author: D. Kennel
         """
         detailedresults = []
-        for rule in self.installedrules:
-            if ruleid == rule.getrulenum():
+        result = self.results.getresult(ruleid)
+        if result is not None:
+            detailedresults = '\n'.join(result['findings'])
+        else:
+            rule = self.registry.getbynum(ruleid)
+            if rule is not None:
                 detailedresults = rule.getdetailedresults()
         return detailedresults
 
+    def getruleresult(self, ruleid):
+        """
+        This method returns the structured result of the most recent run of
+        the rule with a given rule id. See ResultStore.record for the keys.
+
+        @param int: ruleid
+        @return: dict or None if the rule has not been run
+        @author: D. Kennel
+        """
+        return self.results.getresult(ruleid)
+
+    def getresultstore(self):
+        """
+        Return the ResultStore holding the results of this run.
+
+        @return: ResultStore
+        @author: D. Kennel
+        """
+        return self.results
+
     def getcompletionpercentage(self):
         """
         This method returns the percentage of items on the to-do list
@@ -939,12 +1081,20 @@ class Controller(Observable):
 
     def displaylastrun(self):
         """
-        Returns the contents of the log file by way of the logger object.
+        Returns the results of the last run from the result store, or the
+        contents of the previous log file by way of the logger object when
+        that run left no results.
 
         @return string :
         @author
+        @change: 2015/10/18 dkennel read the result store instead of the
+            whole log
         """
-        return self.logger.displaylastrun()
+        lastrun = self.results.getlastrun()
+        if not lastrun:
+            # Runs from before the result store only have the text log
+            return self.logger.displaylastrun()
+        return formatresults(lastrun)
 
     def updatestatus(self, callingobject):
         """
@@ -1082,6 +1232,8 @@ ABORTING EXECUTION!"""
         self.environ.setinstallmode(self.prog_args.get_install())
         self.pcf = self.prog_args.getPrintConfigFull()
         self.pcs = self.prog_args.getPrintConfigSimple()
+        self.jobs = self.prog_args.getJobs()
+        self.prune = self.prog_args.getPruneArchive()
 
         if self.prog_args.get_update():
             # update(debug)
@@ -1186,8 +1338,13 @@ ABORTING EXECUTION!"""
                                 'Generating Simple config file')
                 self.regenerateconfig(True)
                 self.logger.closereports()
+            if self.prune:
+                self.logger.log(LogPriority.DEBUG,
+                                'Pruning the file archive')
+                self.prunearchive(self.prune)
+                self.logger.closereports()
             if not self.fix and not self.report and not self.undo and \
-            not self.pcf and not self.pcs:
+            not self.pcf and not self.pcs and not self.prune:
                 self.logger.log(LogPriority.INFO,
                                 'No action specified. Please check command syntax')
                 self.logger.closereports()
@@ -0,0 +1,326 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The AccountDB answers questions about local accounts and groups from
+/etc/passwd, /etc/shadow and /etc/group. Each file is read and indexed by
+name and id once, through the ConfigCache, so every rule in the run shares
+the same tables and a rule that rewrites one of the files is seen by the
+next query. Accounts that are not in the local files, LDAP or NIS users for
+instance, are looked up in process through the pwd module rather than by
+running id, and the answers are kept for the rest of the run.
+
+Use getaccountdb() to obtain the shared instance for the current run. The
+entries handed out are tuples of the fields of a line and are shared with
+every other caller.
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+'''
+import pwd
+import threading
+from ConfigCache import getparsed
+
+ACCOUNTDB = None
+ACCOUNTDBLOCK = threading.Lock()
+
+
+def getaccountdb():
+    '''
+    Return the AccountDB shared by all rules in this run, creating it on
+    first use.
+
+    @return: AccountDB instance
+    @author: dkennel
+    '''
+    global ACCOUNTDB
+    ACCOUNTDBLOCK.acquire()
+    try:
+        if ACCOUNTDB is None:
+            ACCOUNTDB = AccountDB()
+    finally:
+        ACCOUNTDBLOCK.release()
+    return ACCOUNTDB
+
+
+class AccountTable(object):
+    '''
+    The entries of one colon separated account file indexed by name and,
+    for passwd and group, by numeric id. Comments, blank lines and lines
+    without a colon are skipped. Every other line is kept, including
+    malformed ones and NIS compat (+/-) entries, so that callers see the
+    file as it is.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, lines, idfield=None):
+        '''
+        AccountTable constructor.
+
+        @param lines: sequence of lines of the file
+        @param idfield: int - index of the numeric id field, None for files
+            without one
+        @author: dkennel
+        '''
+        self.entries = []
+        self.byname = {}
+        self.byid = {}
+        for line in lines:
+            if line.startswith('#') or not line.strip() or ':' not in line:
+                continue
+            entry = tuple(line.rstrip('\n').split(':'))
+            self.entries.append(entry)
+            self.byname.setdefault(entry[0], []).append(entry)
+            if idfield is not None and len(entry) > idfield and \
+               entry[idfield].strip().isdigit():
+                self.byid.setdefault(int(entry[idfield]), []).append(entry)
+
+
+def parsepasswd(lines):
+    '''
+    ConfigCache parser for passwd format files.
+
+    @param lines: sequence of lines of the file
+    @return: AccountTable instance
+    @author: dkennel
+    '''
+    return AccountTable(lines, 2)
+
+
+def parseshadow(lines):
+    '''
+    ConfigCache parser for shadow and master.passwd format files.
+
+    @param lines: sequence of lines of the file
+    @return: AccountTable instance
+    @author: dkennel
+    '''
+    return AccountTable(lines)
+
+
+def parsegroup(lines):
+    '''
+    ConfigCache parser for group format files.
+
+    @param lines: sequence of lines of the file
+    @return: AccountTable instance
+    @author: dkennel
+    '''
+    return AccountTable(lines, 2)
+
+
+class AccountDB(object):
+    '''
+    Indexed, read only view of the local account databases.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, passwd='/etc/passwd', shadow='/etc/shadow',
+                 group='/etc/group'):
+        '''
+        AccountDB constructor. The files are read when they are first
+        queried.
+
+        @param passwd: string - path of the passwd file
+        @param shadow: string - path of the shadow file
+        @param group: string - path of the group file
+        @author: dkennel
+        '''
+        self.passwd = passwd
+        self.shadow = shadow
+        self.group = group
+        self.nsscache = {}
+
+    def gettable(self, path, parser):
+        '''
+        Return the AccountTable for a file. A file that does not exist or can
+        not be read, shadow for an unprivileged user for instance, gives an
+        empty table.
+
+        @param path: string - path of the file
+        @param parser: parsepasswd, parseshadow or parsegroup
+        @return: AccountTable instance
+        @author: dkennel
+        '''
+        try:
+            return getparsed(path, parser)
+        except (IOError, OSError):
+            return AccountTable([])
+
+    def getusers(self):
+        '''
+        Return the passwd entries in file order.
+
+        @return: list of tuples
+        @author: dkennel
+        '''
+        return list(self.gettable(self.passwd, parsepasswd).entries)
+
+    def getuser(self, name):
+        '''
+        Return the first passwd entry for name.
+
+        @param name: string - account name
+        @return: tuple or None
+        @author: dkennel
+        '''
+        entries = self.gettable(self.passwd, parsepasswd).byname.get(name)
+        if entries:
+            return entries[0]
+        return None
+
+    def getusersbyuid(self, uid):
+        '''
+        Return the passwd entries with the given uid in file order.
+
+        @param uid: int
+        @return: list of tuples
+        @author: dkennel
+        '''
+        return list(self.gettable(self.passwd,
+                                  parsepasswd).byid.get(uid, []))
+
+    def getuid(self, name):
+        '''
+        Return the uid of an account, as id -u would. The local passwd file
+        is consulted first and then the system's name services through the
+        pwd module. Name service answers, including unknown accounts, are
+        remembered for the rest of the run.
+
+        @param name: string - account name
+        @return: int or None if the account is unknown
+        @author: dkennel
+        '''
+        entry = self.getuser(name)
+        if entry is not None and len(entry) > 2 and \
+           entry[2].strip().isdigit():
+            return int(entry[2])
+        if name not in self.nsscache:
+            try:
+                self.nsscache[name] = pwd.getpwnam(name).pw_uid
+            except KeyError:
+                self.nsscache[name] = None
+        return self.nsscache[name]
+
+    def gethomedirs(self, minuid=0):
+        '''
+        Return (name, uid, home directory) for every passwd entry with a
+        numeric uid of at least minuid and a home directory field, in file
+        order.
+
+        @param minuid: int
+        @return: list of tuples
+        @author: dkennel
+        '''
+        homedirs = []
+        for entry in self.gettable(self.passwd, parsepasswd).entries:
+            if len(entry) > 5 and entry[2].strip().isdigit() and \
+               int(entry[2]) >= minuid:
+                homedirs.append((entry[0], int(entry[2]), entry[5]))
+        return homedirs
+
+    def getshadowentries(self):
+        '''
+        Return the shadow entries in file order.
+
+        @return: list of tuples
+        @author: dkennel
+        '''
+        return list(self.gettable(self.shadow, parseshadow).entries)
+
+    def getshadowentry(self, name):
+        '''
+        Return the first shadow entry for name.
+
+        @param name: string - account name
+        @return: tuple or None
+        @author: dkennel
+        '''
+        entries = self.gettable(self.shadow, parseshadow).byname.get(name)
+        if entries:
+            return entries[0]
+        return None
+
+    def getgroups(self):
+        '''
+        Return the group entries in file order.
+
+        @return: list of tuples
+        @author: dkennel
+        '''
+        return list(self.gettable(self.group, parsegroup).entries)
+
+    def getgroup(self, name):
+        '''
+        Return the first group entry for name.
+
+        @param name: string - group name
+        @return: tuple or None
+        @author: dkennel
+        '''
+        entries = self.gettable(self.group, parsegroup).byname.get(name)
+        if entries:
+            return entries[0]
+        return None
+
+    def getgroupsbygid(self, gid):
+        '''
+        Return the group entries with the given gid in file order.
+
+        @param gid: int
+        @return: list of tuples
+        @author: dkennel
+        '''
+        return list(self.gettable(self.group, parsegroup).byid.get(gid, []))
+
+    def getduplicates(self, path):
+        '''
+        Return the entries of a passwd or group format file that repeat the
+        name or the id of an earlier entry. Entries with fewer than three
+        fields are ignored.
+
+        @param path: string - path of the file, normally self.passwd or
+            self.group
+        @return: list of (kind, entry) tuples in file order where kind is
+            'name' or 'id'. An entry that repeats both is listed twice.
+        @author: dkennel
+        '''
+        if path == self.group:
+            parser = parsegroup
+        else:
+            parser = parsepasswd
+        names = set()
+        ids = set()
+        duplicates = []
+        for entry in self.gettable(path, parser).entries:
+            if len(entry) < 3:
+                continue
+            if entry[0] in names:
+                duplicates.append(('name', entry))
+            names.add(entry[0])
+            if entry[2] in ids:
+                duplicates.append(('id', entry))
+            ids.add(entry[2])
+        return duplicates
@@ -31,9 +31,14 @@
 @change: 04/15/2014 ekkehard enhance documentation & pep8 compliance
 @change: 04/15/2014 ekkehard made logging more intelligent
 @change: 10/20/2014 ekkehard fix pep8 viloation
+@change: 2015/10/13 dkennel drain stdout and stderr concurrently, added
+command timeouts, executeCommandStream and findInStream
 '''
+import os
 import re
+import signal
 import subprocess
+import threading
 import traceback
 import types
 from logdispatcher import LogPriority
@@ -71,6 +76,10 @@ class CommandHelper(object):
 
         # set this to False if you need to run a command that has no return code
         self.wait = True
+        # seconds after which a command is killed, None to never time out
+        self.timeout = None
+        self.timedout = False
+        self.processgroup = False
 
 ###############################################################################
 
@@ -349,15 +358,61 @@ class CommandHelper(object):
         if flag in self.flags:
             self.flag = flag
 
+###############################################################################
+
+    def getTimeout(self):
+        '''
+        Get the number of seconds after which commands are killed.
+        @param self:essential if you override this definition
+        @return: number or None if commands never time out
+        @author: dkennel
+        '''
+        return self.timeout
+
+###############################################################################
+
+    def setTimeout(self, timeout=None):
+        '''
+        Set the number of seconds after which a command and any processes it
+        started are killed. getTimedOut() reports whether the last command
+        was killed this way.
+        @param self:essential if you override this definition
+        @param timeout number: seconds, None to never time out
+        @return: bool indicating success or failure
+        @author: dkennel
+        '''
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Timeout must be greater than 0, got " +
+                             str(timeout))
+        self.timeout = timeout
+        return True
+
+###############################################################################
+
+    def getTimedOut(self):
+        '''
+        Return True if the last command was killed because it ran longer
+        than the timeout.
+        @param self:essential if you override this definition
+        @return: bool
+        @author: dkennel
+        '''
+        return self.timedout
+
 ###############################################################################
 
     def executeCommand(self, command=None):
         '''
         executeCommand (command) excecute the command for the CommandHelper
+        Standard out and standard error are read at the same time so a
+        command that fills one pipe while we wait on the other cannot hang.
         @param self:essential if you override this definition
         @param command string or list: command to set the command property to
-        @return: bool indicating success or failure
+        @return: bool indicating success or failure, False if the command
+        timed out
         @author: ekkehard j. koch
+        @change: 2015/10/13 dkennel read both pipes concurrently, honour the
+        timeout
         '''
         try:
             commandobj = None
@@ -372,25 +427,19 @@ class CommandHelper(object):
                                            "".join(self.command) + ")")
 
             if (success):
-                commandobj = subprocess.Popen(self.command,
-                               stdout=subprocess.PIPE,
-                               stderr=subprocess.PIPE,
-                               shell=self.shell)
-                if self.wait:
-                    commandobj.wait()
+                commandobj, errreader, timer = self.__start()
 
                 if commandobj is not None:
 
                     self.stdout = commandobj.stdout.readlines()
-
-                    self.stderr = commandobj.stderr.readlines()
+                    self.__finish(commandobj, errreader, timer)
                     self.output = self.stderr + self.stdout
 
-                    self.returncode = commandobj.returncode
-
                     self.logdispatcher.log(self.logpriority,
                                            "returncode: " +
                                             str(self.returncode))
+                    if self.timedout:
+                        success = False
         except (KeyboardInterrupt, SystemExit):
             raise
         except Exception, err:
@@ -414,6 +463,186 @@ class CommandHelper(object):
 
         return success
 
+###############################################################################
+
+    def executeCommandStream(self, command=None):
+        '''
+        executeCommandStream (command) execute the command for the
+        CommandHelper and yield its standard out one line at a time as it is
+        produced. Standard out is not kept, standard error is collected in
+        the background and available from getError() once the generator is
+        exhausted or closed. If the caller stops early the command is killed,
+        otherwise it is waited for once standard out is at end of file.
+        @param self:essential if you override this definition
+        @param command string or list: command to set the command property to
+        @return: generator of standard out lines
+        @author: dkennel
+        '''
+        if command is not None:
+            self.setCommand(command)
+        if self.commandblank:
+            raise ValueError("Cannot Execute a blank command (" + \
+                             "".join(self.command) + ")")
+        commandobj, errreader, timer = self.__start(True)
+        finished = False
+        try:
+            for line in iter(commandobj.stdout.readline, ''):
+                yield line
+            finished = True
+        finally:
+            if finished:
+                # The command may close standard out before it exits, so
+                # only a generator closed early kills it.
+                commandobj.wait()
+            elif commandobj.poll() is None:
+                self.__kill(commandobj)
+            self.__finish(commandobj, errreader, timer)
+            commandobj.stdout.close()
+            commandobj.stderr.close()
+            self.output = list(self.stderr)
+            self.logdispatcher.log(LogPriority.DEBUG,
+                                   "returncode:(" + str(self.returncode) +
+                                   ") stderr:(" + str(self.stderr) +
+                                   "); command:(" + str(self.command) + ")")
+
+###############################################################################
+
+    def findInStream(self, expression, command=None):
+        '''
+        findInStream (expression, command) execute the command and search its
+        standard out line by line, stopping the command at the first line
+        that matches the expression.
+        @param self:essential if you override this definition
+        @param expression string: expression to search for in standard out
+        @param command string or list: command to set the command property to
+        @return: bool indicating whether the expression was found
+        @author: dkennel
+        '''
+        found = False
+        stream = self.executeCommandStream(command)
+        try:
+            for line in stream:
+                if re.search(expression, line):
+                    found = True
+                    self.logdispatcher.log(LogPriority.DEBUG,
+                                           "expression = " + str(expression) +
+                                           ", found in line = " + str(line))
+                    break
+        finally:
+            stream.close()
+        return found
+
+###############################################################################
+
+    def __start(self, killable=False):
+        '''
+        Private method to start the current command with a background reader
+        for standard error and, when a timeout is set, a timer that kills it.
+        @param self:essential if you override this definition
+        @param killable bool: start the command in its own process group even
+        without a timeout so it can be killed with everything it started
+        @return: tuple of Popen object, reader thread, timer or None
+        @author: dkennel
+        '''
+        self.stdout = []
+        self.stderr = []
+        self.output = []
+        self.returncode = None
+        self.timedout = False
+        self.processgroup = killable or self.timeout is not None
+        preexec = None
+        if self.processgroup:
+            # Own process group so the whole tree can be killed
+            preexec = os.setsid
+        commandobj = subprocess.Popen(self.command,
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE,
+                                      shell=self.shell,
+                                      preexec_fn=preexec)
+        errreader = threading.Thread(target=self.__drain,
+                                     args=(commandobj.stderr, self.stderr))
+        errreader.daemon = True
+        errreader.start()
+        timer = None
+        if self.timeout is not None:
+            timer = threading.Timer(self.timeout, self.__expire, [commandobj])
+            timer.daemon = True
+            timer.start()
+        return commandobj, errreader, timer
+
+###############################################################################
+
+    def __drain(self, stream, lines):
+        '''
+        Private thread body that reads a pipe to the end.
+        @param self:essential if you override this definition
+        @param stream file: pipe to read
+        @param lines list: list the lines are appended to
+        @author: dkennel
+        '''
+        for line in iter(stream.readline, ''):
+            lines.append(line)
+
+###############################################################################
+
+    def __finish(self, commandobj, errreader, timer):
+        '''
+        Private method to wait for a started command, stop its timer and
+        collect the return code.
+        @param self:essential if you override this definition
+        @param commandobj Popen: the running command
+        @param errreader Thread: standard error reader
+        @param timer Timer: timeout timer or None
+        @author: dkennel
+        '''
+        try:
+            errreader.join()
+            if self.wait or self.timedout:
+                commandobj.wait()
+            else:
+                commandobj.poll()
+            self.returncode = commandobj.returncode
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if self.timedout:
+                self.logdispatcher.log(LogPriority.DEBUG,
+                                       "Command timed out after " +
+                                       str(self.timeout) + " seconds: " +
+                                       str(self.command))
+
+###############################################################################
+
+    def __expire(self, commandobj):
+        '''
+        Private timer callback that kills a command that ran too long.
+        @param self:essential if you override this definition
+        @param commandobj Popen: the running command
+        @author: dkennel
+        '''
+        if commandobj.poll() is None:
+            self.timedout = True
+            self.__kill(commandobj)
+
+###############################################################################
+
+    def __kill(self, commandobj):
+        '''
+        Private method to kill a command, and its process group if it was
+        started in one.
+        @param self:essential if you override this definition
+        @param commandobj Popen: the running command
+        @author: dkennel
+        '''
+        try:
+            if self.processgroup:
+                os.killpg(commandobj.pid, signal.SIGKILL)
+            else:
+                commandobj.kill()
+        except OSError:
+            # Already gone
+            pass
+
 ###############################################################################
 
     def findInOutput(self, expression, searchgroup="output", dtype="list"):
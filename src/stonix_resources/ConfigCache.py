@@ -0,0 +1,181 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The ConfigCache keeps the contents of configuration files that have already
+been read during this run. Many rules read the same files (/etc/passwd,
+sysctl.conf, sshd_config, login.defs ...) and each used to read and split
+them again. Cached contents are keyed by the file's mtime, size, inode and
+device, so any change to a file, including replacing it with a renamed
+temporary file, is noticed on the next read. Files larger than MAXSIZE are
+read but not cached, as are files such as those under /proc and /sys whose
+size does not match what was read from them.
+
+getlines() returns a private copy of the lines of a file. getparsed() runs a
+parser over the lines once and hands every caller the same result, which
+must therefore be treated as read only.
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+'''
+import os
+import stat
+import threading
+
+CACHE = {}
+CACHELOCK = threading.Lock()
+MAXSIZE = 1048576
+
+
+def getentry(path):
+    '''
+    Return the cache entry for a file, reading the file if it is not cached
+    or has changed since it was cached. Entries are dictionaries holding the
+    stamp, the lines as a tuple and the parsed representations.
+
+    @param path: string - path of the file
+    @return: dict - cache entry
+    @raise IOError: when the file can not be read
+    @author: dkennel
+    '''
+    path = os.path.abspath(path)
+    handle = open(path, 'r')
+    try:
+        filestat = os.fstat(handle.fileno())
+        stamp = (filestat.st_mtime, filestat.st_size, filestat.st_ino,
+                 filestat.st_dev)
+        CACHELOCK.acquire()
+        try:
+            entry = CACHE.get(path)
+        finally:
+            CACHELOCK.release()
+        if entry is not None and entry['stamp'] == stamp:
+            return entry
+        entry = {'stamp': stamp,
+                 'lines': tuple(handle.readlines()),
+                 'parsed': {}}
+    finally:
+        handle.close()
+    if stat.S_ISREG(filestat.st_mode) and stamp[1] <= MAXSIZE and \
+       stamp[1] == sum([len(line) for line in entry['lines']]):
+        CACHELOCK.acquire()
+        try:
+            CACHE[path] = entry
+        finally:
+            CACHELOCK.release()
+    return entry
+
+
+def getlines(path):
+    '''
+    Return the lines of a file, newlines included, as readlines would.
+
+    @param path: string - path of the file
+    @return: list of strings - a copy that the caller may modify
+    @raise IOError: when the file can not be read
+    @author: dkennel
+    '''
+    return list(getentry(path)['lines'])
+
+
+def getparsed(path, parser):
+    '''
+    Return the result of parser for the current contents of a file. The
+    parser is called with a tuple of the file's lines and only runs again
+    once the file has changed. All callers share the returned object.
+
+    @param path: string - path of the file
+    @param parser: callable taking a tuple of lines
+    @return: whatever parser returns
+    @raise IOError: when the file can not be read
+    @author: dkennel
+    '''
+    return parseentry(getentry(path), parser)
+
+
+def getlinesparsed(path, parser):
+    '''
+    Return both a copy of the lines of a file and the shared result of
+    parser for them, taken from the same version of the file.
+
+    @param path: string - path of the file
+    @param parser: callable taking a tuple of lines
+    @return: tuple of a list of lines and whatever parser returns
+    @raise IOError: when the file can not be read
+    @author: dkennel
+    '''
+    entry = getentry(path)
+    return list(entry['lines']), parseentry(entry, parser)
+
+
+def parseentry(entry, parser):
+    '''
+    Return the result of parser for a cache entry, running it on the first
+    request only.
+
+    @param entry: dict - cache entry as returned by getentry
+    @param parser: callable taking a tuple of lines
+    @return: whatever parser returns
+    @author: dkennel
+    '''
+    CACHELOCK.acquire()
+    try:
+        if parser in entry['parsed']:
+            return entry['parsed'][parser]
+    finally:
+        CACHELOCK.release()
+    parsed = parser(entry['lines'])
+    CACHELOCK.acquire()
+    try:
+        entry['parsed'][parser] = parsed
+    finally:
+        CACHELOCK.release()
+    return parsed
+
+
+def invalidate(path):
+    '''
+    Drop a file from the cache. Called after stonix writes a file so the
+    next reader does not depend on the stamp alone to see the change.
+
+    @param path: string - path of the file
+    @author: dkennel
+    '''
+    CACHELOCK.acquire()
+    try:
+        CACHE.pop(os.path.abspath(path), None)
+    finally:
+        CACHELOCK.release()
+
+
+def clear():
+    '''
+    Drop every cached file.
+
+    @author: dkennel
+    '''
+    CACHELOCK.acquire()
+    try:
+        CACHE.clear()
+    finally:
+        CACHELOCK.release()
@@ -0,0 +1,410 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The DeliveryQueue takes the network traffic STONIX generates, the error
+report mail and the run report upload, off of the path of the rules. Errors
+are collected in memory and sent as a single digest mail per run. Mail and
+reports are written to a spool directory and delivered by a background
+thread. Anything that can not be delivered stays in the spool and is retried
+by the next run.
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+@change: 2015/10/18 dkennel a spooldir of None disables spooling and delivery
+'''
+import os
+import shutil
+import smtplib
+import subprocess
+import tempfile
+import threading
+import time
+import traceback
+
+SPOOLDIR = '/var/spool/stonix'
+# Maximum number of distinct error messages held for the digest
+MAXERRORS = 200
+# Maximum number of files kept in the spool, the oldest are dropped
+MAXSPOOL = 20
+# Seconds allowed for a single mail or upload
+SENDTIMEOUT = 30
+# Seconds close() waits for the spool to be delivered
+CLOSETIMEOUT = 60
+
+
+class DeliveryQueue(object):
+    '''
+    Background delivery of error mail and run reports through an on disk
+    spool.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, spooldir, mailrelay, sender, recipients, uploadurl,
+                 debug=False):
+        '''
+        DeliveryQueue constructor.
+
+        @param spooldir: string - directory mail and reports are spooled in.
+            None discards everything handed to the queue, which is what the
+            test harness uses.
+        @param mailrelay: string - mail relay host, optionally host:port
+        @param sender: string - address the error mail is sent from
+        @param recipients: string - comma separated addresses the error mail
+            is sent to
+        @param uploadurl: string - url the run report is posted to
+        @param debug: bool - print delivery results
+        @author: dkennel
+        '''
+        self.spooldir = spooldir
+        self.mailrelay = mailrelay
+        self.sender = sender
+        self.recipients = recipients
+        self.uploadurl = uploadurl
+        self.debug = debug
+        self.lock = threading.Lock()
+        self.errors = []
+        self.errindex = {}
+        self.dropped = 0
+        self.spooled = 0
+        self.worker = None
+        self.event = threading.Event()
+        self.stopping = False
+
+    def adderror(self, prefix, errmsg):
+        '''
+        Add an error message to the digest. Repeats of a message are counted
+        rather than stored again and once MAXERRORS distinct messages are
+        held further ones are only counted. This never blocks on the network.
+
+        @param prefix: string - module and function that logged the error
+        @param errmsg: string - error message
+        @author: dkennel
+        '''
+        key = (prefix, errmsg)
+        self.lock.acquire()
+        try:
+            if key in self.errindex:
+                self.errindex[key][2] += 1
+            elif len(self.errors) < MAXERRORS:
+                error = [prefix, errmsg, 1]
+                self.errors.append(error)
+                self.errindex[key] = error
+            else:
+                self.dropped += 1
+        finally:
+            self.lock.release()
+
+    def geterrorcount(self):
+        '''
+        Return the number of errors waiting to be sent in the next digest.
+
+        @return: int
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            count = self.dropped
+            for error in self.errors:
+                count += error[2]
+            return count
+        finally:
+            self.lock.release()
+
+    def spooldigest(self, sentby):
+        '''
+        Write the errors collected so far to the spool as one mail and wake
+        the delivery thread. Nothing is spooled if there are no errors.
+
+        @param sentby: string - description of the system the mail is from
+        @return: bool - True if a digest was spooled
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            errors = self.errors
+            dropped = self.dropped
+            self.errors = []
+            self.errindex = {}
+            self.dropped = 0
+        finally:
+            self.lock.release()
+        if not errors and not dropped:
+            return False
+        count = dropped
+        for error in errors:
+            count += error[2]
+        lines = ['From: ' + self.sender,
+                 'To: ' + self.recipients,
+                 'Subject: STONIX Error Report: ' + str(count) + ' errors',
+                 '',
+                 'Sent by: ' + sentby]
+        for prefix, errmsg, repeats in errors:
+            lines.append('')
+            if repeats > 1:
+                lines.append(prefix + ' (repeated ' + str(repeats) +
+                             ' times)')
+            else:
+                lines.append(prefix)
+            lines.append(errmsg)
+        if dropped:
+            lines.append('')
+            lines.append(str(dropped) + ' further errors were not included')
+        self.__spool('.mail', data='\r\n'.join(lines))
+        return True
+
+    def spoolreport(self, path, keep=False):
+        '''
+        Put a run report in the spool for upload and wake the delivery
+        thread.
+
+        @param path: string - report file, the name must end in .xml or
+            .xml.gz
+        @param keep: bool - copy the report instead of moving it
+        @author: dkennel
+        '''
+        if path.endswith('.gz'):
+            suffix = '.xml.gz'
+        else:
+            suffix = '.xml'
+        self.__spool(suffix, path=path, keep=keep)
+
+    def __spool(self, suffix, data=None, path=None, keep=False):
+        '''
+        Private method to add a file to the spool. Files are written under a
+        temporary name and renamed so the delivery thread never sees a
+        partial file. Spooled files are named after the time they were
+        spooled so they are delivered oldest first.
+
+        @param suffix: string - kind of file, .mail, .xml or .xml.gz
+        @param data: string - contents of the new file
+        @param path: string - existing file to spool instead of data
+        @param keep: bool - copy path instead of moving it
+        @author: dkennel
+        '''
+        if self.spooldir is None:
+            return
+        if not os.path.isdir(self.spooldir):
+            os.makedirs(self.spooldir, 0700)
+        self.lock.acquire()
+        try:
+            self.spooled += 1
+            name = '%017.6f-%d-%d%s' % (time.time(), os.getpid(),
+                                        self.spooled, suffix)
+        finally:
+            self.lock.release()
+        fdesc, tmppath = tempfile.mkstemp(dir=self.spooldir, prefix='.')
+        os.close(fdesc)
+        try:
+            if data is not None:
+                whandle = open(tmppath, 'wb')
+                try:
+                    whandle.write(data)
+                finally:
+                    whandle.close()
+            elif keep:
+                shutil.copyfile(path, tmppath)
+            else:
+                shutil.move(path, tmppath)
+            os.rename(tmppath, os.path.join(self.spooldir, name))
+        except:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            raise
+        spooled = self.getspool()
+        for oldname in spooled[:-MAXSPOOL]:
+            self.__remove(oldname)
+        self.wake()
+
+    def getspool(self):
+        '''
+        Return the names of the files waiting in the spool, oldest first.
+
+        @return: list of strings
+        @author: dkennel
+        '''
+        if self.spooldir is None:
+            return []
+        try:
+            names = os.listdir(self.spooldir)
+        except OSError:
+            return []
+        spooled = []
+        for name in names:
+            if not name.startswith('.'):
+                spooled.append(name)
+        spooled.sort()
+        return spooled
+
+    def wake(self):
+        '''
+        Start the delivery thread if it is not running and have it deliver
+        the spool.
+
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.__run,
+                                               name='DeliveryQueue')
+                self.worker.daemon = True
+                self.worker.start()
+        finally:
+            self.lock.release()
+        self.event.set()
+
+    def close(self, timeout=CLOSETIMEOUT):
+        '''
+        Let the delivery thread finish its current pass over the spool and
+        wait at most timeout seconds for it. Whatever is not delivered stays
+        in the spool for the next run.
+
+        @param timeout: float - seconds to wait
+        @author: dkennel
+        '''
+        self.stopping = True
+        self.event.set()
+        if self.worker is not None:
+            self.worker.join(timeout)
+
+    def __run(self):
+        '''
+        Private thread body. Delivers the spool each time the queue is
+        woken until close() is called.
+
+        @author: dkennel
+        '''
+        while True:
+            self.event.wait()
+            self.event.clear()
+            try:
+                self.deliver()
+            except Exception:
+                if self.debug:
+                    print 'DeliveryQueue: ' + traceback.format_exc()
+            if self.stopping:
+                return
+
+    def deliver(self):
+        '''
+        Make one pass over the spool, oldest first. After the first failure
+        of a kind of delivery the remaining files of that kind are left for
+        a later pass.
+
+        @return: int - number of files delivered
+        @author: dkennel
+        '''
+        delivered = 0
+        mailok = True
+        uploadok = True
+        for name in self.getspool():
+            path = os.path.join(self.spooldir, name)
+            if name.endswith('.mail'):
+                if not mailok:
+                    continue
+                mailok = self.sendmail(path)
+                success = mailok
+            else:
+                if not uploadok:
+                    continue
+                uploadok = self.upload(path)
+                success = uploadok
+            if success:
+                self.__remove(name)
+                delivered += 1
+        return delivered
+
+    def sendmail(self, path):
+        '''
+        Send a spooled mail through the mail relay.
+
+        @param path: string - spooled mail file
+        @return: bool - True if the relay accepted the mail
+        @author: dkennel
+        '''
+        try:
+            rhandle = open(path, 'rb')
+            try:
+                message = rhandle.read()
+            finally:
+                rhandle.close()
+            recipients = []
+            for recipient in self.recipients.split(','):
+                if recipient.strip():
+                    recipients.append(recipient.strip())
+            server = smtplib.SMTP(self.mailrelay, timeout=SENDTIMEOUT)
+            try:
+                server.sendmail(self.sender, recipients, message)
+            finally:
+                server.quit()
+            return True
+        except Exception, err:
+            if self.debug:
+                print 'DeliveryQueue.sendmail: ' + str(err)
+            return False
+
+    def upload(self, path):
+        '''
+        Post a spooled run report to the report server. The server answers
+        ok followed by the name it stored the report under.
+
+        @param path: string - spooled report file
+        @return: bool - True if the server accepted the report
+        @author: dkennel
+        '''
+        if path.endswith('.gz'):
+            filetype = 'application/x-gzip'
+        else:
+            filetype = 'text/xml'
+        curlcommand = ['curl', '-k', '-s', '-G', '--connect-timeout',
+                       str(SENDTIMEOUT), '--max-time', str(SENDTIMEOUT * 10),
+                       '-F', 'file=@' + path + ';type=' + filetype,
+                       self.uploadurl]
+        try:
+            cmd = subprocess.Popen(curlcommand, close_fds=True,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+            uploadstatus, errors = cmd.communicate()
+        except OSError, err:
+            if self.debug:
+                print 'DeliveryQueue.upload: ' + str(err)
+            return False
+        if self.debug:
+            print 'DeliveryQueue.upload: Upload status: ' + uploadstatus + \
+                errors
+        return cmd.returncode == 0 and uploadstatus.startswith('ok')
+
+    def __remove(self, name):
+        '''
+        Private method to remove a file from the spool. Another STONIX
+        process may have delivered it already.
+
+        @param name: string - name of the spooled file
+        @author: dkennel
+        '''
+        try:
+            os.remove(os.path.join(self.spooldir, name))
+        except OSError:
+            pass
@@ -0,0 +1,561 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The FSInventory walks the local filesystems once per run and keeps the mode,
+owner, group and mtime of every entry it finds. Rules that need to look for
+world writable, SUID/SGID or unowned files query the inventory instead of
+walking the disk themselves.
+
+Use getinventory() to obtain the shared instance for the current run.
+
+When an index file is passed to scan() the inventory keeps a persistent
+record of every directory's (dev, inode, mtime, ctime) and of the names it
+contained. Directories whose metadata has not changed since the last run are
+not listed again, the names are taken from the index. Every entry is still
+lstat'ed on each walk because changing the mode or owner of a file does not
+touch its parent directory.
+
+@author: dkennel
+@change: 2015/10/05 dkennel original implementation
+@change: 2015/10/07 dkennel added the persistent directory index and result
+sets for incremental scans
+@change: 2015/10/18 dkennel only directory listings are taken from the index,
+entries are always lstat'ed so permission changes are seen
+@change: 2015/10/18 dkennel added refresh so rules can record the entries
+they change
+'''
+import cPickle
+import grp
+import os
+import pwd
+import stat
+import threading
+import time
+from array import array
+from logdispatcher import LogPriority
+from stonixutilityfunctions import getlocalfs
+
+INVENTORY = None
+INVENTORYLOCK = threading.Lock()
+INDEXVERSION = 2
+
+
+def getinventory(logger, environ):
+    '''
+    Return the FSInventory shared by all rules in this run, creating it on
+    first use.
+
+    @param logger: LogDispatcher instance
+    @param environ: Environment instance
+    @return: FSInventory instance
+    @author: dkennel
+    '''
+    global INVENTORY
+    INVENTORYLOCK.acquire()
+    try:
+        if INVENTORY is None:
+            INVENTORY = FSInventory(logger, environ)
+    finally:
+        INVENTORYLOCK.release()
+    return INVENTORY
+
+
+class FSInventory(object):
+    '''
+    Single pass inventory of the local filesystems. Entries are held in
+    parallel arrays rather than a list of stat objects to keep the memory
+    footprint small on hosts with millions of files. Symbolic links are
+    recorded but never match the permission queries.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, logger, environ):
+        '''
+        FSInventory constructor.
+
+        @param logger: LogDispatcher instance
+        @param environ: Environment instance
+        @author: dkennel
+        '''
+        self.logger = logger
+        self.environ = environ
+        self.lock = threading.RLock()
+        self.scanned = False
+        self.filesystems = []
+        self.indexfile = None
+        self.fullscan = 0
+        self.olddirs = {}
+        self.dirs = {}
+        self.reused = 0
+        self.previous = {}
+        self.origin = {}
+        self.results = {}
+        self.__reset()
+
+    def __reset(self):
+        '''
+        Private method to clear the inventory data.
+
+        @author: dkennel
+        '''
+        self.paths = []
+        self.modes = array('L')
+        self.uids = array('L')
+        self.gids = array('L')
+        self.mtimes = array('d')
+        self.index = None
+        self.knownuids = {}
+        self.knowngids = {}
+
+    def scan(self, bypass=None, filesystems=None, rescan=False,
+             indexfile=None, maxage=None):
+        '''
+        Walk the local filesystems and populate the inventory. The walk is
+        only done once per run; later calls return immediately unless rescan
+        is True. Mount points below each filesystem are not crossed.
+
+        If indexfile is given the directory index saved there by a previous
+        run is used to skip unchanged directories. Call saveindex() once the
+        results have been stored to write the updated index back.
+
+        @param bypass: list of filesystems that should not be walked
+        @param filesystems: list of filesystems to walk, defaults to all
+        local filesystems
+        @param rescan: bool - discard existing data and walk again
+        @param indexfile: string - path of the persistent directory index
+        @param maxage: int - seconds after which the index is discarded and a
+        full walk is done. None keeps the index indefinitely.
+        @return: int - number of entries in the inventory
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            if self.scanned and not rescan:
+                return len(self.paths)
+            self.__reset()
+            self.dirs = {}
+            self.reused = 0
+            if indexfile is not None:
+                self.loadindex(indexfile, maxage)
+            if bypass is None:
+                bypass = []
+            if filesystems is None:
+                filesystems = getlocalfs(self.logger, self.environ)
+            self.filesystems = []
+            for filesystem in filesystems:
+                if filesystem in bypass:
+                    self.logger.log(LogPriority.DEBUG,
+                                    ['FSInventory.scan',
+                                     'Skipping Filesystem: ' +
+                                     str(filesystem)])
+                    continue
+                self.logger.log(LogPriority.DEBUG,
+                                ['FSInventory.scan',
+                                 'Walking Filesystem: ' + str(filesystem)])
+                self.filesystems.append(filesystem)
+                self.__walk(filesystem)
+            self.scanned = True
+            # Directories that were not visited again are gone or bypassed.
+            self.olddirs = {}
+            self.logger.log(LogPriority.DEBUG,
+                            ['FSInventory.scan',
+                             'Inventory holds ' + str(len(self.paths)) +
+                             ' entries, ' + str(self.reused) + ' of ' +
+                             str(len(self.dirs)) +
+                             ' directories taken from the index'])
+            return len(self.paths)
+        finally:
+            self.lock.release()
+
+    def loadindex(self, indexfile, maxage=None):
+        '''
+        Load the directory index and result sets saved by a previous run. A
+        missing, unreadable or expired index is ignored, which results in a
+        full walk.
+
+        @param indexfile: string - path of the persistent directory index
+        @param maxage: int - seconds after which the index is discarded
+        @return: bool - True if a usable index was loaded
+        @author: dkennel
+        '''
+        self.indexfile = indexfile
+        self.olddirs = {}
+        self.previous = {}
+        self.origin = {}
+        self.results = {}
+        self.fullscan = time.time()
+        if not os.path.exists(indexfile):
+            return False
+        try:
+            rhandle = open(indexfile, 'rb')
+            try:
+                data = cPickle.load(rhandle)
+            finally:
+                rhandle.close()
+            if data['version'] != INDEXVERSION:
+                raise ValueError('index version ' + str(data['version']))
+        except Exception, err:
+            self.logger.log(LogPriority.DEBUG,
+                            ['FSInventory.loadindex',
+                             'Ignoring unusable index ' + indexfile + ': ' +
+                             str(err)])
+            return False
+        self.previous = data['results']
+        self.origin = data['origin']
+        if maxage is not None and time.time() - data['fullscan'] > maxage:
+            self.logger.log(LogPriority.DEBUG,
+                            ['FSInventory.loadindex',
+                             'Index has expired, doing a full walk'])
+            return False
+        self.olddirs = data['dirs']
+        self.fullscan = data['fullscan']
+        return True
+
+    def saveindex(self):
+        '''
+        Write the directory index and result sets to the index file given to
+        scan(). The file is written under a temporary name and renamed into
+        place so an interrupted run never leaves a truncated index behind.
+
+        @return: bool - True if the index was written
+        @author: dkennel
+        '''
+        if self.indexfile is None:
+            return False
+        self.lock.acquire()
+        try:
+            origin = dict(self.origin)
+            for name in self.results:
+                if name not in origin:
+                    origin[name] = self.results[name]
+            data = {'version': INDEXVERSION,
+                    'fullscan': self.fullscan,
+                    'dirs': self.dirs,
+                    'results': self.results,
+                    'origin': origin}
+            tmpfile = self.indexfile + '.tmp'
+            try:
+                whandle = open(tmpfile, 'wb')
+                try:
+                    cPickle.dump(data, whandle, cPickle.HIGHEST_PROTOCOL)
+                finally:
+                    whandle.close()
+                os.chmod(tmpfile, 0600)
+                os.rename(tmpfile, self.indexfile)
+            except (IOError, OSError), err:
+                self.logger.log(LogPriority.DEBUG,
+                                ['FSInventory.saveindex',
+                                 'Unable to write index ' + self.indexfile +
+                                 ': ' + str(err)])
+                return False
+            return True
+        finally:
+            self.lock.release()
+
+    def getprevious(self, name):
+        '''
+        Return the result set stored under name by the previous run, or None
+        if the previous run did not store one.
+
+        @param name: string - name of the result set
+        @return: set or None
+        @author: dkennel
+        '''
+        return self.previous.get(name)
+
+    def getorigin(self, name):
+        '''
+        Return the result set stored under name by the first run, or None if
+        it has never been stored.
+
+        @param name: string - name of the result set
+        @return: set or None
+        @author: dkennel
+        '''
+        return self.origin.get(name)
+
+    def setorigin(self, name, paths):
+        '''
+        Set the first run result set for name. Used to carry a baseline
+        recorded before the index existed into the index.
+
+        @param name: string - name of the result set
+        @param paths: iterable of strings
+        @author: dkennel
+        '''
+        self.origin[name] = set(paths)
+
+    def setresults(self, name, paths):
+        '''
+        Store the result set for name so that it is saved with the index and
+        returned by getprevious() in the next run. The first set stored under
+        a name also becomes its origin set.
+
+        @param name: string - name of the result set
+        @param paths: iterable of strings
+        @author: dkennel
+        '''
+        self.results[name] = set(paths)
+
+    def __walk(self, filesystem):
+        '''
+        Private method to walk a single filesystem and record its entries.
+        Every entry is lstat'ed, but a directory whose (dev, inode, mtime,
+        ctime) matches the index is not listed and the names recorded for it
+        last time are used instead.
+
+        @param filesystem: string - mount point to walk
+        @author: dkennel
+        '''
+        try:
+            fsdev = os.lstat(filesystem).st_dev
+        except OSError:
+            return
+        stack = [filesystem]
+        while stack:
+            dirpath = stack.pop()
+            try:
+                dstat = os.lstat(dirpath)
+            except OSError:
+                continue
+            # Directories on another device are mount points, the same test
+            # find -xdev uses. They belong to the other filesystem.
+            if dstat.st_dev != fsdev or not stat.S_ISDIR(dstat.st_mode):
+                continue
+            if dirpath != filesystem:
+                self.__add(dirpath, dstat)
+            key = (dstat.st_dev, dstat.st_ino, dstat.st_mtime,
+                   dstat.st_ctime)
+            cached = self.olddirs.get(dirpath)
+            if cached is not None and cached[0] == key:
+                names = cached[1]
+                self.reused += 1
+            else:
+                try:
+                    names = os.listdir(dirpath)
+                except OSError:
+                    names = []
+            entries = self.__readdir(dirpath, names)
+            self.dirs[dirpath] = (key, [entry[0] for entry in entries])
+            for name, mode, uid, gid, mtime in entries:
+                path = os.path.join(dirpath, name)
+                if stat.S_ISDIR(mode):
+                    stack.append(path)
+                else:
+                    self.paths.append(path)
+                    self.modes.append(mode)
+                    self.uids.append(uid)
+                    self.gids.append(gid)
+                    self.mtimes.append(mtime)
+
+    def __readdir(self, dirpath, names):
+        '''
+        Private method to stat the entries of a directory. Names that no
+        longer exist are dropped.
+
+        @param dirpath: string - directory holding the entries
+        @param names: list of entry names
+        @return: list of (name, mode, uid, gid, mtime) tuples
+        @author: dkennel
+        '''
+        entries = []
+        for name in names:
+            try:
+                mode = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            entries.append((name, mode.st_mode, mode.st_uid, mode.st_gid,
+                            mode.st_mtime))
+        return entries
+
+    def __add(self, path, mode):
+        '''
+        Private method to append an entry to the inventory arrays.
+
+        @param path: string - full path of the entry
+        @param mode: stat result for the entry
+        @author: dkennel
+        '''
+        self.paths.append(path)
+        self.modes.append(mode.st_mode)
+        self.uids.append(mode.st_uid)
+        self.gids.append(mode.st_gid)
+        self.mtimes.append(mode.st_mtime)
+
+    def isscanned(self):
+        '''
+        Return True if the inventory has been populated.
+
+        @return: bool
+        @author: dkennel
+        '''
+        return self.scanned
+
+    def getentry(self, path):
+        '''
+        Return the recorded (mode, uid, gid, mtime) tuple for a path, or None
+        if the path is not in the inventory.
+
+        @param path: string - full path
+        @return: tuple or None
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            num = self.__getnum(path)
+        finally:
+            self.lock.release()
+        if num is None:
+            return None
+        return (self.modes[num], self.uids[num], self.gids[num],
+                self.mtimes[num])
+
+    def refresh(self, path):
+        '''
+        Record the current mode, owner and group of a path already in the
+        inventory. Rules call this for the files they change so that a
+        report later in the same run sees the change without a new walk.
+
+        @param path: string - full path
+        @return: bool - True if the entry was updated
+        @author: dkennel
+        '''
+        try:
+            mode = os.lstat(path)
+        except OSError:
+            return False
+        self.lock.acquire()
+        try:
+            num = self.__getnum(path)
+            if num is None:
+                return False
+            self.modes[num] = mode.st_mode
+            self.uids[num] = mode.st_uid
+            self.gids[num] = mode.st_gid
+            self.mtimes[num] = mode.st_mtime
+            return True
+        finally:
+            self.lock.release()
+
+    def __getnum(self, path):
+        '''
+        Private method to return the position of a path in the inventory
+        arrays, building the path index on first use. Must be called with
+        the lock held.
+
+        @param path: string - full path
+        @return: int or None
+        @author: dkennel
+        '''
+        if self.index is None:
+            self.index = dict((entry, num) for num, entry in
+                              enumerate(self.paths))
+        return self.index.get(path)
+
+    def find(self, predicate):
+        '''
+        Return the paths of all entries for which predicate(mode, uid, gid,
+        mtime) is True, in the order they were found.
+
+        @param predicate: callable
+        @return: list of strings
+        @author: dkennel
+        '''
+        results = []
+        paths = self.paths
+        modes = self.modes
+        uids = self.uids
+        gids = self.gids
+        mtimes = self.mtimes
+        for num in xrange(len(paths)):
+            if predicate(modes[num], uids[num], gids[num], mtimes[num]):
+                results.append(paths[num])
+        return results
+
+    def worldwritable(self):
+        '''
+        Return the world writable files and directories.
+
+        @return: list of strings
+        @author: dkennel
+        '''
+        return self.find(lambda mode, uid, gid, mtime:
+                         mode & stat.S_IWOTH and not stat.S_ISLNK(mode))
+
+    def suid(self):
+        '''
+        Return the files with the SUID or SGID bit set. Directories are not
+        included since SGID on a directory only controls group inheritance.
+
+        @return: list of strings
+        @author: dkennel
+        '''
+        return self.find(lambda mode, uid, gid, mtime:
+                         not stat.S_ISDIR(mode) and not stat.S_ISLNK(mode) and
+                         mode & (stat.S_ISUID | stat.S_ISGID))
+
+    def unowned(self):
+        '''
+        Return the files whose owner or group is not known to the system.
+        Each distinct uid and gid is only looked up once.
+
+        @return: list of strings
+        @author: dkennel
+        '''
+        return self.find(lambda mode, uid, gid, mtime:
+                         not stat.S_ISDIR(mode) and not stat.S_ISLNK(mode) and
+                         (not self.uidknown(uid) or not self.gidknown(gid)))
+
+    def uidknown(self, uid):
+        '''
+        Return True if the uid resolves to an account.
+
+        @param uid: int
+        @return: bool
+        @author: dkennel
+        '''
+        if uid not in self.knownuids:
+            try:
+                pwd.getpwuid(uid)
+                self.knownuids[uid] = True
+            except KeyError:
+                self.knownuids[uid] = False
+        return self.knownuids[uid]
+
+    def gidknown(self, gid):
+        '''
+        Return True if the gid resolves to a group.
+
+        @param gid: int
+        @return: bool
+        @author: dkennel
+        '''
+        if gid not in self.knowngids:
+            try:
+                grp.getgrgid(gid)
+                self.knowngids[gid] = True
+            except KeyError:
+                self.knowngids[gid] = False
+        return self.knowngids[gid]
@@ -0,0 +1,189 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The HelperRegistry builds the package and service helpers once per run and
+hands the same instances to every rule. Constructing a Pkghelper works out
+the package manager for the platform and constructing a ServiceHelper probes
+for the init system, so rules that each built their own helpers, some on
+every call to report(), repeated the same probing many times over. Shared
+helpers also share their caches, the installed package list in particular.
+
+Rules reach the registry through Rule.getpkghelper(),
+Rule.getservicehelper() and Rule.getsysctl(). The helpers keep per call state (the service being
+worked on, the output of the last command) so the instances handed out are
+wrapped in a SharedHelper that runs one method call at a time. Rules that run
+in parallel may therefore wait for each other's package or service
+operations but will never see each other's state.
+
+CommandHelper instances are cheap to build and hold the results of the last
+command, so rules keep creating their own.
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+@change: 2015/10/18 dkennel added the shared Sysctl
+'''
+import threading
+from pkghelper import Pkghelper
+from ServiceHelper import ServiceHelper
+from Sysctl import Sysctl
+
+REGISTRY = None
+REGISTRYLOCK = threading.Lock()
+
+
+def getregistry(logger, environ):
+    '''
+    Return the HelperRegistry shared by all rules in this run, creating it on
+    first use.
+
+    @param logger: LogDispatcher instance
+    @param environ: Environment instance
+    @return: HelperRegistry instance
+    @author: dkennel
+    '''
+    global REGISTRY
+    REGISTRYLOCK.acquire()
+    try:
+        if REGISTRY is None:
+            REGISTRY = HelperRegistry(logger, environ)
+    finally:
+        REGISTRYLOCK.release()
+    return REGISTRY
+
+
+class SharedHelper(object):
+    '''
+    Wrapper around a helper shared between rules. Method calls are passed to
+    the helper one at a time, attribute reads are passed straight through.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, helper):
+        '''
+        SharedHelper constructor.
+
+        @param helper: the helper instance to wrap
+        @author: dkennel
+        '''
+        self.__dict__['helper'] = helper
+        self.__dict__['lock'] = threading.RLock()
+
+    def __getattr__(self, name):
+        attr = getattr(self.helper, name)
+        if not callable(attr):
+            return attr
+        lock = self.lock
+
+        def locked(*args, **kwargs):
+            lock.acquire()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                lock.release()
+        return locked
+
+    def __setattr__(self, name, value):
+        setattr(self.helper, name, value)
+
+
+class HelperRegistry(object):
+    '''
+    Run scoped store of the helpers shared between rules.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, logger, environ):
+        '''
+        HelperRegistry constructor. Helpers are built when they are first
+        asked for.
+
+        @param logger: LogDispatcher instance
+        @param environ: Environment instance
+        @author: dkennel
+        '''
+        self.logger = logger
+        self.environ = environ
+        self.helpers = {}
+        self.lock = threading.Lock()
+        self.factories = {'pkghelper': self.__makepkghelper,
+                          'servicehelper': self.__makeservicehelper,
+                          'sysctl': self.__makesysctl}
+
+    def __makepkghelper(self):
+        return Pkghelper(self.logger, self.environ)
+
+    def __makeservicehelper(self):
+        return ServiceHelper(self.environ, self.logger)
+
+    def __makesysctl(self):
+        return Sysctl(self.logger, self.environ)
+
+    def gethelper(self, name):
+        '''
+        Return the shared helper registered under name, building it on first
+        use. A helper whose constructor raises is not kept, the next request
+        will try again.
+
+        @param name: string - 'pkghelper', 'servicehelper' or 'sysctl'
+        @return: SharedHelper instance
+        @raise KeyError: when no helper is registered under name
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            if name not in self.helpers:
+                helper = self.factories[name]()
+                self.helpers[name] = SharedHelper(helper)
+            return self.helpers[name]
+        finally:
+            self.lock.release()
+
+    def getpkghelper(self):
+        '''
+        Return the shared Pkghelper.
+
+        @return: SharedHelper wrapping a Pkghelper
+        @author: dkennel
+        '''
+        return self.gethelper('pkghelper')
+
+    def getservicehelper(self):
+        '''
+        Return the shared ServiceHelper.
+
+        @return: SharedHelper wrapping a ServiceHelper
+        @author: dkennel
+        '''
+        return self.gethelper('servicehelper')
+
+    def getsysctl(self):
+        '''
+        Return the shared Sysctl.
+
+        @return: SharedHelper wrapping a Sysctl
+        @author: dkennel
+        '''
+        return self.gethelper('sysctl')
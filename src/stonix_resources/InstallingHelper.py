@@ -7,12 +7,24 @@ intended for use to selfupdate a script.
 @operatingsystem: Only specifics - md5 hashing specific to both python version 
                   and OS.
 
+Downloads are hashed as they are written and resumed with an HTTP range
+request when the connection drops. Archives whose md5 matches the published
+signature are kept in a local cache, CACHEDIR/<md5>/<file name>, and later
+installs of the same archive, on this host or on any host sharing the cache
+directory, are served from there.
+
 @author: Roy Nielsen
+@change: 2015/10/18 dkennel streaming download with inline md5, range resume
+                            and a local archive cache
 
 """
+import hashlib
+import httplib
 import os
 import os.path
 import re
+import shutil
+import socket
 import sys
 import tempfile
 import urllib2
@@ -21,6 +33,11 @@ from subprocess import Popen, PIPE
 from logdispatcher import LogPriority
 from stonixutilityfunctions import set_no_proxy
 
+CACHEDIR = "/var/cache/stonix/downloads"
+CHUNKSIZE = 1024 * 1024
+RETRIES = 3
+TIMEOUT = 60
+
 class InstallingHelper(object) :
     """
     Generic class using python native calls to download, check md5sums
@@ -30,12 +47,20 @@ class InstallingHelper(object) :
     
     """
     
-    def __init__(self, environ, url, logger) :
+    def __init__(self, environ, url, logger, cachedir=CACHEDIR) :
         """
         Initialization method
+
+        @param: cachedir - directory to keep verified archives in, None to
+                           disable the cache
+
+        @change: 2015/10/18 dkennel added the archive cache
         """
         self.environ = environ
         self.url = url
+        self.cachedir = cachedir
+        self.signature = None
+        self.sig_match = False
         if re.match("^\s*$", self.url):
             print "Cannot use this class without a URL to the archive " + \
             "file you wish to download and install"
@@ -173,78 +198,301 @@ class InstallingHelper(object) :
 
         return retval
     
-    def download_and_save_file(self, fpath="") :
+    def download_and_save_file(self, fpath="", resume=False) :
         """
         Download a file from "url" to "fpath" location, a "chunk" at a time,
-        so we don't get a memory filling problem.
+        so we don't get a memory filling problem.  The data is hashed as it
+        is written.  If the connection drops before the whole file has
+        arrived the download is resumed where it stopped, up to RETRIES times.
 
         @param: fpath - path to save the file to
+        @param: resume - if fpath already holds the start of the file, only
+                         ask the server for the rest of it
+
+        @returns: the md5sum of the saved file, or "" if the download failed
 
         @author: Roy Nielsen
+        @change: 2015/10/18 dkennel hash while downloading, resume with range
+                                    requests, return the md5sum
     
         """
-        if not re.match("^$", self.url) or not re.match("^$", fpath) :
+        if re.match("^\s*$", self.url) or re.match("^\s*$", fpath) :
+            print "Need both a URL and full path filename... try again."
+            return ""
 
-            set_no_proxy()
+        set_no_proxy()
+
+        digest = hashlib.md5()
+        offset = 0
+        if resume and os.path.exists(fpath) :
+            offset = self.hash_file(fpath, digest)
+        attempts = 0
 
-            # first try to open the URL
+        while True :
+            expected = None
             try :
-                urlfile = urllib2.urlopen(self.url)
-            except Exception , err:
-                self.logger.log(LogPriority.DEBUG, 
+                request = urllib2.Request(self.url)
+                if offset :
+                    request.add_header("Range", "bytes=" + str(offset) + "-")
+                urlfile = urllib2.urlopen(request, timeout=TIMEOUT)
+                try :
+                    if offset and not self.is_resumed(urlfile, offset) :
+                        # The server sent the whole file, start over
+                        self.logger.log(LogPriority.DEBUG,
+                                        ["InstallingHelper.download_and_save_file",
+                                         "Server ignored range request for: " + \
+                                         self.url])
+                        digest = hashlib.md5()
+                        offset = 0
+                    length = urlfile.info().getheader("Content-Length")
+                    if length and length.strip().isdigit() :
+                        expected = offset + int(length)
+                    if offset :
+                        f = open(fpath, "ab")
+                    else :
+                        f = open(fpath, "wb")
+                    try :
+                        # take data out of the url stream and put it in the
+                        # file a chunk at a time
+                        while 1 :
+                            data = urlfile.read(CHUNKSIZE)
+                            if not data :
+                                break
+                            f.write(data)
+                            digest.update(data)
+                            offset = offset + len(data)
+                    finally :
+                        f.close()
+                finally :
+                    urlfile.close()
+            except urllib2.HTTPError, err :
+                if err.code == 416 and offset :
+                    # What we have is not the start of the file on the server
+                    self.logger.log(LogPriority.DEBUG,
+                                    ["InstallingHelper.download_and_save_file",
+                                     "Discarding partial download of: " + \
+                                     self.url])
+                    digest = hashlib.md5()
+                    offset = 0
+                    attempts = attempts + 1
+                    if attempts <= RETRIES :
+                        continue
+                self.logger.log(LogPriority.DEBUG,
                                 ["InstallingHelper.download_and_save_file",
                                  "Error: " + str(err)])
+                return ""
+            except (IOError, OSError, socket.error, httplib.HTTPException), err :
+                self.logger.log(LogPriority.DEBUG,
+                                ["InstallingHelper.download_and_save_file",
+                                 "Error after " + str(offset) + " bytes: " + \
+                                 str(err)])
             else :
-                try :
-                    # Next try to open the file for writing
-                    f = open(fpath, "w")
-                except IOError, err :
-                    self.logger.log(LogPriority.INFO, 
-                                    ["InstallingHelper.download_and_save_file",
-                                    "Error opening file - err: " + str(err)])
-                except Exception, err :
-                    self.logger.log(LogPriority.INFO, 
+                if expected is None or offset >= expected :
+                    self.logger.log(LogPriority.DEBUG,
                                     ["InstallingHelper.download_and_save_file",
-                                    "Generic exception opening file - err: " + str(err)])
-                else :
-                    # take data out of the url stream and put it in the file
-                    # a chunk at a time
-                    chunk = 16 * 1024 * 1024
-                    while 1 :
-                        data = urlfile.read(chunk)
-                        if not data :
-                            self.logger.log(LogPriority.DEBUG, 
-                                            ["InstallingHelper.download_and_save_file",
-                                            "Done reading file: " + self.url])
-                            break
-                        f.write(data)
-                        self.logger.log(LogPriority.DEBUG, 
-                                        ["InstallingHelper.download_and_save_file",
-                                        "Read " + str(len(data)) + " bytes"])
-                    f.close()
-                urlfile.close()
+                                     "Done reading file: " + self.url + \
+                                     ", " + str(offset) + " bytes"])
+                    return digest.hexdigest()
+                self.logger.log(LogPriority.DEBUG,
+                                ["InstallingHelper.download_and_save_file",
+                                 "Connection closed after " + str(offset) + \
+                                 " of " + str(expected) + " bytes"])
+            attempts = attempts + 1
+            if attempts > RETRIES :
+                self.logger.log(LogPriority.INFO,
+                                ["InstallingHelper.download_and_save_file",
+                                 "Giving up on: " + self.url])
+                return ""
+            if not os.path.exists(fpath) :
+                digest = hashlib.md5()
+                offset = 0
+
+    def is_resumed(self, urlfile, offset) :
+        """
+        Check that the server answered a range request with the rest of the
+        file, starting at offset.
+
+        @param: urlfile - response returned by urlopen
+        @param: offset - first byte that was asked for
+
+        @returns: True if the response continues the file at offset
+
+        @author: dkennel
+        """
+        crange = urlfile.info().getheader("Content-Range", "")
+        return urlfile.getcode() == 206 and \
+               re.match("^bytes\s+" + str(offset) + "-", crange) is not None
+
+    def hash_file(self, filename, digest) :
+        """
+        Feed the contents of a file to a hash object.
+
+        @param: filename - file to read
+        @param: digest - hashlib object to update
+
+        @returns: the number of bytes read
+
+        @author: dkennel
+        """
+        size = 0
+        fh = open(filename, "rb")
+        try :
+            while True :
+                data = fh.read(CHUNKSIZE)
+                if not data :
+                    break
+                digest.update(data)
+                size = size + len(data)
+        finally :
+            fh.close()
+        return size
+
+    def get_signature(self) :
+        """
+        Read the md5sum of the archive from <package name>.md5.txt next to
+        it on the server, falling back to the lower case package name.  The
+        answer is remembered, so the server is asked only once.
+
+        @returns: the md5sum as lower case hex, or "" if none was found
+
+        @author: dkennel
+        """
+        if self.signature is None :
+            self.signature = ""
+            names = [self.package_name]
+            if self.package_name.lower() != self.package_name :
+                names.append(self.package_name.lower())
+            for name in names :
+                sig_url = self.base_url + "/" + name + ".md5.txt"
+                self.logger.log(LogPriority.DEBUG,
+                                ["InstallingHelper.get_signature",
+                                 "md5 file: " + sig_url])
+                tmp_sig = self.get_string_from_url(sig_url)
+                if not re.match("^\s*$", tmp_sig) :
+                    self.signature = tmp_sig.split()[0].lower()
+                    break
+        return self.signature
+
+    def get_cache_path(self, signature) :
+        """
+        Location of the archive in the cache.
+
+        @param: signature - md5sum of the archive
+
+        @returns: CACHEDIR/<md5sum>/<file name>
+
+        @author: dkennel
+        """
+        return os.path.join(self.cachedir, signature, self.file_name)
+
+    def fetch_archive(self, signature, fpath) :
+        """
+        Get a copy of the archive whose md5sum matches signature, from the
+        cache if it is there, otherwise from the server.  A download that
+        is interrupted is kept under CACHEDIR/partial and resumed on the
+        next attempt.  Only downloads that match the signature are added
+        to the cache.
+
+        @param: signature - expected md5sum of the archive
+        @param: fpath - where to save the archive if it can not be cached
+
+        @returns: path of the verified archive, or "" if there is none
+
+        @author: dkennel
+        """
+        partial = ""
+        if self.cachedir :
+            cached = self.get_cache_path(signature)
+            if os.path.exists(cached) :
+                if self.get_file_md5sum(cached) == signature :
+                    self.logger.log(LogPriority.DEBUG,
+                                    ["InstallingHelper.fetch_archive",
+                                     "Using cached archive: " + cached])
+                    return cached
+                self.logger.log(LogPriority.DEBUG,
+                                ["InstallingHelper.fetch_archive",
+                                 "Dropping damaged cached archive: " + cached])
+                self.remove_file(cached)
+            # Partial downloads are per host, the cache may be shared
+            key = hashlib.sha1(self.url + signature).hexdigest()
+            partial = os.path.join(self.cachedir, "partial",
+                                   key + "." + socket.gethostname())
+            try :
+                for cachedir in [os.path.dirname(partial),
+                                 os.path.dirname(cached)] :
+                    if not os.path.isdir(cachedir) :
+                        os.makedirs(cachedir, 0755)
+            except OSError, err :
+                self.logger.log(LogPriority.DEBUG,
+                                ["InstallingHelper.fetch_archive",
+                                 "Not caching, " + str(err)])
+                partial = ""
+
+        if partial :
+            resumed = os.path.exists(partial)
+            hash_from_file = self.download_and_save_file(partial, True)
+            if hash_from_file and hash_from_file != signature and resumed :
+                # The partial download may have been of another version
+                hash_from_file = self.download_and_save_file(partial)
+            if hash_from_file == signature :
+                try :
+                    os.rename(partial, cached)
+                    return cached
+                except OSError, err :
+                    self.logger.log(LogPriority.DEBUG,
+                                    ["InstallingHelper.fetch_archive",
+                                     "Could not cache archive, " + str(err)])
+                    shutil.move(partial, fpath)
+                    return fpath
+            if hash_from_file :
+                # Complete but wrong, do not resume from it next time
+                self.remove_file(partial)
         else :
-            print "Need both a URL and full path filename... try again."    
-    
-    
-    def download_and_prepare(self):
+            hash_from_file = self.download_and_save_file(fpath)
+            if hash_from_file == signature :
+                return fpath
+        self.logger.log(LogPriority.DEBUG,
+                        ["InstallingHelper.fetch_archive",
+                         "md5: " + signature + " and download: " + \
+                         str(hash_from_file) + " don't match"])
+        return ""
+
+    def remove_file(self, filename) :
+        """
+        Remove a file, ignoring a file that is already gone.
+
+        @param: filename - file to remove
+
+        @author: dkennel
+        """
+        try :
+            os.remove(filename)
+        except OSError :
+            pass
+
+    def download_and_prepare(self, signature=None):
         """
         Download and unarchive a file into a temporary directory.
 
+        @param: signature - md5sum of the archive.  If it is not given it is
+                            read from <package name>.md5.txt on the server.
+                            With a signature and a cached copy of the
+                            archive the server is not contacted at all.
+
         @returns: tmp_dir - the path where the archive was downloaded to
                   tmp_name - name of the downloaded archive, including the
                              tmp_dir
     
         @author: Roy Nielsen
+        @change: 2015/10/18 dkennel use the archive cache, read the md5 file
+                                    once and refuse archives without one
         """
-    
+        tmp_dir = ""
         if re.match("^\s*$", self.url) or re.match("^\s*$", self.package_name) :
             self.logger.log(LogPriority.DEBUG, 
                             ["InstallingHelper.download_and_prepare",
                             "sent empty URL: \"" + self.url + "\" or name: \"" + \
                             self.package_name + "\" to download_and_prepare..."])
-            tmp_name = ""
-            tmp_dir = ""
         else :
     
             try :
@@ -254,6 +502,7 @@ class InstallingHelper(object) :
                                 ["InstallingHelper.download_and_prepare",
                                 "mkdtemp exception: " + str(err)])
                 self.sig_match = False
+                return tmp_dir
             else :
                 self.logger.log(LogPriority.DEBUG, 
                                 ["InstallingHelper.download_and_prepare",
@@ -261,31 +510,36 @@ class InstallingHelper(object) :
 
             tmp_name = tmp_dir + "/" + self.file_name
 
-            self.download_and_save_file(tmp_name)    
+            if signature is None :
+                signature = self.get_signature()
+            else :
+                signature = signature.strip().lower()
 
-            self.logger.log(LogPriority.DEBUG, 
-                            ["InstallingHelper.download_and_prepare",
-                            "md5 file: " + self.base_url + "/" + \
-                            self.package_name + ".md5.txt"])
-
-            tmp_sig = self.get_string_from_url(self.base_url + "/" + \
-                                               self.package_name + \
-                                               ".md5.txt")
-            if re.match("^\s*$", tmp_sig) :
-                tmp_sig = self.get_string_from_url(self.base_url + "/" + \
-                                                   self.package_name.lower() + \
-                                                   ".md5.txt")
-
-            if not self.check_md5(tmp_sig, tmp_name) :
+            if not re.match("^[0-9a-f]{32}$", signature) :
+                self.logger.log(LogPriority.WARNING,
+                                ["InstallingHelper.download_and_prepare",
+                                 "No valid md5 for: " + self.url + \
+                                 ", got: \"" + signature + "\""])
+                self.sig_match = False
+                return tmp_dir
+
+            archive = self.fetch_archive(signature, tmp_name)
+
+            if not archive :
                 self.logger.log(LogPriority.WARNING, 
                                 ["InstallingHelper.download_and_prepare",
-                                "md5: " + str(tmp_sig) + " and file: " + \
+                                "md5: " + str(signature) + " and file: " + \
                                 tmp_name + " don't match"])
                 self.sig_match = False
             else :
+                if archive != tmp_name :
+                    try :
+                        os.link(archive, tmp_name)
+                    except OSError :
+                        shutil.copyfile(archive, tmp_name)
                 self.logger.log(LogPriority.DEBUG,
                                 ["InstallingHelper.download_and_prepare",
-                                "md5: " + str(tmp_sig) + " and file: " + \
+                                "md5: " + str(signature) + " and file: " + \
                                 tmp_name + " match"])
                 self.sig_match = True
                 un_arch_complete = self.un_archive(tmp_name, tmp_dir)
@@ -331,7 +585,7 @@ class InstallingHelper(object) :
             set_no_proxy()
 
             try :
-                f = urllib2.urlopen(url)
+                f = urllib2.urlopen(url, timeout=TIMEOUT)
             except IOError, err :
                 self.logger.log(LogPriority.WARNING, 
                                 ["InstallingHelper.get_string_from_url",
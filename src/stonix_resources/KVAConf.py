@@ -27,9 +27,62 @@ Created on May 6, 2013
 '''
 from logdispatcher import LogPriority
 from stonixutilityfunctions import writeFile
+from ConfigCache import getlinesparsed
 import traceback
 import re
 
+# Characters that make a key a regular expression rather than a plain name
+METACHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def indexeq(lines):
+    '''
+    Index the lines of a file where an equal sign separates key and value.
+    Comments and blank lines are skipped, everything else containing an equal
+    sign is indexed under the stripped text before the first equal sign.
+    @author: dkennel
+    @param lines: sequence of lines
+    @return: tuple of the key names in file order and a dictionary of key name
+    to a list of (line index, stripped value) tuples
+    '''
+    names = []
+    index = {}
+    for number, line in enumerate(lines):
+        if line.startswith("#") or not line.strip():
+            continue
+        if "=" in line:
+            fields = line.split("=")
+            name = fields[0].strip()
+            if name not in index:
+                names.append(name)
+                index[name] = []
+            index[name].append((number, fields[1].strip()))
+    return names, index
+
+
+def indexspace(lines):
+    '''
+    Index the lines of a file where white space separates key and value.
+    Comments and blank lines are skipped, everything else is indexed under its
+    first field.
+    @author: dkennel
+    @param lines: sequence of lines
+    @return: tuple of the key names in file order and a dictionary of key name
+    to a list of (line index, list of fields) tuples
+    '''
+    names = []
+    index = {}
+    for number, line in enumerate(lines):
+        if line.startswith("#") or not line.strip():
+            continue
+        fields = line.split()
+        if fields[0] not in index:
+            names.append(fields[0])
+            index[fields[0]] = []
+        index[fields[0]].append((number, fields))
+    return names, index
+
+
 class KVAConf():
     '''This class checks files for correctness that consist of key:value pairs
     either in the form of closed equal separated (k=v), open separated (k = v),
@@ -57,11 +110,12 @@ class KVAConf():
         self.fixables = {}
         self.removeables = {}
         self.contents = []
+        self.index = ([], {})
         self.logger = logger
         self.path = path
         self.tmpPath = tmpPath
-        self.storeContents(self.path)
         self.configType = configType
+        self.storeContents(self.path)
         self.universal = "#The following lines were added by stonix\n"
         self.tempstring = ""
         self.intent = intent
@@ -154,37 +208,22 @@ class KVAConf():
         @param key: key in a dictionary passed from calling class
         @param val: value part in dictionary passed from calling class
         @return: Bool
+        @change: 2015/10/18 dkennel look the key up in self.index instead of
+        scanning the file, notpresent no longer always reports the key found
         '''
         if self.contents:
+            entries = self.getEntries(key)
             if self.intent == "present":  # self.data contains key val pairs we want in the file
                 found = False
-                for line in self.contents:
-                    if re.match('^#', line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
-                        continue
-                    elif re.search("=", line):  # examine line if there is an = sign
-                        temp = line.split("=")  # split line into key val list [key, val]
-                        if re.match("^" + key + "$", temp[0].strip()):  # it contains the current key we're looking for
-                            if temp[1].strip() == value:  # and the value is correct
-                                found = True  # however we continue to make sure the key doesn't appear later in the file and have the wrong value
-                                continue
-                            else:  # the value is wrong so we break out of the loop.  Unecessary to continue, it will be fixed in the update
-                                found = False
-                                break
-                if found:  # return True or False value
-                    return True
-                else:
-                    return False
-            elif self.intent == "notpresent":  # self.data contains key val pairs we don't want in the file
-                found = True
-                for line in self.contents:
-                    if re.match("^#", line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
-                        continue
-                    elif re.search("=", line):  # examine line if there is an = sign
-                        temp = line.split("=")  # split line into key val list [key, val]
-                        if re.match("^" + key + "$", temp[0].strip()):  # it contains the current key we're looking for
-                            found = True  # no need to check value, it's irrelevant
-                            break
+                for index, current in entries:
+                    if current == value:  # and the value is correct
+                        found = True  # however we continue to make sure the key doesn't appear later in the file and have the wrong value
+                    else:  # the value is wrong, it will be fixed in the update
+                        found = False
+                        break
                 return found
+            elif self.intent == "notpresent":  # self.data contains key val pairs we don't want in the file
+                return len(entries) > 0  # no need to check value, it's irrelevant
 ###############################################################################
     def getSpaceValue(self, key, value):
         '''
@@ -200,97 +239,90 @@ class KVAConf():
         @param key: key in a dictionary passed from calling class
         @param val: value part in dictionary passed from calling class
         @return: Bool
+        @change: 2015/10/18 dkennel look the key up in self.index instead of
+        scanning the file
         '''
         fixables = []  # this fixables variable will be used for both desired and non desired keys
         if self.contents:
-            if self.intent == "present":  # self.data contains key val pairs we want in the file
-                if isinstance(value, list):  # value can be a list in cases, see init pydoc
-                    for item in value:
-                        foundalready = False
-                        for line in self.contents:
-                            if re.match('^#', line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
-                                continue
-                            elif re.search(key, line):  # we found the key, which in this case can be repeatable
-                                temp = line.strip()  # strip off all trailing and leading whitespace
-                                temp = re.sub("\s+", " ", temp)  # replace all whitespace with just one whitespace character
-                                temp = temp.split()  # separate contents into list separated by spaces
-                                if len(temp) > 0 and temp[0] == key:  # check to make sure key appears in beginning and has more than one item in the list
-                                    try:
-                                        if len(temp) > 2:  # this could indicate the file's format may be corrupted but that's not our issue
-                                            continue
-                                        elif temp[1] == item:  # value is correct
-                                            foundalready = True
-                                    except IndexError:
-                                        self.detailedresults += "Index error\n"
-                                        raise(self.detailedresults)
-                        if not foundalready:
-                            fixables.append(item)
-                    if fixables:
-                        return fixables
-                    else:
-                        return True
-                else:  # value must be a string, normal case
-                    found = False
-                    for line in self.contents:
-                        if re.match('^#', line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
-                            continue
-                        elif re.search(key, line):  # the key is in this line
-                            temp = line.strip()  # strip off all trailing and leading whitespace
-                            temp = re.sub("\s+", " ", temp)  # replace all whitespace with just one whitespace character
-                            temp = temp.split()  # separate contents into list separated by spaces
-                            if len(temp) > 0 and temp[0] == key:  # check to make sure key appears in beginning and has more than one item in the list
-                                try:
-                                    if len(temp) > 2:
-                                        continue  # this could indicate the file's format may be corrupted but that's not our issue
-                                    elif temp[1] == value:  # the value is correct
-                                        found = True  # however we continue to make sure the key doesn't appear later in the file and have the wrong value
-                                        continue
-                                    else:  # the value is wrong so we break out of the loop.  Unecessary to continue, it will be fixed in the update
-                                        found = False
-                                        break
-                                except IndexError:
-                                    self.detailedresults += "Index error\n"
-                                    raise(self.detailedresults)
-                    return found
-            elif self.intent == "notpresent":  # self.data contains key val pairs we don't want in the file
-                if isinstance(value, list):  # value can be a list in cases, see init pydoc
-                    for item in value:
-                        foundalready = False
-                        for line in self.contents:
-                            if re.match('^#', line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
-                                continue
-                            elif re.search(key, line):  # we found the key, which in this case can be repeatable
-                                temp = line.strip()  # strip off all trailing and leading whitespace
-                                temp = re.sub("\s+", " ", temp)  # replace all whitespace with just one whitespace character
-                                temp = temp.split()  # separate contents into list separated by spaces
-                                if len(temp) > 0 and temp[0] == key:  # check to make sure key appears in beginning and has more than one item in the list
-                                    try:
-                                        if len(temp) > 2:
-                                            continue  # this could indicate the file's format may be corrupted but that's not our issue
-                                        elif temp[1] == item:  # the value is correct
-                                            foundalready = True
-                                    except IndexError:
-                                        self.detailedresults += "Index error\n"
-                                        raise(self.detailedresults)
-                        if foundalready:
-                            fixables.append(item)
-                    if fixables:
-                        return fixables
-                    else:
+            if self.intent == "notpresent" and not isinstance(value, list):
+                # the key only has to start the line, its value is irrelevant
+                start = re.compile("^" + key)
+                for index, fields in self.getEntries(key):
+                    if start.match(self.contents[index]):
                         return True
-                else:  # value must be a string, normal case
-                    found = False
-                    for line in self.contents:
-                        if re.match('^#', line) or re.match(r'^\s*$', line):  # ignore is comment or blank line
+                return False
+            entries = []
+            for index, fields in self.index[1].get(key, []):
+                # keys are matched exactly here, but must also be found in
+                # the line when they contain regular expression characters
+                if not METACHARS.search(key) or \
+                   re.search(key, self.contents[index]):
+                    entries.append((index, fields))
+            if isinstance(value, list):  # value can be a list in cases, see init pydoc
+                for item in value:
+                    foundalready = False
+                    for index, fields in entries:
+                        if len(fields) > 2:  # this could indicate the file's format may be corrupted but that's not our issue
                             continue
-                        elif re.match("^" + key, line):  # we found the key
-                            temp = line.strip()  # strip off all trailing and leading whitespace
-                            temp = re.sub("\s+", " ", temp)  # replace all whitespace with just one whitespace character
-                            temp = temp.split()  # separate contents into list separated by spaces
-                            if re.match("^" + key + "$", temp[0]):  # a more specific check of the key in case is shares a similar key name with another key up to a point
-                                found = True
-                                break
-                    return found
+                        elif len(fields) < 2:
+                            self.detailedresults += "Index error\n"
+                            raise(self.detailedresults)
+                        elif fields[1] == item:  # value is correct
+                            foundalready = True
+                    # missing items need fixing when they are desired, found
+                    # ones when they are not
+                    if foundalready == (self.intent == "notpresent"):
+                        fixables.append(item)
+                if fixables:
+                    return fixables
+                else:
+                    return True
+            else:  # value must be a string, normal case
+                found = False
+                for index, fields in entries:
+                    if len(fields) > 2:
+                        continue  # this could indicate the file's format may be corrupted but that's not our issue
+                    elif len(fields) < 2:
+                        self.detailedresults += "Index error\n"
+                        raise(self.detailedresults)
+                    elif fields[1] == value:  # the value is correct
+                        found = True  # however we continue to make sure the key doesn't appear later in the file and have the wrong value
+                    else:  # the value is wrong, it will be fixed in the update
+                        found = False
+                        break
+                return found
+###############################################################################
+    def getEntries(self, key):
+        '''
+        Private method that returns the index entries of every line whose key
+        matches key, in file order.  Keys are regular expressions that have to
+        match the whole key in the file, which for most keys is a plain
+        dictionary lookup.
+        @author: dkennel
+        @param key: key in a dictionary passed from calling class
+        @return: list of (line index, value) or (line index, fields) tuples
+        '''
+        names, index = self.index
+        if not METACHARS.search(key):
+            return index.get(key, [])
+        pattern = re.compile("^" + key + "$")
+        entries = []
+        for name in names:
+            if pattern.match(name):
+                entries.extend(index[name])
+        entries.sort()
+        return entries
+###############################################################################
+    def buildIndex(self):
+        '''
+        Private method that indexes self.contents after it has been changed
+        in memory.
+        @author: dkennel
+        '''
+        if self.configType == "space":
+            self.index = indexspace(self.contents)
+        else:
+            self.index = indexeq(self.contents)
 ###############################################################################
     def update(self, fixables, removeables):
         '''
@@ -322,46 +354,30 @@ class KVAConf():
         @param fixables: a dictionary of key val paris desired in file
         @param removeables: a dictionary of key val paris not desired in file
         @return: Bool
+        @change: 2015/10/18 dkennel lines to drop come from self.index, every
+        line holding the key is dropped rather than all but repeats
         '''
         self.storeContents(self.path)  # re-read the contents of the desired file
-        contents = self.contents
-        if removeables:  # we have items that need to be removed from file
-            for key in removeables:
-                i = 0  # variable to keep our place in the list, will be used for removing items
-                for line in contents:
-                    if re.search("^#", line) or re.match("^\s*$", line):  # ignore if comment or blank line
-                        i += 1
-                    elif re.search("=", line.strip()):  # line contains an = sign
-                        temp = line.split("=")
-                        if re.match("^" + key + "$", temp[0].strip()):  # found the key
-                            contents.pop(i)  # not concerned with the value because we don't want the key either way
-                        i += 1
-                    else:
-                        i += 1
+        doomed = set()
+        for key in removeables:  # not concerned with the value because we don't want the key either way
+            for index, current in self.getEntries(key):
+                doomed.add(index)
+        for key in fixables:  # we drop these but down below we add the correct line
+            for index, current in self.getEntries(key):
+                doomed.add(index)
+        contents = []
+        for index, line in enumerate(self.contents):
+            if index not in doomed:
+                contents.append(line)
         if fixables:  # we have items that either had the wrong value or don't exist in the file
-            for key in fixables:
-                i = 0  # variable to keep our place in the list, will be used for removing items
-                for line in contents:
-                    if re.search("^#", line) or re.match("^\s*$", line):  # ignore if comment or blank line
-                        i += 1
-                    elif re.search("=", line.strip()):  # line contains an = sign
-                        temp = line.split("=")
-                        if re.match("^" + key + "$", temp[0].strip()):  # found the key
-                            contents.pop(i)  # we pop it out but down below we add the correct line unlike above
-                        i += 1
-                    else:
-                        i += 1
-            self.contents = []
-            for line in contents:  # contents should now have a list of items we are ok with having in the file but will still be missing the fixables
-                self.contents.append(line)  # make self.contents contain the correct file contents before fixing
-            self.contents.append("\n" + self.universal)  # add our universal line to show line(s) were added by stonix to self.contents
+            contents.append("\n" + self.universal)  # add our universal line to show line(s) were added by stonix to self.contents
             for key in fixables:
                 if self.configType == "openeq":  # construct the appropriate line and add to bottom of self.contents
-                    temp = key + " = " + fixables[key] + "\n"
-                    self.contents.append(temp)
+                    contents.append(key + " = " + fixables[key] + "\n")
                 elif self.configType == "closedeq":
-                    temp = key + "=" + fixables[key] + "\n"
-                    self.contents.append(temp)
+                    contents.append(key + "=" + fixables[key] + "\n")
+        self.contents = contents
+        self.buildIndex()
         return True
 ###############################################################################
     def setSpaceValue(self, fixables, removeables):
@@ -375,73 +391,42 @@ class KVAConf():
         @param fixables: a dictionary of key val paris desired in file
         @param removeables: a dictionary of key val paris not desired in file
         @return: Bool
+        @change: 2015/10/18 dkennel lines to drop come from self.index, the
+        stonix header is only added once and string values are added when
+        mixed with list values
         '''
         self.storeContents(self.path)  # re-read the contents of the desired file
-        contents = self.contents
-        if removeables:  # we have items that need to be removed from file
-            for key, val in removeables.iteritems():
-                i = 0
+        doomed = set()
+        for key, val in removeables.iteritems():
+            for index, fields in self.getEntries(key):
                 if isinstance(val, list):  # we have a list where the key can repeat itself
-                    for key2, in val:
-                        for line in contents:
-                            if re.search("^#", line) or re.match("^\s*$", line):  # ignore comments and blank lines
-                                i += 1
-                            else:
-                                temp = line.strip()
-                                temp = re.sub("\s+", " ", temp)
-                                temp = line.split()
-                                if len(temp) > 2:
-                                    i += 1
-                                    continue
-                                elif re.search("^" + key + "$", temp[0]):
-                                    if re.search("^" + key2 + "$", temp[1]):
-                                        contents.pop(i)
-                                else:
-                                    i += 1
-                else:
-                    for line in contents:
-                        if re.search("^#", line) or re.match("^\s*$", line):  # ignore if comment or blank line
-                            i += 1
-                        elif re.search(key, line.strip()):
-                            temp = line.strip().split(" ")
-                            if re.match("^" + key + "$", temp[0].strip()):
-                                contents.pop(i)
-                        else:
-                            i += 1
-            self.contents = contents
+                    if len(fields) != 2:
+                        continue
+                    for item in val:
+                        if re.search("^" + item + "$", fields[1]):
+                            doomed.add(index)
+                elif not METACHARS.search(key) or \
+                     re.search(key, self.contents[index]):
+                    doomed.add(index)
+        for key, val in fixables.iteritems():
+            if not isinstance(val, list):  # the line is replaced
+                for index, fields in self.getEntries(key):
+                    doomed.add(index)
+        contents = []
+        for index, line in enumerate(self.contents):
+            if index not in doomed:
+                contents.append(line)
         if fixables:
-            contents.append(self.universal)
-            listPresent = False
+            contents.append("\n" + self.universal)
             for key, val in fixables.iteritems():
                 if isinstance(val, list):
-                    listPresent = True
-                    for key2 in fixables[key]:
-                        contents.append(key + " " + key2 + "\n")
+                    for item in val:
+                        contents.append(key + " " + item + "\n")
                 else:
-                    i = 0
-                    for line in contents:
-                        if re.search("^#", line) or re.match("^\s*$", line):
-                            i += 1
-                        elif re.search(key, line):
-                            temp = line.strip().split()
-                            if re.match("^" + key + "$", temp[0].strip()):
-                                contents.pop(i)
-                            i += 1
-                        else:
-                            i += 1
-            if listPresent:
-                self.contents = contents
-                return True
-            else:
-                self.contents = []
-                for line in contents:  # reconstruct the self.contents list to contain the most updated list
-                    self.contents.append(line)
-                self.contents.append("\n" + self.universal)
-                if fixables:  # if there are fixables, we need to then add those, removeables have already been taken care of above
-                    for key in fixables:
-                        temp = key + " " + fixables[key] + "\n"
-                        self.contents.append(temp)
-                return True
+                    contents.append(key + " " + val + "\n")
+        self.contents = contents
+        self.buildIndex()
+        return True
 ###############################################################################
     def commit(self):
         '''
@@ -452,8 +437,7 @@ class KVAConf():
         @author: dwalker
         @return: Bool
         '''
-        for line in self.contents:
-            self.tempstring += line
+        self.tempstring = "".join(self.contents)
         success = writeFile(self.tmpPath, self.tempstring, self.logger)
         return success
 ###############################################################################
@@ -463,19 +447,21 @@ class KVAConf():
         stores in private variable self.contents.
         @author: dwalker
         @param path: The path which contents need to be read 
+        @change: 2015/10/18 dkennel read through the ConfigCache, which also
+        hands back the shared index of the file in self.index
         '''
+        if self.configType == "space":
+            indexer = indexspace
+        else:
+            indexer = indexeq
         try:
-            f = open(path, 'r')
+            self.contents, self.index = getlinesparsed(path, indexer)
         except IOError:
             self.detailedresults = "KVAConf: unable to open the" \
 "specified file"
             self.detailedresults += traceback.format_exc()
             self.logger.log(LogPriority.DEBUG, self.detailedresults)
             return False
-        self.contents = []
-        for line in f:
-            self.contents.append(line)
-        f.close()
 ###############################################################################
     def getValue(self):
         '''
@@ -26,6 +26,7 @@ Created on Jul 23, 2013
 @author: dwalker
 '''
 from logdispatcher import LogPriority
+from ConfigCache import getlines
 import traceback
 import re
 
@@ -511,15 +512,12 @@ class KVATaggedConf():
 ###############################################################################
     def storeContents(self, path):
         try:
-            f = open(path, 'r')
+            self.contents.extend(getlines(path))
         except IOError:
             self.detailedresults = "KVATaggedConf: unable to open the " \
             "specified file"
             self.detailedresults += traceback.format_exc()
             return False
-        for line in f:
-            self.contents.append(line)
-        f.close()
 ###############################################################################
     def checkConfigType(self):
         for item in self.contents:
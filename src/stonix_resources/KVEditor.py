@@ -218,7 +218,7 @@ class KVEditor(object):
                 if isinstance(retval, list):
                     self.fixables[k] = retval
                     validate = False
-                elif not self.editor.validate(k, v):
+                elif not retval:
                     validate = False
                     self.fixables[k] = v
         if self.intent == "notpresent":
@@ -227,7 +227,7 @@ class KVEditor(object):
                 if isinstance(retval, list):
                     self.removeables[k] = retval
                     validate = False
-                elif self.editor.validate(k, v):
+                elif retval:
                     validate = False
                     self.removeables[k] = v
         return validate
@@ -27,6 +27,7 @@ Created on Jun 12, 2013
 '''
 from KVEditor import KVEditor
 from logdispatcher import LogPriority
+from ConfigCache import invalidate
 import os
 
 
@@ -116,6 +117,7 @@ class KVEditorStonix(KVEditor):
                 self.detailedresults = "couldn't rename file"
                 self.logger.log(LogPriority.DEBUG, self.detailedresults)
                 raise
+            invalidate(self.path)
             return True
         else:
             return False
@@ -0,0 +1,346 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The ResultStore keeps a structured record of every rule the Controller runs:
+rule number, rule name, mode, compliant and success flags, elapsed time and
+the findings reported by the rule. Records are held in memory for the
+Controller and the GUI to query, and are appended one JSON object per line to
+stonix-results.json in the log directory so that the outcome of the last run
+can be read back without parsing the text report.
+
+The results file of the previous run is rotated to stonix-results.json.old
+when the first result of a new run is recorded. Invocations that do not run
+any rules (e.g. --list) leave it in place.
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+'''
+import json
+import os
+import threading
+import time
+import traceback
+from logdispatcher import LogPriority
+
+RESULTFILE = 'stonix-results.json'
+MODES = ['report', 'fix', 'undo']
+
+
+def loadresults(path):
+    '''
+    Read a results file written by a ResultStore and return its records in
+    the order they were recorded. Lines that cannot be decoded, e.g. a
+    partial line left behind by an abnormal exit, are skipped.
+
+    @param path: string - path to the results file
+    @return: list of dicts. Empty if the file does not exist.
+    @author: dkennel
+    '''
+    results = []
+    if not os.path.isfile(path):
+        return results
+    rhandle = open(path, 'r')
+    try:
+        for line in rhandle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(result, dict):
+                results.append(result)
+    finally:
+        rhandle.close()
+    return results
+
+
+def formatresults(results):
+    '''
+    Render result records as text for display, one line per rule followed
+    by its findings.
+
+    @param results: list of dicts as returned by loadresults
+    @return: string
+    @author: dkennel
+    '''
+    lines = []
+    for result in results:
+        if result.get('compliant'):
+            state = 'compliant'
+        else:
+            state = 'not compliant'
+        if not result.get('success', True):
+            state = state + ', failed'
+        lines.append(str(result.get('rulename', result.get('rulenum'))) +
+                     ' (' + str(result.get('mode')) + '): ' + state +
+                     ' in ' + str(result.get('duration', 0)) + 's')
+        for finding in result.get('findings', []):
+            lines.append('    ' + finding)
+    return '\n'.join(lines)
+
+
+class ResultStore(object):
+    '''
+    In memory, persisted store of rule results for the current run.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, logdispatcher, environ, resultfile=None):
+        '''
+        ResultStore constructor.
+
+        @param logdispatcher: LogDispatcher instance
+        @param environ: environment instance
+        @param resultfile: string - path of the results file. Defaults to
+        stonix-results.json in the log directory.
+        @author: dkennel
+        '''
+        self.logger = logdispatcher
+        self.environ = environ
+        if resultfile is None:
+            resultfile = os.path.join(self.environ.get_log_path(), RESULTFILE)
+        self.resultfile = resultfile
+        self.lock = threading.Lock()
+        self.results = []
+        self.latest = {}
+        self.rotated = False
+        self.writable = True
+
+    def getresultfile(self):
+        '''
+        Return the path of the file the results of this run are written to.
+
+        @return: string
+        @author: dkennel
+        '''
+        return self.resultfile
+
+    def record(self, rule, mode, duration):
+        '''
+        Record the current state of a rule after it has been run. Safe to
+        call from the scheduler's worker threads.
+
+        @param rule: Rule instance
+        @param mode: string - one of 'report', 'fix' or 'undo'
+        @param duration: float - elapsed time in seconds
+        @return: dict - the stored record
+        @author: dkennel
+        '''
+        if mode not in MODES:
+            raise ValueError('Unknown mode: ' + str(mode))
+        detailedresults = rule.getdetailedresults()
+        if not detailedresults:
+            findings = []
+        elif isinstance(detailedresults, basestring):
+            findings = detailedresults.splitlines()
+        else:
+            findings = [str(detailedresults)]
+        result = {'rulenum': rule.getrulenum(),
+                  'rulename': rule.getrulename(),
+                  'mode': mode,
+                  'compliant': bool(rule.iscompliant()),
+                  'success': bool(rule.getrulesuccess()),
+                  'duration': round(duration, 3),
+                  'findings': findings,
+                  'time': int(time.time())}
+        self.lock.acquire()
+        try:
+            self.results.append(result)
+            self.latest[result['rulenum']] = result
+            self.__write(result)
+        finally:
+            self.lock.release()
+        return self.__copy(result)
+
+    def getresult(self, rulenum, mode=None):
+        '''
+        Return the most recent record for a rule, optionally limited to a
+        single mode.
+
+        @param rulenum: int - rule number
+        @param mode: string - 'report', 'fix', 'undo' or None for any
+        @return: dict or None if the rule has not been run
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            if mode is None:
+                result = self.latest.get(rulenum)
+            else:
+                result = None
+                for entry in reversed(self.results):
+                    if entry['rulenum'] == rulenum and entry['mode'] == mode:
+                        result = entry
+                        break
+        finally:
+            self.lock.release()
+        if result is None:
+            return None
+        return self.__copy(result)
+
+    def getresults(self, mode=None, compliant=None, success=None,
+                   latest=False):
+        '''
+        Return the records matching all of the passed criteria in the order
+        they were recorded. Criteria left at None are not applied.
+
+        @param mode: string - 'report', 'fix' or 'undo'
+        @param compliant: bool
+        @param success: bool
+        @param latest: bool - only consider the most recent record of each
+        rule
+        @return: list of dicts
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            if latest:
+                candidates = [entry for entry in self.results
+                              if self.latest[entry['rulenum']] is entry]
+            else:
+                candidates = list(self.results)
+        finally:
+            self.lock.release()
+        matches = []
+        for entry in candidates:
+            if mode is not None and entry['mode'] != mode:
+                continue
+            if compliant is not None and entry['compliant'] != compliant:
+                continue
+            if success is not None and entry['success'] != success:
+                continue
+            matches.append(self.__copy(entry))
+        return matches
+
+    def getsummary(self):
+        '''
+        Return counts over the most recent record of each rule run so far.
+
+        @return: dict with the keys total, compliant, noncompliant, failed
+        and duration (total elapsed seconds across all records)
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            latest = self.latest.values()
+            duration = sum([entry['duration'] for entry in self.results])
+        finally:
+            self.lock.release()
+        summary = {'total': len(latest),
+                   'compliant': 0,
+                   'noncompliant': 0,
+                   'failed': 0,
+                   'duration': round(duration, 3)}
+        for entry in latest:
+            if not entry['success']:
+                summary['failed'] = summary['failed'] + 1
+            if entry['compliant']:
+                summary['compliant'] = summary['compliant'] + 1
+            else:
+                summary['noncompliant'] = summary['noncompliant'] + 1
+        return summary
+
+    def getlastrun(self):
+        '''
+        Return the records of the previous run as read from disk.
+
+        @return: list of dicts
+        @author: dkennel
+        '''
+        self.lock.acquire()
+        try:
+            if self.rotated:
+                path = self.resultfile + '.old'
+            else:
+                path = self.resultfile
+            try:
+                return loadresults(path)
+            except (IOError, OSError), err:
+                self.logger.log(LogPriority.DEBUG,
+                                ['ResultStore',
+                                 'Could not read ' + path + ': ' + str(err)])
+                return []
+        finally:
+            self.lock.release()
+
+    def __rotate(self):
+        '''
+        Private method to move the previous run's results file out of the
+        way. Must be called with the lock held.
+
+        @author: dkennel
+        '''
+        self.rotated = True
+        if not os.path.exists(self.resultfile):
+            return
+        oldfile = self.resultfile + '.old'
+        if os.path.exists(oldfile):
+            os.remove(oldfile)
+        os.rename(self.resultfile, oldfile)
+
+    def __write(self, result):
+        '''
+        Private method to append a record to the results file. Failure to
+        write is logged once and the store carries on in memory only. Must be
+        called with the lock held.
+
+        @param result: dict
+        @author: dkennel
+        '''
+        if not self.writable:
+            return
+        try:
+            if not self.rotated:
+                self.__rotate()
+            whandle = open(self.resultfile, 'a')
+            try:
+                whandle.write(json.dumps(result, sort_keys=True,
+                                         separators=(',', ':')) + '\n')
+            finally:
+                whandle.close()
+        except (KeyboardInterrupt, SystemExit):
+            # User initiated exit
+            raise
+        except Exception:
+            self.writable = False
+            self.logger.log(LogPriority.DEBUG,
+                            ['ResultStore',
+                             'Results will not be persisted: ' +
+                             traceback.format_exc()])
+
+    def __copy(self, result):
+        '''
+        Private method returning a copy of a record that callers may modify
+        without affecting the store.
+
+        @param result: dict
+        @return: dict
+        @author: dkennel
+        '''
+        copy = dict(result)
+        copy['findings'] = list(result['findings'])
+        return copy
@@ -0,0 +1,326 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The RuleManifest records, for every rule module in the rules directory, the
+rule number, rule name, applicable dictionary and root requirement without
+importing the rule. The controller uses it to decide which rule modules are
+worth importing and instantiating on the current platform.
+
+The values are read from the literal assignments made in the rule class's
+__init__. Rules that override isapplicable, or whose values are not plain
+literals, are marked custom and are always imported so that the rule itself
+can answer.
+
+The manifest is written to rulemanifest.json in the rules directory at build
+time by running this module:
+    python RuleManifest.py /usr/bin/stonix_resources/rules
+Each entry carries the mtime and size of its source file. Entries that do not
+match the file on disk, and rule files missing from the manifest, are parsed
+again in memory so a stale or missing manifest only costs time.
+
+@author: dkennel
+@change: 2015/10/14 dkennel original implementation
+'''
+import ast
+import json
+import os
+import sys
+import traceback
+from logdispatcher import LogPriority
+from rule import checkapplicable, getplatform
+
+MANIFESTNAME = 'rulemanifest.json'
+MANIFESTVERSION = 1
+PROPERTIES = ['rulenumber', 'rulename', 'applicable', 'rootrequired']
+
+
+def parserule(path):
+    '''
+    Read a rule source file and return its manifest entry. The entry is a
+    dictionary with the keys module, rulenumber, rulename, applicable,
+    rootrequired, custom, mtime and size.
+
+    @param path: string - full path to the rule's .py file
+    @return: dict
+    @author: dkennel
+    '''
+    module = os.path.basename(path)[:-3]
+    fstat = os.stat(path)
+    entry = {'module': module,
+             'rulenumber': 0,
+             'rulename': None,
+             'applicable': {'default': 'default'},
+             'rootrequired': True,
+             'custom': False,
+             'mtime': fstat.st_mtime,
+             'size': fstat.st_size}
+    rfile = open(path, 'r')
+    try:
+        tree = ast.parse(rfile.read(), path)
+    finally:
+        rfile.close()
+    ruleclass = None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == module:
+            ruleclass = node
+    if ruleclass is None:
+        entry['custom'] = True
+        return entry
+    init = None
+    for node in ruleclass.body:
+        if isinstance(node, ast.FunctionDef):
+            if node.name == 'isapplicable':
+                entry['custom'] = True
+            elif node.name == '__init__':
+                init = node
+    if init is None:
+        entry['custom'] = True
+        return entry
+    found = []
+    for node in ast.walk(init):
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Attribute) and \
+               isinstance(target.value, ast.Name) and \
+               target.value.id == 'self' and target.attr in PROPERTIES:
+                # Only a single, unconditional, literal assignment can be
+                # trusted to hold the value the instance will end up with.
+                if target.attr in found or node not in init.body:
+                    entry['custom'] = True
+                    continue
+                found.append(target.attr)
+                try:
+                    entry[target.attr] = ast.literal_eval(node.value)
+                except ValueError:
+                    entry['custom'] = True
+    if 'rulenumber' not in found or 'rulename' not in found:
+        entry['custom'] = True
+    return entry
+
+
+class RuleManifest(object):
+    '''
+    Holds the manifest entries for the rules in a rules directory and answers
+    which of them should be loaded on the current platform.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, rulespath, logdispatcher=None):
+        '''
+        RuleManifest constructor. Loads the manifest file if present and
+        refreshes any entries that do not match the rule files on disk.
+
+        @param rulespath: string - path to the stonix rules directory
+        @param logdispatcher: LogDispatcher instance, optional
+        @author: dkennel
+        '''
+        self.rulespath = rulespath
+        self.manifestfile = os.path.join(rulespath, MANIFESTNAME)
+        self.logger = logdispatcher
+        self.entries = {}
+        self.stale = []
+        self.load()
+
+    def log(self, priority, msg):
+        '''
+        Log a message if a LogDispatcher was supplied.
+
+        @param priority: LogPriority
+        @param msg: string or list
+        @author: dkennel
+        '''
+        if self.logger is not None:
+            self.logger.log(priority, msg)
+
+    def load(self):
+        '''
+        Read the manifest file and validate every entry against the rule
+        files currently present. Stale and missing entries are parsed from
+        source. Nothing is written back to disk.
+
+        @author: dkennel
+        '''
+        stored = {}
+        try:
+            mfile = open(self.manifestfile, 'r')
+            try:
+                data = json.load(mfile)
+            finally:
+                mfile.close()
+            if data.get('version') == MANIFESTVERSION:
+                stored = data.get('rules', {})
+        except (IOError, OSError, ValueError, AttributeError):
+            self.log(LogPriority.DEBUG,
+                     ['RuleManifest', 'No usable manifest at ' +
+                      self.manifestfile])
+        self.entries = {}
+        self.stale = []
+        for module in self.listmodules():
+            path = os.path.join(self.rulespath, module + '.py')
+            entry = stored.get(module)
+            try:
+                fstat = os.stat(path)
+                if entry is not None and \
+                   entry.get('mtime') == fstat.st_mtime and \
+                   entry.get('size') == fstat.st_size:
+                    entry['module'] = str(module)
+                    self.entries[module] = entry
+                    continue
+                self.stale.append(module)
+                self.entries[module] = parserule(path)
+            except Exception:
+                # Leave it to the import to report what is wrong with it
+                self.log(LogPriority.DEBUG,
+                         ['RuleManifest', 'Unable to parse ' + path + ': ' +
+                          traceback.format_exc()])
+                self.entries[module] = {'module': module, 'custom': True}
+        if self.stale:
+            self.log(LogPriority.DEBUG,
+                     ['RuleManifest', 'Stale entries: ' + str(self.stale)])
+
+    def listmodules(self):
+        '''
+        Return the sorted list of rule module names in the rules directory.
+
+        @return: list of strings
+        @author: dkennel
+        '''
+        modules = []
+        for rfile in os.listdir(self.rulespath):
+            if rfile.endswith('.py') and rfile != '__init__.py':
+                modules.append(rfile[:-3])
+        modules.sort()
+        return modules
+
+    def save(self):
+        '''
+        Write the current entries to the manifest file. The file is written
+        to a temporary name and renamed into place.
+
+        @author: dkennel
+        '''
+        data = {'version': MANIFESTVERSION, 'rules': self.entries}
+        tmpfile = self.manifestfile + '.tmp'
+        mfile = open(tmpfile, 'w')
+        try:
+            json.dump(data, mfile, indent=1, sort_keys=True)
+        finally:
+            mfile.close()
+        os.chmod(tmpfile, 0644)
+        os.rename(tmpfile, self.manifestfile)
+        self.stale = []
+
+    def getentries(self):
+        '''
+        Return the manifest entries keyed by module name.
+
+        @return: dict
+        @author: dkennel
+        '''
+        return self.entries
+
+    def getentry(self, name):
+        '''
+        Return the entry for the rule whose module or rule name matches the
+        passed name.
+
+        @param name: string - rule name or module name
+        @return: dict or None
+        @author: dkennel
+        '''
+        if name in self.entries:
+            return self.entries[name]
+        for entry in self.entries.values():
+            if entry.get('rulename') == name:
+                return entry
+        return None
+
+    def isloadable(self, entry, environ, platform=None):
+        '''
+        Return True if the rule described by the entry should be imported on
+        the platform described by environ. Custom rules are always loaded so
+        they can decide for themselves.
+
+        @param entry: dict - manifest entry
+        @param environ: Environment instance
+        @param platform: tuple - result of rule.getplatform(environ)
+        @return: bool
+        @author: dkennel
+        @change: 2015/10/18 dkennel accept the platform from getloadable
+        '''
+        if entry.get('custom', True):
+            return True
+        if entry['rootrequired'] and not environ.geteuid() == 0:
+            return False
+        try:
+            return checkapplicable(entry['applicable'], environ,
+                                   _NullLogger(), entry['rulename'],
+                                   platform)
+        except Exception:
+            self.log(LogPriority.DEBUG,
+                     ['RuleManifest', 'Applicability check failed for ' +
+                      entry['module'] + ': ' + traceback.format_exc()])
+            return True
+
+    def getloadable(self, environ):
+        '''
+        Return the sorted list of module names that should be imported on the
+        platform described by environ.
+
+        @param environ: Environment instance
+        @return: list of strings
+        @author: dkennel
+        @change: 2015/10/18 dkennel read the platform once for all entries
+        '''
+        modules = []
+        platform = getplatform(environ)
+        for module in sorted(self.entries):
+            if self.isloadable(self.entries[module], environ, platform):
+                modules.append(str(module))
+        return modules
+
+
+class _NullLogger(object):
+    '''
+    Discards the per-rule debug messages of checkapplicable. The rules that
+    are loaded log their own applicability check again when the controller
+    calls isapplicable.
+    '''
+
+    def log(self, priority, msg):
+        pass
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        RULESPATH = sys.argv[1]
+    else:
+        RULESPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'rules')
+    MANIFEST = RuleManifest(RULESPATH)
+    MANIFEST.save()
+    print 'Wrote ' + str(len(MANIFEST.getentries())) + ' entries to ' + \
+        MANIFEST.manifestfile
@@ -0,0 +1,168 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The RuleRegistry holds the rules loaded for the current run and indexes them
+by rule number, by rule name and by category so that lookups done by the
+controller and the GUI do not have to walk the whole rule list.
+
+The categories are derived from properties every rule already carries:
+    database     - rules that maintain a database on disk (isdatabaserule)
+    mandatory    - rules that are mandatory (getmandatory)
+    rootrequired - rules that need root privileges (getisrootrequired)
+
+The controller owns a single registry and hands it out with getregistry().
+Reloading the rule set goes through load(), which rebuilds the indexes in
+place, so everyone holding the registry sees the new rules.
+
+@author: dkennel
+@change: 2015/10/15 dkennel original implementation
+'''
+
+CATEGORIES = {'database': 'isdatabaserule',
+              'mandatory': 'getmandatory',
+              'rootrequired': 'getisrootrequired'}
+
+
+class RuleRegistry(object):
+    '''
+    Index of the loaded rule instances.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, rules=None):
+        '''
+        RuleRegistry constructor.
+
+        @param rules: list of Rule instances, optional
+        @author: dkennel
+        '''
+        self.rules = []
+        self.bynum = {}
+        self.byname = {}
+        self.bycategory = {}
+        if rules is not None:
+            self.load(rules)
+
+    def load(self, rules):
+        '''
+        Replace the registered rules with the passed list and rebuild the
+        indexes. Should two rules share a number or a name the later one in
+        the list wins, as it did with the old linear lookups.
+
+        @param rules: list of Rule instances
+        @author: dkennel
+        '''
+        bynum = {}
+        byname = {}
+        bycategory = {}
+        for category in CATEGORIES:
+            bycategory[category] = []
+        for rule in rules:
+            bynum[rule.getrulenum()] = rule
+            byname[rule.getrulename()] = rule
+            for category, getter in CATEGORIES.iteritems():
+                if getattr(rule, getter)():
+                    bycategory[category].append(rule)
+        # The indexes are built aside and swapped in so that readers never
+        # see a half built index.
+        self.rules = list(rules)
+        self.bynum = bynum
+        self.byname = byname
+        self.bycategory = bycategory
+
+    def getrules(self):
+        '''
+        Return the registered rules in load order.
+
+        @return: list of Rule instances
+        @author: dkennel
+        '''
+        return self.rules
+
+    def getbynum(self, rulenum):
+        '''
+        Return the rule with the passed rule number.
+
+        @param rulenum: int
+        @return: Rule instance or None
+        @author: dkennel
+        '''
+        return self.bynum.get(rulenum)
+
+    def getbyname(self, rulename):
+        '''
+        Return the rule with the passed rule name. Non string names, such as
+        a QString from the GUI, are converted before the lookup.
+
+        @param rulename: string
+        @return: Rule instance or None
+        @author: dkennel
+        '''
+        if not isinstance(rulename, basestring):
+            rulename = unicode(rulename)
+        return self.byname.get(rulename)
+
+    def getnumbyname(self, rulename):
+        '''
+        Return the rule number for the passed rule name.
+
+        @param rulename: string
+        @return: int - 0 if no rule matches
+        @author: dkennel
+        '''
+        rule = self.getbyname(rulename)
+        if rule is None:
+            return 0
+        return rule.getrulenum()
+
+    def getnamebynum(self, rulenum):
+        '''
+        Return the rule name for the passed rule number.
+
+        @param rulenum: int
+        @return: string or None if no rule matches
+        @author: dkennel
+        '''
+        rule = self.getbynum(rulenum)
+        if rule is None:
+            return None
+        return rule.getrulename()
+
+    def getcategory(self, category):
+        '''
+        Return the rules in the named category, in load order. See CATEGORIES
+        for the valid names.
+
+        @param category: string
+        @return: list of Rule instances
+        @author: dkennel
+        '''
+        return self.bycategory.get(category, [])
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
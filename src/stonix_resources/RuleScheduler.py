@@ -0,0 +1,185 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The RuleScheduler runs a list of rules through a bounded pool of worker
+threads. Rules declare the resources they touch (see Rule.getresources) and
+two rules that share a resource are never run at the same time. Rules that
+have not declared any resources are treated as touching everything and are
+always run on their own.
+
+@author: dkennel
+@change: 2015/10/01 dkennel original implementation
+'''
+import threading
+import traceback
+from logdispatcher import LogPriority
+
+
+class RuleScheduler(object):
+    '''
+    Schedules rule execution across a bounded set of worker threads while
+    keeping rules with conflicting resources apart.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, logdispatcher, jobs=1):
+        '''
+        RuleScheduler constructor.
+
+        @param logdispatcher: LogDispatcher instance
+        @param jobs: int - maximum number of rules to run at the same time
+        @author: dkennel
+        '''
+        self.logger = logdispatcher
+        try:
+            self.jobs = int(jobs)
+        except (TypeError, ValueError):
+            self.jobs = 1
+        if self.jobs < 1:
+            self.jobs = 1
+        self.cond = threading.Condition()
+        self.pending = []
+        self.running = []
+        self.failures = []
+
+    def getjobs(self):
+        '''
+        Return the maximum number of rules that will be run concurrently.
+
+        @return: int
+        @author: dkennel
+        '''
+        return self.jobs
+
+    def conflicts(self, rule1, rule2):
+        '''
+        Return True if the two rules may not be run at the same time. Rules
+        without declared resources conflict with every other rule.
+
+        @param rule1: Rule instance
+        @param rule2: Rule instance
+        @return: bool
+        @author: dkennel
+        '''
+        res1 = rule1.getresources()
+        res2 = rule2.getresources()
+        if not res1 or not res2:
+            return True
+        for resource in res1:
+            if resource in res2:
+                return True
+        return False
+
+    def run(self, rules, action, ordered=False):
+        '''
+        Run action(rule) for every rule in the list. When ordered is True a
+        rule will not be started before every earlier rule in the list that it
+        conflicts with has finished, which keeps dependent fix runs in their
+        original sequence. When ordered is False conflicting rules only need
+        to stay apart and may run in any order.
+
+        The action is expected to handle its own errors. Anything that escapes
+        it is logged and the remaining rules continue to run.
+
+        @param rules: list of Rule instances
+        @param action: callable taking a single Rule instance
+        @param ordered: bool - preserve list order for conflicting rules
+        @author: dkennel
+        '''
+        if self.jobs == 1 or len(rules) < 2:
+            for rule in rules:
+                action(rule)
+            return
+        self.pending = list(rules)
+        self.running = []
+        self.failures = []
+        self.cond.acquire()
+        try:
+            while self.pending or self.running:
+                rule = self.__nextrule(ordered)
+                if rule is None:
+                    # The timeout keeps the wait interruptible by Ctrl-C.
+                    self.cond.wait(0.5)
+                    continue
+                self.pending.remove(rule)
+                self.running.append(rule)
+                worker = threading.Thread(target=self.__worker,
+                                          args=(rule, action),
+                                          name=rule.getrulename())
+                worker.daemon = True
+                worker.start()
+        finally:
+            self.cond.release()
+        for rule, trace in self.failures:
+            self.logger.log(LogPriority.ERROR,
+                            [rule.getrulename(),
+                             'RuleScheduler caught rule death: ' + trace])
+
+    def __nextrule(self, ordered):
+        '''
+        Private method to select the next pending rule that may be started.
+        Must be called with the condition held.
+
+        @param ordered: bool - preserve list order for conflicting rules
+        @return: Rule instance or None if nothing can be started yet
+        @author: dkennel
+        '''
+        if len(self.running) >= self.jobs:
+            return None
+        for index, rule in enumerate(self.pending):
+            blocked = False
+            for active in self.running:
+                if self.conflicts(rule, active):
+                    blocked = True
+                    break
+            if not blocked and ordered:
+                for earlier in self.pending[:index]:
+                    if self.conflicts(rule, earlier):
+                        blocked = True
+                        break
+            if not blocked:
+                return rule
+        return None
+
+    def __worker(self, rule, action):
+        '''
+        Private thread body. Runs the action for a single rule and wakes up
+        the scheduler when it is done.
+
+        @param rule: Rule instance
+        @param action: callable taking a single Rule instance
+        @author: dkennel
+        '''
+        try:
+            action(rule)
+        except Exception:
+            self.failures.append((rule, traceback.format_exc()))
+        finally:
+            self.cond.acquire()
+            try:
+                self.running.remove(rule)
+                self.cond.notify()
+            finally:
+                self.cond.release()
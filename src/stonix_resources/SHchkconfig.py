@@ -25,13 +25,62 @@ Created on Aug 9, 2012
 
 @author: dkennel
 @change: Added try/except in list services to handle blank lines in output
+@change: 2015/10/12 dkennel audits are answered from a single chkconfig --list
+read once per run, resetsnapshot discards it
+@change: 2015/10/18 dkennel services chkconfig --list does not show are asked
+about directly
 '''
 
 import subprocess
 import os
 import re
+import threading
 from logdispatcher import LogPriority
 
+# Service name to enabled status for every service chkconfig knows, shared by
+# every SHchkconfig in the run. See SHchkconfig.getsnapshot().
+SNAPSHOT = None
+SNAPSHOTLOCK = threading.Lock()
+
+
+def parsechkconfig(lines):
+    '''
+    Parse the output of chkconfig --list. SysV services are enabled if they
+    are on in any run level, xinetd based services if they are on.
+
+    @param lines: list of output lines
+    @return: dict of service name to a bool that is True if the service is
+    configured to run
+    @author: dkennel
+    '''
+    services = {}
+    for line in lines:
+        line = line.split()
+        if not line:
+            continue
+        if line[0].endswith(':') and len(line) == 2:
+            # xinetd based service
+            services[line[0][:-1]] = line[1] == 'on'
+        elif len(line) > 1 and re.search('^\\d:', line[1]):
+            services[line[0]] = ':on' in ' '.join(line[1:])
+    return services
+
+
+def resetsnapshot():
+    '''
+    Discard the snapshot shared by every SHchkconfig so that it is read
+    again on next use. Called after every change to a service and by the
+    controller at the start of each run.
+
+    @author: dkennel
+    '''
+    global SNAPSHOT
+    SNAPSHOTLOCK.acquire()
+    try:
+        SNAPSHOT = None
+    finally:
+        SNAPSHOTLOCK.release()
+
 
 class SHchkconfig(object):
     '''
@@ -74,6 +123,7 @@ class SHchkconfig(object):
                                    shell=True, close_fds=True)
             if ret2 != 0:
                 svcoff = False
+        resetsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHchkconfig.disableservice: ' + service + ' results ' + str(ret) + ' ' + str(ret2))
         if confsuccess and svcoff:
@@ -105,6 +155,7 @@ class SHchkconfig(object):
                                    shell=True, close_fds=True)
             if ret2 != 0:
                 svcon = False
+        resetsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHchkconfig.enableservice: ' + service + ' results ' + str(ret) + ' ' + str(ret2))
         if confsuccess and svcon:
@@ -122,20 +173,63 @@ class SHchkconfig(object):
         '''
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHchkconfig.auditservice: ' + service)
-        chk = subprocess.Popen(self.cmd + '--list ' + service,
-                               stdout=subprocess.PIPE,
-                               stderr=subprocess.PIPE, shell=True,
-                               close_fds=True)
-        proclist = chk.stdout.readlines()
-        for line in proclist:
-            if re.search(service, line) and re.search(':on', line):
-                self.logdispatcher.log(LogPriority.DEBUG,
+        snapshot = self.getsnapshot()
+        if service not in snapshot:
+            self.queryservice(service)
+        if snapshot.get(service, False):
+            self.logdispatcher.log(LogPriority.DEBUG,
                                    'SHchkconfig.auditservice: ' + service + ' True')
-                return True
+            return True
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHchkconfig.auditservice: ' + service + ' False')
         return False
 
+    def getsnapshot(self):
+        '''
+        Return a dict of service name to a bool that is True if the service
+        is configured to run, read from chkconfig --list on first use. See
+        parsechkconfig.
+
+        @return: dict
+        '''
+        global SNAPSHOT
+        SNAPSHOTLOCK.acquire()
+        try:
+            if SNAPSHOT is not None:
+                return SNAPSHOT
+            chk = subprocess.Popen(self.cmd + '--list', stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, shell=True,
+                                   close_fds=True)
+            SNAPSHOT = parsechkconfig(chk.communicate()[0].splitlines())
+            self.logdispatcher.log(LogPriority.DEBUG,
+                                   'SHchkconfig.getsnapshot: ' +
+                                   str(len(SNAPSHOT)) + ' services')
+            return SNAPSHOT
+        finally:
+            SNAPSHOTLOCK.release()
+
+    def queryservice(self, service):
+        '''
+        Ask chkconfig directly whether a service that chkconfig --list does
+        not show is configured to run in the current run level, and keep the
+        answer in the snapshot until the next change.
+
+        @param string: Name of the service
+        @return: bool, True if the service is configured to run
+        '''
+        chk = subprocess.Popen(self.cmd + service, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, shell=True,
+                               close_fds=True)
+        chk.communicate()
+        enabled = chk.returncode == 0
+        snapshot = self.getsnapshot()
+        SNAPSHOTLOCK.acquire()
+        try:
+            snapshot[service] = enabled
+        finally:
+            SNAPSHOTLOCK.release()
+        return enabled
+
     def isrunning(self, service):
         '''
         Check to see if a service is currently running.
@@ -150,7 +244,7 @@ class SHchkconfig(object):
                                stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE, shell=True,
                                close_fds=True)
-        message = chk.stdout.readlines()
+        message = chk.communicate()[0].splitlines()
         if len(message) == 0:
             running = self.auditservice(service)
         for line in message:
@@ -195,7 +289,7 @@ class SHchkconfig(object):
         chk = subprocess.Popen(self.cmd + '--list', stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE, shell=True,
                                close_fds=True)
-        proclist = chk.stdout.readlines()
+        proclist = chk.communicate()[0].splitlines()
         for line in proclist:
             line = line.split()
             try:
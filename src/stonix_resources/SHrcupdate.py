@@ -24,12 +24,56 @@
 Created on Sep 19, 2012
 
 @author: dkennel
+@change: 2015/10/12 dkennel audits are answered from a single rc-update show
+read once per run, resetsnapshot discards it
+@change: 2015/10/18 dkennel the run level of a service is taken from the
+snapshot so it is current after a change
 '''
 import subprocess
 import re
 import os
+import threading
 from logdispatcher import LogPriority
 
+# Names of the services rc-update lists with a run level, shared by every
+# SHrcupdate in the run. See SHrcupdate.getsnapshot().
+SNAPSHOT = None
+SNAPSHOTLOCK = threading.Lock()
+
+
+def parsercupdate(lines):
+    '''
+    Parse the output of rc-update show.
+
+    @param lines: list of output lines
+    @return: dict of the name of every service listed with a run level to
+    the list of its run levels
+    @author: dkennel
+    '''
+    services = {}
+    for line in lines:
+        line = line.split('|')
+        if len(line) == 2 and line[1].strip():
+            services[line[0].strip()] = line[1].split()
+    return services
+
+
+def resetsnapshot():
+    '''
+    Discard the snapshot shared by every SHrcupdate so that it is read again on
+    next use. Called after every change to a service and by the controller
+    at the start of each run.
+
+    @author: dkennel
+    '''
+    global SNAPSHOT
+    SNAPSHOTLOCK.acquire()
+    try:
+        SNAPSHOT = None
+    finally:
+        SNAPSHOTLOCK.release()
+
+
 class SHrcupdate(object):
     '''
     SHrcupdate is the Service Helper for systems using the rcupdate command to
@@ -47,7 +91,6 @@ class SHrcupdate(object):
         self.logdispatcher = logdispatcher
         self.cmd = '/sbin/rc-update '
         self.svc = '/etc/init.d/ '
-        self.svclist = self.getsvclist()
         
     def getsvclist(self):
         '''
@@ -61,7 +104,7 @@ class SHrcupdate(object):
             proc = subprocess.Popen(self.cmd + 'show', stdout = subprocess.PIPE,
                                     stderr = subprocess.PIPE, shell = True,
                                     close_fds = True)
-            svclist = proc.stdout.readlines()
+            svclist = proc.communicate()[0].splitlines()
         except(OSError):
             svclist = []
         self.logdispatcher.log(LogPriority.DEBUG,
@@ -81,15 +124,12 @@ class SHrcupdate(object):
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHrcupdate.findrunlevel ' + service)
         runlevel = None
-        for line in self.svclist:
-            if re.search(service, line):
-                splitline = line.split()
-                try:
-                    runlevel = splitline[2]
-                except(IndexError):
-                    continue
+        runlevels = self.getsnapshot().get(service)
+        if runlevels:
+            runlevel = runlevels[0]
         self.logdispatcher.log(LogPriority.DEBUG,
-                               'SHrcupdate.findrunlevel ' + service + ' ' + runlevel)
+                               'SHrcupdate.findrunlevel ' + service + ' ' +
+                               str(runlevel))
         return runlevel
         
     def disableservice(self, service):
@@ -105,15 +145,19 @@ class SHrcupdate(object):
         confsuccess = True
         svcoff = True
         runlevel = self.findrunlevel(service)
-        ret = subprocess.call(self.cmd + 'delete ' +  service + ' ' + runlevel \
-                              + ' &> /dev/null', shell=True, close_fds=True )
-        if ret != 0:
-            confsuccess = False
+        # A service without a run level is not enabled
+        if runlevel is not None:
+            ret = subprocess.call(self.cmd + 'delete ' + service + ' ' +
+                                  runlevel + ' &> /dev/null', shell=True,
+                                  close_fds=True)
+            if ret != 0:
+                confsuccess = False
         if self.isrunning(service):
             ret2 = subprocess.call(self.svc + service + ' stop &> /dev/null',
                                    shell=True, close_fds=True )
             if ret2 != 0:
                 svcoff = False
+        resetsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHrcupdate.disableservice ' + service + ' ' + str(confsuccess) + str(svcoff))
         if confsuccess and svcoff:
@@ -145,6 +189,7 @@ class SHrcupdate(object):
                                    shell=True, close_fds=True )
             if ret2 != 0:
                 svcon = False
+        resetsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHrcupdate.enableservice ' + service + ' ' + str(confsuccess) + str(svcon))
         if confsuccess and svcon:
@@ -162,20 +207,28 @@ class SHrcupdate(object):
         '''
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHrcupdate.auditservice ' + service)
-        running = False
-        try:
-            proc = subprocess.Popen(self.cmd + 'show', stdout = subprocess.PIPE,
-                                    stderr = subprocess.PIPE, shell = True,
-                                    close_fds = True)
-            svclist = proc.stdout.readlines()
-        except(OSError):
-            svclist = []
-        for line in svclist:
-            if re.search(service, line):
-                running = True
+        running = service in self.getsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHrcupdate.auditservice ' + service + ' ' + str(running))
         return running
+
+    def getsnapshot(self):
+        '''
+        Return the services rc-update show lists with a run level, read on
+        first use. See parsercupdate.
+
+        @return: dict
+        @author: dkennel
+        '''
+        global SNAPSHOT
+        SNAPSHOTLOCK.acquire()
+        try:
+            if SNAPSHOT is None:
+                SNAPSHOT = parsercupdate(self.getsvclist())
+            return SNAPSHOT
+        finally:
+            SNAPSHOTLOCK.release()
+
     
     def isrunning(self, service):
         '''
@@ -191,9 +244,8 @@ class SHrcupdate(object):
                                stdout = subprocess.PIPE,
                                stderr = subprocess.PIPE, shell = True,
                                close_fds = True)
-        message = chk.stdout.readlines()
+        message = chk.communicate()[0].splitlines()
         # some services don't return any output (sysstat) so we call audit
-        chk.poll()
         if len(message) == 0:
             running = self.auditservice(service)
         for line in message:
@@ -24,17 +24,92 @@
 Created on Sep 19, 2012
 
 @author: dkennel
+@change: 2015/10/12 dkennel audits and running checks are answered from a
+snapshot of all units taken once per run
+@change: 2015/10/18 dkennel the snapshot is discarded by every call that
+changes a unit and at the start of each run, units it does not list are
+asked about directly
 '''
 import subprocess
 import re
 import os
+import threading
 from logdispatcher import LogPriority
 
+# Snapshot of unit file and unit states shared by every SHsystemctl in the
+# run. See SHsystemctl.getsnapshot().
+SNAPSHOT = None
+SNAPSHOTLOCK = threading.RLock()
+# Unit file states for which systemctl is-enabled returns 0
+ENABLEDSTATES = ['enabled', 'enabled-runtime', 'alias', 'static', 'indirect',
+                 'generated', 'transient']
+UNITTYPES = ['service', 'socket', 'target', 'device', 'mount', 'automount',
+             'swap', 'timer', 'path', 'slice', 'scope']
+
+
+def parseunitfiles(lines):
+    '''
+    Parse the output of systemctl list-unit-files --no-legend.
+
+    @param lines: list of output lines
+    @return: dict of unit name to unit file state
+    @author: dkennel
+    '''
+    states = {}
+    for line in lines:
+        line = line.split()
+        if len(line) < 2:
+            continue
+        states[line[0]] = line[1]
+    return states
+
+
+def parseunits(lines):
+    '''
+    Parse the output of systemctl list-units --all --no-legend.
+
+    @param lines: list of output lines
+    @return: dict of unit name to an (active, sub) state tuple
+    @author: dkennel
+    '''
+    states = {}
+    for line in lines:
+        line = line.split()
+        # Failed units are flagged with a leading marker
+        if line and line[0] in ['*', '\xe2\x97\x8f']:
+            line = line[1:]
+        if len(line) < 4:
+            continue
+        states[line[0]] = (line[2], line[3])
+    return states
+
+
+def resetsnapshot():
+    '''
+    Discard the snapshot shared by every SHsystemctl so that it is read again
+    on next use. Called after every change to a unit and by the controller
+    at the start of each run.
+
+    @author: dkennel
+    '''
+    global SNAPSHOT
+    SNAPSHOTLOCK.acquire()
+    try:
+        SNAPSHOT = None
+    finally:
+        SNAPSHOTLOCK.release()
+
 
 class SHsystemctl(object):
     '''
     SHsystemctl is the Service Helper for systems using the systemctl command to
     configure services. (Fedora and future RHEL and variants)
+
+    The state of every unit is read with one list-unit-files and one
+    list-units call the first time it is needed. Enable, disable and reload
+    discard the snapshot, a unit may be known under several alias names so
+    refreshing a single entry is not enough. Names the snapshot does not list
+    are asked about directly and the answer kept until the next change.
     '''
 
     def __init__(self, environment, logdispatcher):
@@ -71,6 +146,7 @@ class SHsystemctl(object):
                                    shell=True, close_fds=True)
             if ret2 != 0:
                 svcoff = False
+        resetsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.disable ' + service + ' ' + str(confsuccess) + str(svcoff))
         if confsuccess and svcoff:
@@ -100,6 +176,7 @@ class SHsystemctl(object):
                                    shell=True, close_fds=True)
             if ret2 != 0:
                 svcon = False
+        resetsnapshot()
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.enable ' + service + ' ' + str(confsuccess) + str(svcon))
         if confsuccess and svcon:
@@ -117,11 +194,14 @@ class SHsystemctl(object):
         '''
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.audit ' + service)
-        running = False
-        chk = subprocess.call(self.cmd + '-q is-enabled ' + service + ' &> /dev/null',
-                              shell=True, close_fds=True)
-        if chk == 0:
-            running = True
+        entry = self.getunit(service)
+        if entry is not None and entry['enabled'] is not None:
+            running = entry['enabled'] in ENABLEDSTATES
+            chk = entry['enabled']
+        else:
+            # Alias names and generated units are not in list-unit-files
+            running = self.queryenabled(service)
+            chk = 'is-enabled'
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.audit ' + service + ' ' + str(running) + str(chk))
         return running
@@ -138,18 +218,79 @@ class SHsystemctl(object):
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.isrunning ' + service)
         running = False
-        chk = subprocess.Popen(self.cmd + '--no-pager show ' + service,
+        entry = self.getunit(service)
+        snapshot = self.getsnapshot()
+        if entry is not None and entry['sub'] is not None:
+            running = bool(re.search('running', entry['sub']))
+        elif entry is not None and snapshot['loaded']:
+            # A unit file that list-units does not show is not loaded
+            running = False
+        else:
+            running = self.showrunning(service)
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'SHsystemctl.isrunning ' + service + ' ' + str(running))
+        return running
+
+    def queryenabled(self, service):
+        '''
+        Ask systemctl is-enabled directly whether a service the snapshot does
+        not list is configured to run. The answer is kept in the snapshot.
+
+        @param string: Name of the service
+        @return: bool, True if the service is configured to run
+        '''
+        snapshot = self.getsnapshot()
+        SNAPSHOTLOCK.acquire()
+        try:
+            if service in snapshot['enabled']:
+                return snapshot['enabled'][service]
+        finally:
+            SNAPSHOTLOCK.release()
+        chk = subprocess.Popen(self.cmd + '-q is-enabled ' + service,
                                stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE, shell=True,
                                close_fds=True)
-        message = chk.stdout.readlines()
+        chk.communicate()
+        enabled = chk.returncode == 0
+        SNAPSHOTLOCK.acquire()
+        try:
+            snapshot['enabled'][service] = enabled
+        finally:
+            SNAPSHOTLOCK.release()
+        return enabled
+
+    def showrunning(self, service):
+        '''
+        Ask systemctl directly whether a single service is running. Used when
+        the snapshot does not cover the service. The answer is kept in the
+        snapshot.
+
+        @param sting: Name of the service to check
+        @return: bool, True if the service is running
+        '''
+        snapshot = self.getsnapshot()
+        SNAPSHOTLOCK.acquire()
+        try:
+            if service in snapshot['running']:
+                return snapshot['running'][service]
+        finally:
+            SNAPSHOTLOCK.release()
+        running = False
+        chk = subprocess.Popen(self.cmd + '--no-pager show -p SubState ' +
+                               service, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, shell=True,
+                               close_fds=True)
+        message = chk.communicate()[0].splitlines()
         for line in message:
             if re.search('SubState', line):
                 line = line.split('=')
                 if re.search('running', line[1]):
                     running = True
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'SHsystemctl.isrunning ' + service + ' ' + str(running))
+        SNAPSHOTLOCK.acquire()
+        try:
+            snapshot['running'][service] = running
+        finally:
+            SNAPSHOTLOCK.release()
         return running
 
     def reloadservice(self, service):
@@ -168,6 +309,7 @@ class SHsystemctl(object):
                                   shell=True, close_fds=True)
             self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.reload ' + service + str(ret))
+            resetsnapshot()
         return True
 
     def listservices(self):
@@ -183,7 +325,7 @@ class SHsystemctl(object):
                                stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE, shell=True,
                                close_fds=True)
-        proclist = chk.stdout.readlines()
+        proclist = chk.communicate()[0].splitlines()
         for line in proclist:
             if re.search('units listed', line):
                 continue
@@ -201,4 +343,81 @@ class SHsystemctl(object):
         svclist = [service for service in svclist if service not in metaentries]
         self.logdispatcher.log(LogPriority.DEBUG,
                                'SHsystemctl.listservices ' + str(svclist))
-        return svclist
\ No newline at end of file
+        return svclist
+
+    def unitname(self, service):
+        '''
+        Return the full unit name for a service name, adding the .service
+        suffix when no unit type was given.
+
+        @param string: Name of the service
+        @return: string
+        '''
+        if service.rsplit('.', 1)[-1] in UNITTYPES and '.' in service:
+            return service
+        return service + '.service'
+
+    def getsnapshot(self):
+        '''
+        Return the snapshot of all units, reading it on first use. The
+        snapshot is a dict with the keys 'units', mapping unit names to dicts
+        holding the 'enabled' unit file state and the 'active' and 'sub'
+        states (None when unknown), 'files' and 'loaded', which are False
+        when list-unit-files or list-units could not be read, and 'enabled'
+        and 'running', holding the answers of direct queries for names the
+        snapshot does not list.
+
+        @return: dict
+        '''
+        global SNAPSHOT
+        SNAPSHOTLOCK.acquire()
+        try:
+            if SNAPSHOT is None:
+                SNAPSHOT = self.readsnapshot()
+            return SNAPSHOT
+        finally:
+            SNAPSHOTLOCK.release()
+
+    def readsnapshot(self):
+        '''
+        Read the state of every unit with systemctl list-unit-files and
+        list-units.
+
+        @return: dict, see getsnapshot
+        '''
+        units = {}
+        chk = subprocess.Popen(self.cmd + '--no-pager --no-legend --full list-unit-files',
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, shell=True,
+                               close_fds=True)
+        output = chk.communicate()[0]
+        files = chk.returncode == 0
+        for unit, state in parseunitfiles(output.splitlines()).iteritems():
+            units[unit] = {'enabled': state, 'active': None, 'sub': None}
+        chk = subprocess.Popen(self.cmd + '--no-pager --no-legend --full --all list-units',
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, shell=True,
+                               close_fds=True)
+        output = chk.communicate()[0]
+        loaded = chk.returncode == 0
+        for unit, state in parseunits(output.splitlines()).iteritems():
+            entry = units.setdefault(unit, {'enabled': None,
+                                            'active': None, 'sub': None})
+            entry['active'] = state[0]
+            entry['sub'] = state[1]
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'SHsystemctl.readsnapshot ' + str(len(units)) +
+                               ' units, list-unit-files read: ' + str(files) +
+                               ', list-units read: ' + str(loaded))
+        return {'units': units, 'files': files, 'loaded': loaded,
+                'enabled': {}, 'running': {}}
+
+    def getunit(self, service):
+        '''
+        Return the snapshot entry for a service or None if the snapshot does
+        not know it.
+
+        @param string: Name of the service
+        @return: dict or None
+        '''
+        return self.getsnapshot()['units'].get(self.unitname(service))
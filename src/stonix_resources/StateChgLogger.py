@@ -27,18 +27,142 @@ Created on Aug 22, 2012
 
 @change: 2014/07/22 dkennel - Added -f flag to patch command call to eliminate
 prompt and wait issues during undo.
+@change: 2015/10/18 dkennel - Replaced the shelve eventlog with an indexed
+SQLite event store. Existing shelve eventlogs are migrated on first use.
+@change: 2015/10/18 dkennel - Archived file versions and patches are kept
+once each in a content addressed blob store with a manifest in the event
+store. Added prunearchive.
+@change: 2015/10/18 dkennel - Patches are applied in process rather than by
+running the patch utility.
+@change: 2015/10/18 dkennel - Events are committed as soon as they are
+recorded. Batches are kept per thread and only defer archive timestamp
+refreshes.
 '''
 import shelve
+import whichdb
+import sqlite3
+import cPickle
+import hashlib
+import tempfile
 import shutil
 import os
+import stat
 import re
 import traceback
-import filecmp
 import time
 import difflib
 import weakref
-import subprocess
+import threading
 from logdispatcher import LogPriority
+from stonixutilityfunctions import resetsecon
+
+EVENTSTORE = '/usr/share/stonix/eventlog.sqlite'
+LEGACYEVENTLOG = '/usr/share/stonix/eventlog'
+# Files that the various dbm backends behind shelve may have created.
+LEGACYSUFFIXES = ['', '.db', '.dir', '.dat', '.bak', '.pag']
+# Archived file versions and patches, stored once each under their sha256.
+BLOBDIR = '/usr/share/stonix/blobs'
+HUNKHEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def parsepatch(patchlines):
+    '''
+    Parse a single file unified diff as written by recordfilechange into a
+    list of hunks. Each hunk is a tuple of the zero based line index the
+    hunk starts at in the file being patched, the lines expected there and
+    the lines that replace them.
+
+    @param patchlines: list of strings - the lines of the patch
+    @return: list of tuples (index, oldlines, newlines)
+    @author: dkennel
+    '''
+    hunks = []
+    oldleft = 0
+    newleft = 0
+    lasttargets = []
+    for line in patchlines:
+        if line.startswith('\\'):
+            # "\ No newline at end of file" applies to the previous line
+            for target in lasttargets:
+                if target[-1].endswith('\n'):
+                    target[-1] = target[-1][:-1]
+            continue
+        if oldleft == 0 and newleft == 0:
+            match = HUNKHEADER.match(line)
+            if match:
+                start = int(match.group(1))
+                oldleft = int(match.group(2) or 1)
+                newleft = int(match.group(4) or 1)
+                # An empty range names the line the hunk goes after.
+                if oldleft:
+                    start = start - 1
+                hunks.append((start, [], []))
+            elif hunks:
+                raise ValueError('Unexpected line after hunk: ' + line)
+            lasttargets = []
+            continue
+        oldlines = hunks[-1][1]
+        newlines = hunks[-1][2]
+        if line == '\n':
+            # Context line for an empty line that lost its leading space
+            line = ' \n'
+        if line.startswith(' '):
+            lasttargets = [oldlines, newlines]
+            oldleft = oldleft - 1
+            newleft = newleft - 1
+        elif line.startswith('-'):
+            lasttargets = [oldlines]
+            oldleft = oldleft - 1
+        elif line.startswith('+'):
+            lasttargets = [newlines]
+            newleft = newleft - 1
+        else:
+            raise ValueError('Malformed hunk line: ' + line)
+        for target in lasttargets:
+            target.append(line[1:])
+        if oldleft < 0 or newleft < 0:
+            raise ValueError('Hunk longer than its header: ' + line)
+    if oldleft or newleft:
+        raise ValueError('Patch ends in the middle of a hunk')
+    return hunks
+
+
+def patchlines(lines, hunks):
+    '''
+    Apply parsed hunks to the lines of a file. A hunk whose lines are not at
+    the expected place is looked for nearby in the same way patch applies
+    hunks with an offset, but no fuzz is allowed so the file must still
+    contain exactly the lines the patch expects.
+
+    @param lines: list of strings - the lines of the file
+    @param hunks: list of hunks as returned by parsepatch
+    @return: list of strings - the patched lines
+    @author: dkennel
+    '''
+    result = []
+    cursor = 0
+    offset = 0
+    for start, oldlines, newlines in hunks:
+        expected = start + offset
+        found = None
+        last = len(lines) - len(oldlines)
+        for distance in range(max(expected - cursor, last - expected) + 1):
+            for pos in (expected - distance, expected + distance):
+                if cursor <= pos <= last and \
+                   lines[pos:pos + len(oldlines)] == oldlines:
+                    found = pos
+                    break
+            if found is not None:
+                break
+        if found is None:
+            raise ValueError('Hunk at line ' + str(start + 1) +
+                             ' does not match')
+        result.extend(lines[cursor:found])
+        result.extend(newlines)
+        cursor = found + len(oldlines)
+        offset = found - start
+    result.extend(lines[cursor:])
+    return result
 
 
 class StateChgLogger(object):
@@ -61,12 +185,15 @@ class StateChgLogger(object):
          The eventlog database. This file contains a record of change events.
          The change event record can be referenced to determine whether or not a
          change occured and/or the initial value of objects before the change
-         occured.
+         occured. The events are held in a SQLite database indexed by event id
+         and rule number.
 
         eventlog  (public)
 
          This is the location where the original copies of config files are
-         stored in case they are needed by system admins.
+         stored in case they are needed by system admins. Every archived
+         version of a file is also kept in the blob store under BLOBDIR and
+         listed in the archive table of the eventlog database.
 
         archive  (public)
 
@@ -84,13 +211,19 @@ class StateChgLogger(object):
         self.diffdir = '/usr/share/stonix/diffdir'
         self.archive = '/usr/share/stonix/archive'
         self.privmode = True
+        self.eventlog = None
+        # Batch depth is tracked per thread so that one rule ending its
+        # batch never decides when another rule's writes are committed.
+        self.batch = threading.local()
+        # Rules may record events from concurrent worker threads, they all
+        # share one database connection so all access goes through this lock.
+        self.eventlock = threading.RLock()
         try:
             if not os.path.exists('/usr/share/stonix') and \
             self.environment.geteuid() == 0:
                 os.makedirs('/usr/share/stonix', 448)
             if self.environment.geteuid() == 0:
-                self.eventlog = shelve.open('/usr/share/stonix/eventlog', 'c',
-                                            None, True)
+                self.eventlog = self.openeventstore()
             else:
                 self.privmode = False
             for node in [self.diffdir, self.archive]:
@@ -100,6 +233,286 @@ class StateChgLogger(object):
             # We probably don't have privileges needed
             pass
 
+    def openeventstore(self):
+        """
+        Open the event store, creating the table and indexes if needed, and
+        migrate any events left in an old shelve eventlog. The database is
+        put in WAL mode so that readers are not blocked by a rule that is in
+        the middle of writing its events.
+
+        @return: sqlite3 connection
+        @author: dkennel
+        """
+        conn = sqlite3.connect(EVENTSTORE, timeout=30,
+                               check_same_thread=False)
+        conn.text_factory = str
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''CREATE TABLE IF NOT EXISTS events (
+eventid TEXT PRIMARY KEY,
+ruleid TEXT NOT NULL,
+eventdict BLOB NOT NULL)''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS events_ruleid
+ON events (ruleid)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS archive (
+path TEXT NOT NULL,
+eventid TEXT NOT NULL,
+kind TEXT NOT NULL,
+blob TEXT NOT NULL,
+mode INTEGER NOT NULL,
+stamp REAL NOT NULL)''')
+        conn.execute('''CREATE INDEX IF NOT EXISTS archive_path
+ON archive (path, kind)''')
+        conn.commit()
+        self.migrateeventlog(conn)
+        return conn
+
+    def migrateeventlog(self, conn):
+        """
+        Copy the events held in a shelve eventlog written by older versions of
+        stonix into the event store. All events are copied in one transaction
+        and the old eventlog is renamed to eventlog.migrated once they have
+        been committed so that the migration only happens once.
+
+        @param conn: sqlite3 connection to the event store
+        @return: bool - True if events were migrated
+        @author: dkennel
+        """
+        if not whichdb.whichdb(LEGACYEVENTLOG):
+            return False
+        self.logger.log(LogPriority.DEBUG,
+                        ['StateChgLogger.migrateeventlog',
+                         'Migrating events from ' + LEGACYEVENTLOG])
+        try:
+            legacy = shelve.open(LEGACYEVENTLOG, 'r')
+        except Exception:
+            self.logger.log(LogPriority.ERROR,
+                            ['StateChgLogger.migrateeventlog',
+                             'Unable to open old eventlog: ' +
+                             traceback.format_exc()])
+            return False
+        try:
+            try:
+                for key in legacy.keys():
+                    try:
+                        eventdict = legacy[key]
+                    except Exception:
+                        self.logger.log(LogPriority.ERROR,
+                                        ['StateChgLogger.migrateeventlog',
+                                         'Bad record in old eventlog: ' +
+                                         str(key)])
+                        continue
+                    conn.execute('''INSERT OR IGNORE INTO events
+(eventid, ruleid, eventdict) VALUES (?, ?, ?)''',
+                                 (key, key[0:4], self.__pack(eventdict)))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self.logger.log(LogPriority.ERROR,
+                                ['StateChgLogger.migrateeventlog',
+                                 'Migration failed: ' +
+                                 traceback.format_exc()])
+                return False
+        finally:
+            legacy.close()
+        for suffix in LEGACYSUFFIXES:
+            oldpath = LEGACYEVENTLOG + suffix
+            if os.path.exists(oldpath):
+                os.rename(oldpath, LEGACYEVENTLOG + '.migrated' + suffix)
+        return True
+
+    def __pack(self, eventdict):
+        """
+        Private method to serialize an event dictionary for storage.
+
+        @param eventdict: dict
+        @return: sqlite3.Binary
+        @author: dkennel
+        """
+        return sqlite3.Binary(cPickle.dumps(eventdict,
+                                            cPickle.HIGHEST_PROTOCOL))
+
+    def getblobpath(self, blob):
+        """
+        Return the location of a blob in the blob store.
+
+        @param blob: string - sha256 hex digest of the blob contents
+        @return: string - path
+        @author: dkennel
+        """
+        return os.path.join(BLOBDIR, blob[0:2], blob)
+
+    def storeblob(self, chunks):
+        """
+        Store data in the blob store and return its digest. The data is
+        hashed while it is written to a temporary file, which is then moved
+        into place or simply dropped if the blob is already stored.
+
+        @param chunks: iterable of strings making up the data
+        @return: string - sha256 hex digest of the data
+        @author: dkennel
+        """
+        if not os.path.exists(BLOBDIR):
+            os.makedirs(BLOBDIR, 448)
+        digest = hashlib.sha256()
+        tmpfd, tmppath = tempfile.mkstemp(dir=BLOBDIR)
+        try:
+            tmphandle = os.fdopen(tmpfd, 'wb')
+            try:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    tmphandle.write(chunk)
+            finally:
+                tmphandle.close()
+            blob = digest.hexdigest()
+            blobpath = self.getblobpath(blob)
+            if os.path.exists(blobpath):
+                os.remove(tmppath)
+            else:
+                if not os.path.exists(os.path.dirname(blobpath)):
+                    os.makedirs(os.path.dirname(blobpath), 448)
+                os.rename(tmppath, blobpath)
+        except Exception:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            raise
+        return blob
+
+    def recordblob(self, filepath, eventid, kind, blob, mode):
+        """
+        Add a blob to the archive manifest. Seeing the same version of a file
+        again only refreshes its timestamp so the manifest grows with the
+        number of distinct versions rather than the number of runs.
+
+        @param filepath: string - path of the archived file
+        @param eventid: string - event id the blob was stored for or ''
+        @param kind: string - 'orig' for a file version, 'patch' for a diff
+        @param blob: string - sha256 hex digest of the blob
+        @param mode: int - permission bits to restore the file with
+        @author: dkennel
+        """
+        self.eventlock.acquire()
+        try:
+            cursor = self.eventlog.execute('''UPDATE archive SET stamp = ?,
+mode = ? WHERE path = ? AND eventid = ? AND kind = ? AND blob = ?''',
+                                           (time.time(), mode, filepath,
+                                            eventid, kind, blob))
+            if cursor.rowcount == 0:
+                # Undo needs the new manifest entry, never defer it.
+                self.eventlog.execute('''INSERT INTO archive
+(path, eventid, kind, blob, mode, stamp) VALUES (?, ?, ?, ?, ?, ?)''',
+                                      (filepath, eventid, kind, blob, mode,
+                                       time.time()))
+                self.eventlog.commit()
+            elif not self.getbatchdepth():
+                self.eventlog.commit()
+        finally:
+            self.eventlock.release()
+
+    def prunearchive(self, keep=5):
+        """
+        Apply the archive retention policy. For every file the newest keep
+        versions and patches are kept along with the newest one recorded for
+        each event id, which is what undo uses. Blobs no longer listed in the
+        manifest are then removed from the blob store.
+
+        @param keep: int - number of versions to keep per file
+        @return: int - number of blobs removed
+        @author: dkennel
+        """
+        if not self.privmode:
+            raise RuntimeError('''prunearchive method called without privilege.
+If you are a rule developer you should guard against this. If you
+are an end user please report a bug.''')
+        keep = max(int(keep), 1)
+        counts = {}
+        newest = set()
+        doomed = []
+        self.eventlock.acquire()
+        try:
+            rows = self.eventlog.execute('''SELECT rowid, path, eventid, kind
+FROM archive ORDER BY path, kind, stamp DESC''').fetchall()
+            for rowid, filepath, eventid, kind in rows:
+                counts[(filepath, kind)] = counts.get((filepath, kind), 0) + 1
+                eventkey = (filepath, eventid, kind)
+                if counts[(filepath, kind)] <= keep or eventkey not in newest:
+                    newest.add(eventkey)
+                    continue
+                doomed.append((rowid,))
+            self.eventlog.executemany('DELETE FROM archive WHERE rowid = ?',
+                                      doomed)
+            self.eventlog.commit()
+            referenced = set()
+            for row in self.eventlog.execute('''SELECT DISTINCT blob
+FROM archive'''):
+                referenced.add(row[0])
+        finally:
+            self.eventlock.release()
+        removed = 0
+        if os.path.isdir(BLOBDIR):
+            for prefix in os.listdir(BLOBDIR):
+                prefixdir = os.path.join(BLOBDIR, prefix)
+                if not os.path.isdir(prefixdir):
+                    continue
+                for blob in os.listdir(prefixdir):
+                    if blob not in referenced:
+                        os.remove(os.path.join(prefixdir, blob))
+                        removed = removed + 1
+                if not os.listdir(prefixdir):
+                    os.rmdir(prefixdir)
+        self.logger.log(LogPriority.INFO,
+                        ['StateChgLogger.prunearchive',
+                         'Pruned ' + str(len(doomed)) +
+                         ' archive entries and ' + str(removed) + ' blobs'])
+        return removed
+
+    def getbatchdepth(self):
+        """
+        Return the batch nesting depth of the calling thread.
+
+        @return: int
+        @author: dkennel
+        """
+        return getattr(self.batch, 'depth', 0)
+
+    def startbatch(self):
+        """
+        Start a batch for the calling thread. The controller wraps each
+        rule's fix in a batch. Change events, deletions and new archive
+        entries are still committed as soon as they are written so that undo
+        can revert everything a rule did even if the run dies part way
+        through. Only refreshed archive timestamps are left for endbatch to
+        commit. Batches may be nested. Without privilege this does nothing.
+
+        @author: dkennel
+        """
+        if not self.privmode:
+            return
+        self.batch.depth = self.getbatchdepth() + 1
+
+    def endbatch(self):
+        """
+        End a batch started by startbatch on the same thread and commit any
+        deferred writes once the outermost batch ends. Without privilege this
+        does nothing.
+
+        @author: dkennel
+        """
+        if not self.privmode:
+            return
+        depth = self.getbatchdepth()
+        if depth > 0:
+            depth = depth - 1
+        self.batch.depth = depth
+        if depth:
+            return
+        self.eventlock.acquire()
+        try:
+            if self.eventlog is not None:
+                self.eventlog.commit()
+        finally:
+            self.eventlock.release()
+
     def __del__(self):
         """
         This class has an explicit destructor in order to ensure that the
@@ -152,7 +565,7 @@ are an end user please report a bug.''')
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger',
                          "Recording changes in %s" % oldfile])
-        self.archivefile(oldfile)
+        self.archivefile(oldfile, eventid)
         oldfilehandle = open(oldfile, 'r')
         newfilehandle = open(newfile, 'r')
         oldfiledata = oldfilehandle.readlines()
@@ -171,20 +584,26 @@ are an end user please report a bug.''')
                          "Complete path to patchfile: %s" % patchdest])
         if not os.path.exists(patchpath):
             os.makedirs(patchpath, 448)
-        patchhandle = open(patchdest, 'w')
-        for line in difflib.unified_diff(newfiledata, oldfiledata,
-                                         fromfile=newfile,
-                                         tofile=oldfile):
-            patchhandle.write(line)
-        patchhandle.close()
+        blob = self.storeblob(difflib.unified_diff(newfiledata, oldfiledata,
+                                                   fromfile=newfile,
+                                                   tofile=oldfile))
+        self.recordblob(oldfile, eventid, 'patch', blob, 384)
+        # The patch file is a hard link into the blob store so that
+        # identical patches only take up space once.
+        if os.path.exists(patchdest):
+            os.remove(patchdest)
+        try:
+            os.link(self.getblobpath(blob), patchdest)
+        except OSError:
+            shutil.copy(self.getblobpath(blob), patchdest)
         return True
 
     def revertfilechanges(self, filename, eventid):
         """
         revertfilechanges removes changes made to complex configuration files
-        by stonix. It uses the patch utility and a diff file created by
-        recordfilechange to restore the configuration file without altering
-        other customizations.
+        by stonix. It applies the diff file created by recordfilechange to
+        restore the configuration file without altering other
+        customizations.
 
         @param string file : Path to the configuration file that should have
         changes made by stonix reverted to a pre-alteration state.
@@ -192,6 +611,8 @@ are an end user please report a bug.''')
         to the file being reverted
         @return  : Bool for success
         @author D. Kennel
+        @change: 2015/10/18 dkennel - Apply the diff with applypatch instead
+        of the patch utility.
         """
         if not self.privmode:
             raise RuntimeError('''recordfilechange method called without privilege.
@@ -211,9 +632,6 @@ are an end user please report a bug.''')
                             ['StateChgLogger.revert',
                              "Complete path to patchfile: %s" % patchsource])
 
-        patchcmd = '/usr/bin/patch -p0 -u -f ' + fullpath + ' ' + patchsource
-        if self.environment.getosfamily() == 'solaris':
-            patchcmd = '/usr/bin/patch -p0 -u -i ' + patchsource + ' ' + fullpath
         if not os.path.exists(patchsource):
             self.logger.log(LogPriority.ERROR,
                             ['StateChgLogger.revert',
@@ -223,17 +641,63 @@ are an end user please report a bug.''')
             self.logger.log(LogPriority.ERROR,
                             ['StateChgLogger.revert',
                              "Conf file not found, unable to revert: %s" % fullpath])
-        if not os.path.exists('/usr/bin/patch'):
-            self.logger.log(LogPriority.ERROR,
-                            ['StateChgLogger.revert',
-                             "Patch utility not found, unable to revert: %s" % fullpath])
             return False
+        return self.applypatch(fullpath, patchsource)
+
+    def applypatch(self, filepath, patchpath):
+        """
+        Apply a unified diff to a file. The patched file is written to a
+        temporary file next to the original, given the original's mode and
+        ownership and renamed over it so the file is either fully patched or
+        left alone.
 
-        patchproc = subprocess.call(patchcmd, shell=True)
-        if patchproc != 0:
+        @param filepath: string - path of the file to patch
+        @param patchpath: string - path of the unified diff
+        @return: bool - True if the patch was applied
+        @author: dkennel
+        """
+        try:
+            patchhandle = open(patchpath, 'r')
+            try:
+                hunks = parsepatch(patchhandle.readlines())
+            finally:
+                patchhandle.close()
+            filehandle = open(filepath, 'r')
+            try:
+                lines = filehandle.readlines()
+            finally:
+                filehandle.close()
+            newlines = patchlines(lines, hunks)
+        except (IOError, ValueError), err:
             self.logger.log(LogPriority.ERROR,
-                            ['StateChgLogger.revertfilechange',
-                             "Problem patching: %s" % fullpath])
+                            ['StateChgLogger.applypatch',
+                             "Problem patching: " + filepath + ' ' + str(err)])
+            return False
+        if newlines == lines:
+            return True
+        dirname, filename = os.path.split(filepath)
+        tmpfd, tmppath = tempfile.mkstemp(dir=dirname,
+                                          prefix='.' + filename + '.')
+        try:
+            tmphandle = os.fdopen(tmpfd, 'w')
+            try:
+                tmphandle.writelines(newlines)
+            finally:
+                tmphandle.close()
+            filestat = os.stat(filepath)
+            os.chmod(tmppath, stat.S_IMODE(filestat.st_mode))
+            os.chown(tmppath, filestat.st_uid, filestat.st_gid)
+            os.rename(tmppath, filepath)
+        except (IOError, OSError):
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            self.logger.log(LogPriority.ERROR,
+                            ['StateChgLogger.applypatch',
+                             "Problem writing: " + filepath + ' ' +
+                             traceback.format_exc()])
+            return False
+        resetsecon(filepath)
+        return True
 
     def recordfiledelete(self, filename, eventid):
         """
@@ -273,7 +737,7 @@ are an end user please report a bug.''')
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger',
                          "Recording deletion of %s" % filename])
-        self.archivefile(filename)
+        self.archivefile(filename, eventid)
         mytype = 'del'
         mystart = 'present'
         myend = 'deleted'
@@ -300,6 +764,28 @@ are an end user please report a bug.''')
             raise RuntimeError('''revertfiledelete method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
+        self.eventlock.acquire()
+        try:
+            row = self.eventlog.execute('''SELECT blob, mode FROM archive
+WHERE path = ? AND kind = 'orig' ORDER BY stamp DESC LIMIT 1''',
+                                        (filepath,)).fetchone()
+        finally:
+            self.eventlock.release()
+        if row is not None and os.path.exists(self.getblobpath(row[0])):
+            self.logger.log(LogPriority.DEBUG,
+                            ['StateChgLogger.revertfiledelete',
+                             "Restoring from blob: " + row[0]])
+            try:
+                shutil.copyfile(self.getblobpath(row[0]), filepath)
+                os.chmod(filepath, row[1])
+            except (IOError, OSError):
+                self.logger.log(LogPriority.ERROR,
+                                ['StateChgLogger.revertfiledelete',
+                                 "Problem reading file: " +
+                                 traceback.format_exc()])
+                return False
+            return True
+        # Files archived by older versions only have timestamped copies.
         path, filename = os.path.split(filepath)
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger.revertfiledelete',
@@ -377,8 +863,15 @@ are an end user please report a bug.''')
             raise RuntimeError('''recordfilechange method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
-        self.eventlog[eventcode] = eventdict
-        self.eventlog.sync()
+        self.eventlock.acquire()
+        try:
+            self.eventlog.execute('''INSERT OR REPLACE INTO events
+(eventid, ruleid, eventdict) VALUES (?, ?, ?)''',
+                                  (eventcode, eventcode[0:4],
+                                   self.__pack(eventdict)))
+            self.eventlog.commit()
+        finally:
+            self.eventlock.release()
 
     def getchgevent(self, eventcode):
         """
@@ -395,8 +888,15 @@ are an end user please report a bug.''')
             raise RuntimeError('''recordfilechange method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
-        eventdict = self.eventlog[eventcode]
-        return eventdict
+        self.eventlock.acquire()
+        try:
+            row = self.eventlog.execute('''SELECT eventdict FROM events
+WHERE eventid = ?''', (eventcode,)).fetchone()
+        finally:
+            self.eventlock.release()
+        if row is None:
+            raise KeyError(eventcode)
+        return cPickle.loads(str(row[0]))
 
     def closelog(self):
         """
@@ -409,16 +909,29 @@ are an end user please report a bug.''')
             raise RuntimeError('''recordfilechange method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
-        self.eventlog.close()
+        self.eventlock.acquire()
+        try:
+            if self.eventlog is not None:
+                self.eventlog.commit()
+                self.eventlog.close()
+                self.eventlog = None
+            self.batch = threading.local()
+        finally:
+            self.eventlock.release()
 
-    def archivefile(self, oldfile):
+    def archivefile(self, oldfile, eventid=''):
         """
         Private method to archive a copy of a file into the file archive. This
-        is intended to be called by the recordfilechanges method.
+        is intended to be called by the recordfilechanges method. The first
+        copy of a file is kept in the archive with a .ovf extension, every
+        version seen is stored in the blob store.
 
         @param string: oldfile - full path to the file to be archived
+        @param string: eventid - change event id the copy is made for
         @return: True unless an error was encountered
         @author: D. Kennel
+        @change: 2015/10/18 dkennel - Versions after the original go to the
+        blob store instead of timestamped copies.
         """
         if not self.privmode:
             raise RuntimeError('''recordfilechange method called without privilege.
@@ -447,18 +960,21 @@ are an end user please report a bug.''')
                             ['StateChgLogger',
                              "Source file doesn't exist skipping backup."])
             return True
+        oldhandle = open(oldfile, 'rb')
+        try:
+            blob = self.storeblob(iter(lambda: oldhandle.read(65536), ''))
+        finally:
+            oldhandle.close()
+        self.logger.log(LogPriority.DEBUG,
+                        ['StateChgLogger',
+                         'Archived ' + oldfile + ' as blob ' + blob])
+        self.recordblob(oldfile, eventid, 'orig', blob,
+                        stat.S_IMODE(os.stat(oldfile).st_mode))
         if not os.path.exists(backupdest):
             self.logger.log(LogPriority.DEBUG,
                             ['StateChgLogger',
                              'Copying ' + oldfile + ' to ' + backupdest])
             shutil.copy(oldfile, backupdest)
-        else:
-            if not filecmp.cmp(oldfile, backupdest):
-                backupdest = backupdest + str(time.time())
-                self.logger.log(LogPriority.DEBUG,
-                                ['StateChgLogger',
-                                 'Copying ' + oldfile + ' to ' + backupdest])
-                shutil.copy(oldfile, backupdest)
         return True
 
     def findrulechanges(self, ruleid):
@@ -489,18 +1005,14 @@ are an end user please report a bug.''')
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger.findrulechanges',
                          "Searching for: %s" % ruleid])
-        for key in self.eventlog:
-            try:
-                keyruleid = key[0:4]
-                self.logger.log(LogPriority.DEBUG,
-                                ['StateChgLogger.findrulechanges',
-                                 "Comparing to keyruleid: %s" % keyruleid])
-                if keyruleid == myruleid:
-                    eventlist.append(key)
-            except(IndexError):
-                self.logger.log(LogPriority.ERROR,
-                                ['StateChgLogger.findrulechanges',
-                                 'Bad key detected in eventlog: ' + key])
+        self.eventlock.acquire()
+        try:
+            rows = self.eventlog.execute('''SELECT eventid FROM events
+WHERE ruleid = ? ORDER BY eventid''', (myruleid,)).fetchall()
+        finally:
+            self.eventlock.release()
+        for row in rows:
+            eventlist.append(row[0])
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger.findrulechanges',
                          "returning eventlist: %s" % eventlist])
@@ -527,14 +1039,17 @@ If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
         if not eventid or not type(eventid) == str:
             raise TypeError('Null eventid or wrong type')
+        self.eventlock.acquire()
         try:
-            del self.eventlog[eventid]
-        except(KeyError):
-            # key was not found in the event log
-            return True
+            # Deleting an eventid that is not in the event log is not an error
+            self.eventlog.execute('DELETE FROM events WHERE eventid = ?',
+                                  (eventid,))
+            self.eventlog.commit()
         except Exception:
             self.logger.log(LogPriority.ERROR,
                             ['StateChgLogger.deleteentry',
                              'Error deleting ' + str(eventid) + ' ' + traceback.format_exc()])
             return False
+        finally:
+            self.eventlock.release()
         return True
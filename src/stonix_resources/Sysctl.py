@@ -0,0 +1,233 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+The Sysctl class audits and sets kernel parameters for the rules that manage
+sysctl.conf. Rules used to check only the file and then reload the whole of
+it with sysctl -p after every edit, so the running kernel was never checked
+and the file was reloaded once per rule. Here the live values are read
+straight from /proc/sys on Linux, or with a single sysctl call elsewhere, and
+only the keys whose value differs are set.
+
+Rules reach the shared instance through Rule.getsysctl(). Keys are given in
+dotted form, values as strings. Values are compared with runs of whitespace
+collapsed, so "4096 87380 6291456" matches the tab separated value the
+kernel reports. On Linux a key may also be given in the slash form sysctl(8)
+accepts, net/ipv4/conf/eth0.100/rp_filter, and dotted keys whose components
+hold dots themselves are found by checking which directories exist.
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+@change: 2015/10/18 dkennel resolve keys for interfaces with dotted names
+'''
+import os
+from CommandHelper import CommandHelper
+from logdispatcher import LogPriority
+
+PROCSYS = '/proc/sys'
+
+
+def normalize(value):
+    '''
+    Return a sysctl value with leading, trailing and repeated whitespace
+    removed.
+
+    @param value: string
+    @return: string
+    @author: dkennel
+    '''
+    return ' '.join(str(value).split())
+
+
+class Sysctl(object):
+    '''
+    Reads and sets live kernel parameters.
+
+    @author: dkennel
+    '''
+
+    def __init__(self, logger, environ, procsys=PROCSYS):
+        '''
+        Sysctl constructor.
+
+        @param logger: LogDispatcher instance
+        @param environ: Environment instance
+        @param procsys: string - location of the proc sysctl tree, if it
+            does not exist the sysctl command is used instead
+        @author: dkennel
+        '''
+        self.logger = logger
+        self.environ = environ
+        self.procsys = procsys
+        self.command = '/sbin/sysctl'
+        if not os.path.exists(self.command):
+            self.command = '/usr/sbin/sysctl'
+
+    def useproc(self):
+        '''
+        Return True when parameters are read and written through /proc/sys.
+
+        @return: bool
+        @author: dkennel
+        '''
+        return os.path.isdir(self.procsys)
+
+    def getprocpath(self, key):
+        '''
+        Return the /proc/sys file for a key. A key holding a slash is taken
+        as a path below /proc/sys the way sysctl(8) does. A dotted key is
+        mapped by turning each dot into a slash, unless that file does not
+        exist and a component holds dots itself, the VLAN interface in
+        net.ipv4.conf.eth0.100.rp_filter for instance.
+
+        @param key: string - parameter name, net.ipv4.ip_forward for instance
+        @return: string
+        @author: dkennel
+        @change: 2015/10/18 dkennel accept slash keys and dotted components
+        '''
+        if '/' in key:
+            return os.path.join(self.procsys, key.strip('/'))
+        path = os.path.join(self.procsys, key.replace('.', '/'))
+        if not os.path.exists(path):
+            found = self.__findprocpath(self.procsys, key.split('.'))
+            if found is not None:
+                path = found
+        return path
+
+    def __findprocpath(self, path, parts):
+        '''
+        Private method to find the file below path named by a list of dotted
+        key components. The longest run of components that names an entry is
+        tried first, shorter runs are tried when that leads nowhere.
+
+        @param path: string - directory to search
+        @param parts: list of strings - key components still to be matched
+        @return: string or None if no file matches
+        @author: dkennel
+        '''
+        for count in range(len(parts), 0, -1):
+            candidate = os.path.join(path, '.'.join(parts[:count]))
+            if count == len(parts):
+                if os.path.isfile(candidate):
+                    return candidate
+            elif os.path.isdir(candidate):
+                found = self.__findprocpath(candidate, parts[count:])
+                if found is not None:
+                    return found
+        return None
+
+    def getlive(self, keys):
+        '''
+        Return the running kernel's values for a set of parameters.
+
+        @param keys: iterable of parameter names
+        @return: dict of name to normalized value, None for parameters the
+            kernel does not have
+        @author: dkennel
+        '''
+        live = {}
+        for key in keys:
+            live[key] = None
+        if not live:
+            return live
+        if self.useproc():
+            for key in live:
+                try:
+                    rhandle = open(self.getprocpath(key), 'r')
+                    try:
+                        live[key] = normalize(rhandle.read())
+                    finally:
+                        rhandle.close()
+                except (IOError, OSError):
+                    continue
+        else:
+            cmdhelper = CommandHelper(self.logger)
+            cmdhelper.executeCommand([self.command, '-e'] + sorted(live))
+            for line in cmdhelper.getOutput():
+                if '=' not in line:
+                    continue
+                key, value = line.split('=', 1)
+                key = key.strip()
+                if key in live:
+                    live[key] = normalize(value)
+        return live
+
+    def audit(self, settings):
+        '''
+        Compare the running kernel with the wanted settings. Parameters the
+        kernel does not have are left out, they can not be set anyway.
+
+        @param settings: dict of parameter name to wanted value
+        @return: dict of parameter name to current value for the parameters
+            that are not set as wanted
+        @author: dkennel
+        '''
+        wrong = {}
+        live = self.getlive(settings.keys())
+        for key in settings:
+            if live[key] is not None and \
+               live[key] != normalize(settings[key]):
+                wrong[key] = live[key]
+        return wrong
+
+    def apply(self, settings):
+        '''
+        Set the parameters whose running value differs from the wanted one.
+        Parameters already set as wanted and parameters the kernel does not
+        have are not touched.
+
+        @param settings: dict of parameter name to wanted value
+        @return: bool - True if every parameter that needed changing was
+            changed
+        @author: dkennel
+        '''
+        wrong = self.audit(settings)
+        if not wrong:
+            return True
+        success = True
+        if self.useproc():
+            for key in sorted(wrong):
+                try:
+                    whandle = open(self.getprocpath(key), 'w')
+                    try:
+                        whandle.write(str(settings[key]).strip() + '\n')
+                    finally:
+                        whandle.close()
+                except (IOError, OSError), err:
+                    success = False
+                    self.logger.log(LogPriority.DEBUG,
+                                    ['Sysctl.apply', 'Unable to set ' + key +
+                                     ': ' + str(err)])
+        else:
+            cmd = [self.command]
+            for key in sorted(wrong):
+                cmd.append(key + '=' + str(settings[key]).strip())
+            cmdhelper = CommandHelper(self.logger)
+            if not cmdhelper.executeCommand(cmd) or \
+               cmdhelper.getReturnCode() != 0:
+                success = False
+        if success:
+            self.logger.log(LogPriority.DEBUG,
+                            ['Sysctl.apply', 'Set ' +
+                             ', '.join(sorted(wrong))])
+        return success
@@ -41,6 +41,8 @@ class AptGet(object):
         self.install = "sudo DEBIAN_FRONTEND=noninteractive /usr/bin/apt-get \
 -y install "
         self.remove = "/usr/bin/apt-get -y remove "
+        self.queryall = ["/usr/bin/dpkg-query", "-W", "-f",
+                         "${Package}\\t${Architecture}\\t${Status}\\n"]
 ###############################################################################
     def installpackage(self, package):
         '''Install a package. Return a bool indicating success or failure.
@@ -77,6 +79,35 @@ class AptGet(object):
             self.logger.log(LogPriority.INFO,
                                        ["AptGet.install",self.detailedresults])
             raise(self.detailedresults)
+###############################################################################
+    def installpackages(self, packages):
+        '''Install several packages in a single apt-get transaction. Return a
+        bool indicating success or failure.
+
+        @param list packages : Names of the packages to be installed, must be
+            recognizable to the underlying package manager.
+        @return bool :
+        @author: dkennel'''
+        try:
+            names = " ".join(packages)
+            self.ch.executeCommand(self.install + names)
+            if self.ch.getReturnCode() == 0:
+                self.detailedresults = names + " pkgs installed successfully"
+                self.logger.log(LogPriority.INFO,
+                                ["AptGet.install",self.detailedresults])
+                return True
+            else:
+                self.detailedresults = names + " pkgs not able to install"
+                self.logger.log(LogPriority.INFO,
+                                ["AptGet.install",self.detailedresults])
+                return False
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            self.detailedresults = traceback.format_exc()
+            self.logger.log(LogPriority.INFO,
+                            ["AptGet.install",self.detailedresults])
+            raise
 ###############################################################################
     def removepackage(self, package):
         '''Remove a package. Return a bool indicating success or failure.
@@ -141,6 +172,36 @@ class AptGet(object):
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.INFO, self.detailedresults)
             raise(self.detailedresults)
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed packages using a single dpkg-query
+        call. Packages are listed by name and by name:arch. Only packages in
+        the installed state are included, the same as the "ii" lines
+        checkInstall looks for. Return None if dpkg could not be queried.
+
+        @return: set or None
+        @author: dkennel'''
+        try:
+            self.ch.executeCommand(self.queryall)
+            if self.ch.getReturnCode() != 0:
+                return None
+            installed = set()
+            for line in self.ch.getOutput():
+                fields = line.split("\t")
+                if len(fields) != 3:
+                    continue
+                name, arch, status = fields
+                if status.strip() != "install ok installed":
+                    continue
+                installed.add(name)
+                installed.add(name + ":" + arch)
+            return installed
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            self.detailedresults = traceback.format_exc()
+            self.logger.log(LogPriority.INFO, self.detailedresults)
+            return None
 ###############################################################################
     def checkAvailable(self,package):
         try:
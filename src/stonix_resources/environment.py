@@ -39,16 +39,26 @@ Created on Aug 24, 2010
 
 @author: dkennel
 @change: 2014/05/29 - ekkehard j. koch - pep8 and comment updates
+@change: 2015/10/16 dkennel native Linux OS and network discovery, lazy
+network facts and a short lived on disk cache for hardware facts
+@change: 2015/10/18 dkennel release files with the full version are preferred
+over /etc/os-release, which is only read on Linux
 '''
 import os
 import re
 import sys
 import socket
+import struct
 import subprocess
 import types
 import platform
 import pwd
 import time
+import json
+try:
+    import fcntl
+except(ImportError):
+    fcntl = None
 from localize import CORPORATENETWORKSERVERS, STONIXVERSION
 if os.geteuid() == 0:
     try:
@@ -59,6 +69,16 @@ if os.geteuid() == 0:
 else:
     DMI = False
 
+# Hardware and identity facts are kept in this file for FACTTTL seconds so
+# that back to back stonix runs do not have to query the hardware again.
+FACTCACHE = '/var/cache/stonix/facts.json'
+FACTTTL = 3600
+SIOCGIFADDR = 0x8915
+SYSNET = '/sys/class/net'
+SYSDMI = '/sys/class/dmi/id'
+# SMBIOS chassis type codes for portable systems as found in chassis_type
+MOBILECHASSIS = ['8', '9', '10', '11', '14']
+
 
 class Environment:
 
@@ -89,6 +109,10 @@ class Environment:
         self.verbosemode = False
         self.debugmode = False
         self.runtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        self.networkcollected = False
+        self.facts = {}
+        self.cachedfacts = None
+        self.factcache = FACTCACHE
         self.collectinfo()
 
     def setinstallmode(self, installmode):
@@ -206,11 +230,14 @@ class Environment:
 
     def gethostname(self):
         """
-        Return the hostname of the system.
+        Return the hostname of the system. The network facts are collected
+        the first time one of them is asked for.
 
         @return: string
         @author: dkennel
         """
+        if not self.networkcollected:
+            self.guessnetwork()
         return self.hostname
 
     def getipaddress(self):
@@ -220,6 +247,8 @@ class Environment:
         @return string :
         @author D. Kennel
         """
+        if not self.networkcollected:
+            self.guessnetwork()
         return self.ipaddress
 
     def getmacaddr(self):
@@ -229,6 +258,8 @@ class Environment:
         @return string :
         @author D. Kennel
         """
+        if not self.networkcollected:
+            self.guessnetwork()
         return self.macaddress
 
     def geteuid(self):
@@ -269,8 +300,8 @@ class Environment:
         self.discoveros()
         # print 'Environment running setosfamily'
         self.setosfamily()
-        # print 'Environment running guessnetwork'
-        self.guessnetwork()
+        # The network facts may need DNS and are collected on first use by
+        # gethostname, getipaddress and getmacaddr.
         self.collectpaths()
 
     def discoveros(self):
@@ -279,6 +310,10 @@ class Environment:
         @return : void
         @author: D. Kennel
         """
+        # Read the release files directly where possible, lsb_release is
+        # slow to start and not always installed
+        if self.discoverosrelease():
+            return
         # Alternative (better) implementation for Linux
         if os.path.exists('/usr/bin/lsb_release'):
             proc = subprocess.Popen('/usr/bin/lsb_release -dr',
@@ -358,6 +393,93 @@ class Environment:
             opsys = description + ' ' + release + ' ' + build
             self.osreportstring = opsys
 
+    def discoverosrelease(self):
+        """
+        Set the operating system type and version on Linux without running
+        lsb_release. The release files that carry the full version are read
+        first: /etc/redhat-release on Red Hat derived systems,
+        /etc/lsb-release where it sets DISTRIB_RELEASE and /etc/debian_version
+        on Debian. /etc/os-release only gives the major version on some
+        distributions, so it is used only when none of these apply and
+        lsb_release and /etc/gentoo-release are not available either.
+
+        @return: bool - True if the OS type and version were set
+        @author: dkennel
+        """
+        if platform.system() != 'Linux':
+            return False
+        if os.path.exists('/etc/redhat-release'):
+            try:
+                relfile = open('/etc/redhat-release')
+                description = relfile.readline().strip()
+                relfile.close()
+            except(IOError):
+                description = ''
+            match = re.search(r'release\s+(\S+)', description)
+            if match:
+                self.operatingsystem = description
+                self.osreportstring = description
+                self.osversion = match.group(1)
+                return True
+        lsbrelease = self.readreleasefile('/etc/lsb-release')
+        description = lsbrelease.get('DISTRIB_DESCRIPTION', '')
+        version = lsbrelease.get('DISTRIB_RELEASE', '')
+        if description and version:
+            self.operatingsystem = description
+            self.osreportstring = description
+            self.osversion = version
+            return True
+        osrelease = self.readreleasefile('/etc/os-release')
+        description = osrelease.get('PRETTY_NAME', osrelease.get('NAME', ''))
+        if description and os.path.exists('/etc/debian_version'):
+            try:
+                relfile = open('/etc/debian_version')
+                version = relfile.readline().strip()
+                relfile.close()
+            except(IOError):
+                version = ''
+            # Testing and unstable carry a codename such as jessie/sid
+            if re.match(r'^\d+(\.\d+)*$', version):
+                self.operatingsystem = description
+                self.osreportstring = description
+                self.osversion = version
+                return True
+        if os.path.exists('/usr/bin/lsb_release') or \
+           os.path.exists('/etc/gentoo-release'):
+            return False
+        version = osrelease.get('VERSION_ID', '')
+        if not description or not version:
+            return False
+        self.operatingsystem = description
+        self.osreportstring = description
+        self.osversion = version
+        return True
+
+    def readreleasefile(self, path):
+        """
+        Read a shell style KEY=value release file such as /etc/os-release or
+        /etc/lsb-release.
+
+        @param path: string - path of the release file
+        @return: dict - empty if the file is missing or unreadable
+        @author: dkennel
+        """
+        release = {}
+        if not os.path.exists(path):
+            return release
+        try:
+            relfile = open(path)
+            for line in relfile:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                key, value = line.split('=', 1)
+                release[key.strip()] = value.strip().strip('"\'')
+            relfile.close()
+        except(IOError):
+            return {}
+        return release
+
     def setosfamily(self):
         """
         Private method to detect and set the self.osfamily property. This is a
@@ -403,31 +525,33 @@ class Environment:
             # a valid hostname and gethostbyname errored.
             ipaddress = self.getdefaultip()
 
-        # In ifconfig output macaddresses are always one line before the ip
-        # address.
         if sys.platform == 'linux2':
-            cmd = '/sbin/ifconfig'
-        elif os.path.exists('/usr/sbin/ifconfig'):
-            cmd = '/usr/sbin/ifconfig -a'
+            macaddress = self.getlinuxmac(ipaddress) or macaddress
         else:
-            cmd = '/sbin/ifconfig -a'
-        proc = subprocess.Popen(cmd, shell=True,
-                                stdout=subprocess.PIPE, close_fds=True)
-        netdata = proc.stdout.readlines()
-
-        for line in netdata:
-            # print "processing: " + line
-            match = re.search(macre, line)
-            if match is not None:
-                # print 'Matched MAC address'
-                macaddress = match.group()
-            if re.search(ipaddress, line):
-                # print 'Found ipaddress'
-                break
+            # In ifconfig output macaddresses are always one line before the
+            # ip address.
+            if os.path.exists('/usr/sbin/ifconfig'):
+                cmd = '/usr/sbin/ifconfig -a'
+            else:
+                cmd = '/sbin/ifconfig -a'
+            proc = subprocess.Popen(cmd, shell=True,
+                                    stdout=subprocess.PIPE, close_fds=True)
+            netdata = proc.stdout.readlines()
+
+            for line in netdata:
+                # print "processing: " + line
+                match = re.search(macre, line)
+                if match is not None:
+                    # print 'Matched MAC address'
+                    macaddress = match.group()
+                if re.search(ipaddress, line):
+                    # print 'Found ipaddress'
+                    break
 
         self.hostname = hostname
         self.ipaddress = ipaddress
         self.macaddress = macaddress
+        self.networkcollected = True
 
     def getdefaultip(self):
         """
@@ -440,20 +564,11 @@ class Environment:
         ipaddr = '127.0.0.1'
         gateway = ''
         if sys.platform == 'linux2':
-            try:
-                routecmd = subprocess.Popen('/sbin/route -n', shell=True,
-                                            stdout=subprocess.PIPE,
-                                            close_fds=True)
-                routedata = routecmd.stdout.readlines()
-            except(OSError):
-                return ipaddr
-            for line in routedata:
-                if re.search('^default', line):
-                    line = line.split()
-                    try:
-                        gateway = line[1]
-                    except(IndexError):
-                        return ipaddr
+            # The kernel tells us which interface carries the default route
+            iface = self.getdefaultiface()
+            if iface is not None:
+                ipaddr = self.getinterfaces().get(iface) or ipaddr
+            return ipaddr
         else:
             try:
                 if os.path.exists('/usr/sbin/route'):
@@ -521,23 +636,10 @@ class Environment:
         """
         iplist = []
         if sys.platform == 'linux2':
-            try:
-                ifcmd = subprocess.Popen('/sbin/ifconfig', shell=True,
-                                         stdout=subprocess.PIPE,
-                                         close_fds=True)
-                ifdata = ifcmd.stdout.readlines()
-            except(OSError):
-                return iplist
-            for line in ifdata:
-                if re.search('inet addr:', line):
-                    try:
-                        line = line.split()
-                        addr = line[1]
-                        addr = addr.split(':')
-                        addr = addr[1]
-                        iplist.append(addr)
-                    except(IndexError):
-                        continue
+            interfaces = self.getinterfaces()
+            for iface in sorted(interfaces):
+                if interfaces[iface]:
+                    iplist.append(interfaces[iface])
         else:
             try:
                 if os.path.exists('/usr/sbin/ifconfig'):
@@ -560,7 +662,205 @@ class Environment:
                         continue
         return iplist
 
+    def getinterfaces(self):
+        """
+        Return the IPv4 address of every network interface on a Linux system.
+        The interfaces are listed from /sys/class/net and their addresses
+        read with the SIOCGIFADDR ioctl so no external command is run.
+
+        @return: dict - interface name: ip address, None for interfaces
+        without an IPv4 address
+        @author: dkennel
+        """
+        interfaces = {}
+        try:
+            names = os.listdir(SYSNET)
+        except(OSError):
+            return interfaces
+        sock = None
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            for name in names:
+                interfaces[name] = None
+                if fcntl is None:
+                    continue
+                try:
+                    ifreq = fcntl.ioctl(sock.fileno(), SIOCGIFADDR,
+                                        struct.pack('256s', name[:15]))
+                    interfaces[name] = socket.inet_ntoa(ifreq[20:24])
+                except(IOError):
+                    # no IPv4 address on this interface
+                    continue
+        except(socket.error):
+            pass
+        if sock is not None:
+            sock.close()
+        return interfaces
+
+    def getdefaultiface(self):
+        """
+        Return the name of the interface carrying the default route as found
+        in /proc/net/route.
+
+        @return: string or None if there is no default route
+        @author: dkennel
+        """
+        try:
+            routefile = open('/proc/net/route')
+            routedata = routefile.readlines()
+            routefile.close()
+        except(IOError):
+            return None
+        # Iface Destination Gateway Flags ... all in hex
+        for line in routedata[1:]:
+            fields = line.split()
+            try:
+                if fields[1] == '00000000' and int(fields[3], 16) & 2:
+                    return fields[0]
+            except(IndexError, ValueError):
+                continue
+        return None
+
+    def getlinuxmac(self, ipaddress):
+        """
+        Return the MAC address of the interface holding the passed IP
+        address. When no interface holds it the MAC of the default route
+        interface is used, then that of the first interface that has one.
+
+        @param ipaddress: string
+        @return: string or None if no MAC address was found
+        @author: dkennel
+        """
+        interfaces = self.getinterfaces()
+        candidates = []
+        for iface in sorted(interfaces):
+            if interfaces[iface] == ipaddress:
+                candidates.append(iface)
+        default = self.getdefaultiface()
+        if default is not None:
+            candidates.append(default)
+        candidates.extend(sorted(interfaces))
+        for iface in candidates:
+            try:
+                addrfile = open(os.path.join(SYSNET, iface, 'address'))
+                macaddress = addrfile.readline().strip()
+                addrfile.close()
+            except(IOError):
+                continue
+            if macaddress and macaddress != '00:00:00:00:00:00':
+                return macaddress
+        return None
+
+    def getfact(self, name, function):
+        """
+        Return the named hardware or identity fact. Facts are computed by
+        calling function the first time they are asked for and then kept for
+        the life of this object. When running as root they are also kept in
+        the fact cache file for FACTTTL seconds so that the next run does not
+        have to query the hardware again.
+
+        @param name: string - fact name used as the cache key
+        @param function: callable returning the fact value
+        @return: the fact value
+        @author: dkennel
+        """
+        if name in self.facts:
+            return self.facts[name]
+        if self.cachedfacts is None:
+            self.cachedfacts = self.loadfacts()
+        if name in self.cachedfacts:
+            value = self.cachedfacts[name][1]
+        else:
+            value = function()
+            self.cachedfacts[name] = [time.time(), value]
+            self.savefacts()
+        self.facts[name] = value
+        return value
+
+    def loadfacts(self):
+        """
+        Read the fact cache file and return the facts that have not expired.
+        The cache is only used when running as root.
+
+        @return: dict - fact name: [timestamp, value]
+        @author: dkennel
+        """
+        facts = {}
+        if self.euid != 0:
+            return facts
+        try:
+            cachefile = open(self.factcache, 'r')
+            try:
+                cached = json.load(cachefile)
+            finally:
+                cachefile.close()
+            now = time.time()
+            for name in cached:
+                stamp, value = cached[name]
+                if 0 <= now - stamp < FACTTTL:
+                    if isinstance(value, unicode):
+                        value = str(value)
+                    facts[str(name)] = [stamp, value]
+        except(IOError, OSError, ValueError, TypeError, AttributeError):
+            # missing or damaged cache, the facts will be looked up again
+            pass
+        return facts
+
+    def savefacts(self):
+        """
+        Write the current facts to the fact cache file. The file is only
+        readable by root and is replaced atomically.
+
+        @return: void
+        @author: dkennel
+        """
+        if self.euid != 0:
+            return
+        tmpfile = self.factcache + '.tmp'
+        try:
+            cachedir = os.path.dirname(self.factcache)
+            if not os.path.exists(cachedir):
+                os.makedirs(cachedir, 0700)
+            cachefile = open(tmpfile, 'w')
+            try:
+                json.dump(self.cachedfacts, cachefile)
+            finally:
+                cachefile.close()
+            os.chmod(tmpfile, 0600)
+            os.rename(tmpfile, self.factcache)
+        except(IOError, OSError):
+            # not being able to cache is not fatal
+            pass
+
+    def readsysdmi(self, name):
+        """
+        Return the contents of a file in /sys/class/dmi/id, the kernel's copy
+        of the SMBIOS tables. Serial numbers and the UUID are only readable
+        by root.
+
+        @param name: string - file name, e.g. product_serial
+        @return: string - empty if the file could not be read
+        @author: dkennel
+        """
+        try:
+            dmifile = open(os.path.join(SYSDMI, name), 'r')
+            value = dmifile.readline().strip()
+            dmifile.close()
+        except(IOError):
+            value = ''
+        return value
+
     def get_property_number(self):
+        """
+        Find and return the property number of the local machine. The value is
+        looked up by findpropertynumber on first use and cached, see getfact.
+
+        @return: int
+        @author: dkennel
+        """
+        return self.getfact('propertynumber', self.findpropertynumber)
+
+    def findpropertynumber(self):
         """
         Find and return the
         Property number of the local machine
@@ -597,6 +897,16 @@ class Environment:
         return propnum
 
     def get_system_serial_number(self):
+        """
+        Find and return the serial number of the local machine. The value is
+        looked up by findsystemserial on first use and cached, see getfact.
+
+        @return: string
+        @author: dkennel
+        """
+        return self.getfact('systemserial', self.findsystemserial)
+
+    def findsystemserial(self):
         """
         Find and return the
         Serial number of the local machine
@@ -615,6 +925,8 @@ class Environment:
             except(IndexError, KeyError):
                 # got unexpected data back from dmidecode
                 pass
+        elif self.readsysdmi('product_serial'):
+            systemserial = self.readsysdmi('product_serial')
         elif os.path.exists('/usr/sbin/system_profiler'):
             profilerfetch = '/usr/sbin/system_profiler SPHardwareDataType'
             cmd3 = subprocess.Popen(profilerfetch, shell=True,
@@ -632,6 +944,16 @@ class Environment:
         return systemserial
 
     def get_chassis_serial_number(self):
+        """
+        Find and return the chassis serial number. The value is looked up by
+        findchassisserial on first use and cached, see getfact.
+
+        @return: string
+        @author: dkennel
+        """
+        return self.getfact('chassisserial', self.findchassisserial)
+
+    def findchassisserial(self):
         """
         Find and return the
         Chassis serial number
@@ -647,10 +969,22 @@ class Environment:
             except(IndexError, KeyError):
                 # got unexpected data back from dmidecode
                 pass
+        elif self.readsysdmi('chassis_serial'):
+            chassisserial = self.readsysdmi('chassis_serial')
         chassisserial = chassisserial.strip()
         return chassisserial
 
     def get_system_manufacturer(self):
+        """
+        Find and return the system manufacturer. The value is looked up by
+        findsystemmanufacturer on first use and cached, see getfact.
+
+        @return: string
+        @author: dkennel
+        """
+        return self.getfact('systemmanufacturer', self.findsystemmanufacturer)
+
+    def findsystemmanufacturer(self):
         """
         Find and return the
         System manufacturer
@@ -669,10 +1003,23 @@ class Environment:
             except(IndexError, KeyError):
                 # got unexpected data back from dmidecode
                 pass
+        elif self.readsysdmi('sys_vendor'):
+            systemmfr = self.readsysdmi('sys_vendor')
         systemmfr = systemmfr.strip()
         return systemmfr
 
     def get_chassis_manfacturer(self):
+        """
+        Find and return the chassis manufacturer. The value is looked up by
+        findchassismanufacturer on first use and cached, see getfact.
+
+        @return: string
+        @author: dkennel
+        """
+        return self.getfact('chassismanufacturer',
+                            self.findchassismanufacturer)
+
+    def findchassismanufacturer(self):
         """
         Find and return the
         Chassis manufacterer
@@ -688,10 +1035,22 @@ class Environment:
             except(IndexError, KeyError):
                 # got unexpected data back from dmidecode
                 pass
+        elif self.readsysdmi('chassis_vendor'):
+            chassismfr = self.readsysdmi('chassis_vendor')
         chassismfr = chassismfr.strip()
         return chassismfr
 
     def get_sys_uuid(self):
+        """
+        Find and return a unique identifier for the system. The value is looked
+        up by findsysuuid on first use and cached, see getfact.
+
+        @return: string
+        @author: dkennel
+        """
+        return self.getfact('sysuuid', self.findsysuuid)
+
+    def findsysuuid(self):
         """
         Find and return a unique identifier for the system. On most systems
         this will be the UUID of the system. On Solaris SPARC this will be
@@ -712,6 +1071,8 @@ class Environment:
             except(IndexError, KeyError):
                 # got unexpected data back from dmidecode
                 pass
+        elif self.readsysdmi('product_uuid'):
+            uuid = self.readsysdmi('product_uuid')
         elif os.path.exists('/usr/sbin/dmidecode') and self.euid == 0:
             uuidfetch = '/usr/sbin/dmidecode -s system-uuid'
             cmd1 = subprocess.Popen(uuidfetch, shell=True,
@@ -754,6 +1115,16 @@ class Environment:
         return uuid
 
     def ismobile(self):
+        """
+        Returns a bool indicating whether or not the system is a laptop. The
+        value is looked up by findmobile on first use and cached, see getfact.
+
+        @return: bool
+        @author: dkennel
+        """
+        return self.getfact('ismobile', self.findmobile)
+
+    def findmobile(self):
         '''
         Returns a bool indicating whether or not the system in question is a
         laptop. The is mobile method is used by some rules that have alternate
@@ -774,6 +1145,9 @@ class Environment:
             except(IndexError, KeyError):
                 # got unexpected data back from dmidecode
                 pass
+        elif self.readsysdmi('chassis_type'):
+            if self.readsysdmi('chassis_type') in MOBILECHASSIS:
+                ismobile = True
         elif os.path.exists('/usr/sbin/system_profiler'):
             profilerfetch = '/usr/sbin/system_profiler SPHardwareDataType'
             cmd3 = subprocess.Popen(profilerfetch, shell=True,
@@ -67,6 +67,33 @@ class Freebsd(object):
         except Exception:
             self.detailedresults += traceback.format_exc()
             self.logger.log(LogPriority.INFO, self.detailedresults)
+###############################################################################
+    def installpackages(self, packages):
+        '''
+         Install several packages with a single pkg_add. Return a bool
+         indicating success or failure.
+
+        @param list packages : Names of the packages to be installed, must be
+            recognizable to the underlying package manager.
+        @return bool :
+        @author: dkennel'''
+        try:
+            installed = False
+            names = " ".join(packages)
+            self.ch.executeCommand(self.install + names)
+            if self.ch.getReturnCode() == 0:
+                self.detailedresults += names + " pkgs installed successfully"
+                installed = True
+            else:
+                self.detailedresults += names + " pkgs not able to install"
+            self.logger.log(LogPriority.INFO, self.detailedresults)
+            return installed
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            self.detailedresults += traceback.format_exc()
+            self.logger.log(LogPriority.INFO, self.detailedresults)
+            return False
 ###############################################################################
     def removepackage(self, package):
         '''
@@ -138,6 +165,32 @@ to be removed"
         except Exception:
             self.detailedresults += traceback.format_exc()
             self.logger.log(LogPriority.INFO, self.detailedresults)
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed packages from a single pkg_info
+        call. Packages are listed both as name-version and as name. Return
+        None if pkg_info could not be run.
+
+        @return: set or None
+        @author: dkennel'''
+        try:
+            self.ch.executeCommand(["/usr/sbin/pkg_info"])
+            if self.ch.getReturnCode() != 0:
+                return None
+            installed = set()
+            for cell in self.ch.getOutput():
+                cell2 = cell.split()
+                if not cell2:
+                    continue
+                installed.add(cell2[0])
+                installed.add(cell2[0].rsplit("-", 1)[0])
+            return installed
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            self.detailedresults += traceback.format_exc()
+            self.logger.log(LogPriority.INFO, self.detailedresults)
+            return None
 ###############################################################################
     def getInstall(self):
         return self.install
@@ -74,6 +74,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
         main_window.Ui_MainWindow.__init__(self)
 
         self.controller = controller
+        self.registry = self.controller.getregistry()
         self.environ = environment
         self.logger = logger
         self.icon_path = self.environ.get_icon_path()
@@ -190,7 +191,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
             self.logger.log(LogPriority.DEBUG,
                             ['gui.GUI.init',
                              'processing options for: ' + rulename])
-            rulenum = self.controller.getrulenumbyname(rulename)
+            rulenum = self.registry.getnumbyname(rulename)
             self.ruleci[rulename] = CiFrame(self, rulenum, self.controller,
                                             self.logger)
             self.ci_contlayout.addWidget(self.ruleci[rulename])
@@ -244,7 +245,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
                                          font-weight:600;'>%s</div>" %
                                          self.rule_list_widget.selectedItems()[0].text())
             rule_name = self.rule_list_widget.selectedItems()[0].text()
-            rule_num = self.controller.getrulenumbyname(rule_name)
+            rule_num = self.registry.getnumbyname(rule_name)
             self.rule_instructions_text.setPlainText(QApplication.translate("MainWindow",
                                                                             self.rule_data[rule_num][1],
                                                                             None,
@@ -318,37 +319,37 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
         for item in items:
             item.setIcon(icon)
 
-    def tupdate(self, status):
+    def tupdate(self, ruleid, count, total):
         """
         This method is called by runThread objects. In response
-        we need to refresh all dynamic components of the UI.
+        we need to refresh all dynamic components of the UI. The outcome of
+        the rule is looked up in the controller's result store.
 
-        @param status: a space separated string rule ruleid compliant count
-        total.
+        @param ruleid: int - number of the rule that completed. 0 when the
+        run was canceled.
+        @param count: int - number of rules completed
+        @param total: int - number of rules in the run
         @author: D. Kennel
         """
         try:
             self.logger.log(LogPriority.DEBUG,
-                            ['GUI', "Tupdate called. Args: " + str(status)])
-            stats = status.split(' ')
-            rule = stats[0]
-            # ruleid = int(stats[1])
-            count = int(stats[3])
-            total = int(stats[4])
-            if stats[2] == 'True':
-                compliant = True
-            else:
-                compliant = False
-            if compliant:
-                qcolor_rgb = self.green
-                self.set_listview_item_bgcolor(rule, qcolor_rgb)
-                iconame = 'grn'
-                self.set_listview_item_icon(rule, iconame)
+                            ['GUI', "Tupdate called. Args: " + str(ruleid) +
+                             ' ' + str(count) + ' ' + str(total)])
+            result = self.controller.getruleresult(ruleid)
+            if result is not None:
+                rule = result['rulename']
+                if result['compliant']:
+                    qcolor_rgb = self.green
+                    self.set_listview_item_bgcolor(rule, qcolor_rgb)
+                    iconame = 'grn'
+                    self.set_listview_item_icon(rule, iconame)
+                else:
+                    qcolor_rgb = self.red
+                    self.set_listview_item_bgcolor(rule, qcolor_rgb)
+                    iconame = 'red'
+                    self.set_listview_item_icon(rule, iconame)
             else:
-                qcolor_rgb = self.red
-                self.set_listview_item_bgcolor(rule, qcolor_rgb)
-                iconame = 'red'
-                self.set_listview_item_icon(rule, iconame)
+                rule = 'Canceled'
             self.rulelistselchange()
             self.statusBar().showMessage('Completed: ' + str(rule))
             self.update_progress(count, total)
@@ -414,7 +415,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
         self.update_progress(0, 0)
         self.threads = []
         thread = runThread(self.controller, 'fix', self.logger)
-        self.connect(thread, SIGNAL('tupdate(QString)'), self.tupdate)
+        self.connect(thread, SIGNAL('tupdate(int, int, int)'), self.tupdate)
         self.connect(thread, SIGNAL('supdate(QString)'), self.supdate)
         self.threads.append(thread)
         for waitingthread in self.threads:
@@ -433,7 +434,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
         self.update_progress(0, 0)
         self.threads = []
         thread = runThread(self.controller, 'report', self.logger)
-        self.connect(thread, SIGNAL('tupdate(QString)'), self.tupdate)
+        self.connect(thread, SIGNAL('tupdate(int, int, int)'), self.tupdate)
         self.connect(thread, SIGNAL('supdate(QString)'), self.supdate)
         self.threads.append(thread)
         for waitingthread in self.threads:
@@ -456,7 +457,8 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
                                         QMessageBox.Yes, QMessageBox.No)
             if reply == QMessageBox.Yes:
                 thread = runThread(self.controller, 'undo', self.logger)
-                self.connect(thread, SIGNAL('tupdate(QString)'), self.tupdate)
+                self.connect(thread, SIGNAL('tupdate(int, int, int)'),
+                             self.tupdate)
                 self.connect(thread, SIGNAL('supdate(QString)'), self.supdate)
                 self.threads.append(thread)
                 for waitingthread in self.threads:
@@ -506,9 +508,9 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
             self.pbar.setRange(0, 0)
             self.logger.log(LogPriority.DEBUG,
                             ['GUI', "Run Rule Fix running: " + rule_name])
-            rule_num = self.controller.getrulenumbyname(rule_name)
+            rule_num = self.registry.getnumbyname(rule_name)
             thread = runThread(self.controller, 'fix', self.logger, rule_num)
-            self.connect(thread, SIGNAL('tupdate(QString)'), self.tupdate)
+            self.connect(thread, SIGNAL('tupdate(int, int, int)'), self.tupdate)
             self.connect(thread, SIGNAL('supdate(QString)'), self.supdate)
             self.threads.append(thread)
             for waitingthread in self.threads:
@@ -531,10 +533,10 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
             self.pbar.setRange(0, 0)
             self.logger.log(LogPriority.DEBUG,
                             ['GUI', "Run Rule Report running: " + rule_name])
-            rule_num = self.controller.getrulenumbyname(rule_name)
+            rule_num = self.registry.getnumbyname(rule_name)
             thread = runThread(self.controller, 'report', self.logger,
                                rule_num)
-            self.connect(thread, SIGNAL('tupdate(QString)'), self.tupdate)
+            self.connect(thread, SIGNAL('tupdate(int, int, int)'), self.tupdate)
             self.connect(thread, SIGNAL('supdate(QString)'), self.supdate)
             self.threads.append(thread)
             for waitingthread in self.threads:
@@ -558,7 +560,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
             self.pbar.setRange(0, 0)
             self.logger.log(LogPriority.DEBUG,
                             ['GUI', "Run Rule Revert running: " + rule_name])
-            rule_num = self.controller.getrulenumbyname(rule_name)
+            rule_num = self.registry.getnumbyname(rule_name)
             if self.environ.geteuid() == 0:
                 reply = QMessageBox.warning(self, 'Revert Changes',
                                           "Are you sure you want to revert changes for rule " \
@@ -567,7 +569,7 @@ class GUI (View, QMainWindow, main_window.Ui_MainWindow):
                 if reply == QMessageBox.Yes:
                     thread = runThread(self.controller, 'undo', self.logger,
                                        rule_num)
-                    self.connect(thread, SIGNAL('tupdate(QString)'),
+                    self.connect(thread, SIGNAL('tupdate(int, int, int)'),
                                  self.tupdate)
                     self.connect(thread, SIGNAL('supdate(QString)'),
                                  self.supdate)
@@ -872,10 +874,7 @@ class runThread(QThread):
                              'Sent supdate signal: ' + str(sstatus)])
             # Look for the stop flag and cleanly terminate processing
             if self.stopflag:
-                compliant = self.controller.getrulecompstatus(ruleid)
-                status = 'Canceled' + ' ' + str(ruleid) + ' ' + str(compliant) \
-                + ' ' + str(100) + ' ' + str(100)
-                self.emit(SIGNAL('tupdate(QString)'), status)
+                self.emit(SIGNAL('tupdate(int, int, int)'), 0, 100, 100)
                 self.logger.log(LogPriority.DEBUG,
                                 ['GUI.runThread.run',
                                  'Sent tupdate signal for stop flag: ' + str(sstatus)])
@@ -886,11 +885,9 @@ class runThread(QThread):
                 self.controller.runruleaudit(ruleid)
             elif self.action == 'undo':
                 self.controller.undorule(ruleid)
-            compliant = self.controller.getrulecompstatus(ruleid)
             completed = completed + 1
-            status = name + ' ' + str(ruleid) + ' ' + str(compliant) \
-            + ' ' + str(completed) + ' ' + str(total)
-            self.emit(SIGNAL('tupdate(QString)'), status)
+            self.emit(SIGNAL('tupdate(int, int, int)'), ruleid, completed,
+                      total)
             self.logger.log(LogPriority.DEBUG,
                             ['GUI.runThread.run',
                              'Sent tupdate signal: ' + str(sstatus)])
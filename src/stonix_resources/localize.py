@@ -58,6 +58,11 @@ REPORTSERVER = 'reports.bar.com'
 # sendreports = False
 SENDREPORTS = True
 
+# The run report can be gzip compressed before it is uploaded to the report
+# server. The report server importer accepts both forms. Please note no quotes.
+# compressreport = True
+COMPRESSREPORT = False
+
 # The SoftwarePatching rule will check to see if local update sources are being
 # used. If you have local update sources list them here. This check will be
 # skipped if the list is empty. The list is in python list format:
@@ -40,20 +40,23 @@ Created on Aug 24, 2010
 '''
 
 from observable import Observable
+from DeliveryQueue import DeliveryQueue, SPOOLDIR
+import atexit
 import logging
 import localize
 import logging.handlers
 import os.path
 import os
 import socket
-import inspect
+import sys
 import traceback
 import weakref
-import smtplib
-import subprocess
+import threading
+import time
+import gzip
 import xml.etree.ElementTree as ET
 import localize
-from shutil import move
+from shutil import move, copyfileobj
 
 
 class LogDispatcher (Observable):
@@ -65,7 +68,21 @@ class LogDispatcher (Observable):
     :author: scmcleni
     """
 
-    def __init__(self, environment):
+    def __init__(self, environment, spooldir=None):
+        """
+        LogDispatcher constructor.
+
+        @param environment: environment instance
+        @param spooldir: string - directory error mail and run reports are
+            spooled in for delivery. Defaults to SPOOLDIR when running as
+            root and a spool in the log directory otherwise. Nothing is
+            spooled when the environment is in test mode.
+        @change: 2015/10/18 dkennel added spooldir so tests never spool to
+            the production spool
+        @change: 2015/10/18 dkennel delivery starts in postreport and
+            closereports, so a dispatcher that never hands over its reports
+            never spools or sends
+        """
         Observable.__init__(self)
         self.environment = environment
         self.debug = self.environment.getdebugmode()
@@ -79,6 +96,9 @@ class LogDispatcher (Observable):
             print 'LOGDISPATCHER: xml log path: ' + self.xmllog
         if os.path.isfile(self.xmllog):
             try:
+                # A report left behind by an abnormal exit is closed off so
+                # that the copy we keep is still a valid document.
+                recoverreport(self.xmllog)
                 if os.path.exists(self.xmllog + '.old'):
                     os.remove(self.xmllog + '.old')
                 move(self.xmllog, self.xmllog + '.old')
@@ -89,8 +109,23 @@ class LogDispatcher (Observable):
                 print 'logdispatcher: '
                 print traceback.format_exc()
                 print err
-        self.xmlreport = xmlReport(self.xmllog, self.debug)
+        self.xmlreport = xmlReport(self.xmllog, self.debug,
+                                   localize.COMPRESSREPORT)
+        # In test mode spooldir stays None and nothing is delivered
+        if spooldir is None and not self.environment.get_test_mode():
+            if self.environment.geteuid() == 0:
+                spooldir = SPOOLDIR
+            else:
+                spooldir = os.path.join(self.logpath, 'stonix-spool')
+        self.delivery = DeliveryQueue(spooldir, localize.MAILRELAYSERVER,
+                                      localize.STONIXERR, localize.STONIXDEVS,
+                                      'https://' + localize.REPORTSERVER +
+                                      '/stonix/results.php', self.debug)
+        self.delivering = False
+        # Reentrant so observers notified by log() may log themselves
+        self.loglock = threading.RLock()
         self.metadataopen = False
+        self.rootlogger = logging.getLogger('')
         self.__initializelogs()
         self.last_message_received = ""
         self.last_prio = LogPriority.ERROR
@@ -108,55 +143,39 @@ class LogDispatcher (Observable):
     def postreport(self):
         """postreport()
 
-        Sends the XML formatted stor report file to the server
-        responsible for gathering and processing them.
+        Hands the XML formatted stor report file to the delivery queue, which
+        sends it to the server responsible for gathering and processing them
+        in the background. The errors logged so far are spooled as a digest
+        mail at the same time.
 
         @author: dkennel
+        @change: 2015/10/18 dkennel upload through the DeliveryQueue instead
+        of probing the server and waiting for curl
         """
-        if self.environment.geteuid() != 0:
-            return
-        self.xmlreport.closeReport()
-        xmlreport = self.xmllog
-        resolvable = True
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((localize.REPORTSERVER, 80))
-            sock.close()
-        except (socket.gaierror, socket.timeout, socket.error):
-            resolvable = False
-        try:
-            if resolvable:
-                curlcommand = 'curl -k -s -G -F "file=@' + xmlreport + \
-                ';type=text/xml" https://' + localize.REPORTSERVER + \
-                '/stonix/results.php'
-                if self.debug:
-                    self.log(LogPriority.DEBUG,
-                             ['LogDispatcher.postreport',
-                              'Upload command: ' + curlcommand])
-                cmd = subprocess.Popen(curlcommand, shell=True, close_fds=True,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE)
-                uploadstatus = cmd.stdout.read()
-                uploadstatus = uploadstatus + cmd.stderr.read()
+        self.__startdelivery()
+        if self.environment.geteuid() == 0:
+            self.xmlreport.closeReport()
+            xmlreport = self.xmlreport.getUploadPath()
+            try:
                 if self.debug:
                     self.log(LogPriority.DEBUG,
                              ['LogDispatcher.postreport',
-                              'Upload status: ' + uploadstatus])
-            if self.debug and not resolvable:
-                self.log(LogPriority.DEBUG,
-                         ['LogDispatcher.postreport',
-                          'Could not resolve upload host'])
-            if not self.debug and os.path.exists(xmlreport):
-                os.remove(xmlreport)
+                              'Spooling report: ' + xmlreport])
+                self.delivery.spoolreport(xmlreport, self.debug)
+                if not self.debug:
+                    for report in [self.xmllog, self.xmllog + '.gz']:
+                        if os.path.exists(report):
+                            os.remove(report)
 
-        except (KeyboardInterrupt, SystemExit):
-            # User initiated exit
-            raise
+            except (KeyboardInterrupt, SystemExit):
+                # User initiated exit
+                raise
 
-        except Exception:
-            trace = traceback.format_exc()
-            self.log(LogPriority.ERROR,
-                     ['LogDispatcher.postreport', trace])
+            except Exception:
+                trace = traceback.format_exc()
+                self.log(LogPriority.ERROR,
+                         ['LogDispatcher.postreport', trace])
+        self.flusherrors()
 
     def log(self, priority, msg_data):
         """
@@ -179,98 +198,158 @@ class LogDispatcher (Observable):
         @return: void
         @author scmcleni
         @author: dkennel
+        @change: 2015/10/17 dkennel check the level before any formatting and
+        take the caller from the frame instead of inspect.stack
+        @change: 2015/10/18 dkennel serialize writers with loglock
         """
 
-        entry = self.format_message_data(msg_data)
+        level = LOGLEVELS.get(priority)
+        if level is None:
+            # Invalid log priority
+            return
+        # Check the level first so that dropped DEBUG and INFO messages cost
+        # no formatting and no caller lookup.
+        if level < logging.WARNING and \
+           not self.rootlogger.isEnabledFor(level):
+            return
 
-        self.last_message_received = entry
-        self.last_prio = priority
-        if isinstance(msg_data, list):
-            msg = str(msg_data[0]).strip() + ':' + str(msg_data[1]).strip()
-        else:
-            # msg = 'none' + ':' + msg_data.strip()
-            msg = msg_data.strip()
-        if self.debug:
-            #####
-            # Set up inspect to use stack variables to log file and
-            # method/function that is being called. Message to be in the
-            # format:
-            # DEBUG:<name_of_module>:<name of function>(<line number>): <message to print>
-            stack1 = inspect.stack()[1]
-            mod = inspect.getmodule(stack1[0])
-            if mod:
-                prefix = mod.__name__ + \
-                      ":" + stack1[3] + \
-                      "(" + str(stack1[2]) + "): "
-            else:
-                prefix = stack1[3] + \
-                      "(" + str(stack1[2]) + "): "
-        else:
-            stack1 = inspect.stack()[1]
-            mod = inspect.getmodule(stack1[0])
-            if mod:
-                prefix = mod.__name__ + \
-                      ":" + stack1[3] + ":"
+        # Rules log from several threads at once. The last message, the
+        # metadata flag and the dirty flag are shared, so each message is
+        # written and announced to the observers before the next one starts.
+        self.loglock.acquire()
+        try:
+            entry = self.format_message_data(msg_data)
+
+            self.last_message_received = entry
+            self.last_prio = priority
+            if isinstance(msg_data, list):
+                msg = str(msg_data[0]).strip() + ':' + \
+                    str(msg_data[1]).strip()
             else:
-                prefix = stack1[3] + ":"
-
-        if priority == LogPriority.INFO:
-            logging.info('INFO:' + prefix + msg)
-            # self.write_xml_log(priority, entry)
-        elif priority == LogPriority.WARNING:
-            logging.warning('WARNING:' + msg)
-            if self.metadataopen:
-                # self.writemetadataentry(entry)
-                self.xmlreport.writeMetadata(entry)
+                # msg = 'none' + ':' + msg_data.strip()
+                msg = msg_data.strip()
+            if priority != LogPriority.WARNING:
+                prefix = self.__callerprefix()
+
+            if priority == LogPriority.INFO:
+                logging.info('INFO:' + prefix + msg)
+                # self.write_xml_log(priority, entry)
+            elif priority == LogPriority.WARNING:
+                logging.warning('WARNING:' + msg)
+                if self.metadataopen:
+                    # self.writemetadataentry(entry)
+                    self.xmlreport.writeMetadata(entry)
+                else:
+                    # self.write_xml_log(entry)
+                    self.xmlreport.writeFinding(entry)
+            elif priority == LogPriority.ERROR:
+                logging.error('ERROR:' + prefix + msg)
+                # self.write_xml_log(priority, entry)
+                self.reporterr(msg, prefix)
+            elif priority == LogPriority.CRITICAL:
+                logging.critical('CRITICAL:' + prefix + msg)
+                # self.write_xml_log(priority, entry)
+                self.reporterr(msg, prefix)
+            elif priority == LogPriority.DEBUG:
+                logging.debug('DEBUG:' + prefix + msg)
+                # self.write_xml_log(priority, entry)
             else:
-                # self.write_xml_log(entry)
-                self.xmlreport.writeFinding(entry)
-        elif priority == LogPriority.ERROR:
-            logging.error('ERROR:' + prefix + msg)
-            # self.write_xml_log(priority, entry)
-            self.reporterr(msg, prefix)
-        elif priority == LogPriority.CRITICAL:
-            logging.critical('CRITICAL:' + prefix + msg)
-            # self.write_xml_log(priority, entry)
-            self.reporterr(msg, prefix)
-        elif priority == LogPriority.DEBUG:
-            logging.debug('DEBUG:' + prefix + msg)
-            # self.write_xml_log(priority, entry)
-        else:
-            # Invalid log priority
-            pass
+                # Invalid log priority
+                pass
 
-        self.set_dirty()
-        self.notify_check()
+            self.set_dirty()
+            self.notify_check()
+        finally:
+            self.loglock.release()
+
+    def __callerprefix(self):
+        """
+        Build the caller prefix for a log message from the frame that called
+        log(). Messages are formatted as
+        DEBUG:<name_of_module>:<name of function>(<line number>): <message>
+        in debug mode and as <name_of_module>:<name of function>: otherwise.
+        Only the frame objects are read, no source files are touched.
+
+        @return: string
+        @author: dkennel
+        """
+        try:
+            # 0 is this method, 1 is log, 2 is log's caller
+            frame = sys._getframe(2)
+        except ValueError:
+            return ''
+        modname = frame.f_globals.get('__name__')
+        funcname = frame.f_code.co_name
+        if self.debug:
+            prefix = funcname + "(" + str(frame.f_lineno) + "): "
+        else:
+            prefix = funcname + ":"
+        if modname:
+            prefix = modname + ":" + prefix
+        return prefix
 
     def reporterr(self, errmsg, prefix):
         """reporterr(errmsg)
 
-        reporterr sends error messages generated by STONIX to the unixeffort
-        email address. Requires an error message string.
+        reporterr queues error messages generated by STONIX for the
+        unixeffort email address. Requires an error message string. The
+        messages are sent as a single digest by flusherrors so logging an
+        error never waits on the mail relay.
 
         @param string: Error message
         @author: dkennel
+        @change: 2015/10/18 dkennel queue the error for the digest mail
         """
+        self.delivery.adderror(prefix, errmsg)
 
-        message = '''From: ''' + localize.STONIXERR + '''
-To: ''' + localize.STONIXDEVS + '''
-Subject: STONIX Error Report: ''' + prefix + '''
+    def flusherrors(self):
+        """
+        Spool the errors logged so far as one digest mail for the delivery
+        queue to send.
 
-'''
-        message = prefix + ' ' + message + 'Sent by: ' + \
-        self.environment.gethostname() + ' IP: ' \
-        + self.environment.getipaddress() + ' OS: ' + \
-        self.environment.getostype() + ': ' + \
-        str(self.environment.getosver()) + \
-        ' STONIX Ver: ' + str(self.environment.getstonixversion())
-        message = message + '\n' + errmsg
-        to = localize.STONIXDEVS + '\r\n'
-        frm = localize.STONIXERR + '\r\n'
-
-        server = smtplib.SMTP(localize.MAILRELAYSERVER)
-        server.sendmail(frm, to, message)
-        server.quit()
+        @author: dkennel
+        """
+        if not self.delivery.geterrorcount():
+            return
+        try:
+            sentby = self.environment.gethostname() + ' IP: ' + \
+            self.environment.getipaddress() + ' OS: ' + \
+            self.environment.getostype() + ': ' + \
+            str(self.environment.getosver()) + \
+            ' STONIX Ver: ' + str(self.environment.getstonixversion())
+            self.delivery.spooldigest(sentby)
+        except (KeyboardInterrupt, SystemExit):
+            # User initiated exit
+            raise
+        except Exception, err:
+            print 'logdispatcher: '
+            print traceback.format_exc()
+            print err
+
+    def __startdelivery(self):
+        """
+        Start delivering at the end of a run. Retries anything an earlier run
+        could not deliver and registers the spool flush with atexit. Only the
+        first call does anything.
+
+        @author: dkennel
+        """
+        if self.delivering:
+            return
+        self.delivering = True
+        if self.delivery.getspool():
+            self.delivery.wake()
+        atexit.register(self.__shutdown)
+
+    def __shutdown(self):
+        """
+        Registered with atexit. Spools any errors that are still queued and
+        gives the delivery queue a bounded amount of time to send the spool.
+
+        @author: dkennel
+        """
+        self.flusherrors()
+        self.delivery.close()
 
     def format_message_data(self, msg_data):
         """
@@ -319,10 +398,12 @@ Subject: STONIX Error Report: ''' + prefix + '''
 
         @author: dkennel
         '''
+        self.__startdelivery()
         try:
             self.xmlreport.closeReport()
         except Exception:
             pass
+        self.flusherrors()
 
     def displaylastrun(self):
         """
@@ -354,11 +435,17 @@ Subject: STONIX Error Report: ''' + prefix + '''
         is processed seperately due to timing issues in the controller's init
 
         @author: dkennel
+        @change: 2015/10/18 dkennel hold loglock so findings logged by rules
+        running at the same time are not written as metadata
         '''
-        self.metadataopen = True
-        self.log(LogPriority.WARNING,
-                 ['RuleCount', self.environment.getnumrules()])
-        self.metadataopen = False
+        self.loglock.acquire()
+        try:
+            self.metadataopen = True
+            self.log(LogPriority.WARNING,
+                     ['RuleCount', self.environment.getnumrules()])
+        finally:
+            self.metadataopen = False
+            self.loglock.release()
 
     def __initializelogs(self):
         """
@@ -432,11 +519,11 @@ Subject: STONIX Error Report: ''' + prefix + '''
 
         self.metadataopen = True
         self.log(LogPriority.WARNING,
-                 ["Hostname", self.environment.hostname])
+                 ["Hostname", self.environment.gethostname()])
         self.log(LogPriority.WARNING,
-                 ["IPAddress", self.environment.ipaddress])
+                 ["IPAddress", self.environment.getipaddress()])
         self.log(LogPriority.WARNING,
-                 ["MACAddress", self.environment.macaddress])
+                 ["MACAddress", self.environment.getmacaddr()])
         self.log(LogPriority.WARNING,
                  ["OS", str(self.environment.getosreportstring())])
         self.log(LogPriority.WARNING,
@@ -504,28 +591,93 @@ class LogPriority:
     CRITICAL = "CRITICAL"
 
 
+# The python logging level each LogPriority is emitted at
+LOGLEVELS = {LogPriority.DEBUG: logging.DEBUG,
+             LogPriority.INFO: logging.INFO,
+             LogPriority.WARNING: logging.WARNING,
+             LogPriority.ERROR: logging.ERROR,
+             LogPriority.CRITICAL: logging.CRITICAL}
+
+
+# Seconds between flushes of the streamed xml report
+FLUSHINTERVAL = 5
+
+
+def recoverreport(path):
+    '''
+    Close off an xml report that was left incomplete by an abnormal exit so
+    that it is a valid document again. A partly written entry at the end of
+    the file is dropped. Reports that are already complete are not touched.
+
+    @param path: string - fully qualified path to the report file
+    @return: Bool - True if the report was repaired
+    @author: dkennel
+    '''
+    handle = open(path, 'r+')
+    try:
+        started = False
+        section = None
+        last = ''
+        offset = 0
+        good = 0
+        for line in handle:
+            offset = offset + len(line)
+            if not line.endswith('\n'):
+                break
+            good = offset
+            last = line.strip()
+            if last == '<run>':
+                started = True
+            elif last in ('<metadata>', '<findings>'):
+                section = last[1:-1]
+            elif last in ('</metadata>', '</findings>'):
+                section = None
+        if not started or last == '</run>':
+            return False
+        handle.seek(good)
+        handle.truncate()
+        if section is not None:
+            handle.write('</' + section + '>\n')
+        handle.write('</run>\n')
+        return True
+    finally:
+        handle.close()
+
+
 class xmlReport:
     '''
-    Simple class to manage the STONIX XML report formatting.
+    Simple class to manage the STONIX XML report formatting. Entries are
+    written to the report file as they arrive, one per line, and the file is
+    flushed every FLUSHINTERVAL seconds. Entries are grouped in metadata and
+    findings sections and a new section is started whenever the kind of
+    entry changes, so a report may hold more than one of each.
 
     @author: dkennel
+    @change: 2015/10/18 dkennel stream the report to disk instead of keeping
+    an ElementTree
     '''
-    def __init__(self, path, debug=False):
+    def __init__(self, path, debug=False, compress=False):
         '''
         xmlReport.__init__(path): The xmlReport constructor. Requires a string
         version of the fully qualified path to the file where the XML version
-        of the report will be written.
+        of the report will be written. The file is created when the first
+        entry is written.
 
         @param path: string - fully qualified path to the report file
         @param debug: Bool - whether or not to run in debug mode
+        @param compress: Bool - also write a gzip copy of the report to
+            path.gz when it is closed
         @author: dkennel
         '''
         self.path = path
         self.debug = debug
-        self.root = ET.Element('run')
-        self.meta = ET.SubElement(self.root, 'metadata')
-        self.findings = ET.SubElement(self.root, 'findings')
+        self.compress = compress
+        self.handle = None
+        self.section = None
+        self.lastflush = 0
         self.closed = False
+        self.compressed = False
+        self.lock = threading.Lock()
 
     def __del__(self):
         """
@@ -549,7 +701,7 @@ class xmlReport:
         @param entry: Formatted version of the log data.
         @author: dkennel
         '''
-        ET.SubElement(self.meta, entry.Tag, val=entry.Detail)
+        self.__write('metadata', entry)
         if self.debug:
             print 'xmlReport.writeMetadata: Added entry ' + entry.Tag + \
             ' ' + entry.Detail
@@ -563,27 +715,109 @@ class xmlReport:
         @param entry: Formatted version of the log data.
         @author: dkennel
         '''
-        ET.SubElement(self.findings, entry.Tag, val=entry.Detail)
+        self.__write('findings', entry)
         if self.debug:
             print 'xmlReport.writeFinding: Added entry ' + entry.Tag + \
             ' ' + entry.Detail
 
+    def __write(self, section, entry):
+        '''
+        Private method to append an entry to the given section of the report
+        file.
+
+        @param section: string - metadata or findings
+        @param entry: Formatted version of the log data.
+        @author: dkennel
+        '''
+        line = ET.tostring(ET.Element(entry.Tag, val=entry.Detail))
+        self.lock.acquire()
+        try:
+            if self.closed:
+                return
+            self.__open()
+            if section != self.section:
+                if self.section is not None:
+                    self.handle.write('</' + self.section + '>\n')
+                self.handle.write('<' + section + '>\n')
+                self.section = section
+            self.handle.write(line + '\n')
+            now = time.time()
+            if now - self.lastflush >= FLUSHINTERVAL:
+                self.handle.flush()
+                self.lastflush = now
+        except (IOError, OSError), err:
+            if self.debug:
+                print 'logdispatcher.xmlReport: Error writing the report'
+                print err
+        finally:
+            self.lock.release()
+
+    def __open(self):
+        '''
+        Private method to create the report file if it has not been created
+        yet. Must be called with the lock held.
+
+        @author: dkennel
+        '''
+        if self.handle is None:
+            self.handle = open(self.path, 'w')
+            self.handle.write('<run>\n')
+
     def closeReport(self):
         '''
-        xmlReport.closeReport(): This method will write the xmlReport to disk.
+        xmlReport.closeReport(): This method will finish the report on disk
+        and write the gzip copy if one was requested.
 
         @author: dkennel
+        @change: 2015/10/18 dkennel close off the streamed report
         '''
+        self.lock.acquire()
         try:
             if not self.closed:
-                ET.ElementTree(self.root).write(self.path)
+                self.__open()
+                if self.section is not None:
+                    self.handle.write('</' + self.section + '>\n')
+                self.handle.write('</run>\n')
+                self.handle.close()
                 self.closed = True
+                if self.compress:
+                    self.__compress()
+                    self.compressed = True
             if self.debug:
-                print 'xmlReport.closeReport: dumping the ElementTree: '
-                ET.dump(self.root)
+                print 'xmlReport.closeReport: report written to ' + self.path
         except Exception, err:
             if self.debug:
                 print 'logdispatcher.xmlReport.closeReport: Error encountered processing xml'
                 print err
                 trace = traceback.format_exc()
                 print trace
+        finally:
+            self.lock.release()
+
+    def __compress(self):
+        '''
+        Private method to write a gzip copy of the closed report to path.gz.
+
+        @author: dkennel
+        '''
+        rhandle = open(self.path, 'rb')
+        try:
+            whandle = gzip.open(self.path + '.gz', 'wb')
+            try:
+                copyfileobj(rhandle, whandle)
+            finally:
+                whandle.close()
+        finally:
+            rhandle.close()
+
+    def getUploadPath(self):
+        '''
+        xmlReport.getUploadPath(): Return the path of the file that should be
+        sent to the report server, the gzip copy when one was written.
+
+        @return: string
+        @author: dkennel
+        '''
+        if self.compressed:
+            return self.path + '.gz'
+        return self.path
@@ -22,10 +22,32 @@
 ###############################################################################
 
 import re
+import threading
 import yum,aptGet,portage,zypper,freebsd,solaris
 import traceback
 from logdispatcher import LogPriority
 
+# The set of installed packages is shared by every Pkghelper in the run so
+# the package manager is only queried once. It is reset at the start of each
+# run and by install() and remove().
+INSTALLED = None
+INSTALLEDLOCK = threading.Lock()
+
+
+def resetcache():
+    '''Discard the shared installed package cache so the next check queries
+    the package manager again. The controller calls this at the start of
+    every run since the GUI keeps the module loaded between runs.
+
+    @author: dkennel'''
+    global INSTALLED
+    INSTALLEDLOCK.acquire()
+    try:
+        INSTALLED = None
+    finally:
+        INSTALLEDLOCK.release()
+
+
 class Pkghelper(object):
         
     '''
@@ -33,8 +55,15 @@ class Pkghelper(object):
      or check the status of software packages. Relies on platform specific 
      subclasses to do the heavy lifting.
 
+     check() answers from a cache of the installed packages that is loaded
+     with a single package manager query the first time it is needed.
+
     :version:
-    :author:Derek T Walker  July 2012'''
+    :author:Derek T Walker  July 2012
+    @change: 2015/10/09 dkennel added the installed package cache, checkMany
+    and installMany
+    @change: 2015/10/18 dkennel reset the cache even when install or remove
+    fails, installMany uses the backend's installpackages'''
     
     def __init__(self,logdispatcher, environment):
         self.enviro = environment
@@ -116,11 +145,14 @@ class Pkghelper(object):
         
         try:
             if self.enviro.geteuid() is 0:
-                if self.pckgr.installpackage(package):
+                try:
+                    installed = self.pckgr.installpackage(package)
+                finally:
+                    self.invalidateCache()
+                if installed:
                     return True
                 else:
                     return False
-                return False    
             else:
                 msg = "Not running as root, only root can use the pkghelper \
 install command"
@@ -141,7 +173,11 @@ install command"
         @author Derek T Walker July 2012'''
         try:
             if self.enviro.geteuid() == 0:
-                if self.pckgr.removepackage(package):
+                try:
+                    removed = self.pckgr.removepackage(package)
+                finally:
+                    self.invalidateCache()
+                if removed:
                     return True
                 else:
                     return False
@@ -164,8 +200,13 @@ remove command"
             is to be checked. Must be recognizable to the underlying package 
             manager.
         @return bool :
-        @author Derek T Walker July 2012'''
+        @author Derek T Walker July 2012
+        @change: 2015/10/09 dkennel answer from the installed package cache
+        when the package manager supports it'''
         try:
+            installed = self.getInstalled()
+            if installed is not None and not re.search(r"[*?\[]", package):
+                return package in installed
             if self.pckgr.checkInstall(package):
                 return True
             else:
@@ -176,6 +217,87 @@ remove command"
             info = traceback.format_exc()
             self.logger.log(LogPriority.ERROR,info)
             raise
+###############################################################################
+    def checkMany(self, packages):
+        '''Check the installation status of several packages at once.
+
+        @param list packages : names of the packages to check
+        @return dict : package name to bool, True if installed
+        @author: dkennel'''
+        results = {}
+        for package in packages:
+            results[package] = self.check(package)
+        return results
+###############################################################################
+    def installMany(self, packages):
+        '''Install several packages in a single package manager transaction.
+        Packages that are already installed are skipped. Backends without
+        installpackages are given the missing packages one at a time. Return
+        True if every package is installed afterwards.
+
+        @param list packages : names of the packages to be installed, must be
+            recognizable to the underlying package manager.
+        @return bool :
+        @author: dkennel'''
+        try:
+            if self.enviro.geteuid() != 0:
+                msg = "Not running as root, only root can use the pkghelper \
+install command"
+                raise Exception(msg)
+            status = self.checkMany(packages)
+            missing = [package for package in packages if not status[package]]
+            if not missing:
+                return True
+            try:
+                if hasattr(self.pckgr, "installpackages"):
+                    self.pckgr.installpackages(missing)
+                else:
+                    # This backend takes one package name at a time
+                    for package in missing:
+                        self.pckgr.installpackage(package)
+            finally:
+                self.invalidateCache()
+            status = self.checkMany(missing)
+            for package in missing:
+                if not status[package]:
+                    return False
+            return True
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            info = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR,info)
+            raise
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed packages, querying the package manager
+        only if the shared cache is empty. Return None if the package manager
+        does not support listing its packages.
+
+        @return set or None :
+        @author: dkennel'''
+        global INSTALLED
+        if not hasattr(self.pckgr, "getInstalled"):
+            return None
+        INSTALLEDLOCK.acquire()
+        try:
+            if INSTALLED is None:
+                INSTALLED = self.pckgr.getInstalled()
+                if INSTALLED is not None:
+                    self.logger.log(LogPriority.DEBUG,
+                                    ["Pkghelper.getInstalled",
+                                     "Loaded " + str(len(INSTALLED)) +
+                                     " installed package names"])
+            return INSTALLED
+        finally:
+            INSTALLEDLOCK.release()
+###############################################################################
+    def invalidateCache(self):
+        '''Discard the shared installed package cache so the next check
+        queries the package manager again.
+
+        @author: dkennel'''
+        resetcache()
 ###############################################################################
     def checkAvailable(self,package):
         try:
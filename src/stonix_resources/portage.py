@@ -21,6 +21,7 @@
 #                                                                             #
 ###############################################################################
 
+import os
 import re
 import traceback
 from subprocess import Popen,call,PIPE
@@ -68,6 +69,32 @@ class Portage(object):
         except Exception:
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
+###############################################################################
+    def installpackages(self, packages):
+        '''Install several packages with a single emerge. Return a bool
+        indicating success or failure.
+
+        @param list packages : Names of the packages to be installed, must be
+            recognizable to the underlying package manager.
+        @return bool :
+        @author: dkennel'''
+        try:
+            installed = False
+            names = " ".join(packages)
+            self.ch.executeCommand(self.install + names)
+            if self.ch.getReturnCode() == 0:
+                installed = True
+                self.detailedresults += names + " pkgs installed successfully\n"
+            else:
+                self.detailedresults += names + " pkgs not able to install\n"
+            self.logger.log(LogPriority.INFO, self.detailedresults)
+            return installed
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            self.detailedresults = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, self.detailedresults)
+            return False
 ###############################################################################
     def removepackage(self, package):
         '''Remove a package. Return a bool indicating success or failure.
@@ -124,6 +151,26 @@ class Portage(object):
         except Exception:
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed packages read from the portage
+        package database. Packages are listed as category/name-version,
+        category/name and name.
+
+        @return: set
+        @author: dkennel'''
+        installed = set()
+        for item in glob.glob('/var/db/pkg/*/*'):
+            category = os.path.basename(os.path.dirname(item))
+            fullname = os.path.basename(item)
+            match = re.match(r"(.*?)-(\d.*)$", fullname)
+            if match:
+                name = match.group(1)
+            else:
+                name = fullname
+            installed.update([category + "/" + fullname,
+                              category + "/" + name, name])
+        return installed
 ###############################################################################
     def checkAvailable(self,package):
         try:
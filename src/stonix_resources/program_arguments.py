@@ -99,6 +99,14 @@ class ProgramArguments(object):
                           default=False,
                           help="List all installed rules that stonix will run on this platform.")
 
+        self.parser.add_option("-j", "--jobs", action="store", type="int",
+                          dest="jobs", default=1, metavar="N",
+                          help="Number of rules to run at the same time during full system runs.")
+
+        self.parser.add_option("--prune-archive", action="store", type="int",
+                          dest="prune", default=0, metavar="N",
+                          help="Keep only the newest N archived versions of each file changed by stonix and remove the rest.")
+
         #####
         # The Self Update test will look to a development/test environment
         # to test Self Update rather than testing self update
@@ -123,6 +131,10 @@ class ProgramArguments(object):
             self.parser.error('The -p --printconfigsimple option may not be used with the fix, report, rollback, update or GUI options')
         if self.opts.list and (self.opts.fix or self.opts.report or self.opts.rollback or self.opts.pcf or self.opts.update):
             self.parser.error('The -l --list option may not be used with the fix, report, rollback, update or GUI options')
+        if self.opts.jobs < 1:
+            self.parser.error('The -j --jobs option requires a number greater than zero')
+        if self.opts.prune < 0:
+            self.parser.error('The --prune-archive option requires a number of zero or greater, 0 disables pruning')
 
         if self.opts.debug:
             print "Selected options: "
@@ -264,3 +276,20 @@ class ProgramArguments(object):
         @author: D. Kennel
         """
         return self.opts.list
+
+    def getJobs(self):
+        """
+        Return the maximum number of rules that may be run at the same time.
+
+        @author: D. Kennel
+        """
+        return self.opts.jobs
+
+    def getPruneArchive(self):
+        """
+        Return the number of archived file versions to keep when the CLI has
+        requested pruning of the archive, 0 otherwise.
+
+        @author: D. Kennel
+        """
+        return self.opts.prune
@@ -0,0 +1,70 @@
+'''
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+Single rpm query for the installed package list, shared by the package
+manager backends for rpm based systems (yum and zypper).
+
+@author: dkennel
+@change: 2015/10/18 dkennel original implementation
+'''
+import traceback
+from logdispatcher import LogPriority
+
+RPMQUERYALL = ["/bin/rpm", "-qa", "--qf",
+               "%{NAME} %{VERSION} %{RELEASE} %{ARCH}\\n"]
+
+
+def getinstalled(ch, logger):
+    '''
+    Return the set of installed packages using a single rpm query. Each
+    package is listed under every form rpm -q accepts: name, name.arch,
+    name-version, name-version-release and name-version-release.arch.
+    Return None if rpm could not be queried.
+
+    @param ch: CommandHelper instance to run rpm with
+    @param logger: LogDispatcher instance
+    @return: set or None
+    @author: dkennel
+    '''
+    try:
+        ch.executeCommand(RPMQUERYALL)
+        if ch.getReturnCode() != 0:
+            return None
+        installed = set()
+        for line in ch.getOutput():
+            fields = line.split()
+            if len(fields) != 4:
+                continue
+            name, version, release, arch = fields
+            installed.update([name, name + "." + arch,
+                              name + "-" + version,
+                              name + "-" + version + "-" + release,
+                              name + "-" + version + "-" + release + "." +
+                              arch])
+        return installed
+    except(KeyboardInterrupt, SystemExit):
+        raise
+    except Exception:
+        logger.log(LogPriority.ERROR, traceback.format_exc())
+        return None
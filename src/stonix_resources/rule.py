@@ -46,6 +46,7 @@ from logdispatcher import LogPriority
 from types import *
 import os
 import re
+import threading
 from distutils.version import LooseVersion
 
 from stonixutilityfunctions import isServerVersionHigher
@@ -55,9 +56,229 @@ from localize import DRREPORTCOMPIANT, DRREPORTNOTCOMPIANT, DRREPORTNOTAVAILABLE
 from localize import DRFIXSUCCESSFUL, DRFIXFAILED, DRFIXNOTAVAILABLE
 from localize import DRUNDOSUCCESSFUL, DRUNDOFAILED, DRUNDONOTAVAILABLE
 from CommandHelper import CommandHelper
+from HelperRegistry import getregistry
 import traceback
 
 
+# Compiled applicability specs keyed by speckey(), see compileapplicable
+COMPILED = {}
+COMPILEDLOCK = threading.Lock()
+
+
+def getplatform(environ):
+    """
+    Return the (os family, os type, os version) tuple that applicability is
+    evaluated against. Callers checking many rules can read it once and pass
+    it to checkapplicable.
+
+    @param environ: Environment instance
+    @return: tuple of strings
+    @author: dkennel
+    """
+    return (environ.getosfamily(), environ.getostype(), environ.getosver())
+
+
+def speckey(applicable):
+    """
+    Return a hashable key for an applicable dictionary. Equal dictionaries
+    give equal keys no matter how they were built.
+
+    @param applicable: dict - a rule's applicable property
+    @return: tuple
+    @author: dkennel
+    """
+    key = []
+    for name in sorted(applicable):
+        value = applicable[name]
+        if isinstance(value, dict):
+            items = []
+            for ostype in sorted(value):
+                items.append((ostype, tuple(value[ostype])))
+            value = tuple(items)
+        elif isinstance(value, list):
+            value = tuple(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+def compileapplicable(applicable):
+    """
+    Return the CompiledApplicable for an applicable dictionary. Specs are
+    compiled once and shared by every rule that uses the same spec.
+
+    @param applicable: dict - a rule's applicable property
+    @return: CompiledApplicable instance
+    @author: dkennel
+    """
+    key = speckey(applicable)
+    COMPILEDLOCK.acquire()
+    try:
+        compiled = COMPILED.get(key)
+        if compiled is None:
+            compiled = CompiledApplicable(applicable)
+            COMPILED[key] = compiled
+        return compiled
+    finally:
+        COMPILEDLOCK.release()
+
+
+def checkapplicable(applicable, environ, logdispatch, rulename='',
+                    platform=None):
+    """
+    Evaluate an applicable dictionary, in the format described in
+    Rule.isapplicable, against the platform described by environ. This is the
+    implementation behind Rule.isapplicable and is kept at module level so
+    that the rule manifest can answer applicability without importing or
+    instantiating the rule.
+
+    @param applicable: dict - the rule's applicable property
+    @param environ: Environment instance
+    @param logdispatch: LogDispatcher instance
+    @param rulename: string - rule name used in debug messages
+    @param platform: tuple - result of getplatform(environ), read from
+        environ when not given
+    @return: bool
+    @author: D. Kennel
+    @change: 2015/10/14 dkennel moved out of Rule.isapplicable
+    @change: 2015/10/18 dkennel evaluate through a compiled and memoized
+    CompiledApplicable
+    """
+    if platform is None:
+        platform = getplatform(environ)
+    applies = compileapplicable(applicable).evaluate(platform)
+    logdispatch.log(LogPriority.DEBUG,
+                    ['Applicability', str(rulename) + ' applies: ' +
+                     str(applies)])
+    return applies
+
+
+class CompiledApplicable(object):
+    """
+    An applicable dictionary compiled for repeated evaluation. The os type
+    patterns and the version bounds are compiled once and the result is
+    remembered for every platform it has been evaluated against. The
+    applicable dictionary itself is never modified.
+
+    @author: dkennel
+    """
+
+    def __init__(self, applicable):
+        """
+        Compile an applicable dictionary. Errors in the os entries are only
+        raised when the entry's os type matches the platform, as they always
+        have been.
+
+        @param applicable: dict - a rule's applicable property
+        @author: dkennel
+        """
+        self.default = False
+        self.results = {}
+        if 'os' not in applicable and 'family' not in applicable and \
+           applicable.get('default') == 'default':
+            # Shortcut if we are defaulting to true
+            self.default = True
+            return
+        # Determine whether we are a blacklist or a whitelist, default to a
+        # blacklist
+        self.listtype = applicable.get('type', 'black')
+        assert self.listtype in ['white', 'black'], \
+            'Invalid list type specified: %r' % self.listtype
+        self.family = applicable.get('family')
+        self.oslist = []
+        if 'os' in applicable:
+            for ostype, osverlist in applicable['os'].iteritems():
+                self.oslist.append((re.compile(ostype),
+                                    self.compileversions(osverlist)))
+
+    def compileversions(self, osverlist):
+        """
+        Compile the version list of an os entry into a tuple of the kind of
+        match, +, -, r or =, and the versions to compare with. An invalid
+        list compiles to an error kind holding the exception to raise.
+
+        @param osverlist: list - version list of an os entry
+        @return: tuple
+        @author: dkennel
+        """
+        # Process version and up
+        if '+' in osverlist or '-' in osverlist:
+            if '+' in osverlist:
+                kind = '+'
+            else:
+                kind = '-'
+            if len(osverlist) != 2:
+                return ('error', AssertionError('Wrong number of entries ' +
+                                                'for a ' + kind))
+            if osverlist[1] == kind:
+                return (kind, LooseVersion(osverlist[0]))
+            return (kind, LooseVersion(osverlist[1]))
+        # Process inclusive range
+        elif 'r' in osverlist:
+            if len(osverlist) != 3:
+                return ('error', AssertionError('Wrong number of entries ' +
+                                                'for a range'))
+            versions = [LooseVersion(version) for version in osverlist
+                        if version != 'r']
+            if versions[0] == versions[1]:
+                return ('error', ValueError('Range versions are the same'))
+            return ('r', min(versions), max(versions))
+        # Process explicit match
+        return ('=', list(osverlist))
+
+    def evaluate(self, platform):
+        """
+        Return whether the spec applies to the platform.
+
+        @param platform: tuple - (os family, os type, os version) as returned
+            by getplatform
+        @return: bool
+        @author: dkennel
+        """
+        if self.default:
+            return True
+        applies = self.results.get(platform)
+        if applies is None:
+            applies = self.match(platform)
+            if self.listtype == 'black':
+                applies = not applies
+            self.results[platform] = applies
+        return applies
+
+    def match(self, platform):
+        """
+        Return True if the family or one of the os entries matches the
+        platform.
+
+        @param platform: tuple - (os family, os type, os version)
+        @return: bool
+        @author: dkennel
+        """
+        myosfamily, myostype, myosversion = platform
+        matched = False
+        if self.family is not None and myosfamily in self.family:
+            matched = True
+        myversion = None
+        for pattern, versions in self.oslist:
+            if not pattern.search(myostype):
+                continue
+            kind = versions[0]
+            if kind == 'error':
+                raise versions[1]
+            if kind == '=':
+                if myosversion in versions[1]:
+                    matched = True
+                continue
+            if myversion is None:
+                myversion = LooseVersion(myosversion)
+            if kind == '+' and myversion >= versions[1]:
+                matched = True
+            elif kind == '-' and myversion <= versions[1]:
+                matched = True
+            elif kind == 'r' and versions[1] <= myversion <= versions[2]:
+                matched = True
+        return matched
+
+
 class Rule (Observable):
 
     """
@@ -95,6 +316,7 @@ LANL-stonix."""
         self.currstate = "notconfigured"
         self.targetstate = "configured"
         self.guidance = []
+        self.resources = []
 
     def fix(self):
         """
@@ -133,6 +355,8 @@ LANL-stonix."""
         self.rulesuccess will be updated if the rule does not succeed.
 
         @author D. Kennel & D. Walker
+        @change: 2015/10/18 dkennel replay the events newest first, a conf
+        event that can not be reverted fails the undo
         """
         # pass
         if not self.environ.geteuid() == 0:
@@ -149,7 +373,9 @@ LANL-stonix."""
                 self.formatDetailedResults("undo", None, self.detailedresults)
                 self.logdispatch.log(LogPriority.INFO, self.detailedresults)
                 return undosuccessful
-            for entry in eventlist:
+            # Events are undone newest first so each one finds the system
+            # in the state it left it in.
+            for entry in reversed(eventlist):
                 try:
                     event = self.statechglogger.getchgevent(entry)
                     if event["eventtype"] == "perm":
@@ -158,7 +384,13 @@ LANL-stonix."""
                         os.chown(event["filepath"], perms[0], perms[1])
                         
                     elif event["eventtype"] == "conf":
-                        self.statechglogger.revertfilechanges(event["filepath"], entry)
+                        filepath = event["filepath"]
+                        if not self.statechglogger.revertfilechanges(filepath,
+                                                                     entry):
+                            undosuccessful = False
+                            self.detailedresults = self.detailedresults + \
+                                "Unable to revert the changes to " + \
+                                filepath + "\n"
                         
                     elif event["eventtype"] == "comm":
                         ch = CommandHelper(self.logger)
@@ -385,114 +617,8 @@ to undo\n"
         @author D. Kennel
         @change: 2015/04/13 added this method to template class
         """
-        # return True
-        # Shortcut if we are defaulting to true
-        self.logdispatch.log(LogPriority.DEBUG,
-                             'Check applicability for ' + self.rulename)
-        self.logdispatch.log(LogPriority.DEBUG,
-                             'Dictionary is: ' + str(self.applicable))
-        try:
-            if 'os' not in self.applicable and 'family' not in self.applicable:
-                amidefault = self.applicable['default']
-                if amidefault == 'default':
-                    self.logdispatch.log(LogPriority.DEBUG,
-                                         'Defaulting to True')
-                    return True
-        except KeyError:
-            pass
-
-        # Determine whether we are a blacklist or a whitelist, default to a
-        # blacklist
-        if 'type' in self.applicable:
-            listtype = self.applicable['type']
-        else:
-            listtype = 'black'
-        # Set the default return as appropriate to the list type
-        # FIXME check for valid input
-        assert listtype in ['white', 'black'], 'Invalid list type specified: %r' % listtype
-        if listtype == 'black':
-            applies = True
-        else:
-            applies = False
-
-        # get our data in local vars
-        myosfamily = self.environ.getosfamily()
-        myosversion = self.environ.getosver()
-        myostype = self.environ.getostype()
-
-        # Process the os family list
-        if 'family' in self.applicable:
-            if myosfamily in self.applicable['family']:
-                if listtype == 'black':
-                    applies = False
-                else:
-                    applies = True
-                self.logdispatch.log(LogPriority.DEBUG,
-                                     'Family match, applies: ' + str(applies))
-
-        # Process the OS list
-        if 'os' in self.applicable:
-            for ostype, osverlist in self.applicable['os'].iteritems():
-                if re.search(ostype, myostype):
-                    # Process version and up
-                    if '+' in osverlist:
-                        assert len(osverlist) is 2, "Wrong number of entries for a +"
-                        if osverlist[1] == '+':
-                            baseversion = osverlist[0]
-                        else:
-                            baseversion = osverlist[1]
-                        if LooseVersion(myosversion) >= LooseVersion(baseversion):
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Plus match, applies: ' + str(applies))
-                    # Process version and lower
-                    elif '-' in osverlist:
-                        assert len(osverlist) is 2, "Wrong number of entries for a -"
-                        if osverlist[1] == '-':
-                            baseversion = osverlist[0]
-                        else:
-                            baseversion = osverlist[1]
-                        if LooseVersion(myosversion) <= LooseVersion(baseversion):
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Minus match, applies: ' + str(applies))
-                    # Process inclusive range
-                    elif 'r' in osverlist:
-                        assert len(osverlist) is 3, "Wrong number of entries for a range"
-                        vertmp = osverlist
-                        vertmp.remove('r')
-                        if LooseVersion(vertmp[0]) > LooseVersion(vertmp[1]):
-                            highver = vertmp[0]
-                            lowver = vertmp[1]
-                        elif LooseVersion(vertmp[0]) < LooseVersion(vertmp[1]):
-                            highver = vertmp[1]
-                            lowver = vertmp[0]
-                        else:
-                            raise ValueError('Range versions are the same')
-                        if LooseVersion(myosversion) <= LooseVersion(highver) \
-                        and LooseVersion(myosversion) >= LooseVersion(lowver):
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Range match, applies: ' + str(applies))
-                    # Process explicit match
-                    else:
-                        if myosversion in osverlist:
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Version match, applies: ' + str(applies))
-        return applies
+        return checkapplicable(self.applicable, self.environ,
+                               self.logdispatch, self.rulename)
 
     def addresses(self):
         """
@@ -504,6 +630,53 @@ to undo\n"
         """
         return self.guidance
 
+    def getresources(self):
+        """
+        This method returns the list of resources the rule inspects or
+        changes. Entries are absolute file paths, 'service:<name>' for
+        services and 'pkgdb' for the package database. The RuleScheduler
+        will never run two rules that share a resource at the same time. An
+        empty list means the rule has not declared its resources and will
+        always be run on its own.
+
+        @return: list
+        @author: D. Kennel
+        """
+        return self.resources
+
+    def getpkghelper(self):
+        """
+        Return the Pkghelper shared by all rules in this run. Rules should
+        use this rather than constructing their own Pkghelper.
+
+        @return: Pkghelper, wrapped in a HelperRegistry.SharedHelper
+        @author: D. Kennel
+        @change: 2015/10/18 dkennel original implementation
+        """
+        return getregistry(self.logdispatch, self.environ).getpkghelper()
+
+    def getservicehelper(self):
+        """
+        Return the ServiceHelper shared by all rules in this run. Rules
+        should use this rather than constructing their own ServiceHelper.
+
+        @return: ServiceHelper, wrapped in a HelperRegistry.SharedHelper
+        @author: D. Kennel
+        @change: 2015/10/18 dkennel original implementation
+        """
+        return getregistry(self.logdispatch, self.environ).getservicehelper()
+
+    def getsysctl(self):
+        """
+        Return the Sysctl shared by all rules in this run, used to audit and
+        set live kernel parameters.
+
+        @return: Sysctl, wrapped in a HelperRegistry.SharedHelper
+        @author: D. Kennel
+        @change: 2015/10/18 dkennel original implementation
+        """
+        return getregistry(self.logdispatch, self.environ).getsysctl()
+
     def getcurrstate(self):
         """
         This method returns the current state. This information is only valid
@@ -88,6 +88,7 @@ shells set the value of this to False, or No.'''
                            'os': {'Mac OS X': ['10.9', 'r', '10.10.10']}}
         self.ci = self.initCi(datatype, key, instructions,
                                                default)
+        self.resources = ['/etc/passwd']
         self.guidance = ['CIS', 'NSA(2.3.1.4)', 'cce-3987-5', '4525-2',
                          '4657-3', '4661-5', '4807-4', '4701-9', '4669-8',
                          '4436-2', '4815-7', '4696-1', '4216-8', '4758-9',
@@ -73,6 +73,9 @@ class BootloaderPerms(Rule):
         self.helptext = 'This rule will verify the permissions on the boot \
         loader config file to be root:root and 600'
         self.rootrequired = True
+        self.resources = ['/boot/grub/grub.conf', '/boot/grub/grub.cfg',
+                          '/boot/grub/menu.lst', '/boot/grub2/grub.cfg',
+                          '/boot/efi/EFI/redhat/grub.cfg', '/etc/grub.conf']
         self.guidance = ['NSA(2.3.5.2)', 'cce-4144-2', '3923-0, 4197-0']
 
         # init CIs
@@ -29,6 +29,7 @@ on a system must have unique UIDs.
 @change: 02/12/2014 ekkehard Implemented isapplicable
 @change: 08/05/2014 ekkehard added duplicate uid & gid check for OS X
 @change: 2015/04/14 dkennel updated to use new style isApplicable
+@change: 2015/10/18 dkennel nixcheck takes the duplicates from the AccountDB
 '''
 from __future__ import absolute_import
 import os
@@ -39,6 +40,7 @@ import traceback
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..CommandHelper import CommandHelper
+from ..AccountDB import getaccountdb
 
 
 class CheckDuplicateIds(Rule):
@@ -66,6 +68,7 @@ class CheckDuplicateIds(Rule):
         "only rule that will examine local account databases for accounts " + \
         "that have duplicate UID values. All accounts must be unique for " + \
         "accountability purposes."
+        self.resources = ['/etc/passwd', '/etc/group']
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd'],
                            'os': {'Mac OS X': ['10.9', 'r', '10.10.10']}}
@@ -185,47 +188,23 @@ class CheckDuplicateIds(Rule):
         """
         try:
             retval = True
-            filelist = ['/etc/passwd', '/etc/group']
+            accounts = getaccountdb()
+            filelist = [accounts.passwd, accounts.group]
             for adb in filelist:
                 if os.path.exists(adb):
                     self.logger.log(LogPriority.DEBUG,
                                     ['CheckDuplicateIds.nixcheck',
                                      "Checking : " + adb])
-                    namelist = []
-                    idlist = []
-                    fdata = open(adb, 'r')
-                    for line in fdata:
-                        line = line.split(':')
-                        try:
-                            if len(line) > 2:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['CheckDuplicateIds.nixcheck',
-                                                 "Checking line: " + str(line)])
-                                name = line[0]
-                                uid = line[2]
-                                self.logger.log(LogPriority.DEBUG,
-                                                "Checking account: " + name + ' ' + uid)
-                                if name not in namelist:
-                                    namelist.append(name)
-                                else:
-                                    issue = "Duplicate Name: NAME('" + name + "'; UID('" + uid + "')"
-                                    self.issuelist.append(issue)
-                                    retval = False
-                                if uid not in idlist:
-                                    idlist.append(uid)
-                                else:
-                                    issue = "Duplicate UID: NAME('" + name + "'; UID('" + uid + "')"
-                                    self.issuelist.append(issue)
-                        except(IndexError):
-                            # Some systems have malformed lines in the
-                            # accounts db due to poor administration
-                            # practices. Go to the next record.
-                            continue
-                    self.logger.log(LogPriority.DEBUG,
-                                    "NAMELIST: " + str(namelist))
-                    self.logger.log(LogPriority.DEBUG,
-                                    "IDLIST: " + str(idlist))
-                    fdata.close()
+                    for kind, entry in accounts.getduplicates(adb):
+                        name = entry[0]
+                        uid = entry[2]
+                        if kind == 'name':
+                            issue = "Duplicate Name: NAME('" + name + "'; UID('" + uid + "')"
+                            self.issuelist.append(issue)
+                            retval = False
+                        else:
+                            issue = "Duplicate UID: NAME('" + name + "'; UID('" + uid + "')"
+                            self.issuelist.append(issue)
             return retval
 
         except (KeyboardInterrupt, SystemExit):
@@ -63,6 +63,7 @@ not change system settings. Best *NIX partitioning practices recommend that the
 following areas of the filesystem, if present, be placed on their own
 partitions: /home, /tmp, ,/var, /var/tmp, /var/log, /var/log/audit.'''
         self.rootrequired = False
+        self.resources = ['/etc/fstab', '/etc/vfstab']
         self.guidance = ['CCE 14161-4', 'CCE 14777-7', 'CCE 14011-1',
                          'CCE 14171-3', 'CCE 14559-9']
         self.applicable = {'family': ['darwin']}
@@ -34,6 +34,7 @@ This rule is optional and will install and configure AIDE when it is run.
     be modifying rule as well
 CI was not referenced in the fix and report method.
 @change: 2015/04/14 dkennel updated to use new is applicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -44,7 +45,6 @@ import traceback
 from ..rule import Rule
 from ..stonixutilityfunctions import readFile, writeFile, iterate, resetsecon
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
 
 
@@ -101,7 +101,7 @@ class ConfigureAIDE(Rule):
         '''
 
         try:
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             self.ch = CommandHelper(self.logger)
             compliant = True
             self.detailedresults = ""
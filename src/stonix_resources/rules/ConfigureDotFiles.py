@@ -37,6 +37,7 @@ permission.
 checked in fix method.
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel take the home directories from the AccountDB
 '''
 
 from __future__ import absolute_import
@@ -47,6 +48,7 @@ from ..rule import Rule
 from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import isWritable
+from ..AccountDB import getaccountdb
 
 
 class ConfigureDotFiles(Rule):
@@ -109,24 +111,16 @@ permission.'''
 
         try:
             self.detailedresults = ""
-            f = open('/etc/passwd', 'r')
-            contentlines = f.readlines()
-            f.close()
-
             try:
 
-                for line in contentlines:
-                    line = line.split(':')
-                    if len(line) > 5:
-                        line[2] = int(line[2])
-                        if line[2] >= 500 and not re.search('nfsnobody',
-                                                            line[0]):
-                            if os.path.exists(line[5]):
-                                filelist = os.listdir(line[5])
-                                for i in range(len(filelist)):
-                                    if re.search('^\.', filelist[i]):
-                                        dotfilelist.append(line[5] + "/" + \
-                                                           filelist[i])
+                for name, uid, home in getaccountdb().gethomedirs(500):
+                    if not re.search('nfsnobody', name):
+                        if os.path.exists(home):
+                            filelist = os.listdir(home)
+                            for i in range(len(filelist)):
+                                if re.search('^\.', filelist[i]):
+                                    dotfilelist.append(home + "/" + \
+                                                       filelist[i])
 
             except (KeyError, IndexError):
                 self.logger.log(LogPriority.DEBUG, traceback.format_exc())
@@ -170,36 +164,27 @@ permission.'''
         if self.ConfigureDotFiles.getcurrvalue():
             try:
                 self.detailedresults = ""
-                f = open('/etc/passwd', 'r')
-                contentlines = f.readlines()
-                f.close()
-
-                for line in contentlines:
-
-                    line = line.split(':')
-
-                    if line[5]:
+                for name, uid, home in getaccountdb().gethomedirs(500):
 
-                        line[2] = int(line[2])
-                        if line[2] >= 500 and not re.search('nfsnobody', line[0]):
+                    if home and not re.search('nfsnobody', name):
 
-                            if os.path.exists(line[5]):
+                        if os.path.exists(home):
 
-                                filelist = os.listdir(line[5])
-                                for i in range(len(filelist)):
-                                    if re.search('^\.', filelist[i]):
-                                        dotfilelist.append(line[5] + "/" + filelist[i])
+                            filelist = os.listdir(home)
+                            for i in range(len(filelist)):
+                                if re.search('^\.', filelist[i]):
+                                    dotfilelist.append(home + "/" + filelist[i])
 
-                                if os.getuid() in [line[2], 0]:
+                            if os.getuid() in [uid, 0]:
 
-                                    for item in dotfilelist:
-                                        if os.path.isfile(item):
+                                for item in dotfilelist:
+                                    if os.path.isfile(item):
 
-                                            os.system('chmod o-w ' + item)
+                                        os.system('chmod o-w ' + item)
 
-                                else:
-                                    dotfilelist = []
+                            else:
                                 dotfilelist = []
+                            dotfilelist = []
 
             except (IndexError):
                 self.detailedresults = traceback.format_exc()
@@ -29,6 +29,7 @@ dictionary
 @change: 2014/06/17 dkennel - Fixed traceback on Debian
 @change: 2014/07/14 ekkehard - Fixed report to self.fh.evaluateFiles()
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 import os
@@ -38,7 +39,6 @@ from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
 from ..filehelper import FileHelper
 from ..CommandHelper import CommandHelper
-from ..ServiceHelper import ServiceHelper
 from ..localize import KERB5
 
 
@@ -129,7 +129,7 @@ class ConfigureKerberos(RuleKVEditor):
                            "eventid": str(self.rulenumber).zfill(4) + \
                            "kerb5"}}
         self.ch = CommandHelper(self.logdispatch)
-        self.sh = ServiceHelper(self.environ, self.logdispatch)
+        self.sh = self.getservicehelper()
         self.fh = FileHelper(self.logdispatch, self.statechglogger)
         self.filepathToConfigure = []
         for filelabel, fileinfo in sorted(self.files.items()):
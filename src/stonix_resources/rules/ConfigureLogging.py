@@ -31,15 +31,14 @@ Created on May 20, 2013
 @change: 04/18/2014 dkennel updated to use new CI class
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, resetsecon, createFile
 from ..stonixutilityfunctions import readFile, writeFile, checkPerms, setPerms
 from ..rule import Rule
-from ..pkghelper import Pkghelper
 from ..logdispatcher import LogPriority
-from ..ServiceHelper import ServiceHelper
 from ..CommandHelper import CommandHelper
 from ..localize import LOGSVR, LOGROTATE
 from subprocess import PIPE, Popen
@@ -91,7 +90,7 @@ class ConfigureLogging(Rule):
         self.logd = ""
         self.iditerator = 0
         self.daemon = ""
-        self.sh = ServiceHelper(self.environ, self.logger)
+        self.sh = self.getservicehelper()
         self.ch = CommandHelper(self.logger)
         self.logs = {"rsyslog": False,
                      "syslog": False}
@@ -136,10 +135,10 @@ class ConfigureLogging(Rule):
             self.missinglogrot = []
             self.config = []
             if self.environ.getosfamily() == "linux":
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 self.compliant = self.reportSysRSyslog()
             elif self.environ.getosfamily() == "solaris":
-                self.helper = Pkghelper(self.logger, self.environ)
+                self.helper = self.getpkghelper()
                 if self.path:
                     self.compliant = self.reportSol(self.path[0], self.path[1])
                 else:
@@ -29,13 +29,13 @@ dictionary
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2014/10/20 ekkehard Artifact artf34318 : ConfigureNetworks(122)
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 import traceback
 import re
 from ..ruleKVEditor import RuleKVEditor
 from ..CommandHelper import CommandHelper
-from ..ServiceHelper import ServiceHelper
 from ..logdispatcher import LogPriority
 
 
@@ -74,7 +74,7 @@ class ConfigureNetworks(RuleKVEditor):
         self.nsInitialized = False
         self.nsc = "/usr/sbin/networksetup"
         self.ch = CommandHelper(self.logdispatch)
-        self.sh = ServiceHelper(self.environ, self.logdispatch)
+        self.sh = self.getservicehelper()
         self.addKVEditor("DisableBluetoothUserInterface",
                          "defaults",
                          "/Library/Preferences/com.apple.Bluetooth",
@@ -31,13 +31,13 @@ Created on Jul 11, 2013
 @change: 2014-07-29 ekkehard refix OS X Mavericks issues
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/14 dkennel update for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, checkPerms, setPerms
 from ..stonixutilityfunctions import writeFile, readFile, resetsecon, getUserGroupName
 from ..ruleKVEditor import RuleKVEditor
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from subprocess import PIPE, Popen
 from ..KVEditorStonix import KVEditorStonix
 from ..CommandHelper import CommandHelper
@@ -183,7 +183,7 @@ class ConfigureScreenLocking(RuleKVEditor):
             if self.environ.getosfamily() == "darwin":
                 self.compliant = self.reportMac()
             else:
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 if not self.reportGnome():
                     compliant = False
                 if not self.reportKde():
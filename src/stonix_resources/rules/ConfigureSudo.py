@@ -28,13 +28,13 @@ Created on Mar 7, 2013
 @change: 02/14/2014 ekkehard Implemented isapplicable
 @change: 04/18/2014 dkennel Updated to use new style CI
 @change: 2015/04/14 dkennel upddated to use new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import setPerms, checkPerms, readFile
 from ..stonixutilityfunctions import writeFile, resetsecon
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 import traceback
 import os
 import re
@@ -92,12 +92,12 @@ CONFIGURESUDO to False.'''
             compliant = True
             self.detailedresults = ""
             if self.environ.getosfamily() == "linux":
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 self.path = "/etc/sudoers"
             elif self.environ.getostype() == "Mac OS X":
                 self.path = "/private/etc/sudoers"
             elif self.environ.getosfamily() == "freebsd":
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 self.path = "/usr/local/etc/sudoers"
             groupname = "%" + self.ci.getcurrvalue()
             if os.path.exists(self.path):
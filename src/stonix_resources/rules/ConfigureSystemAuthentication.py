@@ -27,6 +27,7 @@ Created on Sep 11, 2013
 @change: 2014/04/18 dkennel Implemented new style CI in place of old style.
 @change: 2014/12/15 dkennel replaced print statement with logger debug call.
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 
@@ -36,7 +37,6 @@ from subprocess import call
 import traceback
 from ..KVEditorStonix import KVEditorStonix
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..rule import Rule
 from ..stonixutilityfunctions import iterate, setPerms, checkPerms, readFile, \
     writeFile, resetsecon, createFile
@@ -148,7 +148,7 @@ has been run and is not compliant"
         debug = ""
         compliant = True
         self.editor1, self.editor2 = "", ""
-        self.ph = Pkghelper(self.logger, self.environ)
+        self.ph = self.getpkghelper()
         if self.ph.manager == "apt-get":
             self.pam = "/etc/pam.d/common-password"
             self.pam2 = "/etc/pam.d/common-auth"
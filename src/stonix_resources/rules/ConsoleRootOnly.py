@@ -31,6 +31,7 @@ This class will restrict access to the root log on to console only
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2014/12/15 dkennel Replaced print statements with logger debug calls
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -40,7 +41,6 @@ from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import setPerms, resetsecon
 from ..stonixutilityfunctions import readFile, writeFile, checkPerms, iterate
 from ..KVEditorStonix import KVEditorStonix
-from ..pkghelper import Pkghelper
 import os
 import traceback
 import re
@@ -66,6 +66,7 @@ class ConsoleRootOnly(Rule):
         self.helptext = "This class will restrict access to the root log " + \
         "on to console only"
         self.formatDetailedResults("initialize")
+        self.resources = ['/etc/securetty', '/etc/ssh/sshd_config', 'pkgdb']
         self.guidance = ['CIS, NSA(2.3.1.1), cce3820-8, 3485-0, 4111-1']
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd']}
@@ -110,7 +111,7 @@ class ConsoleRootOnly(Rule):
                 self.securetty = '/etc/securetty'
 
                 if os.path.exists(self.securetty):
-                    helper = Pkghelper(self.logger, self.environ)
+                    helper = self.getpkghelper()
 
                     if helper.manager == "apt-get" or \
                                                     helper.manager == "zypper":
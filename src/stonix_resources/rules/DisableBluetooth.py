@@ -35,6 +35,7 @@ Check to see if all of the above operations have been done or not - report()
 @change: 02/14/2014 ekkehard Implemented isapplicable
 @change: 04/18/2014 dkennel Replaced old style CI with new
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -42,8 +43,6 @@ import os
 import traceback
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..ServiceHelper import ServiceHelper
-from ..pkghelper import Pkghelper
 from ..KVEditorStonix import KVEditorStonix
 from ..stonixutilityfunctions import iterate, setPerms, checkPerms, resetsecon
 
@@ -80,7 +79,7 @@ class DisableBluetooth(Rule):
         self.ci = self.initCi(datatype, key, instructions, default)
         self.applicable = {'type': 'white',
                            'family': ['linux', 'freebsd']}
-        self.servicehelper = ServiceHelper(self.environ, self.logger)
+        self.servicehelper = self.getservicehelper()
         self.guidance = ["NSA(3.3.14)", "CCE 14948-4", "CCE 4377-8",
                          "CCE 4355-4"]
         self.driverdict = { "blacklist":["bluetooth", "btusb", "bcm203x", 
@@ -29,12 +29,11 @@ dictionary
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2014/12/02 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/14 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..ruleKVEditor import RuleKVEditor
 from ..CommandHelper import CommandHelper
-from ..ServiceHelper import ServiceHelper
-from ..pkghelper import Pkghelper
 from ..stonixutilityfunctions import iterate
 from ..logdispatcher import LogPriority
 
@@ -73,7 +72,7 @@ dictionary
                            'os': {'Mac OS X': ['10.9', 'r', '10.10.10'],
                                   'Ubuntu': ['12.04', '+']}}
         self.ch = CommandHelper(self.logdispatch)
-        self.sh = ServiceHelper(self.environ, self.logdispatch)
+        self.sh = self.getservicehelper()
 
         # init CIs
         datatype = 'bool'
@@ -124,7 +123,7 @@ dictionary
 
         try:
 
-            self.ph = Pkghelper(self.logdispatch, self.environ)
+            self.ph = self.getpkghelper()
 
             for package in self.debianpkglist:
                 if self.ph.check(package):
@@ -25,10 +25,10 @@ Created on Mar 4, 2015
 
 @author: dwalker
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..ruleKVEditor import RuleKVEditor
-from ..ServiceHelper import ServiceHelper
 from stonix_resources.logdispatcher import LogPriority
 
 
@@ -62,7 +62,7 @@ class DisableFTP(RuleKVEditor):
                          "present",
                          "",
                          "Disable FTP service")
-        self.sh = ServiceHelper(self.environ, self.logger)
+        self.sh = self.getservicehelper()
         self.setkvdefaultscurrenthost()  # default value is False
 
     def afterfix(self):
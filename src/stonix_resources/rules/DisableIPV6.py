@@ -29,6 +29,9 @@ Created on Apr 9, 2013
 @change: 06/02/2014 dkennel removed extraneous arg from setperms call on 864
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
+@change: 2015/10/18 dkennel check the running kernel and set only the changed
+parameters through the shared Sysctl instead of reloading sysctl.conf
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, setPerms, checkPerms, writeFile
@@ -36,9 +39,7 @@ from ..stonixutilityfunctions import readFile, resetsecon, createFile
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..KVEditorStonix import KVEditorStonix
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
-from ..ServiceHelper import ServiceHelper
 import traceback
 import os
 import re
@@ -71,8 +72,9 @@ class DisableIPV6(Rule):
         self.iditerator = 0
         self.created = False
         self.created2 = False
+        self.sysctls = {}
         self.editor1, self.editor2, self.editor3 = "", "", ""
-        self.sh = ServiceHelper(self.environ, self.logger)
+        self.sh = self.getservicehelper()
 
     def report(self):
         try:
@@ -352,7 +354,7 @@ and/or wasn't able to be created\n"
         compliant = True
         sysctls = {"net.ipv6.conf.all.disable_ipv6": "1",
                    "net.ipv6.conf.default.disable_ipv6": "1"}
-        self.helper = Pkghelper(self.logger, self.environ)
+        self.helper = self.getpkghelper()
         if self.helper.manager == "yum":
             ifacefile = "/etc/sysconfig/network-scripts/"
             if not os.path.exists(ifacefile):
@@ -419,6 +421,12 @@ the correct contents\n"
                 self.detailedresults += "/etc/sysctl file doesn't contain \
 the correct contents\n"
                 compliant = False
+        self.sysctls = sysctls
+        wrong = self.getsysctl().audit(sysctls)
+        for key in sorted(wrong):
+            self.detailedresults += "The running kernel has " + key + \
+                " = " + wrong[key] + ", should be " + sysctls[key] + "\n"
+            compliant = False
 #---------------------check out /etc/modprobe.conf----------------------------#
         # this file is optional so if it doesn't exist, no harm done, however
         # if it does exist, it needs to be configured correctly
@@ -708,12 +716,10 @@ contain the correct contents\n"
                     os.chown(sysctl, 0, 0)
                     os.chmod(sysctl, 420)
                     resetsecon(sysctl)
-                    cmdhelper = CommandHelper(self.logger)
-                    cmd = ["/sbin/sysctl", "-q", "-e", "-p"]
-                    if not cmdhelper.executeCommand(cmd):
-                        success = False
-                        debug = "Unable to reset sysctl\n"
-                        self.logger.log(LogPriority.DEBUG, debug)
+        if not self.getsysctl().apply(self.sysctls):
+            success = False
+            debug = "Unable to set kernel parameters\n"
+            self.logger.log(LogPriority.DEBUG, debug)
 #--------------------------fix /etc/modprobe.conf-----------------------------#
         tempstring = ""
         tmpfile = modprobefile + ".tmp"
@@ -29,6 +29,7 @@ startup mode for all supported flavors of Linux operating systems.
         in init method, updated with new isapplicable section 4/16/2014
 @change: dkennel 04/18/2014 Replaced old style CI with new
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 import os
@@ -38,7 +39,6 @@ from ..rule import Rule
 from ..stonixutilityfunctions import resetsecon, checkPerms
 from ..stonixutilityfunctions import iterate, setPerms, createFile
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..KVEditorStonix import KVEditorStonix
 from ..CommandHelper import CommandHelper
 
@@ -93,7 +93,7 @@ class DisableInteractiveStartup(Rule):
             self.detailedresults = ""
             compliant = True
             self.perms = [0, 0, 420]
-            self.helper = Pkghelper(self.logger, self.environ)
+            self.helper = self.getpkghelper()
             if self.helper.manager == "portage":
                 self.filepath = "/etc/conf.d/rc"
                 keyval = {"RC_INTERACTIVE": "no"}
@@ -31,6 +31,7 @@ possible.
 
 @author: bemalmbe
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -42,7 +43,6 @@ from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import iterate
 from ..CommandHelper import CommandHelper
-from ..ServiceHelper import ServiceHelper
 
 
 class DisableRemoteAppleEvents(Rule):
@@ -104,7 +104,7 @@ class DisableRemoteAppleEvents(Rule):
 
         self.detailedresults = ''
         self.cmhelper = CommandHelper(self.logger)
-        self.svchelper = ServiceHelper(self.environ, self.logger)
+        self.svchelper = self.getservicehelper()
         self.compliant = False
         secure = True
         disabled = False
@@ -38,6 +38,7 @@ OS X Mavericks not Mountain Lion, Lion, etc.
     an optional rule designed for very high security environments.
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -50,7 +51,6 @@ from ..rule import Rule
 from ..stonixutilityfunctions import readFile, setPerms, createFile
 from ..stonixutilityfunctions import checkPerms, iterate, writeFile, resetsecon
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 import cmd
 
 
@@ -132,7 +132,7 @@ class DisableRemoveableStorage(Rule):
             else:
                 output = ""
                 removeables = []
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 self.ch = CommandHelper(self.logger)
                 self.detailedresults = ""
                 # check compliance of grub file if exists
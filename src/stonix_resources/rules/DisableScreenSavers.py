@@ -27,13 +27,13 @@ Created on Nov 12, 2013
 @change: dkennel 04/18/2014 Replaced old style CI with new
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import readFile, writeFile, checkPerms
 from ..stonixutilityfunctions import resetsecon
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from re import search
 import os
 import traceback
@@ -68,7 +68,7 @@ class DisableScreenSavers(Rule):
             # are supposed to be on these files
             compliant = True
             self.detailedresults = ""
-            self.helper = Pkghelper(self.logger, self.environ)
+            self.helper = self.getpkghelper()
             config = ""
             self.paths = {"/usr/share/kde4/services/ScreenSavers/":".desktop",
                      "/usr/share/applnk/System/ScreenSavers/":"desktop",
@@ -86,6 +86,7 @@ space separated.'''
         default2 = ['cramfs', 'freevxfs', 'jffs2', 'hfs', 'hfsplus',
                     'squashfs']
         self.fslist = self.initCi(datatype2, key2, instructions2, default2)
+        self.resources = ['/etc/modprobe.d/usgcb-blacklist.conf']
         self.guidance = ['NSA 2.2.2.5']
         self.applicable = {'type': 'white',
                            'family': ['linux']}
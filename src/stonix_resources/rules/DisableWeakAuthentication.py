@@ -27,13 +27,13 @@ Created on Aug 12, 2013
 @change: dkennel 04/18/2014 Replaced old style CI with new style
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/15 dkennel updated to use new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import readFile, writeFile, setPerms, checkPerms
 from ..stonixutilityfunctions import resetsecon
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 import os
 import traceback
 import re
@@ -86,7 +86,7 @@ class DisableWeakAuthentication(Rule):
         '''
         self.detailedresults = ""
         try:
-            self.helper = Pkghelper(self.logger, self.environ)
+            self.helper = self.getpkghelper()
             compliant = True
             for item in self.rsh:
                 if self.helper.check(item):
@@ -30,6 +30,7 @@ well-managed web server is recommended.
 @author: bemalmbe
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -37,7 +38,6 @@ import traceback
 import os
 
 from ..rule import Rule
-from ..ServiceHelper import ServiceHelper
 from ..stonixutilityfunctions import iterate
 from ..logdispatcher import LogPriority
 from ..CommandHelper import CommandHelper
@@ -94,7 +94,7 @@ well-managed web server is recommended.
         self.compliant = False
 
         # init servicehelper object
-        self.svchelper = ServiceHelper(self.environ, self.logger)
+        self.svchelper = self.getservicehelper()
         self.cmhelper = CommandHelper(self.logger)
 
         if not os.path.exists(self.maclongname):
@@ -29,6 +29,7 @@ The EnableSELinux class enables and configures SELinux on support OS platforms.
 @change: dwalker 3/10/2014
 @change: dkennel 04/18/2014 Replaced old style CI invocation
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -40,7 +41,6 @@ from ..stonixutilityfunctions import checkPerms, setPerms, readFile, writeFile
 from ..stonixutilityfunctions import iterate, resetsecon
 from ..logdispatcher import LogPriority
 from ..environment import *
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
 
 
@@ -114,7 +114,7 @@ enter (inside the terminal or window, whichever is available) is done'''
         try:
             self.detailedresults = ""
             self.mode = self.modeci.getcurrvalue()
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             self.ch = CommandHelper(self.logger)
             compliant = True
             if self.ph.manager == "zypper":
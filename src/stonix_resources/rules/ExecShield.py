@@ -26,13 +26,14 @@ This class is responsible for auditing and correcting the setting of the
 ExecShield overflow prevention and the randomize_va_space ASLR mechanism.
 @author: dkennel
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel read and set the kernel values through the shared
+Sysctl
 '''
 from __future__ import absolute_import
 import os
 import re
 import traceback
 import stat
-import subprocess
 import shutil
 
 from ..rule import Rule
@@ -69,6 +70,7 @@ va_randomize which randomizes the locations of various memory regions.'''
         self.sysctlconf = '/etc/sysctl.conf'
         self.tmpPath = '/etc/sysctl.conf.tmp'
         self.comment = re.compile('^#|^;')
+        self.resources = ['/etc/sysctl.conf']
         self.guidance = ['CCE-27007-4', 'CCE-26999-3']
         self.applicable = {'type': 'white',
                            'family': ['linux']}
@@ -98,34 +100,6 @@ va_randomize which randomizes the locations of various memory regions.'''
         myci = self.initCi(datatype, key, instructions, default)
         return myci
 
-    def checkproc(self, procpath):
-        '''
-        Check for the value of a specific key in proc. Return that value.
-        This method is designed for proc keys that only return a single value.
-
-        @param procpath string: fully qualified path to the element to be
-        checked.
-        @return: string version of the value at that proc location.
-        @author: dkennel
-        '''
-        myval = ''
-        try:
-            rhandle = open(procpath, 'r')
-            myval = rhandle.read()
-            rhandle.close()
-            myval = myval.strip()
-            return myval
-        except (KeyboardInterrupt, SystemExit):
-            # User initiated exit
-            raise
-        except Exception:
-            self.detailedresults = 'ExecShield.checkproc: '
-            self.detailedresults = self.detailedresults + traceback.format_exc()
-            self.rulesuccess = False
-            self.logdispatch.log(LogPriority.ERROR,
-                            ['ExecShield.checkproc',
-                             self.detailedresults])
-
     def report(self):
         '''
         Main report method. We rely on the active values in proc to make our
@@ -135,16 +109,16 @@ va_randomize which randomizes the locations of various memory regions.'''
         '''
         self.detailedresults = 'Results: '
         try:
+            live = self.getsysctl().getlive(self.directives.keys())
             if self.execshieldapplies:
-                execval = int(self.checkproc(self.shieldprocpath))
-                if execval == 1:
+                execval = live['kernel.exec-shield']
+                if execval == '1':
                     self.execshieldcompliant = True
                     self.detailedresults += 'Exec-Shield present and compliant\n'
                 else:
                     self.detailedresults += 'Exec-Shield present but not compliant. Current value: ' + str(execval) +'\n'
-            va_path = '/proc/sys/kernel/randomize_va_space'
-            vaval = int(self.checkproc(va_path))
-            if vaval == 2:
+            vaval = live['kernel.randomize_va_space']
+            if vaval == '2':
                 self.varandomcompliant = True
                 self.detailedresults += 'Randomize_va_space compliant\n'
             else:
@@ -169,10 +143,10 @@ va_randomize which randomizes the locations of various memory regions.'''
 
     def fix(self):
         '''
-        Main fix method. We update the current vaules in proc via shell
-        commands and set the correct settings in /etc/sysctl.conf since our
-        assumption is that if it didn't pass it's because it's been overridden
-        in sysctl.conf.
+        Main fix method. We update the current values in proc that are not
+        already correct and set the correct settings in /etc/sysctl.conf since
+        our assumption is that if it didn't pass it's because it's been
+        overridden in sysctl.conf.
 
         @author: dkennel
         '''
@@ -185,11 +159,8 @@ va_randomize which randomizes the locations of various memory regions.'''
             self.editor = KVEditorStonix(self.statechglogger, self.logdispatch,
                                          kvtype, self.sysctlconf, self.tmpPath,
                                          self.directives, intent, "openeq")
-            if self.execshieldapplies:
-                cmdshield = '/sbin/sysctl -w kernel.exec-shield=1'
-                cmdproc = subprocess.call(cmdshield, shell=True)
-            cmdvarand = '/sbin/sysctl -w kernel.randomize_va_space=2'
-            cmdvaproc = subprocess.call(cmdvarand, shell=True)
+            if not self.getsysctl().apply(self.directives):
+                self.rulesuccess = False
 
             if not self.editor.report():
                 if self.editor.fixables:
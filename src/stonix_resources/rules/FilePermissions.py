@@ -33,6 +33,16 @@ directories.
 systems. Added code to remove world write from files in the root users path.
 @change: 2015/04/13 dkennel changed to use new isApplicable method in template
 rule class
+@change: 2015/10/05 dkennel multifind now uses the shared FSInventory instead
+of walking the filesystems itself
+@change: 2015/10/07 dkennel scans are incremental using the FSInventory index,
+new since last and new since install are computed from the index result sets
+@change: 2015/10/08 dkennel all report comparisons use sets, removed the 25000
+entry find overrun limit
+@change: 2015/10/18 dkennel fix clears the world write bit instead of toggling
+it
+@change: 2015/10/18 dkennel fix refreshes the inventory entries it changes so
+the report after the fix sees them
 
 '''
 from __future__ import absolute_import
@@ -43,13 +53,12 @@ import random
 import shutil
 import stat
 import re
-import pwd
-import grp
 
 from ..rule import Rule
 from ..stonixutilityfunctions import *
 from ..logdispatcher import LogPriority
 from ..localize import SITELOCALWWWDIRS
+from ..FSInventory import getinventory
 
 
 class FilePermissions(Rule):
@@ -118,6 +127,7 @@ for this system. Please note that this rule may take several minutes to run.'''
         self.noorigin = os.path.join(self.noownerdir,
                                      'no-owners-at-install.db')
         self.nolast = os.path.join(self.noownerdir, 'no-owners-previous.db')
+        self.fsindex = os.path.join(self.infodir, 'fsindex.db')
         datatype = 'bool'
         key = 'setsticky'
         instructions = '''If set to yes or true the WorldWritables rule will attempt to
@@ -143,12 +153,22 @@ users path are very dangerous.'''
         ww_default = True
         self.fixww = self.initCi(ww_datatype, ww_key, ww_instructions,
                                  ww_default)
+        fs_datatype = 'int'
+        fs_key = 'fullscandays'
+        fs_instructions = '''To speed up scheduled runs this rule only
+re-lists directories that have changed since the last run. Every file is still
+checked on each run so permission changes are always seen. All directories are
+listed again when the last full scan is older than FULLSCANDAYS days. Set to 0
+to always do a full scan.'''
+        fs_default = 7
+        self.fullscandays = self.initCi(fs_datatype, fs_key, fs_instructions,
+                                        fs_default)
         self.hasrunalready = False
         self.wwresults = ''
         self.suidresults = ''
         self.unownedresults = ''
+        self.currentresults = {'ww': [], 'suid': [], 'unowned': []}
         self.firstrun = False
-        self.findoverrun = False
         random.seed()
 
     def processconfig(self):
@@ -189,10 +209,12 @@ users path are very dangerous.'''
 
     def multifind(self):
         '''
-        Private method that runs the find command on the file system to create
-        lists of world writable, suid/sgid, and unowned files. The invocation
-        of the find shell command is a bit complex to do all of this in one
-        shot.
+        Private method that queries the shared filesystem inventory to create
+        lists of world writable, suid/sgid, and unowned files. The inventory
+        walks the local filesystems once per run so other rules can use the
+        same data. The inventory index at self.fsindex lets it skip
+        directories that have not changed since the last run and holds the
+        result sets of the previous and first runs for the reports.
 
         @author: dkennel
         '''
@@ -225,136 +247,36 @@ users path are very dangerous.'''
                 if os.path.exists(dbsets[set]['db']):
                     os.rename(dbsets[set]['db'], dbsets[set]['last'])
 
-            fslist = self.getfilesystems()
-            for filesystem in fslist:
-                if filesystem in self.bypassfs.getcurrvalue():
-                    self.logger.log(LogPriority.DEBUG,
-                                    ['FilePermissions.multifind',
-                                     'Skipping Filesystem: ' + str(filesystem)])
-                    continue
+            inventory = getinventory(self.logger, self.environ)
+            maxage = self.fullscandays.getcurrvalue() * 86400
+            inventory.scan(self.bypassfs.getcurrvalue(),
+                           indexfile=self.fsindex, maxage=maxage)
+            dbsets['ww']['results'] = inventory.worldwritable()
+            dbsets['suid']['results'] = inventory.suid()
+            dbsets['unowned']['results'] = inventory.unowned()
+            for myset in dbsets:
                 self.logger.log(LogPriority.DEBUG,
                                 ['FilePermissions.multifind',
-                                 'Walking Filesystem: ' + str(filesystem)])
-                if self.findoverrun:
-                        break
-                for root, dirs, files in os.walk(filesystem):
-                    # check the number of hits we have if we've got 30,000
-                    # hits then this FS is so bad we don't want to continue
-                    try:
-                        if len(dbsets['ww']['results']) > 25000:
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                            'WW overflow!'])
-                            self.findoverrun = True
-                    except TypeError:
-                        pass
-                    try:
-                        if len(dbsets['suid']['results']) > 25000:
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                            'SUID overflow!'])
-                            self.findoverrun = True
-                    except TypeError:
-                        pass
-                    try:
-                        if len(dbsets['unowned']['results']) > 25000:
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                            'Unowned overflow!'])
-                            self.findoverrun = True
-                    except TypeError:
-                        pass
-
-                    if self.findoverrun:
-                        break
-
-                    # This wacky looking snippet filters out directories that
-                    # are actually file system mount points
-                    dirs[:] = [dirname for dirname in dirs if not
-                               os.path.ismount(os.path.join(root, dirname))]
-                    for dirname in dirs:
-                        path = os.path.join(root, dirname)
-                        try:
-                            mode = os.stat(path)
-                        except OSError:
-                            continue
-                        worldwrite = mode.st_mode & stat.S_IWOTH
-                        # sticky = mode.st_mode & stat.S_ISVTX
-                        if worldwrite:
-                            dbsets['ww']['results'].append(path)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found WW Dir: ' + str(path)])
-                    for name in files:
-                        try:
-                            if len(dbsets['ww']['results']) > 25000:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['FilePermissions.multifind',
-                                                'WW overflow!'])
-                                self.findoverrun = True
-                        except TypeError:
-                            pass
-                        try:
-                            if len(dbsets['suid']['results']) > 25000:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['FilePermissions.multifind',
-                                                'SUID overflow!'])
-                                self.findoverrun = True
-                        except TypeError:
-                            pass
-                        try:
-                            if len(dbsets['unowned']['results']) > 25000:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['FilePermissions.multifind',
-                                                'Unowned overflow!'])
-                                self.findoverrun = True
-                        except TypeError:
-                            pass
-
-                        if self.findoverrun:
-                            break
-
-                        fpath = os.path.join(root, name)
-                        if os.path.islink(fpath):
-                            continue
-                        try:
-                            fmode = os.stat(fpath)
-                        except OSError:
-                            continue
-                        worldwrite = fmode.st_mode & stat.S_IWOTH
-                        if worldwrite:
-                            dbsets['ww']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found WW File: ' + str(fpath)])
-                        suid = fmode.st_mode & stat.S_ISUID
-                        sgid = fmode.st_mode & stat.S_ISGID
-                        if suid or sgid:
-                            dbsets['suid']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found SUID File: ' + str(fpath)])
-                        try:
-                            uname = pwd.getpwuid(fmode.st_uid)[0]
-                        except KeyError:
-                            dbsets['unowned']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found unowned File: ' + str(fpath)])
-                        try:
-                            gname = grp.getgrgid(fmode.st_gid)[0]
-                        except KeyError:
-                            dbsets['unowned']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found unowned File, bad group: ' + str(fpath)])
+                                 'Found ' + str(len(dbsets[myset]['results']))
+                                 + ' ' + myset + ' entries'])
             for myset in dbsets:
+                self.currentresults[myset] = dbsets[myset]['results']
                 data = '\n'.join(dbsets[myset]['results'])
                 whandle = open(dbsets[myset]['db'], 'w')
                 whandle.write(data)
                 whandle.close()
+                if inventory.getorigin(myset) is None:
+                    # Carry a baseline recorded before the index existed
+                    # into the index.
+                    if os.path.exists(dbsets[myset]['orig']):
+                        inventory.setorigin(myset,
+                                            self.readdb(dbsets[myset]['orig']))
+                    else:
+                        inventory.setorigin(myset, dbsets[myset]['results'])
                 if not os.path.exists(dbsets[myset]['orig']):
                     shutil.copy(dbsets[myset]['db'], dbsets[myset]['orig'])
+                inventory.setresults(myset, dbsets[myset]['results'])
+            inventory.saveindex()
 
         except (KeyboardInterrupt, SystemExit):
             # User initiated exit
@@ -368,6 +290,50 @@ users path are very dangerous.'''
                              self.detailedresults])
             raise
 
+    def readdb(self, dbfile):
+        '''
+        Private method to read one of the newline separated db files into a
+        set of paths.
+
+        @param dbfile: string - path to the db file
+        @return: set of strings
+        @author: dkennel
+        '''
+        results = set()
+        if not os.path.exists(dbfile):
+            return results
+        rhandle = open(dbfile, 'r')
+        try:
+            for line in rhandle:
+                line = line.strip()
+                if line:
+                    results.add(line)
+        finally:
+            rhandle.close()
+        return results
+
+    def getrunsets(self, myset, lastdb, origdb):
+        '''
+        Private method to get the results of the previous run and of the
+        first run for one of the result sets. The sets come from the
+        FSInventory index, the db files are only read when the index does not
+        hold them yet.
+
+        @param myset: string - 'ww', 'suid' or 'unowned'
+        @param lastdb: string - path to the previous run db file
+        @param origdb: string - path to the first run db file
+        @return: tuple of (previous run set, first run set)
+        @author: dkennel
+        '''
+        inventory = getinventory(self.logger, self.environ)
+        prevrun = inventory.getprevious(myset)
+        if prevrun is None:
+            prevrun = self.readdb(lastdb)
+        firstrun = inventory.getorigin(myset)
+        if firstrun is None:
+            firstrun = self.readdb(origdb)
+        return prevrun, firstrun
+
     def wwreport(self):
         '''Public method to report on installed WorldWritable files.
         @author: dkennel
@@ -379,45 +345,33 @@ users path are very dangerous.'''
         # compare current run to last and origin.
         # compare current run to package db or list of typical ww files
         compliant = False
-        wwlist = ['/tmp', '/tmp/.ICE-unix', '/tmp/at-spi2', '/tmp/.Test-unix',
-                  '/tmp/.font-unix', '/tmp/.X11-unix', '/tmp/.XIM-unix',
-                  '/var/tmp', '/tmp/at-spi2', '/var/crash',
-                  '/var/tmp/vi.recover', '/var/cache/fonts', '/var/spool/mail',
-                  '/var/adm/spellhist', '/var/mail', '/var/preserve',
-                  '/var/spool/pkg', '/var/spool/samba',
-                  '/var/spool/uucppublic', '/var/webconsole/tmp',
-                  '/var/krb5/rcache', '/var/dt/dtpower/schemes',
-                  '/var/dt/dtpower/_current_scheme', '/var/dt/tmp',
-                  '/var/lib/puppet/run', '/var/imq/instances',
-                  '/usr/oasys/tmp/TERRLOG',
-                  '/var/run/kdm', '/var/run/gdm', '/private/tmp',
-                  '/private/var/tmp', '/Library/Caches']
-        for pathelement in SITELOCALWWWDIRS:
-            wwlist.append(pathelement)
-        try:
-            lastrun = open(self.wwdbfile, 'r').readlines()
-        except(IOError):
-            lastrun = []
+        wwlist = set(['/tmp', '/tmp/.ICE-unix', '/tmp/at-spi2', '/tmp/.Test-unix',
+                      '/tmp/.font-unix', '/tmp/.X11-unix', '/tmp/.XIM-unix',
+                      '/var/tmp', '/tmp/at-spi2', '/var/crash',
+                      '/var/tmp/vi.recover', '/var/cache/fonts', '/var/spool/mail',
+                      '/var/adm/spellhist', '/var/mail', '/var/preserve',
+                      '/var/spool/pkg', '/var/spool/samba',
+                      '/var/spool/uucppublic', '/var/webconsole/tmp',
+                      '/var/krb5/rcache', '/var/dt/dtpower/schemes',
+                      '/var/dt/dtpower/_current_scheme', '/var/dt/tmp',
+                      '/var/lib/puppet/run', '/var/imq/instances',
+                      '/usr/oasys/tmp/TERRLOG',
+                      '/var/run/kdm', '/var/run/gdm', '/private/tmp',
+                      '/private/var/tmp', '/Library/Caches'])
+        wwlist.update(SITELOCALWWWDIRS)
+        lastrun = self.currentresults['ww']
         self.logger.log(LogPriority.DEBUG,
                         ['WorldWritables.report',
-                         'lastrun: ' + str(lastrun)])
-        prevrun = []
-        if os.path.exists(self.wwlast):
-            prevrun = open(self.wwlast, 'r').readlines()
-        firstrun = []
-        if os.path.exists(self.wworigin):
-            firstrun = open(self.wworigin, 'r').readlines()
+                         'lastrun: ' + str(len(lastrun)) + ' entries'])
+        prevrun, firstrun = self.getrunsets('ww', self.wwlast, self.wworigin)
         newfilessincelast = []
         newfilessinceorigin = []
         notsticky = []
         notknown = []
-        # Important! lines coming from the files will have newlines unless
-        # they are stripped.
-        for wwfile in lastrun:
-            wwpath = wwfile.strip()
-            if wwfile not in prevrun:
+        for wwpath in lastrun:
+            if wwpath not in prevrun:
                 newfilessincelast.append(wwpath)
-            if wwfile not in firstrun:
+            if wwpath not in firstrun:
                 newfilessinceorigin.append(wwpath)
             try:
                 mode = os.stat(wwpath)[stat.ST_MODE]
@@ -513,26 +467,6 @@ users path are very dangerous.'''
             self.wwresults = self.wwresults + '\nWorld Writable files not known to STONIX: ' + strnotknown
             self.wwresults = self.wwresults + ' '
             self.wwresults = self.wwresults + '\nNew World Writable Files since install: ' + strnewsincefirst
-            if self.findoverrun:
-                self.wwresults = self.wwresults + '''
-WARNING! Large numbers of files with incorrect permissions detected. Please
-conduct a manual check for world writable files and folders and correct
-permissions as needed.
-
-To find world writable directories:
-find / -xdev -type d \( -perm -0002 -a ! -perm -1000 \) -print
-To find world writable files:
-find / -xdev -type f \( -perm -0002 -a ! -perm -1000 \) -print'''
-        elif self.findoverrun:
-            self.wwresults = '''
-WARNING! Large numbers of files with incorrect permissions detected. Please
-conduct a manual check for world writable files and folders and correct
-permissions as needed.
-
-To find world writable directories:
-find / -xdev -type d \( -perm -0002 -a ! -perm -1000 \) -print
-To find world writable files:
-find / -xdev -type f \( -perm -0002 -a ! -perm -1000 \) -print'''
         else:
             compliant = True
             self.wwresults = 'No new World Writable files since last run.'
@@ -545,235 +479,224 @@ find / -xdev -type f \( -perm -0002 -a ! -perm -1000 \) -print'''
         # workflow is as follows
         # compare current run to last and origin.
         # compare current run to package db or list of typical suid files
-        suidlist = ['/bin/mount',
-                    '/bin/ping',
-                    '/bin/ping6',
-                    '/bin/su',
-                    '/bin/umount',
-                    '/sbin/mount.nfs',
-                    '/sbin/mount.nfs4',
-                    '/sbin/netreport',
-                    '/sbin/pam timestamp check',
-                    '/sbin/umount.nfs',
-                    '/sbin/umount.nfs4',
-                    '/sbin/unix chkpwd',
-                    '/usr/bin/at',
-                    '/usr/bin/chage',
-                    '/usr/bin/chfn',
-                    '/usr/bin/chsh',
-                    '/usr/bin/crontab',
-                    '/usr/bin/gpasswd',
-                    '/usr/bin/locate',
-                    '/usr/bin/lockfile',
-                    '/usr/bin/newgrp',
-                    '/usr/bin/passwd',
-                    '/usr/bin/rcp',
-                    '/usr/bin/rlogin',
-                    '/usr/bin/rsh',
-                    '/usr/bin/ssh-agent',
-                    '/usr/bin/sudo',
-                    '/usr/bin/sudoedit',
-                    '/usr/bin/wall',
-                    '/usr/bin/write',
-                    '/usr/bin/Xorg',
-                    '/usr/kerberos/bin/ksu',
-                    '/usr/libexec/openssh/ssh-keysign',
-                    '/usr/libexec/utempter/utempter',
-                    '/usr/lib/squid/pam auth',
-                    '/usr/lib/squid/ncsa auth',
-                    '/usr/lib/vte/gnome-pty-helper',
-                    '/usr/sbin/ccreds validate',
-                    '/usr/sbin/lockdev',
-                    '/usr/sbin/sendmail.sendmail',
-                    '/usr/sbin/suexec',
-                    '/usr/sbin/userhelper',
-                    '/usr/sbin/userisdnctl',
-                    '/usr/sbin/usernetctl',
-                    '/usr/bin/sparcv9/newtask',
-                    '/usr/bin/sparcv9/uptime',
-                    '/usr/bin/sparcv9/w',
-                    '/usr/bin/atq',
-                    '/usr/bin/atrm',
-                    '/usr/bin/eject',
-                    '/usr/bin/fdformat',
-                    '/usr/bin/login',
-                    '/usr/bin/newgrp',
-                    '/usr/bin/pfexec',
-                    '/usr/bin/su',
-                    '/usr/bin/tip',
-                    '/usr/bin/ct',
-                    '/usr/bin/cu',
-                    '/usr/bin/uucp',
-                    '/usr/bin/uuglist',
-                    '/usr/bin/uuname',
-                    '/usr/bin/uustat',
-                    '/usr/bin/uux',
-                    '/usr/bin/rdist',
-                    '/usr/bin/chkey',
-                    '/usr/bin/lpset',
-                    '/usr/bin/pppd',
-                    '/usr/bin/tsoljdslabel',
-                    '/usr/bin/rmformat',
-                    '/usr/bin/volrmmount',
-                    '/usr/bin/mailq',
-                    '/usr/bin/stclient',
-                    '/usr/bin/cdrw',
-                    '/usr/lib/fs/ufs/quota',
-                    '/usr/lib/fs/ufs/ufsdump',
-                    '/usr/lib/fs/ufs/ufsrestore',
-                    '/usr/lib/pt_chmod',
-                    '/usr/lib/utmp_update',
-                    '/usr/lib/uucp/remote.unknown',
-                    '/usr/lib/uucp/uucico',
-                    '/usr/lib/uucp/uusched',
-                    '/usr/lib/uucp/uuxqt',
-                    '/usr/lib/webconsole/pamverifier',
-                    '/usr/lib/print/lpd-port',
-                    '/usr/lib/cacao/lib/tools/cacaocsc',
-                    '/usr/lib/lp/bin/netpr',
-                    '/usr/lib/fbconfig/SUNWnfb_config',
-                    '/usr/lib/fbconfig/SUNWifb_config',
-                    '/usr/lib/fbconfig/SUNWjfb_config',
-                    '/usr/lib/fbconfig/SUNWpfb_config',
-                    '/usr/lib/fbconfig/libSUNWast_conf.so.1',
-                    '/usr/lib/ssh/ssh-keysign',
-                    '/usr/lib/gnome-suspend',
-                    '/usr/lib/acct/accton',
-                    '/usr/openwin/bin/xlock',
-                    '/usr/openwin/bin/sys-suspend',
-                    '/usr/openwin/bin/xscreensaver',
-                    '/usr/sbin/sparcv9/whodo',
-                    '/usr/sbin/allocate',
-                    '/usr/sbin/sacadm',
-                    '/usr/sbin/traceroute',
-                    '/usr/sbin/deallocate',
-                    '/usr/sbin/list_devices',
-                    '/usr/sbin/pmconfig',
-                    '/usr/sbin/ping',
-                    '/usr/sbin/smpatch',
-                    '/usr/sbin/m64config',
-                    '/usr/xpg4/bin/at',
-                    '/usr/xpg4/bin/crontab',
-                    '/usr/dt/bin/dtappgather',
-                    '/usr/dt/bin/dtfile',
-                    '/usr/dt/bin/dtprintinfo',
-                    '/usr/dt/bin/dtsession',
-                    '/usr/dt/bin/tsoldtlabel',
-                    '/usr/dt/bin/tsolxagent',
-                    '/usr/xpg6/bin/crontab',
-                    '/etc/lp/alerts/printer',
-                    '/opt/csw/bin/sudo.minimal',
-                    '/opt/csw/bin/sudoedit.minimal',
-                    '/bin/rcp',
-                    '/sbin/mksnap_ffs',
-                    '/sbin/ping',
-                    '/sbin/ping6',
-                    '/sbin/shutdown',
-                    '/sbin/poweroff',
-                    '/usr/bin/at',
-                    '/usr/bin/atq',
-                    '/usr/bin/atrm',
-                    '/usr/bin/batch',
-                    '/usr/bin/chpass',
-                    '/usr/bin/chfn',
-                    '/usr/bin/chsh',
-                    '/usr/bin/ypchpass',
-                    '/usr/bin/ypchfn',
-                    '/usr/bin/ypchsh',
-                    '/usr/bin/lock',
-                    '/usr/bin/login',
-                    '/usr/bin/opieinfo',
-                    '/usr/bin/opiepasswd',
-                    '/usr/bin/passwd',
-                    '/usr/bin/yppasswd',
-                    '/usr/bin/quota',
-                    '/usr/bin/rlogin',
-                    '/usr/bin/rsh',
-                    '/usr/bin/su',
-                    '/usr/bin/crontab',
-                    '/usr/libexec/ulog-helper',
-                    '/usr/local/bin/ksu',
-                    '/usr/local/bin/sudo',
-                    '/usr/local/bin/sudoedit',
-                    '/usr/sbin/ppp',
-                    '/usr/sbin/timedc',
-                    '/usr/sbin/traceroute',
-                    '/usr/sbin/traceroute6',
-                    '/sbin/mount.ecryptfs_private',
-                    '/bin/fusermount',
-                    '/lib/dbus-1/dbus-daemon-launch-helper',
-                    '/usr/bin/kgrantpty',
-                    '/usr/bin/ksu',
-                    '/usr/bin/staprun',
-                    '/usr/bin/kpac_dhcp_helper',
-                    '/usr/bin/pkexec',
-                    '/usr/libexec/spice-gtk-i386/spice-client-glib-usb-acl-helper',
-                    '/usr/libexec/abrt-action-install-debuginfo-to-abrt-cache',
-                    '/usr/libexec/polkit-1/polkit-agent-helper-1',
-                    '/usr/libexec/pulse/proximity-helper',
-                    '/usr/libexec/pt_chown',
-                    '/usr/lib/nspluginwrapper/plugin-config',
-                    '/bin/ps',
-                    '/bin/rcp',
-                    '/System/Library/CoreServices/RemoteManagement/ARDAgent.app/Contents/MacOS/ARDAgent',
-                    '/System/Library/PrivateFrameworks/SystemAdministration.framework/Versions/A/Resources/readconfig',
-                    '/usr/bin/at',
-                    '/usr/bin/atq',
-                    '/usr/bin/atrm',
-                    '/usr/bin/batch',
-                    '/usr/bin/crontab',
-                    '/usr/bin/ipcs',
-                    '/usr/bin/login',
-                    '/usr/bin/newgrp',
-                    '/usr/bin/quota',
-                    '/usr/bin/rlogin',
-                    '/usr/bin/rsh',
-                    '/usr/bin/su',
-                    '/usr/bin/sudo',
-                    '/usr/bin/top',
-                    '/usr/lib/sa/sadc',
-                    '/usr/libexec/authopen',
-                    '/usr/libexec/security_authtrampoline',
-                    '/usr/sbin/traceroute',
-                    '/usr/sbin/traceroute6',
-                    '/usr/lib64/kde4/libexec/start_kdeinit',
-                    '/usr/lib64/kde4/libexec/kdesud',
-                    '/usr/lib64/kde4/libexec/kcheckpass',
-                    '/usr/bin/fusermount',
-                    '/usr/lib/gnome-pty-helper',
-                    '/usr/lib/utempter/utempter',
-                    '/usr/lib/polkit-1/polkit-agent-helper-1',
-                    '/usr/lib/libgnomesu/gnomesu-pam-backend',
-                    '/sbin/unix2_chkpwd',
-                    '/usr/bin/umount',
-                    '/usr/bin/ping',
-                    '/usr/bin/ping6',
-                    '/usr/bin/mount']
+        suidlist = set(['/bin/mount',
+                        '/bin/ping',
+                        '/bin/ping6',
+                        '/bin/su',
+                        '/bin/umount',
+                        '/sbin/mount.nfs',
+                        '/sbin/mount.nfs4',
+                        '/sbin/netreport',
+                        '/sbin/pam timestamp check',
+                        '/sbin/umount.nfs',
+                        '/sbin/umount.nfs4',
+                        '/sbin/unix chkpwd',
+                        '/usr/bin/at',
+                        '/usr/bin/chage',
+                        '/usr/bin/chfn',
+                        '/usr/bin/chsh',
+                        '/usr/bin/crontab',
+                        '/usr/bin/gpasswd',
+                        '/usr/bin/locate',
+                        '/usr/bin/lockfile',
+                        '/usr/bin/newgrp',
+                        '/usr/bin/passwd',
+                        '/usr/bin/rcp',
+                        '/usr/bin/rlogin',
+                        '/usr/bin/rsh',
+                        '/usr/bin/ssh-agent',
+                        '/usr/bin/sudo',
+                        '/usr/bin/sudoedit',
+                        '/usr/bin/wall',
+                        '/usr/bin/write',
+                        '/usr/bin/Xorg',
+                        '/usr/kerberos/bin/ksu',
+                        '/usr/libexec/openssh/ssh-keysign',
+                        '/usr/libexec/utempter/utempter',
+                        '/usr/lib/squid/pam auth',
+                        '/usr/lib/squid/ncsa auth',
+                        '/usr/lib/vte/gnome-pty-helper',
+                        '/usr/sbin/ccreds validate',
+                        '/usr/sbin/lockdev',
+                        '/usr/sbin/sendmail.sendmail',
+                        '/usr/sbin/suexec',
+                        '/usr/sbin/userhelper',
+                        '/usr/sbin/userisdnctl',
+                        '/usr/sbin/usernetctl',
+                        '/usr/bin/sparcv9/newtask',
+                        '/usr/bin/sparcv9/uptime',
+                        '/usr/bin/sparcv9/w',
+                        '/usr/bin/atq',
+                        '/usr/bin/atrm',
+                        '/usr/bin/eject',
+                        '/usr/bin/fdformat',
+                        '/usr/bin/login',
+                        '/usr/bin/newgrp',
+                        '/usr/bin/pfexec',
+                        '/usr/bin/su',
+                        '/usr/bin/tip',
+                        '/usr/bin/ct',
+                        '/usr/bin/cu',
+                        '/usr/bin/uucp',
+                        '/usr/bin/uuglist',
+                        '/usr/bin/uuname',
+                        '/usr/bin/uustat',
+                        '/usr/bin/uux',
+                        '/usr/bin/rdist',
+                        '/usr/bin/chkey',
+                        '/usr/bin/lpset',
+                        '/usr/bin/pppd',
+                        '/usr/bin/tsoljdslabel',
+                        '/usr/bin/rmformat',
+                        '/usr/bin/volrmmount',
+                        '/usr/bin/mailq',
+                        '/usr/bin/stclient',
+                        '/usr/bin/cdrw',
+                        '/usr/lib/fs/ufs/quota',
+                        '/usr/lib/fs/ufs/ufsdump',
+                        '/usr/lib/fs/ufs/ufsrestore',
+                        '/usr/lib/pt_chmod',
+                        '/usr/lib/utmp_update',
+                        '/usr/lib/uucp/remote.unknown',
+                        '/usr/lib/uucp/uucico',
+                        '/usr/lib/uucp/uusched',
+                        '/usr/lib/uucp/uuxqt',
+                        '/usr/lib/webconsole/pamverifier',
+                        '/usr/lib/print/lpd-port',
+                        '/usr/lib/cacao/lib/tools/cacaocsc',
+                        '/usr/lib/lp/bin/netpr',
+                        '/usr/lib/fbconfig/SUNWnfb_config',
+                        '/usr/lib/fbconfig/SUNWifb_config',
+                        '/usr/lib/fbconfig/SUNWjfb_config',
+                        '/usr/lib/fbconfig/SUNWpfb_config',
+                        '/usr/lib/fbconfig/libSUNWast_conf.so.1',
+                        '/usr/lib/ssh/ssh-keysign',
+                        '/usr/lib/gnome-suspend',
+                        '/usr/lib/acct/accton',
+                        '/usr/openwin/bin/xlock',
+                        '/usr/openwin/bin/sys-suspend',
+                        '/usr/openwin/bin/xscreensaver',
+                        '/usr/sbin/sparcv9/whodo',
+                        '/usr/sbin/allocate',
+                        '/usr/sbin/sacadm',
+                        '/usr/sbin/traceroute',
+                        '/usr/sbin/deallocate',
+                        '/usr/sbin/list_devices',
+                        '/usr/sbin/pmconfig',
+                        '/usr/sbin/ping',
+                        '/usr/sbin/smpatch',
+                        '/usr/sbin/m64config',
+                        '/usr/xpg4/bin/at',
+                        '/usr/xpg4/bin/crontab',
+                        '/usr/dt/bin/dtappgather',
+                        '/usr/dt/bin/dtfile',
+                        '/usr/dt/bin/dtprintinfo',
+                        '/usr/dt/bin/dtsession',
+                        '/usr/dt/bin/tsoldtlabel',
+                        '/usr/dt/bin/tsolxagent',
+                        '/usr/xpg6/bin/crontab',
+                        '/etc/lp/alerts/printer',
+                        '/opt/csw/bin/sudo.minimal',
+                        '/opt/csw/bin/sudoedit.minimal',
+                        '/bin/rcp',
+                        '/sbin/mksnap_ffs',
+                        '/sbin/ping',
+                        '/sbin/ping6',
+                        '/sbin/shutdown',
+                        '/sbin/poweroff',
+                        '/usr/bin/at',
+                        '/usr/bin/atq',
+                        '/usr/bin/atrm',
+                        '/usr/bin/batch',
+                        '/usr/bin/chpass',
+                        '/usr/bin/chfn',
+                        '/usr/bin/chsh',
+                        '/usr/bin/ypchpass',
+                        '/usr/bin/ypchfn',
+                        '/usr/bin/ypchsh',
+                        '/usr/bin/lock',
+                        '/usr/bin/login',
+                        '/usr/bin/opieinfo',
+                        '/usr/bin/opiepasswd',
+                        '/usr/bin/passwd',
+                        '/usr/bin/yppasswd',
+                        '/usr/bin/quota',
+                        '/usr/bin/rlogin',
+                        '/usr/bin/rsh',
+                        '/usr/bin/su',
+                        '/usr/bin/crontab',
+                        '/usr/libexec/ulog-helper',
+                        '/usr/local/bin/ksu',
+                        '/usr/local/bin/sudo',
+                        '/usr/local/bin/sudoedit',
+                        '/usr/sbin/ppp',
+                        '/usr/sbin/timedc',
+                        '/usr/sbin/traceroute',
+                        '/usr/sbin/traceroute6',
+                        '/sbin/mount.ecryptfs_private',
+                        '/bin/fusermount',
+                        '/lib/dbus-1/dbus-daemon-launch-helper',
+                        '/usr/bin/kgrantpty',
+                        '/usr/bin/ksu',
+                        '/usr/bin/staprun',
+                        '/usr/bin/kpac_dhcp_helper',
+                        '/usr/bin/pkexec',
+                        '/usr/libexec/spice-gtk-i386/spice-client-glib-usb-acl-helper',
+                        '/usr/libexec/abrt-action-install-debuginfo-to-abrt-cache',
+                        '/usr/libexec/polkit-1/polkit-agent-helper-1',
+                        '/usr/libexec/pulse/proximity-helper',
+                        '/usr/libexec/pt_chown',
+                        '/usr/lib/nspluginwrapper/plugin-config',
+                        '/bin/ps',
+                        '/bin/rcp',
+                        '/System/Library/CoreServices/RemoteManagement/ARDAgent.app/Contents/MacOS/ARDAgent',
+                        '/System/Library/PrivateFrameworks/SystemAdministration.framework/Versions/A/Resources/readconfig',
+                        '/usr/bin/at',
+                        '/usr/bin/atq',
+                        '/usr/bin/atrm',
+                        '/usr/bin/batch',
+                        '/usr/bin/crontab',
+                        '/usr/bin/ipcs',
+                        '/usr/bin/login',
+                        '/usr/bin/newgrp',
+                        '/usr/bin/quota',
+                        '/usr/bin/rlogin',
+                        '/usr/bin/rsh',
+                        '/usr/bin/su',
+                        '/usr/bin/sudo',
+                        '/usr/bin/top',
+                        '/usr/lib/sa/sadc',
+                        '/usr/libexec/authopen',
+                        '/usr/libexec/security_authtrampoline',
+                        '/usr/sbin/traceroute',
+                        '/usr/sbin/traceroute6',
+                        '/usr/lib64/kde4/libexec/start_kdeinit',
+                        '/usr/lib64/kde4/libexec/kdesud',
+                        '/usr/lib64/kde4/libexec/kcheckpass',
+                        '/usr/bin/fusermount',
+                        '/usr/lib/gnome-pty-helper',
+                        '/usr/lib/utempter/utempter',
+                        '/usr/lib/polkit-1/polkit-agent-helper-1',
+                        '/usr/lib/libgnomesu/gnomesu-pam-backend',
+                        '/sbin/unix2_chkpwd',
+                        '/usr/bin/umount',
+                        '/usr/bin/ping',
+                        '/usr/bin/ping6',
+                        '/usr/bin/mount'])
         compliant = False
-        try:
-            lastrun = open(self.suiddbfile, 'r').readlines()
-        except(IOError):
-            # Probably first run and the db doesn't exist yet.
-            lastrun = []
-        prevrun = []
-        if os.path.exists(self.suidlast):
-            prevrun = open(self.suidlast, 'r').readlines()
-        firstrun = []
-        if os.path.exists(self.suidorigin):
-            firstrun = open(self.suidorigin, 'r').readlines()
+        lastrun = self.currentresults['suid']
+        prevrun, firstrun = self.getrunsets('suid', self.suidlast,
+                                            self.suidorigin)
         newfilessincelast = []
         newfilessinceorigin = []
         notknown = []
         wrongmode = []
-        # Important! lines coming from the files will have newlines unless
-        # they are stripped.
-        for suidfile in lastrun:
-            suidpath = suidfile.strip()
-            if suidfile not in prevrun:
+        for suidpath in lastrun:
+            if suidpath not in prevrun:
                 newfilessincelast.append(suidpath)
-            if suidfile not in firstrun:
+            if suidpath not in firstrun:
                 newfilessinceorigin.append(suidpath)
-            rpmchkval = self.rpmcheck(suidfile)
+            rpmchkval = self.rpmcheck(suidpath)
             if rpmchkval > 3:
                 if suidpath not in suidlist:
                     notknown.append(suidpath)
@@ -834,24 +757,6 @@ find / -xdev -type f \( -perm -0002 -a ! -perm -1000 \) -print'''
             self.suidresults = self.suidresults + '\nSUID files not known by STONIX: ' + strnotknown
             self.suidresults = self.suidresults + ' '
             self.suidresults = self.suidresults + '\nSUID files where current mode does not match the package dbase: ' + strwrongmode
-            if self.findoverrun:
-                self.suidresults = self.suidresults + '''
-WARNING! Large numbers of files with incorrect permissions detected. Please
-conduct a manual check for SUID / SGID files and correct
-permissions as needed.
-
-To find SUID/SGID files:
-find / -xdev \( -perm -04000 -o -perm -02000 \) -print
-'''
-        elif self.findoverrun:
-                self.suidresults = self.suidresults + '''
-WARNING! Large numbers of files with incorrect permissions detected. Please
-conduct a manual check for SUID / SGID files and correct
-permissions as needed.
-
-To find SUID/SGID files:
-find / -xdev \( -perm -04000 -o -perm -02000 \) -print
-'''
         else:
             compliant = True
             self.suidresults = 'No new SUID/SGID files since last run.'
@@ -863,26 +768,16 @@ find / -xdev \( -perm -04000 -o -perm -02000 \) -print
         @author: dkennel
         '''
         compliant = False
-        try:
-            lastrun = open(self.nodbfile, 'r').readlines()
-        except(IOError):
-            lastrun = []
-        prevrun = []
-        if os.path.exists(self.nolast):
-            prevrun = open(self.nolast, 'r').readlines()
-        firstrun = []
-        if os.path.exists(self.noorigin):
-            firstrun = open(self.noorigin, 'r').readlines()
+        lastrun = self.currentresults['unowned']
+        prevrun, firstrun = self.getrunsets('unowned', self.nolast,
+                                            self.noorigin)
         newfilessincelast = []
         newfilessinceorigin = []
-        # Important! lines coming from the files will have newlines unless
-        # they are stripped.
-        for suidfile in lastrun:
-            suidpath = suidfile.strip()
-            if suidfile not in prevrun:
-                newfilessincelast.append(suidpath)
-            if suidfile not in firstrun:
-                newfilessinceorigin.append(suidpath)
+        for nopath in lastrun:
+            if nopath not in prevrun:
+                newfilessincelast.append(nopath)
+            if nopath not in firstrun:
+                newfilessinceorigin.append(nopath)
         strnewfilessincelast = ''
         if len(newfilessincelast) > 15:
             strnewfilessincelast = str(len(newfilessincelast))
@@ -915,24 +810,6 @@ find / -xdev \( -perm -04000 -o -perm -02000 \) -print
             self.unownedresults = 'New Files without owners since last run: ' + strnewfilessincelast
             self.unownedresults = self.unownedresults + ' '
             self.unownedresults = self.unownedresults + 'Files without owners since first run: ' + strnewfilessinceorigin
-            if self.findoverrun:
-                self.suidresults = self.suidresults + '''
-WARNING! Large numbers of files with incorrect permissions detected. Please
-conduct a manual check for unowned files and correct
-permissions as needed.
-
-To find unowned files:
-find / -xdev \( -nouser -o -nogroup \) -print
-'''
-        elif self.findoverrun:
-                self.suidresults = self.suidresults + '''
-WARNING! Large numbers of files with incorrect permissions detected. Please
-conduct a manual check for unowned files and correct
-permissions as needed.
-
-To find unowned files:
-find / -xdev \( -nouser -o -nogroup \) -print
-'''
         else:
             compliant = True
             self.unownedresults = 'No new files without valid owners since last run.'
@@ -1056,6 +933,9 @@ has been called a second time. The previous results are displayed. '''
         """
         rootpath = os.environ["PATH"].split(':')
         pathre = '|'.join(rootpath)
+        # The report that follows the fix reads the inventory again, so each
+        # changed entry is refreshed in it.
+        inventory = getinventory(self.logger, self.environ)
         try:
             self.detailedresults = ""
             if os.path.exists(self.wwdbfile):
@@ -1070,17 +950,18 @@ has been called a second time. The previous results are displayed. '''
                         except (OSError):
                             # catch OSError because we may be NFS or RO
                             continue
+                        inventory.refresh(wwfile)
                     elif os.path.isfile(wwfile) and re.match(pathre, wwfile):
                         # File is in the root users path, remove world write
                         fstat = os.stat(wwfile)
-                        # this call is doing a bitwise exclusive or operation
-                        # on the original file mode to remove the write
-                        # permission from the file
+                        # clear the world write bit from the original file
+                        # mode. The wwfiles list may be older than the file's
+                        # current mode so the bit must never be toggled.
                         self.logger.log(LogPriority.INFO,
                                         ['FilePermissions.fix',
                                          'Removed world write from: ' +
                                          str(wwfile)])
-                        newmode = fstat.st_mode ^ stat.S_IWOTH
+                        newmode = stat.S_IMODE(fstat.st_mode) & ~stat.S_IWOTH
                         self.logger.log(LogPriority.DEBUG,
                                         ['FilePermissions.report',
                                          'Changing mode of ' +
@@ -1092,6 +973,7 @@ has been called a second time. The previous results are displayed. '''
                         except (OSError):
                             # catch OSError because we may be NFS or RO
                             continue
+                        inventory.refresh(wwfile)
         except (KeyboardInterrupt, SystemExit):
             # User initiated exit
             raise
@@ -27,9 +27,9 @@ This InstallVLock object installs the vlock package to enable screen locking
 @change: dkennel 04/18/2014 replaced old-style CI invocation
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
-from ..pkghelper import Pkghelper
 from ..logdispatcher import LogPriority
 from ..rule import Rule
 from ..CommandHelper import CommandHelper
@@ -74,7 +74,7 @@ class InstallVLock(Rule):
            @author: Derek T Walker '''
         try:
             self.detailedresults = ""
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             self.ch = CommandHelper(self.logger)
             vlock = ""
             if self.ph.manager == "yum":
@@ -29,13 +29,13 @@ Created on Aug 9, 2012
 @change: 2014/07/23 dkennel: Added additional services to systemd list based on
 RHEL 7
 @change: 2015/04/15 dkennel: updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 
 import os
 import traceback
 
-from ..ServiceHelper import ServiceHelper
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 
@@ -70,7 +70,7 @@ this rule enabled but some server administrators may want to disable this rule.
         self.detailedresults = '''The MinimizeServices rule has not yet been run.'''
         self.applicable = {'type': 'black',
                            'family': ['darwin']}
-        self.servicehelper = ServiceHelper(self.environ, self.logger)
+        self.servicehelper = self.getservicehelper()
         self.guidance = ['NSA 2.1.2.2', 'NSA 2.2.2.3', 'NSA 2.4.3', 'NSA 3.1',
                          'CCE-3416-5', 'CCE-4218-4', 'CCE-4072-5', 'CCE-4254-9',
                          'CCE-3668-1', 'CCE-4129-3', 'CCE-3679-8', 'CCE-4292-9',
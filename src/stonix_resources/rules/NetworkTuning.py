@@ -32,6 +32,8 @@ Created on Aug 28, 2012
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 variable.
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel audit the running kernel and set only the changed
+parameters through the shared Sysctl instead of reloading sysctl.conf
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import resetsecon, iterate, readFile, writeFile
@@ -77,6 +79,7 @@ class NetworkTuning(Rule):
         else:
             self.networkTuning1 = self.__InitializeNetworkTuning1()
             self.networkTuning2 = self.__InitializeNetworkTuning2()
+        self.resources = ['/etc/sysctl.conf', '/etc/init.d/S70ndd-nettune']
         self.guidance = ["NSA 2.5.1.1", "NSA 2.5.1.2"]
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd'],
@@ -130,6 +133,7 @@ class NetworkTuning(Rule):
         @return: bool'''
         try:
             self.detailedresults = ""
+            self.sysctls = {}
             if self.environ.getosfamily() == "linux":
                 self.path = "/etc/sysctl.conf"
                 self.tmpPath = "/etc/sysctl.conf.tmp"
@@ -246,6 +250,8 @@ class NetworkTuning(Rule):
         else:
             self.detailedresults += "/etc/sysctl.conf is configured " + \
                 "correctly for checked configuration item 1\n"
+        if not self.reportLive(lfc, self.networkTuning1):
+            compliant = False
         if not checkPerms(self.path, [0, 0, 420], self.logger):
             self.detailedresults += "Permissions are incorrect on " + \
                 "/etc/sysctl.con\n"
@@ -279,6 +285,8 @@ class NetworkTuning(Rule):
         else:
             self.detailedresults += "/etc/sysctl.conf is configured " + \
                 "correctly for checked configuration item 2\n"
+        if not self.reportLive(lfc, self.networkTuning2):
+            compliant = False
         if not checkPerms(self.path, [0, 0, 420], self.logger):
             self.detailedresults += "Permissions are incorrect on " + \
                 "/etc/sysctl.con\nf"
@@ -331,6 +339,8 @@ configured correctly\n"
         else:
             self.detailedresults += "/private/etc/sysctl.conf is configured \
 correctly\n"
+        if not self.reportLive(mfc, self.networkTuning2):
+            compliant = False
         if not checkPerms(self.path, [0, 0, 420], self.logger):
             self.detailedresults += "Permissions are incorrect on \
 /private/etc/sysctl.conf\n"
@@ -535,6 +545,8 @@ correctly\n"
                                      "openeq")
         if not self.editor.report():
             compliant = False
+        if not self.reportLive(ffc, self.networkTuning1):
+            compliant = False
         if not checkPerms(self.path, [0, 0, 420], self.logger):
             compliant = False
         return compliant
@@ -560,11 +572,42 @@ correctly\n"
             self.editor.setData(ffc)
         if not self.editor.report():
             compliant = False
+        if not self.reportLive(ffc, self.networkTuning2):
+            compliant = False
         if not checkPerms(self.path, [0, 0, 420], self.logger):
             compliant = False
         return compliant
 ###############################################################################
 
+    def reportLive(self, settings, ci):
+        '''Checks the running kernel values of the given settings. Settings
+        whose configuration item is enabled are remembered so that fix can
+        set the ones that are wrong.
+        @param settings: dict of sysctl parameter to wanted value
+        @param ci: configurationitem object that governs the settings
+        @return: bool
+        @author: dkennel'''
+        if ci.getcurrvalue():
+            self.sysctls.update(settings)
+        wrong = self.getsysctl().audit(settings)
+        for key in sorted(wrong):
+            self.detailedresults += "The running kernel has " + key + \
+                " = " + wrong[key] + ", should be " + settings[key] + "\n"
+        return not wrong
+###############################################################################
+
+    def fixLive(self):
+        '''Sets the kernel parameters remembered by report that are not
+        already set as wanted, instead of reloading all of sysctl.conf.
+        @return: bool
+        @author: dkennel'''
+        if not self.getsysctl().apply(self.sysctls):
+            self.detailedresults += "Unable to set kernel parameters\n"
+            self.logger.log(LogPriority.DEBUG, self.detailedresults)
+            return False
+        return True
+###############################################################################
+
     def fixLinux(self):
         if not checkPerms(self.path, [0, 0, 420], self.logger):
             self.iditerator += 1
@@ -585,16 +628,7 @@ correctly\n"
                 os.chown(self.path, 0, 0)
                 os.chmod(self.path, 420)
                 resetsecon(self.path)
-                cmd = ["/sbin/sysctl", "-q", "-e", "-p"]
-                self.ch.executeCommand(cmd)
-                if self.ch.getReturnCode() != 0:
-                    self.detailedresults += "Unable to restart sysctl\n"
-                    self.logger.log(LogPriority.DEBUG, self.detailedresults)
-                    return False
-                else:
-                    return True
-            else:
-                return True
+            return self.fixLive()
 ##############################################################################
 
     def fixMac(self):
@@ -616,9 +650,7 @@ correctly\n"
                 os.chown(self.path, 0, 0)
                 os.chmod(self.path, 420)
                 resetsecon(self.path)
-                return True
-            else:
-                return True
+            return self.fixLive()
 ###############################################################################
 
     def fixSolaris1(self):
@@ -910,13 +942,4 @@ correctly\n"
                 os.chown(self.path, 0, 0)
                 os.chmod(self.path, 420)
                 resetsecon(self.path)
-                cmd = ["/usr/sbin/service", "sysctl", "restart"]
-                self.ch.executeCommand(cmd)
-                if self.ch.getReturnCode() != 0:
-                    self.detailedresults = "Unable to restart sysctl\n"
-                    self.logger.log(LogPriority.DEBUG, self.detailedresults)
-                    return False
-                else:
-                    return True
-            else:
-                return True
+            return self.fixLive()
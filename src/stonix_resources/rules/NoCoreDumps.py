@@ -30,6 +30,8 @@ Created on Nov 21, 2012
 @change: 2014/07/29 dkennel Rule was setting Linux permissions to mode 600
 which conflicted with DisableIPV6 and NoCoreDumps which expected 644.
 @change: 2015/04/15 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel check the running kernel and set only the changed
+parameters through the shared Sysctl instead of reloading sysctl.conf
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import writeFile, readFile, setPerms, checkPerms
@@ -54,6 +56,8 @@ class NoCoreDumps(Rule):
         self.mandatory = True
         self.helptext = "This rule disables the ability of the system to " + \
         "produce core dump images"
+        self.resources = ['/etc/sysctl.conf', '/etc/security/limits.conf',
+                          '/etc/coreadm.conf']
         self.guidance = ["NSA 2.2.4.2"]
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd'],
@@ -69,6 +73,7 @@ class NoCoreDumps(Rule):
         self.iditerator = 0
         self.created1 = False
         self.created2 = False
+        self.sysctls = {}
 
 ###############################################################################
 
@@ -136,6 +141,9 @@ class NoCoreDumps(Rule):
             compliant = False
         self.editor = KVEditorStonix(self.statechglogger, self.logger, kvtype,
         path, tmpPath, lookfor, intent, "closedeq")
+        self.sysctls = lookfor
+        if not self.reportLive():
+            compliant = False
         if not self.editor.report() or not compliant:
             return False
         else:
@@ -191,11 +199,27 @@ class NoCoreDumps(Rule):
             compliant = False
         self.editor = KVEditorStonix(self.statechglogger, self.logger, kvtype,
         path, tmpPath, lookfor, intent, "openeq")
+        self.sysctls = lookfor
+        if not self.reportLive():
+            compliant = False
         if not self.editor.report() or not compliant:
             return False
         else:
             return True
 
+###############################################################################
+
+    def reportLive(self):
+        '''Checks that the running kernel has the values in self.sysctls
+        @author: dkennel
+        @return: bool
+        '''
+        wrong = self.getsysctl().audit(self.sysctls)
+        for key in sorted(wrong):
+            self.detailedresults += "The running kernel has " + key + \
+            " = " + wrong[key] + ", should be " + self.sysctls[key] + "\n"
+        return not wrong
+
 ###############################################################################
 
     def reportSolaris(self):
@@ -241,11 +265,9 @@ class NoCoreDumps(Rule):
             osfam = self.environ.getosfamily()
             if osfam == "linux":
                 if self.fixLinux1() and self.fixLinux2():
-                    retval = call(["/sbin/sysctl", "-p"],
-                                  stdout=None,
-                                  stderr=None, shell=False)
-                    if retval != 0:
-                        self.detailedresults += "Unable to restart sysctl"
+                    if not self.getsysctl().apply(self.sysctls):
+                        self.detailedresults += "Unable to set kernel " + \
+                        "parameters"
                         self.logger.log(LogPriority.DEBUG,
                                         self.detailedresults)
                         success = False
@@ -391,14 +413,8 @@ class NoCoreDumps(Rule):
         os.chown(path, perms[0], perms[1])
         os.chmod(path, perms[2])
         resetsecon(path)
-        if self.environ.getostype() == "Mac OS X":
-            cmd = "/usr/sbin/sysctl"
-        else:
-            cmd = "/sbin/sysctl"
-        retval = call([cmd, "-p"], stdout=None, stderr=None,
-                                                                   shell=False)
-        if retval != 0:
-            self.detailedresults = "Unable to restart sysctl"
+        if not self.getsysctl().apply(self.sysctls):
+            self.detailedresults = "Unable to set kernel parameters"
             self.logger.log(LogPriority.DEBUG, self.detailedresults)
             success = False
         return success
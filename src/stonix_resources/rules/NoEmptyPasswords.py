@@ -27,6 +27,7 @@ Created on Oct 29, 2012
 @change: 04/18/2014 dkennel Replaced old-style CI invocation.
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/16 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -34,7 +35,6 @@ from ..stonixutilityfunctions import setPerms, checkPerms, readFile, writeFile
 from ..stonixutilityfunctions import getUserGroupName
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from subprocess import call
 import os
 import traceback
@@ -85,7 +85,7 @@ class NoEmptyPasswords(Rule):
             self.ph = ""
             osfamily = self.environ.getosfamily()
             if osfamily == "linux" or osfamily == "solaris":
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 self.shadow = "/etc/shadow"
                 self.passwd = "/etc/passwd"
             elif osfamily() == "freebsd" or osfamily() == "darwin":
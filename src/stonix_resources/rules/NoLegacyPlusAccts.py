@@ -29,13 +29,13 @@ Created on Aug 21, 2012
 @change: 04/18/2014 dkennel Replaced old-style CI invocation
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/16 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import iterate, readFile, writeFile, checkPerms
 from ..stonixutilityfunctions import setPerms, resetsecon, getUserGroupName
-from ..pkghelper import Pkghelper
 import os, re, pwd, grp, traceback #grp is a valid python package
 
 
@@ -85,7 +85,7 @@ class NoLegacyPlusAccts(Rule):
             self.detailedresults = ""
             compliant = True
             self.badfiles = []
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             if self.environ.getostype() == "Mac OS X":
                 filelist = ["/private/etc/master.passwd",
                             "/private/etc/shadow",
@@ -32,6 +32,9 @@ Created on Jun 17, 2013
 @note: May need to be passed to Ekkehard or Roy for Mac portion
 @note: No OS X Implementation blacklisted darwin
 @change: 2015/04/16 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel look uids up in the AccountDB instead of running
+id for every shadow entry
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, writeFile, readFile, resetsecon, getUserGroupName
@@ -40,9 +43,8 @@ from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..KVEditorStonix import KVEditorStonix
 from ..CommandHelper import CommandHelper
-from ..pkghelper import Pkghelper
+from ..AccountDB import getaccountdb
 from time import strftime
-from subprocess import Popen, PIPE
 import traceback
 import re
 import os
@@ -94,7 +96,7 @@ class PasswordExpiration(Rule):
                                                   "LU_SHADOWINACTIVE": "",
                                                   "LU_SHADOWEXPIRE": ""}}
             if self.environ.getosfamily() == "linux":
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 self.specs = {"PASS_MAX_DAYS": "180",
                               "PASS_MIN_DAYS": "7",
                               "PASS_MIN_LEN": "8",
@@ -236,10 +238,7 @@ class PasswordExpiration(Rule):
             contents = readFile(self.shadowfile, self.logger)
             if self.environ.getosfamily() == "solaris" or \
                 self.environ.getosfamily() == "linux":
-                if self.environ.getosfamily() == "linux":
-                    whichid = "/usr/bin/id"
-                elif self.environ.getosfamily() == "solaris":
-                    whichid = "/usr/xpg4/bin/id"
+                accounts = getaccountdb()
                 for line in contents:
                     badacct = False
                     debug = ""
@@ -247,18 +246,8 @@ class PasswordExpiration(Rule):
                         continue
                     if re.search(":", line):
                         field = line.split(":")
-                        cmd = [whichid, "-u", field[0]]
-                        self.ch.executeCommand(cmd)
-                        output = self.ch.getOutputString().strip()
-                        error = self.ch.getError()
-                        if error:
-                            continue
-                        if output:
-                            if output.isdigit():
-                                uid = int(output)
-                            else:
-                                uid = 100
-                        else:
+                        uid = accounts.getuid(field[0])
+                        if uid is None:
                             continue
                         try:
                             if uid >= 500 and not re.search(self.lockedpwds, field[1]):
@@ -307,14 +296,8 @@ class PasswordExpiration(Rule):
                         continue
                     if re.search(':', line):
                         field = line.split(':')
-                        message = Popen(['/usr/bin/id', '-u', field[0]],
-                                           stderr=PIPE, stdout=PIPE, shell=False)
-                        uid = message.stdout.readline()
-                        uid = uid.strip()
-                        message.stdout.close()
-                        if uid.isdigit():
-                            uid = int(uid)
-                        else:
+                        uid = getaccountdb().getuid(field[0])
+                        if uid is None:
                             uid = 100
                         try:
                             if uid >= 500 and not re.search(self.lockedpwds, field[1]):
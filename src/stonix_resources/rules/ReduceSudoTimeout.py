@@ -70,6 +70,7 @@ class ReduceSudoTimeout(Rule):
         "for all other platforms. ***Please note, for all systems besides " + \
         "Mac OS X, this rule is disabled by default.  To enable, click " + \
         "the enable box then click save before running fix****"
+        self.resources = ['/etc/sudoers']
         self.guidance = ['N/A']
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd'],
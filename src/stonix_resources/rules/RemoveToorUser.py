@@ -53,6 +53,7 @@ class RemoveToorUser(Rule):
 REMOVETOORUSER to False.'''
         default = True
         self.ci = self.initCi(datatype, key, instructions, default)
+        self.resources = ['/etc/passwd', '/etc/master.passwd']
         self.guidance = []  # !FIXME!
         self.applicable = {'type': 'white',
                            'family': ['freebsd']}
@@ -38,6 +38,7 @@ reference the CI before executing FIX.
     override them. Refactoring rule completely, current implementation doesn't
     check efficiently enough for compliance.
 @change: 2015/04/16 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -50,7 +51,6 @@ from ..stonixutilityfunctions import cloneMeta, readFile, iterate
 from ..stonixutilityfunctions import setPerms, checkPerms, writeFile, resetsecon, createFile
 from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 
 
 class ReqAuthSingleUserMode(Rule):
@@ -104,7 +104,7 @@ single-user mode, set the value of REQAUTHSINGLEUSERMODE to False.'''
         compliant = True
         try:
             self.detailedresults = ""
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             #apt-get and zypper like systems automatically require a password
             #for single user mode and there is no way to disable it
             if not self.ph.manager == "apt-get" and not self.ph.manager == \
@@ -38,6 +38,7 @@ was not checked before exectuing fix()
 @change: 2015/04/17 dkennel updated for new isApplicable
 @change: 2015/04/28 dkennel changed default2 for ci2 to "root@localhost".
     Original had local domain name appended which provides no value.
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -46,7 +47,6 @@ from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import checkPerms, setPerms
 from ..stonixutilityfunctions import writeFile, readFile, iterate, resetsecon
-from ..pkghelper import Pkghelper
 import os
 from re import search
 import traceback
@@ -74,6 +74,7 @@ class RootMailAlias(Rule):
         self.mandatory = True
         self.helptext = '''Set an alias for root mail on the system so that \
 it is read by an actual human.'''
+        self.resources = ['/etc/aliases', 'pkgdb']
         self.guidance = ['none']
 
         datatype = 'bool'
@@ -109,7 +110,7 @@ receive root mail for this system.'''
         try:
             self.detailedresults = ""
             compliant = True
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             fp = "/etc/aliases"
             email = self.ci2.getcurrvalue()
             if email:
@@ -29,6 +29,7 @@ Created on Mar 12, 2013
 @change: 02/16/2014 ekkehard Implemented isapplicable
 @change: 04/18/2014 ekkehard ci updates
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, checkPerms, setPerms, resetsecon
@@ -37,7 +38,6 @@ from ..rule import Rule
 from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
 from ..KVEditorStonix import KVEditorStonix
-from ..pkghelper import Pkghelper
 import traceback
 import os
 
@@ -61,6 +61,7 @@ automatically logged out. '''
                               "To disable this rule set the value " + \
                               "of SSHTIMEOUT to False",
                               True)
+        self.resources = ['/etc/ssh/sshd_config', 'pkgdb']
         self.guidance = ['NSA 3.5.2.3']
         self.iditerator = 0
         self.editor = ""
@@ -86,7 +87,7 @@ automatically logged out. '''
                 self.path = '/etc/ssh/sshd_config'
                 self.tpath = '/etc/ssh/sshd_config.tmp'
 
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 if self.ph.manager == "zypper":
                     openssh = "openssh"
                 else:
@@ -34,6 +34,7 @@ per day
 @change: 2014/04/30 dkennel Corrected overly greedy regexes
 @change: 2014/09/02 ekkehard self.rootrequired = True & OS X 10.10 compliant
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -41,8 +42,6 @@ from __future__ import absolute_import
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import readFile
-from ..ServiceHelper import ServiceHelper
-from ..pkghelper import Pkghelper
 
 import random
 import os
@@ -77,7 +76,7 @@ and once in a user context per day"
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd'],
                            'os': {'Mac OS X': ['10.9', 'r', '10.10.10']}}
-        self.svchelper = ServiceHelper(self.environ, self.logger)
+        self.svchelper = self.getservicehelper()
 
         # possible locations where the root cron tab may be located
         # (system-dependent)
@@ -303,7 +302,7 @@ the ScheduleStonix rule\n"
 with the ScheduleStonix rule"
             else:
 
-                self.helper = Pkghelper(self.logger, self.environ)
+                self.helper = self.getpkghelper()
                 if not self.cronfilelocation:
                     if self.helper.manager == 'apt-get':
                         self.cronfilelocation = '/var/spool/cron/crontabs/root'
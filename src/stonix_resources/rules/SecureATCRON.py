@@ -76,6 +76,8 @@ these daemons'''
         self.rootrequired = True
         self.detailedresults = 'The SecureATCRON rule has not yet been run'
         self.compliant = False
+        self.resources = ['/etc/at.allow', '/etc/at.deny', '/etc/cron.allow',
+                          '/etc/cron.deny', '/etc/anacrontab', '/etc/crontab']
         self.guidance = ['CIS', 'NSA(3.4)', 'CCE-4644-1', 'CCE-4543-5',
                          'CCE-4437-0', 'CCE-4693-8', 'CCE-4710-0',
                          'CCE-4230-9', 'CCE-4445-3']
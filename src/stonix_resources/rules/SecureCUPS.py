@@ -39,6 +39,7 @@ With this rule, you can:
 @change: 04/21/2014 dkennel Updated CI invocation, fixed bug where master CI
 not referenced before fix.
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -49,8 +50,6 @@ import re
 
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..ServiceHelper import ServiceHelper
-from ..pkghelper import Pkghelper
 from ..KVEditorStonix import KVEditorStonix
 from ..localize import PRINTBROWSESUBNET
 
@@ -362,8 +361,8 @@ DisablePrintBrowsing to True.'
         self.detailedresults = ""
 
         # init helper objects
-        self.svchelper = ServiceHelper(self.environ, self.logger)
-        self.pkghelper = Pkghelper(self.logger, self.environ)
+        self.svchelper = self.getservicehelper()
+        self.pkghelper = self.getpkghelper()
 
         try:
 
@@ -33,6 +33,7 @@ copy of Environment was instantiated, fixed bug where CI was not referenced in
 the Fix method.
 @change: 2014/08/26 Multiple bugs on RHEL 7 fixed.
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -42,7 +43,6 @@ import traceback
 
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
 from ..stonixutilityfunctions import iterate
 
@@ -161,7 +161,7 @@ of users allowed to access ftp and set the default umask for ftp users.
                 self.compliant = self.reportMac()
             else:
                 # only init the pkghelper object if the os is not darwin-based
-                self.pkghelper = Pkghelper(self.logger, self.environ)
+                self.pkghelper = self.getpkghelper()
                 for package in self.packages:
                     if self.pkghelper.check(package):
                         self.ftpdinstalled = True
@@ -29,6 +29,7 @@ Created on May 20, 2013
 @change: 04/21/2014 dkennel Updated CI invocation
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel read /etc/passwd through the shared AccountDB
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, readFile
@@ -36,6 +37,7 @@ from ..rule import Rule
 from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
 from ..CommandHelper import CommandHelper
+from ..AccountDB import getaccountdb
 import traceback
 import os
 import stat
@@ -235,8 +237,8 @@ either group writeable or world readable:\n" + str(badhomes) + "\n"
         else:
             homebase = "/home/"
         #read in /etc/passwd
-        contents = readFile("/etc/passwd", self.logger)
-        if not contents:
+        users = getaccountdb().getusers()
+        if not users:
             self.detailedresults += "the /etc/passwd file is blank.  This \
 rule cannot be run at all.\n"
             self.formatDetailedResults("report", False, self.detailedresults)
@@ -261,22 +263,19 @@ rule cannot be run at all.\n"
             #add home directories found in /etc/passwd
             if not uidmin:
                 uidmin = 100
-            for line in contents:
-                if re.search("^#", line) or re.match("^\s*$", line):
-                    continue
-                if re.search(":", line):
-                    temp = line.split(":")
-                    try:
-                        if re.search("/", temp[5]):
-                            if int(temp[2]) >= uidmin and int(temp[2]) != 65534:
-                                self.homedirs.append(temp[5])
-                        else:
-                            debug = "the /etc/passwd file is not in the \
+            for temp in users:
+                line = ":".join(temp)
+                try:
+                    if re.search("/", temp[5]):
+                        if int(temp[2]) >= uidmin and int(temp[2]) != 65534:
+                            self.homedirs.append(temp[5])
+                    else:
+                        debug = "the /etc/passwd file is not in the \
 correct format as of the line: " + line + "\n"
-                    except IndexError:
-                        compliant = False
-                        debug = traceback.format_exc() + "\n"
-                        debug += "Index out of range on line: " + line + "\n"
+                except IndexError:
+                    compliant = False
+                    debug = traceback.format_exc() + "\n"
+                    debug += "Index out of range on line: " + line + "\n"
 
             #add home directories found
             output = os.listdir(homebase)
@@ -26,6 +26,9 @@ Created on Jan 14, 2014
 @author: dwalker
 @change: 04/21/2014 dkennel Updated CI invocation
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
+@change: 2015/10/18 dkennel check the running kernel and set only the changed
+parameters through the shared Sysctl instead of reloading sysctl.conf
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, setPerms, checkPerms, writeFile
@@ -33,8 +36,6 @@ from ..stonixutilityfunctions import readFile, resetsecon, createFile
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..KVEditorStonix import KVEditorStonix
-from ..CommandHelper import CommandHelper
-from ..pkghelper import Pkghelper
 import traceback
 import os
 import glob
@@ -82,6 +83,7 @@ False.'''
                            'family': ['linux']}
         self.iditerator = 0
         self.created = False
+        self.sysctls = {}
 
     def report(self):
         try:
@@ -124,7 +126,7 @@ False.'''
                    "net.ipv6.conf.default.max_addresses": "1",
                    "net.ipv6.conf.default.accept_ra": "0",
                    "net.ipv6.conf.default.accept_redirect": "0"}
-        self.ph = Pkghelper(self.logger, self.environ)
+        self.ph = self.getpkghelper()
         if self.ph.manager == "yum":
             ifacefile = "/etc/sysconfig/network-scripts/"
             if not os.path.exists(ifacefile):
@@ -166,6 +168,12 @@ False.'''
                 self.detailedresults += "/etc/sysctl file doesn't contain \
 the correct contents\n"
                 compliant = False
+        self.sysctls = sysctls
+        wrong = self.getsysctl().audit(sysctls)
+        for key in sorted(wrong):
+            self.detailedresults += "The running kernel has " + key + \
+                " = " + wrong[key] + ", should be " + sysctls[key] + "\n"
+            compliant = False
         if netwrkfile:
             if os.path.exists(netwrkfile):
                 if not checkPerms(netwrkfile, [0, 0, 420], self.logger):
@@ -309,10 +317,8 @@ the correct contents\n"
                     os.chown(sysctl, 0, 0)
                     os.chmod(sysctl, 420)
                     resetsecon(sysctl)
-                    cmdhelper = CommandHelper(self.logger)
-                    cmd = ["/sbin/sysctl", "-q", "-e", "-p"]
-                    if not cmdhelper.executeCommand(cmd):
-                        success = False
+        if not self.getsysctl().apply(self.sysctls):
+            success = False
         if netwrkfile:
             if not os.path.exists(netwrkfile):
                 if not createFile(netwrkfile, self.logger):
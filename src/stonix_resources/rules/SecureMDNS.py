@@ -40,6 +40,7 @@ configuration changes to the avahi service
 @change: 2014/04/16 ekkehard ci and self.setkvdefaultscurrenthost updates
 @change: 2015/03/17 ekkehard modernized OS X approach
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -49,11 +50,9 @@ import traceback
 import ConfigParser
 import types
 from ..logdispatcher import LogPriority
-from ..ServiceHelper import ServiceHelper
 from ..rule import Rule
 from ..stonixutilityfunctions import iterate
 from ..KVEditorStonix import KVEditorStonix
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
 
 
@@ -100,7 +99,7 @@ the avahi service in order to secure it.'''
         self.ch = CommandHelper(self.logger)
 
 # init helper classes
-        self.sh = ServiceHelper(self.environ, self.logger)
+        self.sh = self.getservicehelper()
 
         if self.environ.getostype() == "Mac OS X":
             self.plb = "/usr/libexec/PlistBuddy"
@@ -195,7 +194,7 @@ the avahi service in order to secure it.'''
             else:
 
                 # set up package helper object only if not mac os x
-                self.pkghelper = Pkghelper(self.logger, self.environ)
+                self.pkghelper = self.getpkghelper()
 
                 # if the disableavahi CI is set, we want to make sure it is
                 # completely disabled
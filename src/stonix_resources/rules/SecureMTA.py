@@ -40,6 +40,7 @@ given instead of the required five.
 @change: 2015/04/17 dkennel updated for new isApplicable
 @change: 2015/04/28 dkennel changed data dictionary in reportpostfix to
 reference localize.py MAILRELAYSERVER instead of static local value.
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -47,7 +48,6 @@ from ..rule import Rule
 from ..stonixutilityfunctions import resetsecon, readFile, iterate, setPerms
 from ..stonixutilityfunctions import checkPerms, writeFile
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..KVEditorStonix import KVEditorStonix
 from ..localize import MAILRELAYSERVER
 import os
@@ -123,7 +123,7 @@ agent, set the value of SECUREMTA to False.'''
         try:
             self.detailedresults = ""
             if not self.environ.operatingsystem == "Mac OS X":
-                self.helper = Pkghelper(self.logger, self.environ)
+                self.helper = self.getpkghelper()
             secure = True
             sndpath = "/etc/mail/sendmail.cf"
             postfixlist = ['postfix', 'squeeze', 'squeeze-backports',
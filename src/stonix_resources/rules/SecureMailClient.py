@@ -29,12 +29,12 @@ dictionary
 @change: 03/25/2014 Original Implementation
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 import re
 from ..ruleKVEditor import RuleKVEditor
 from ..CommandHelper import CommandHelper
-from ..ServiceHelper import ServiceHelper
 from ..localize import APPLEMAILDOMAINFORMATCHING
 
 
@@ -60,7 +60,7 @@ class SecureMailClient(RuleKVEditor):
         self.applicable = {'type': 'white',
                            'os': {'Mac OS X': ['10.9', 'r', '10.10.10']}}
         self.ch = CommandHelper(self.logdispatch)
-        self.sh = ServiceHelper(self.environ, self.logdispatch)
+        self.sh = self.getservicehelper()
         self.addKVEditor("DisableAppleMailURLLoading",
                          "defaults",
                          "~/Library/Preferences/com.apple.mail.plist",
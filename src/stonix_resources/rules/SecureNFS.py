@@ -26,6 +26,7 @@ Created on Mar 11, 2015
 
 @author: dwalker
 @change: 2015/04/14 dkennel - Now using new isApplicable method
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 from ..stonixutilityfunctions import iterate, setPerms, checkPerms
@@ -33,8 +34,6 @@ from ..stonixutilityfunctions import createFile
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..KVEditorStonix import KVEditorStonix
-from ..pkghelper import Pkghelper
-from ..ServiceHelper import ServiceHelper
 import traceback
 import os
 
@@ -68,9 +67,9 @@ class SecureNFS(Rule):
         try:
             compliant = True
             if self.environ.getosfamily() == "linux":
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
 
-            self.sh = ServiceHelper(self.environ, self.logger)
+            self.sh = self.getservicehelper()
             if self.environ.getostype() == "Mac OS X":
                 nfsfile = "/etc/nfs.conf"
                 data1 = {"nfs.lockd.port": "",
@@ -34,6 +34,7 @@ possible. Configure SNMP if necessary.
 @change: 04/21/2014 ekkehard Implemented self.detailedresults flow
 @change: 04/21/2014 ekkehard ci updates and ci fix method implementation
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -44,9 +45,7 @@ import traceback
 from ..rule import Rule
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import getOctalPerms
-from ..ServiceHelper import ServiceHelper
 from ..CommandHelper import CommandHelper
-from ..pkghelper import Pkghelper
 from ..KVEditorStonix import KVEditorStonix
 
 
@@ -125,7 +124,7 @@ possible. Configure SNMP if necessary.'''
 
         # defaults
         secure = True
-        self.svchelper = ServiceHelper(self.environ, self.logger)
+        self.svchelper = self.getservicehelper()
         self.detailedresults = ""
 
         try:
@@ -137,7 +136,7 @@ possible. Configure SNMP if necessary.'''
                 self.logdispatch.log(LogPriority.INFO, self.detailedresults)
                 return self.compliant
 
-            self.pkghelper = Pkghelper(self.logger, self.environ)
+            self.pkghelper = self.getpkghelper()
 
             if self.disablesnmp.getcurrvalue() == True:
                 retval = self.reportDisableSNMP()
@@ -30,6 +30,7 @@ Created on Feb 19, 2013
 @change: 04/21/2014 ekkehard ci updates and ci fix method implementation
 @change: 06/02/2014 dkennel multiple bug fixes for undefined variable issues.
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 from __future__ import absolute_import
 import os
@@ -40,7 +41,6 @@ from ..stonixutilityfunctions import iterate, checkPerms, setPerms, resetsecon
 from ..stonixutilityfunctions import createFile
 from ..KVEditorStonix import KVEditorStonix
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 
 
 class SecureSSH(Rule):
@@ -72,6 +72,8 @@ class SecureSSH(Rule):
                        "of SECURESSH to False"
         default = True
         self.ci = self.initCi(datatype, key, instructions, default)
+        self.resources = ['/etc/ssh/sshd_config', '/etc/ssh/ssh_config',
+                          'pkgdb']
         self.guidance = ['CIS, NSA(3.5.2.1)', 'CCE 4325-7', 'CCE 4726-6',
                     'CCE 4475-0', 'CCE 4370-3', 'CCE 4387-7', 'CCE 3660-8',
                     'CCE 4431-3', 'CCE 14716-5', 'CCE 14491-5']
@@ -112,7 +114,7 @@ class SecureSSH(Rule):
             else:
                 self.path1 = "/etc/ssh/sshd_config"  # server file
                 self.path2 = "/etc/ssh/ssh_config"  # client file
-                self.ph = Pkghelper(self.logger, self.environ)
+                self.ph = self.getpkghelper()
                 
                 #check if openssh-server and clients are installed
                 if self.ph.manager == "yum":
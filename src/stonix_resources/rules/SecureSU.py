@@ -35,6 +35,7 @@ module pam_wheel.so is used to restrict root access to this set of users.
 @change: 03/12/2014 dwalker isapplicable method to fit normal convention
 @change: 04/18/2014 ekkehard ci updates
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -48,7 +49,6 @@ from ..stonixutilityfunctions import resetsecon, writeFile, iterate
 from ..stonixutilityfunctions import checkPerms, setPerms
 from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
 
 
@@ -91,6 +91,7 @@ debian distros specifically."""
                        "SecureSU to False."
         default = True
         self.ci = self.initCi(datatype, key, instructions, default)
+        self.resources = ['/etc/pam.d/su', '/etc/group', 'pkgdb']
         self.guidance = ['CIS', 'NSA 2.3.1.2', 'CCE 4274-7']
         self.iditerator = 0
         self.applicable = {'type': 'white',
@@ -133,7 +134,7 @@ No need to do anything\n"
             self.wheel = True
             self.pamwheel = True
             self.detailedresults = ""
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             if self.ph.manager == "apt-get":
                 if re.search("Debian", self.environ.getostype()):
                     self.compliant = True
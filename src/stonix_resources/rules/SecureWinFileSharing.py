@@ -66,6 +66,9 @@ class SecureWinFileSharing(Rule):
         self.helptext = '''This class will secure samba file sharing'''
         self.rootrequired = True
         self.detailedresults = '''The SecureWinFileSharing rule has not yet been run.'''
+        self.resources = ['/etc/samba/smb.conf', '/etc/sfw/samba/smb.conf',
+                          '/usr/local/etc/smb.conf',
+                          '/usr/local/samba/lib/smb.conf']
         self.guidance = ['']
 
         # init CIs
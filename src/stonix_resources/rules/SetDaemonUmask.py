@@ -79,6 +79,9 @@ for each of the relevant config files and sets the process daemon umask to 022 \
 (0022) to prevent world writability/readability on the system.'
         self.rootrequired = True
         self.detailedresults = 'The SetDaemonUmask rule has not yet been run'
+        self.resources = ['/etc/sysconfig/init', '/etc/default/init',
+                          '/etc/login.defs', '/etc/pam.d/common-session',
+                          '/etc/launchd.conf']
         self.guidance = ['CCE 4220-0']
 
         # init CIs
@@ -80,6 +80,9 @@ class SetDefaultUserUmask(Rule):
         " Mac OS X will have the umask set to 022 because it breaks with " + \
         "stricter settings."
         self.rootrequired = True
+        self.resources = ['/etc/profile', '/etc/bashrc', '/etc/bash.bashrc',
+                          '/etc/csh.cshrc', '/etc/csh.login', '/etc/zshrc',
+                          '/etc/login.conf', '/etc/launchd-user.conf']
         self.guidance = ['CIS', 'NSA(2.3.4.4)', 'CCE-3844-8', 'CCE-4227-5',
                          'CCE-3870-3', 'CCE-4737-6']
 
@@ -31,6 +31,7 @@ The SetNTP class configures ntp for each client.
 @change: 2014/08/27 - ekkehard - added self.ss = "/usr/sbin/systemsetup" to make sure we use the full path
 @change: 08/27/2014 bemalmbe added colons after each docblock parameter
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -40,7 +41,6 @@ import traceback
 
 from ..rule import Rule
 from ..logdispatcher import LogPriority
-from ..pkghelper import Pkghelper
 from ..stonixutilityfunctions import iterate
 from ..localize import NTPSERVERSINTERNAL
 from ..localize import NTPSERVERSEXTERNAL
@@ -228,7 +228,7 @@ class SetNTP(Rule):
 
         # defaults
         retval = False
-        self.ph = Pkghelper(self.logger, self.environ)
+        self.ph = self.getpkghelper()
         self.useschrony = self.parseVersion()
 
         try:
@@ -72,6 +72,7 @@ class SetRootDefaults(Rule):
                               "home directory and group, set the " + \
                               "value of SetRootDefaults to False.",
                               True)
+        self.resources = ['/etc/passwd']
         self.guidance = ['CIS', 'cce-4834-8']
         self.isApplicableWhiteList = ["solaris"]
         self.isApplicableBlackList = ["darwin",
@@ -29,6 +29,7 @@ Created on Oct 15, 2013
 @change: 02/12/2014 ekkehard Implemented isapplicable
 @change: 04/18/2014 ekkehard ci updates and ci fix method implementation
 @change: 2015/04/17 dkennel updated for new isApplicable
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -38,7 +39,6 @@ from ..rule import Rule
 from ..configurationitem import ConfigurationItem
 from ..logdispatcher import LogPriority
 from ..stonixutilityfunctions import *
-from ..pkghelper import Pkghelper
 from ..environment import Environment
 
 
@@ -89,7 +89,7 @@ class SetupLogwatch(Rule):
         try:
             self.detailedresults = ""
             self.compliant = False
-            self.ph = Pkghelper(self.logger, self.environ)
+            self.ph = self.getpkghelper()
             if self.ph.check('logwatch'):
                 self.compliant = True
         except (KeyboardInterrupt, SystemExit):
@@ -77,6 +77,7 @@ class SymlinkDangerFiles(Rule):
         " Note that no undo operation is permitted for this rule due to " + \
         "security reasons."
         self.rootrequired = True
+        self.resources = ['/etc/hosts.equiv', '/etc/shosts.equiv']
         self.guidance = ['CIS RHEL 5 Benchmark Appendix A SN.1']
         self.applicable = {'type': 'white',
                            'family': ['linux', 'solaris', 'freebsd'],
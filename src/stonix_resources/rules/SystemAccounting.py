@@ -30,6 +30,7 @@ activity (password crackers and other CPU-intensive jobs, and activity outside o
 due to departures from the normal system performance curve.
 
 @author: Breen Malmberg
+@change: 2015/10/18 dkennel use the shared helpers from the HelperRegistry
 '''
 
 from __future__ import absolute_import
@@ -39,7 +40,6 @@ import os
 import re
 
 from ..rule import Rule
-from ..pkghelper import Pkghelper
 from ..CommandHelper import CommandHelper
 from ..logdispatcher import LogPriority
 
@@ -163,7 +163,7 @@ class SystemAccounting(Rule):
         '''
 
         if ostype == 'linux':
-            self.pkghelper = Pkghelper(self.logger, self.environ)
+            self.pkghelper = self.getpkghelper()
             self.cmdhelper = CommandHelper(self.logger)
         else:
             self.cmdhelper = CommandHelper(self.logger)
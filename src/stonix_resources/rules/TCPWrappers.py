@@ -82,6 +82,7 @@ class TCPWrappers(Rule):
         (see Section 3.2.1), TCPWrappers supports only services which were
         built to make use of the libwrap library.'''
         self.rootrequired = True
+        self.resources = ['/etc/hosts.allow', '/etc/hosts.deny']
         self.guidance = ['CIS', 'NSA(2.5.4)', '4434-7']
         self.isApplicableWhiteList = []
         self.isApplicableBlackList = ["darwin"]
@@ -73,6 +73,8 @@ class VerifyAccPerms(Rule):
                               "permissions, set the value of " + \
                               "VerifyAccPerms to False.",
                               True)
+        self.resources = ['/etc/passwd', '/etc/group', '/etc/shadow',
+                          '/etc/gshadow']
         self.guidance = ['CIS', 'NSA 2.2.3.1', 'CCE 3988-3', 'CCE 3883-6',
                          'CCE 3276-3', 'CCE 3932-1', 'CCE 4064-2',
                          'CCE 4210-1', 'CCE 3918-0', 'CCE 3566-7',
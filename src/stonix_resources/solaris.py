@@ -143,6 +143,31 @@ class Solaris(object):
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.INFO,
                             ["Solaris.check",self.detailedresults])   
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed package instances from a single
+        pkginfo call. Return None if pkginfo could not be run.
+
+        @return: set or None
+        @author: dkennel'''
+        try:
+            self.ch.executeCommand([self.info.strip()])
+            if self.ch.getReturnCode() != 0:
+                return None
+            installed = set()
+            for line in self.ch.getOutput():
+                fields = line.split()
+                if len(fields) > 1:
+                    installed.add(fields[1])
+            return installed
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception, err:
+            print err
+            self.detailedresults = traceback.format_exc()
+            self.logger.log(LogPriority.INFO,
+                            ["Solaris.getInstalled",self.detailedresults])
+            return None
 ###############################################################################
     def checkAvailable(self,package):
         pass
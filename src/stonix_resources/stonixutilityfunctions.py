@@ -60,6 +60,7 @@ from environment import Environment
 from subprocess import call, Popen, PIPE, STDOUT
 import urllib2
 from logdispatcher import LogPriority
+from ConfigCache import getlines, invalidate
 # from twisted.python.procutils import which
 
 # =========================================================================== #
@@ -1027,18 +1028,15 @@ def readFile(filepath, logger):
     @author: dwalker
     @param filepath: string
     @param logger: logger object
-    @return: list  '''
-    contents = []
+    @return: list
+    @change: 2015/10/18 dkennel read through the ConfigCache'''
     try:
-        f = open(filepath, 'r')
+        contents = getlines(filepath)
     except IOError:
         detailedresults = "unable to open the specified file"
         detailedresults += traceback.format_exc()
         logger.log(LogPriority.DEBUG, detailedresults)
         return []
-    for line in f:
-        contents.append(line)
-    f.close()
     return contents
 ###############################################################################
 
@@ -1049,7 +1047,8 @@ def writeFile(tmpfile, contents, logger):
     @param tmpfile: string
     @param contents: string
     @param logger: logger object
-    @return: bool'''
+    @return: bool
+    @change: 2015/10/18 dkennel drop the file from the ConfigCache'''
     debug = ""
     try:
         w = open(tmpfile, "w")
@@ -1066,6 +1065,7 @@ def writeFile(tmpfile, contents, logger):
         logger.log(LogPriority.DEBUG, debug)
         return False
     w.close()
+    invalidate(tmpfile)
     return True
 ###############################################################################
 
@@ -25,6 +25,7 @@ import traceback
 from logdispatcher import LogPriority
 from subprocess import Popen,call,PIPE
 from CommandHelper import CommandHelper
+import rpmquery
 import re
 class Yum(object):
 
@@ -65,6 +66,31 @@ class Yum(object):
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
             raise(self.detailedresults)
+###############################################################################
+    def installpackages(self, packages):
+        '''Install several packages in a single yum transaction. Return a
+        bool indicating success or failure.
+        @param list packages : Names of the packages to be installed, must be
+        recognizable to the underlying package manager.
+        @return bool :
+        @author: dkennel'''
+        try:
+            installed = False
+            names = " ".join(packages)
+            self.ch.executeCommand(self.install + names)
+            if self.ch.getReturnCode() == 0:
+                installed = True
+                self.detailedresults = names + " pkgs installed successfully\n"
+            else:
+                self.detailedresults = names + " pkgs not able to install\n"
+            self.logger.log(LogPriority.DEBUG,self.detailedresults)
+            return installed
+        except(KeyboardInterrupt,SystemExit):
+            raise
+        except Exception:
+            self.detailedresults = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, self.detailedresults)
+            raise
 ###############################################################################
     def removepackage(self, package):
         '''Remove a package. Return a bool indicating success or failure.
@@ -116,6 +142,14 @@ class Yum(object):
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
             raise(self.detailedresults)
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed packages using a single rpm query,
+        see rpmquery.getinstalled. Return None if rpm could not be queried.
+
+        @return: set or None
+        @author: dkennel'''
+        return rpmquery.getinstalled(self.ch, self.logger)
 ###############################################################################
     def checkAvailable(self,package):
         try:
@@ -25,6 +25,7 @@ import traceback
 from logdispatcher import LogPriority
 from re import search
 from CommandHelper import CommandHelper
+import rpmquery
 
 
 class Zypper(object):
@@ -80,6 +81,38 @@ class Zypper(object):
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
 
+###############################################################################
+    def installpackages(self, packages):
+        '''Install several packages in a single zypper transaction. Return a
+        bool indicating success or failure.
+        @param list packages : Names of the packages to be installed, must be
+            recognizable to the underlying package manager.
+        @return: bool
+        @author: dkennel
+        '''
+        try:
+            installed = False
+            names = " ".join(packages)
+            self.ch.executeCommand(self.install + names)
+            output = self.ch.getOutputString()
+            if self.ch.getReturnCode() == 0:
+                if search("Abort, retry, ignore", output):
+                    self.detailedresults += "There is an error contacting " + \
+                    "one or more repos, aborting\n"
+                    return False
+                self.detailedresults += names + " pkgs installed successfully\n"
+                installed = True
+            else:
+                self.detailedresults += names + " pkgs not able to install\n"
+            self.logger.log(LogPriority.INFO, self.detailedresults)
+            return installed
+        except(KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            self.detailedresults = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, self.detailedresults)
+            return False
+
 ###############################################################################
     def removepackage(self, package):
         '''Remove a package. Return a bool indicating success or failure.
@@ -161,6 +194,14 @@ misspelled\n"
             self.detailedresults = traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
 
+###############################################################################
+    def getInstalled(self):
+        '''Return the set of installed packages using a single rpm query,
+        see rpmquery.getinstalled. Return None if rpm could not be queried.
+
+        @return: set or None
+        @author: dkennel'''
+        return rpmquery.getinstalled(self.ch, self.logger)
 ###############################################################################
     def checkAvailable(self, package):
         '''
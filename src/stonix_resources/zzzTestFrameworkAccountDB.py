@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import tempfile
+import unittest
+import ConfigCache
+from AccountDB import AccountDB
+
+PASSWD = '''# local accounts
+root:x:0:0:root:/root:/bin/bash
+daemon:x:1:1:daemon:/usr/sbin:/sbin/nologin
+
+alice:x:1000:1000:Alice:/home/alice:/bin/bash
+bob:x:1001:1001:Bob:/home/bob:/bin/bash
+toor:x:0:0:root:/root:/bin/sh
+alice:x:1002:1002:Alice:/home/alice2:/bin/bash
++@netgroup
+broken:x:abc
+'''
+
+SHADOW = '''root:!:16000:0:99999:7:::
+alice:$6$salt$hash:16000:1:90:7:::
+'''
+
+GROUP = '''root:x:0:
+wheel:x:10:alice,bob
+users:x:100:
+staff:x:100:
+'''
+
+
+class zzzTestFrameworkAccountDB(unittest.TestCase):
+
+    def setUp(self):
+        ConfigCache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.passwd = self.writefile('passwd', PASSWD)
+        self.shadow = self.writefile('shadow', SHADOW)
+        self.group = self.writefile('group', GROUP)
+        self.accounts = AccountDB(self.passwd, self.shadow, self.group)
+
+    def tearDown(self):
+        ConfigCache.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def writefile(self, name, data):
+        path = os.path.join(self.tmpdir, name)
+        whandle = open(path, 'w')
+        whandle.write(data)
+        whandle.close()
+        return path
+
+    def testUsers(self):
+        users = self.accounts.getusers()
+        self.assertEqual(len(users), 7)
+        self.assertEqual(users[0][0], 'root')
+        self.assertEqual(users[-1], ('broken', 'x', 'abc'))
+        self.assertEqual(self.accounts.getuser('alice')[5], '/home/alice')
+        self.assertEqual(self.accounts.getuser('nobody-here'), None)
+        self.assertEqual([entry[0] for entry in
+                          self.accounts.getusersbyuid(0)], ['root', 'toor'])
+
+    def testGetUid(self):
+        self.assertEqual(self.accounts.getuid('bob'), 1001)
+        self.assertEqual(self.accounts.getuid('alice'), 1000)
+        self.assertEqual(self.accounts.getuid('broken'), None)
+        self.assertEqual(self.accounts.getuid('stonix-no-such-user'), None)
+        self.failUnless('stonix-no-such-user' in self.accounts.nsscache)
+
+    def testNameServiceFallback(self):
+        accounts = AccountDB(os.path.join(self.tmpdir, 'missing'),
+                             self.shadow, self.group)
+        self.assertEqual(accounts.getusers(), [])
+        self.assertEqual(accounts.getuid('root'), 0)
+        self.assertEqual(accounts.nsscache, {'root': 0})
+
+    def testHomeDirs(self):
+        homedirs = self.accounts.gethomedirs(1000)
+        self.assertEqual(homedirs, [('alice', 1000, '/home/alice'),
+                                    ('bob', 1001, '/home/bob'),
+                                    ('alice', 1002, '/home/alice2')])
+        self.assertEqual(len(self.accounts.gethomedirs()), 6)
+
+    def testShadowAndGroups(self):
+        self.assertEqual(self.accounts.getshadowentry('alice')[4], '90')
+        self.assertEqual(self.accounts.getshadowentry('bob'), None)
+        self.assertEqual(len(self.accounts.getshadowentries()), 2)
+        self.assertEqual(self.accounts.getgroup('wheel')[3], 'alice,bob')
+        self.assertEqual([entry[0] for entry in
+                          self.accounts.getgroupsbygid(100)],
+                         ['users', 'staff'])
+        self.assertEqual(len(self.accounts.getgroups()), 4)
+
+    def testDuplicates(self):
+        duplicates = self.accounts.getduplicates(self.passwd)
+        self.assertEqual([(kind, entry[0]) for kind, entry in duplicates],
+                         [('id', 'toor'), ('name', 'alice')])
+        duplicates = self.accounts.getduplicates(self.group)
+        self.assertEqual([(kind, entry[0]) for kind, entry in duplicates],
+                         [('id', 'staff')])
+
+    def testFileChanges(self):
+        self.assertEqual(self.accounts.getuid('carol'), None)
+        tmppath = self.passwd + '.tmp'
+        whandle = open(tmppath, 'w')
+        whandle.write(PASSWD + 'carol:x:1003:1003::/home/carol:/bin/sh\n')
+        whandle.close()
+        os.rename(tmppath, self.passwd)
+        self.assertEqual(self.accounts.getuser('carol')[2], '1003')
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+'''
+Created on Oct 13, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import unittest
+import time
+from CommandHelper import CommandHelper
+
+
+class FakeLogger(object):
+    '''
+    Collects log messages instead of dispatching them.
+    '''
+
+    def __init__(self):
+        self.messages = []
+
+    def log(self, priority, msg):
+        self.messages.append((priority, msg))
+
+
+class zzzTestFrameworkCommandHelper(unittest.TestCase):
+
+    def setUp(self):
+        self.ch = CommandHelper(FakeLogger())
+
+    def tearDown(self):
+        pass
+
+    def testLargeOutput(self):
+        # More than a pipe buffer on both streams must not hang
+        command = "i=0; while [ $i -lt 20000 ]; do echo outputline; " + \
+            "echo errorline >&2; i=$((i+1)); done"
+        self.assertTrue(self.ch.executeCommand(command))
+        self.assertEqual(len(self.ch.getOutput()), 20000)
+        self.assertEqual(len(self.ch.getError()), 20000)
+        self.assertEqual(self.ch.getReturnCode(), 0)
+
+    def testTimeout(self):
+        self.ch.setTimeout(1)
+        start = time.time()
+        self.assertFalse(self.ch.executeCommand("sleep 10; echo done"))
+        self.assertTrue(self.ch.getTimedOut())
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(self.ch.getOutput(), [])
+
+    def testStream(self):
+        lines = list(self.ch.executeCommandStream(["printf", "a\\nb\\n"]))
+        self.assertEqual(lines, ["a\n", "b\n"])
+        self.assertEqual(self.ch.getReturnCode(), 0)
+        # Standard out closed before the command exits
+        lines = list(self.ch.executeCommandStream(["sh", "-c",
+                                                   "echo a; exec 1>&-; " +
+                                                   "sleep 0.1; exit 3"]))
+        self.assertEqual(lines, ["a\n"])
+        self.assertEqual(self.ch.getReturnCode(), 3)
+
+    def testFindInStream(self):
+        start = time.time()
+        self.assertTrue(self.ch.findInStream("^5$", "seq 1 100000000"))
+        self.assertTrue(time.time() - start < 5)
+        self.assertFalse(self.ch.findInStream("nomatch", ["echo", "abc"]))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
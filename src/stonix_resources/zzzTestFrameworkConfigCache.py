@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import tempfile
+import unittest
+import ConfigCache
+
+
+class zzzTestFrameworkConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        ConfigCache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'test.conf')
+        self.writeconf('key1 = orange\nkey2 = lemon\n')
+        self.calls = 0
+
+    def tearDown(self):
+        ConfigCache.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def writeconf(self, data):
+        tmppath = self.path + '.tmp'
+        whandle = open(tmppath, 'w')
+        whandle.write(data)
+        whandle.close()
+        os.rename(tmppath, self.path)
+
+    def countkeys(self, lines):
+        self.calls = self.calls + 1
+        return len(lines)
+
+    def testGetLines(self):
+        lines = ConfigCache.getlines(self.path)
+        self.assertEqual(lines, ['key1 = orange\n', 'key2 = lemon\n'])
+        lines.append('key3 = lime\n')
+        self.assertEqual(len(ConfigCache.getlines(self.path)), 2,
+                         'Cached lines modified through a returned copy')
+        self.writeconf('key1 = orange\n')
+        self.assertEqual(ConfigCache.getlines(self.path), ['key1 = orange\n'])
+        self.assertRaises(IOError, ConfigCache.getlines,
+                          os.path.join(self.tmpdir, 'missing'))
+
+    def testGetParsed(self):
+        self.assertEqual(ConfigCache.getparsed(self.path, self.countkeys), 2)
+        self.assertEqual(ConfigCache.getparsed(self.path, self.countkeys), 2)
+        self.assertEqual(self.calls, 1, 'File parsed more than once')
+        self.writeconf('key1 = orange\nkey2 = lemon\nkey3 = lime\n')
+        self.assertEqual(ConfigCache.getparsed(self.path, self.countkeys), 3)
+        ConfigCache.invalidate(self.path)
+        self.assertEqual(ConfigCache.getparsed(self.path, self.countkeys), 3)
+        self.assertEqual(self.calls, 3)
+
+    def testGetLinesParsed(self):
+        lines, parsed = ConfigCache.getlinesparsed(self.path, self.countkeys)
+        self.assertEqual(lines, ['key1 = orange\n', 'key2 = lemon\n'])
+        self.assertEqual(parsed, 2)
+        self.assertEqual(ConfigCache.getparsed(self.path, self.countkeys), 2)
+        self.assertEqual(self.calls, 1, 'File parsed more than once')
+
+    def testPseudoFiles(self):
+        if not os.path.exists('/proc/self/status'):
+            return
+        ConfigCache.getlines('/proc/self/status')
+        self.failIf('/proc/self/status' in ConfigCache.CACHE,
+                    'File from /proc cached')
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,173 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import asyncore
+import os
+import shutil
+import smtpd
+import tempfile
+import threading
+import unittest
+import BaseHTTPServer
+import DeliveryQueue
+
+
+class MailStandIn(smtpd.SMTPServer):
+    '''
+    Local SMTP server that keeps the messages it is sent.
+    '''
+
+    def __init__(self):
+        smtpd.SMTPServer.__init__(self, ('127.0.0.1', 0), None)
+        self.messages = []
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.messages.append((mailfrom, rcpttos, data))
+
+
+class UploadStandIn(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''
+    Local report server that answers like results.php.
+    '''
+
+    def do_POST(self):
+        length = int(self.headers.getheader('content-length', 0))
+        self.server.uploads.append(self.rfile.read(length))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write('ok results/127.0.0.1-1.xml\n')
+
+    def log_message(self, *args):
+        pass
+
+
+class zzzTestFrameworkDeliveryQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.spooldir = os.path.join(self.tmpdir, 'spool')
+        self.mailserver = MailStandIn()
+        self.mailthread = threading.Thread(target=asyncore.loop,
+                                           kwargs={'timeout': 0.1})
+        self.mailthread.daemon = True
+        self.mailthread.start()
+        self.httpserver = BaseHTTPServer.HTTPServer(('127.0.0.1', 0),
+                                                    UploadStandIn)
+        self.httpserver.uploads = []
+        self.httpthread = threading.Thread(
+            target=self.httpserver.serve_forever)
+        self.httpthread.daemon = True
+        self.httpthread.start()
+        self.queue = self.makequeue(self.mailserver.socket.getsockname()[1],
+                                    self.httpserver.server_address[1])
+
+    def tearDown(self):
+        self.queue.close(5)
+        self.mailserver.close()
+        self.httpserver.shutdown()
+        self.httpserver.server_close()
+        shutil.rmtree(self.tmpdir)
+
+    def makequeue(self, mailport, httpport):
+        return DeliveryQueue.DeliveryQueue(
+            self.spooldir, '127.0.0.1:' + str(mailport),
+            'stonix-err@example.com', 'dev1@example.com, dev2@example.com',
+            'http://127.0.0.1:' + str(httpport) + '/stonix/results.php')
+
+    def testDigest(self):
+        self.queue.adderror('rule:fix:', 'first failure')
+        self.queue.adderror('rule:fix:', 'first failure')
+        self.queue.adderror('rule:report:', 'second failure')
+        self.assertEqual(self.queue.geterrorcount(), 3)
+        self.assertTrue(self.queue.spooldigest('host1'))
+        self.assertFalse(self.queue.spooldigest('host1'))
+        self.queue.close(10)
+        self.assertEqual(self.queue.getspool(), [])
+        self.assertEqual(len(self.mailserver.messages), 1)
+        mailfrom, rcpttos, data = self.mailserver.messages[0]
+        self.assertEqual(mailfrom, 'stonix-err@example.com')
+        self.assertEqual(rcpttos, ['dev1@example.com', 'dev2@example.com'])
+        self.assertTrue('Subject: STONIX Error Report: 3 errors' in data)
+        self.assertTrue('rule:fix: (repeated 2 times)' in data)
+        self.assertTrue('second failure' in data)
+
+    def testBounded(self):
+        for count in range(DeliveryQueue.MAXERRORS + 5):
+            self.queue.adderror('rule:fix:', 'failure ' + str(count))
+        self.assertEqual(self.queue.geterrorcount(),
+                         DeliveryQueue.MAXERRORS + 5)
+        self.queue.spooldigest('host1')
+        self.queue.close(10)
+        data = self.mailserver.messages[0][2]
+        self.assertTrue('5 further errors were not included' in data)
+
+    def testUpload(self):
+        report = os.path.join(self.tmpdir, 'stonix-xmlreport.xml')
+        whandle = open(report, 'w')
+        whandle.write('<run>\n</run>\n')
+        whandle.close()
+        self.queue.spoolreport(report, keep=True)
+        self.assertTrue(os.path.exists(report))
+        self.queue.close(30)
+        self.assertEqual(self.queue.getspool(), [])
+        self.assertEqual(len(self.httpserver.uploads), 1)
+        self.assertTrue('<run>' in self.httpserver.uploads[0])
+
+    def testOffline(self):
+        # Nothing listens on the closed ports so delivery fails and the
+        # files stay spooled for the next queue.
+        offline = self.makequeue(self.closedport(), self.closedport())
+        offline.adderror('rule:fix:', 'failure')
+        offline.spooldigest('host1')
+        report = os.path.join(self.tmpdir, 'stonix-xmlreport.xml')
+        whandle = open(report, 'w')
+        whandle.write('<run>\n</run>\n')
+        whandle.close()
+        offline.spoolreport(report)
+        self.assertFalse(os.path.exists(report))
+        offline.close(30)
+        spooled = offline.getspool()
+        self.assertEqual(len(spooled), 2)
+        self.assertTrue(spooled[0].endswith('.mail'))
+        self.assertTrue(spooled[1].endswith('.xml'))
+        self.assertEqual(self.queue.deliver(), 2)
+        self.assertEqual(self.queue.getspool(), [])
+        self.assertEqual(len(self.mailserver.messages), 1)
+        self.assertEqual(len(self.httpserver.uploads), 1)
+
+    def closedport(self):
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), UploadStandIn)
+        port = server.server_address[1]
+        server.server_close()
+        return port
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,171 @@
+#! /usr/bin/env python
+'''
+Created on Oct 5, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import unittest
+import os
+import shutil
+import stat
+import tempfile
+import FSInventory
+
+
+class FakeLogger(object):
+    '''
+    Collects log messages instead of dispatching them.
+    '''
+
+    def __init__(self):
+        self.messages = []
+
+    def log(self, priority, msg):
+        self.messages.append((priority, msg))
+
+
+class zzzTestFrameworkFSInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.testdir = tempfile.mkdtemp()
+        self.wwdir = os.path.join(self.testdir, 'wwdir')
+        os.mkdir(self.wwdir)
+        os.chmod(self.wwdir, 0777)
+        self.wwfile = os.path.join(self.testdir, 'wwfile')
+        open(self.wwfile, 'w').close()
+        os.chmod(self.wwfile, 0666)
+        self.suidfile = os.path.join(self.wwdir, 'suidfile')
+        open(self.suidfile, 'w').close()
+        os.chmod(self.suidfile, 04755)
+        self.plainfile = os.path.join(self.testdir, 'plainfile')
+        open(self.plainfile, 'w').close()
+        os.chmod(self.plainfile, 0644)
+        self.link = os.path.join(self.testdir, 'link')
+        os.symlink(self.plainfile, self.link)
+        self.to = FSInventory.FSInventory(FakeLogger(), None)
+        self.to.scan(filesystems=[self.testdir])
+
+    def tearDown(self):
+        shutil.rmtree(self.testdir)
+
+    def testScanCount(self):
+        self.assertTrue(self.to.isscanned())
+        self.assertEqual(len(self.to.paths), 5)
+
+    def testWorldWritable(self):
+        self.assertEqual(sorted(self.to.worldwritable()),
+                         sorted([self.wwdir, self.wwfile]))
+
+    def testSuid(self):
+        self.assertEqual(self.to.suid(), [self.suidfile])
+
+    def testGetEntry(self):
+        entry = self.to.getentry(self.plainfile)
+        self.assertEqual(stat.S_IMODE(entry[0]), 0644)
+        self.assertEqual(entry[1], os.stat(self.plainfile).st_uid)
+        self.assertEqual(self.to.getentry('/no/such/path'), None)
+
+    def testRefresh(self):
+        os.chmod(self.wwfile, 0644)
+        self.assertTrue(self.wwfile in self.to.worldwritable())
+        self.assertTrue(self.to.refresh(self.wwfile))
+        self.assertEqual(self.to.worldwritable(), [self.wwdir])
+        self.assertFalse(self.to.refresh(os.path.join(self.testdir, 'gone')))
+
+    def testUnowned(self):
+        self.assertEqual(self.to.unowned(), [])
+        if os.geteuid() == 0:
+            os.chown(self.plainfile, 54321, 54321)
+            self.to.scan(filesystems=[self.testdir], rescan=True)
+            self.assertEqual(self.to.unowned(), [self.plainfile])
+
+    def testScanOnce(self):
+        open(os.path.join(self.testdir, 'newfile'), 'w').close()
+        self.assertEqual(self.to.scan(filesystems=[self.testdir]), 5)
+        self.assertEqual(self.to.scan(filesystems=[self.testdir],
+                                      rescan=True), 6)
+
+    def testIndexReuse(self):
+        indexfile = os.path.join(tempfile.mkdtemp(), 'fsindex.db')
+        try:
+            self.to.scan(filesystems=[self.testdir], rescan=True,
+                         indexfile=indexfile)
+            self.assertEqual(self.to.reused, 0)
+            self.to.setresults('ww', self.to.worldwritable())
+            self.assertTrue(self.to.saveindex())
+            newfile = os.path.join(self.wwdir, 'newfile')
+            open(newfile, 'w').close()
+            os.chmod(newfile, 0666)
+            inventory = FSInventory.FSInventory(FakeLogger(), None)
+            inventory.scan(filesystems=[self.testdir], indexfile=indexfile)
+            # Only wwdir changed, the top directory comes from the index.
+            self.assertEqual(inventory.reused, 1)
+            self.assertEqual(len(inventory.paths), 6)
+            self.assertEqual(sorted(inventory.worldwritable()),
+                             sorted([self.wwdir, self.wwfile, newfile]))
+            self.assertEqual(inventory.getprevious('ww'),
+                             set([self.wwdir, self.wwfile]))
+            self.assertEqual(inventory.getorigin('ww'),
+                             set([self.wwdir, self.wwfile]))
+        finally:
+            shutil.rmtree(os.path.dirname(indexfile))
+
+    def testIndexModeChange(self):
+        indexfile = os.path.join(tempfile.mkdtemp(), 'fsindex.db')
+        try:
+            self.to.scan(filesystems=[self.testdir], rescan=True,
+                         indexfile=indexfile)
+            self.assertTrue(self.to.saveindex())
+            # A chmod does not change the parent directory's mtime or ctime
+            os.chmod(self.plainfile, 0646)
+            os.chmod(self.wwfile, 0644)
+            inventory = FSInventory.FSInventory(FakeLogger(), None)
+            inventory.scan(filesystems=[self.testdir], indexfile=indexfile)
+            self.assertEqual(inventory.reused, 2)
+            self.assertEqual(sorted(inventory.worldwritable()),
+                             sorted([self.wwdir, self.plainfile]))
+        finally:
+            shutil.rmtree(os.path.dirname(indexfile))
+
+    def testIndexExpired(self):
+        indexfile = os.path.join(tempfile.mkdtemp(), 'fsindex.db')
+        try:
+            self.to.scan(filesystems=[self.testdir], rescan=True,
+                         indexfile=indexfile)
+            self.to.saveindex()
+            inventory = FSInventory.FSInventory(FakeLogger(), None)
+            inventory.scan(filesystems=[self.testdir], indexfile=indexfile,
+                           maxage=-1)
+            self.assertEqual(inventory.reused, 0)
+            self.assertEqual(len(inventory.paths), 5)
+        finally:
+            shutil.rmtree(os.path.dirname(indexfile))
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
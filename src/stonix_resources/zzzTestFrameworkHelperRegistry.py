@@ -0,0 +1,109 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import threading
+import time
+import unittest
+from HelperRegistry import HelperRegistry, SharedHelper
+
+
+class SlowHelper(object):
+
+    def __init__(self):
+        self.manager = 'yum'
+        self.service = ''
+        self.active = 0
+        self.overlaps = 0
+
+    def setService(self, service):
+        self.active = self.active + 1
+        if self.active > 1:
+            self.overlaps = self.overlaps + 1
+        self.service = service
+        time.sleep(0.01)
+        service = self.service
+        self.active = self.active - 1
+        return service
+
+
+class zzzTestFrameworkHelperRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = HelperRegistry(None, None)
+        self.built = 0
+        self.fail = False
+        self.registry.factories['slow'] = self.makehelper
+
+    def makehelper(self):
+        self.built = self.built + 1
+        if self.fail:
+            raise ValueError('helper construction failed')
+        return SlowHelper()
+
+    def testBuiltOnce(self):
+        helper = self.registry.gethelper('slow')
+        self.assertTrue(isinstance(helper, SharedHelper))
+        self.assertTrue(self.registry.gethelper('slow') is helper)
+        self.assertEqual(self.built, 1)
+        self.assertRaises(KeyError, self.registry.gethelper, 'nohelper')
+
+    def testFailedBuildRetried(self):
+        self.fail = True
+        self.assertRaises(ValueError, self.registry.gethelper, 'slow')
+        self.fail = False
+        self.registry.gethelper('slow')
+        self.assertEqual(self.built, 2)
+
+    def testAttributes(self):
+        helper = self.registry.gethelper('slow')
+        self.assertEqual(helper.manager, 'yum')
+        helper.manager = 'apt-get'
+        self.assertEqual(helper.helper.manager, 'apt-get')
+        self.assertRaises(AttributeError, getattr, helper, 'nosuchattr')
+
+    def testCallsSerialized(self):
+        helper = self.registry.gethelper('slow')
+        results = {}
+
+        def worker(name):
+            results[name] = helper.setService(name)
+        threads = [threading.Thread(target=worker, args=('svc' + str(num),))
+                   for num in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(helper.overlaps, 0)
+        for name in results:
+            self.assertEqual(results[name], name)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
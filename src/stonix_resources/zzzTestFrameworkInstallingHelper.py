@@ -0,0 +1,198 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import hashlib
+import os
+import re
+import shutil
+import StringIO
+import tarfile
+import tempfile
+import threading
+import unittest
+import BaseHTTPServer
+import InstallingHelper
+
+
+class FakeLogger(object):
+
+    def log(self, priority, msg):
+        pass
+
+
+class ArchiveStandIn(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''
+    Local package server that honours range requests. The first response
+    for the archive can be cut short to simulate a dropped connection.
+    '''
+
+    def do_GET(self):
+        self.server.requests.append((self.path,
+                                     self.headers.getheader('range')))
+        if self.path not in self.server.files:
+            self.send_error(404)
+            return
+        data = self.server.files[self.path]
+        start = 0
+        crange = re.match(r'^bytes=(\d+)-$', self.headers.getheader('range',
+                                                                     ''))
+        if crange and self.server.ranges:
+            start = int(crange.group(1))
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' %
+                             (start, len(data) - 1, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        if self.path.endswith('.tar') and self.server.cutoff:
+            self.wfile.write(data[start:start + self.server.cutoff])
+            self.server.cutoff = 0
+            return
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+class zzzTestFrameworkInstallingHelper(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cachedir = os.path.join(self.tmpdir, 'cache')
+        self.archive = self.makearchive()
+        self.md5 = hashlib.md5(self.archive).hexdigest()
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0),
+                                                ArchiveStandIn)
+        self.server.files = {'/pkgs/Tool.tar': self.archive,
+                             '/pkgs/tool.md5.txt': self.md5 + '\n'}
+        self.server.requests = []
+        self.server.cutoff = 0
+        self.server.ranges = True
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:' + \
+            str(self.server.server_address[1]) + '/pkgs/Tool.tar'
+        self.prepared = []
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        for tmp_dir in self.prepared:
+            shutil.rmtree(tmp_dir, True)
+        shutil.rmtree(self.tmpdir)
+
+    def makearchive(self):
+        data = StringIO.StringIO()
+        tar = tarfile.open(fileobj=data, mode='w')
+        payload = os.urandom(300000)
+        info = tarfile.TarInfo('tool/payload.bin')
+        info.size = len(payload)
+        tar.addfile(info, StringIO.StringIO(payload))
+        tar.close()
+        return data.getvalue()
+
+    def prepare(self, signature=None):
+        helper = InstallingHelper.InstallingHelper(None, self.url,
+                                                   FakeLogger(),
+                                                   self.cachedir)
+        tmp_dir = helper.download_and_prepare(signature)
+        self.prepared.append(tmp_dir)
+        return helper, tmp_dir
+
+    def archiverequests(self):
+        return [request for request in self.server.requests
+                if request[0].endswith('.tar')]
+
+    def testDownloadAndCache(self):
+        helper, tmp_dir = self.prepare()
+        self.assertTrue(helper.sig_match)
+        self.assertTrue(os.path.exists(os.path.join(tmp_dir, 'tool',
+                                                    'payload.bin')))
+        self.assertTrue(os.path.exists(helper.get_cache_path(self.md5)))
+        self.assertEqual(self.server.requests[:2],
+                         [('/pkgs/Tool.md5.txt', None),
+                          ('/pkgs/tool.md5.txt', None)])
+        self.assertEqual(len(self.archiverequests()), 1)
+        helper, tmp_dir = self.prepare()
+        self.assertTrue(helper.sig_match)
+        self.assertEqual(len(self.archiverequests()), 1,
+                         'Cached archive downloaded again')
+        del self.server.requests[:]
+        helper, tmp_dir = self.prepare(self.md5.upper())
+        self.assertTrue(helper.sig_match)
+        self.assertEqual(self.server.requests, [])
+
+    def testResume(self):
+        self.server.cutoff = 100000
+        helper, tmp_dir = self.prepare(self.md5)
+        self.assertTrue(helper.sig_match)
+        self.assertEqual(self.archiverequests(),
+                         [('/pkgs/Tool.tar', None),
+                          ('/pkgs/Tool.tar', 'bytes=100000-')])
+        self.assertEqual(open(helper.get_cache_path(self.md5), 'rb').read(),
+                         self.archive)
+        self.assertEqual(os.listdir(os.path.join(self.cachedir, 'partial')),
+                         [])
+
+    def testNoRangeSupport(self):
+        self.server.cutoff = 100000
+        self.server.ranges = False
+        helper, tmp_dir = self.prepare(self.md5)
+        self.assertTrue(helper.sig_match)
+        self.assertEqual(len(self.archiverequests()), 2)
+
+    def testMismatch(self):
+        helper, tmp_dir = self.prepare('0' * 32)
+        self.assertFalse(helper.sig_match)
+        self.assertFalse(os.path.exists(helper.get_cache_path('0' * 32)))
+        self.assertFalse(os.path.exists(os.path.join(tmp_dir, 'tool')))
+        self.assertEqual(os.listdir(os.path.join(self.cachedir, 'partial')),
+                         [])
+
+    def testNoSignature(self):
+        del self.server.files['/pkgs/tool.md5.txt']
+        helper, tmp_dir = self.prepare()
+        self.assertFalse(helper.sig_match)
+        self.assertEqual(self.archiverequests(), [])
+
+    def testDamagedCache(self):
+        helper, tmp_dir = self.prepare()
+        cached = open(helper.get_cache_path(self.md5), 'wb')
+        cached.write('damaged')
+        cached.close()
+        helper, tmp_dir = self.prepare()
+        self.assertTrue(helper.sig_match)
+        self.assertEqual(len(self.archiverequests()), 2)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
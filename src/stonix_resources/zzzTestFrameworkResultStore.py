@@ -0,0 +1,157 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import ResultStore
+
+
+class FakeLogger(object):
+
+    def log(self, priority, msg):
+        pass
+
+
+class FakeRule(object):
+
+    def __init__(self, rulenum, rulename, compliant, success, results):
+        self.rulenum = rulenum
+        self.rulename = rulename
+        self.compliant = compliant
+        self.rulesuccess = success
+        self.detailedresults = results
+
+    def getrulenum(self):
+        return self.rulenum
+
+    def getrulename(self):
+        return self.rulename
+
+    def iscompliant(self):
+        return self.compliant
+
+    def getrulesuccess(self):
+        return self.rulesuccess
+
+    def getdetailedresults(self):
+        return self.detailedresults
+
+
+class zzzTestFrameworkResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, ResultStore.RESULTFILE)
+        self.store = ResultStore.ResultStore(FakeLogger(), None, self.path)
+        self.rule1 = FakeRule(1, 'RuleOne', False, True,
+                              'first finding\nsecond finding')
+        self.rule2 = FakeRule(2, 'RuleTwo', True, True, '')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testRecordAndQuery(self):
+        self.store.record(self.rule1, 'report', 0.25)
+        self.store.record(self.rule2, 'report', 0.5)
+        self.rule1.compliant = True
+        self.store.record(self.rule1, 'fix', 1.0)
+        result = self.store.getresult(1)
+        self.assertEqual(result['mode'], 'fix')
+        self.assertTrue(result['compliant'])
+        self.assertEqual(result['findings'],
+                         ['first finding', 'second finding'])
+        self.assertFalse(self.store.getresult(1, 'report')['compliant'])
+        self.assertEqual(self.store.getresult(3), None)
+        self.assertEqual(len(self.store.getresults()), 3)
+        self.assertEqual(len(self.store.getresults(mode='report')), 2)
+        self.assertEqual(len(self.store.getresults(compliant=False)), 1)
+        self.assertEqual(len(self.store.getresults(compliant=False,
+                                                   latest=True)), 0)
+        result['findings'].append('modified')
+        self.assertEqual(len(self.store.getresult(1)['findings']), 2,
+                         'Stored record modified through a returned copy')
+        self.assertRaises(ValueError, self.store.record, self.rule1,
+                          'audit', 0)
+
+    def testSummary(self):
+        self.rule2.rulesuccess = False
+        self.store.record(self.rule1, 'report', 0.25)
+        self.store.record(self.rule2, 'report', 0.5)
+        summary = self.store.getsummary()
+        self.assertEqual(summary, {'total': 2, 'compliant': 1,
+                                   'noncompliant': 1, 'failed': 1,
+                                   'duration': 0.75})
+
+    def testPersistence(self):
+        whandle = open(self.path, 'w')
+        whandle.write('{"rulenum": 9, "mode": "report"}\n{"rulenum": 1')
+        whandle.close()
+        self.assertEqual(len(self.store.getlastrun()), 1)
+        self.store.record(self.rule1, 'report', 0.25)
+        self.assertTrue(os.path.exists(self.path + '.old'))
+        self.assertEqual(self.store.getlastrun()[0]['rulenum'], 9)
+        self.store.record(self.rule2, 'report', 0.5)
+        results = ResultStore.loadresults(self.path)
+        self.assertEqual([result['rulenum'] for result in results], [1, 2])
+        self.assertEqual(results[0]['findings'],
+                         ['first finding', 'second finding'])
+
+    def testFormat(self):
+        self.rule2.rulesuccess = False
+        self.store.record(self.rule1, 'report', 0.25)
+        self.store.record(self.rule2, 'fix', 0.5)
+        text = ResultStore.formatresults(self.store.getresults())
+        self.assertEqual(text.splitlines()[0],
+                         'RuleOne (report): not compliant in 0.25s')
+        self.assertEqual(text.splitlines()[1], '    first finding')
+        self.assertEqual(text.splitlines()[3],
+                         'RuleTwo (fix): compliant, failed in 0.5s')
+        self.assertEqual(ResultStore.formatresults([{'rulenum': 9}]),
+                         '9 (None): not compliant in 0s')
+
+    def testThreads(self):
+        rules = [FakeRule(num, 'Rule' + str(num), True, True, 'ok')
+                 for num in range(50)]
+        threads = [threading.Thread(target=self.store.record,
+                                    args=(rule, 'report', 0.1))
+                   for rule in rules]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.store.getresults()), 50)
+        self.assertEqual(len(ResultStore.loadresults(self.path)), 50)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,175 @@
+#! /usr/bin/env python
+'''
+Created on Oct 14, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from RuleManifest import RuleManifest, parserule, MANIFESTNAME
+
+LITERALRULE = '''
+from stonix_resources.rule import Rule
+
+
+class LiteralRule(Rule):
+
+    def __init__(self, config, environ, logdispatcher, statechglogger):
+        Rule.__init__(self, config, environ, logdispatcher, statechglogger)
+        self.rulenumber = 901
+        self.rulename = 'LiteralRule'
+        self.rootrequired = False
+        self.applicable = {'type': 'white',
+                           'family': ['linux']}
+'''
+
+DARWINRULE = '''
+from stonix_resources.rule import Rule
+
+
+class DarwinRule(Rule):
+
+    def __init__(self, config, environ, logdispatcher, statechglogger):
+        Rule.__init__(self, config, environ, logdispatcher, statechglogger)
+        self.rulenumber = 902
+        self.rulename = 'DarwinRule'
+        self.applicable = {'type': 'white',
+                           'os': {'Mac OS X': ['10.9', '+']}}
+'''
+
+CUSTOMRULE = '''
+from stonix_resources.rule import Rule
+
+
+class CustomRule(Rule):
+
+    def __init__(self, config, environ, logdispatcher, statechglogger):
+        Rule.__init__(self, config, environ, logdispatcher, statechglogger)
+        self.rulenumber = 903
+        self.rulename = 'CustomRule'
+        if environ.getosfamily() == 'linux':
+            self.applicable = {'type': 'white', 'family': ['linux']}
+
+    def isapplicable(self):
+        return False
+'''
+
+
+class FakeEnviron(object):
+    '''
+    Minimal stand in for the Environment object.
+    '''
+
+    def __init__(self, family, ostype, osver, euid):
+        self.family = family
+        self.ostype = ostype
+        self.osver = osver
+        self.euid = euid
+
+    def getosfamily(self):
+        return self.family
+
+    def getostype(self):
+        return self.ostype
+
+    def getosver(self):
+        return self.osver
+
+    def geteuid(self):
+        return self.euid
+
+
+class zzzTestFrameworkRuleManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.rulespath = tempfile.mkdtemp()
+        for name, source in [('LiteralRule', LITERALRULE),
+                             ('DarwinRule', DARWINRULE),
+                             ('CustomRule', CUSTOMRULE)]:
+            rfile = open(os.path.join(self.rulespath, name + '.py'), 'w')
+            rfile.write(source)
+            rfile.close()
+        open(os.path.join(self.rulespath, '__init__.py'), 'w').close()
+        self.linux = FakeEnviron('linux', 'Red Hat Enterprise Linux', '6.7',
+                                 0)
+        self.mac = FakeEnviron('darwin', 'Mac OS X', '10.10.5', 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.rulespath)
+
+    def testParseRule(self):
+        entry = parserule(os.path.join(self.rulespath, 'LiteralRule.py'))
+        self.assertEqual(entry['rulenumber'], 901)
+        self.assertEqual(entry['rulename'], 'LiteralRule')
+        self.assertFalse(entry['rootrequired'])
+        self.assertFalse(entry['custom'])
+        self.assertEqual(entry['applicable']['family'], ['linux'])
+        entry = parserule(os.path.join(self.rulespath, 'DarwinRule.py'))
+        self.assertTrue(entry['rootrequired'])
+        entry = parserule(os.path.join(self.rulespath, 'CustomRule.py'))
+        self.assertTrue(entry['custom'])
+
+    def testLoadable(self):
+        manifest = RuleManifest(self.rulespath)
+        self.assertEqual(manifest.getloadable(self.linux),
+                         ['CustomRule', 'LiteralRule'])
+        self.assertEqual(manifest.getloadable(self.mac),
+                         ['CustomRule', 'DarwinRule'])
+        self.mac.euid = 501
+        self.assertEqual(manifest.getloadable(self.mac), ['CustomRule'])
+        self.assertEqual(manifest.getentry('DarwinRule')['rulenumber'], 902)
+        self.assertTrue(manifest.getentry('NoSuchRule') is None)
+
+    def testSaveAndStale(self):
+        manifest = RuleManifest(self.rulespath)
+        self.assertEqual(len(manifest.stale), 3)
+        manifest.save()
+        self.assertTrue(os.path.exists(os.path.join(self.rulespath,
+                                                    MANIFESTNAME)))
+        manifest = RuleManifest(self.rulespath)
+        self.assertEqual(manifest.stale, [])
+        self.assertEqual(manifest.getloadable(self.linux),
+                         ['CustomRule', 'LiteralRule'])
+        # Changing a rule after the manifest was written must be noticed
+        path = os.path.join(self.rulespath, 'DarwinRule.py')
+        rfile = open(path, 'w')
+        rfile.write(DARWINRULE.replace("'os': {'Mac OS X': ['10.9', '+']}",
+                                       "'family': ['linux']"))
+        rfile.close()
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+        manifest = RuleManifest(self.rulespath)
+        self.assertEqual(manifest.stale, ['DarwinRule'])
+        self.assertEqual(manifest.getloadable(self.linux),
+                         ['CustomRule', 'DarwinRule', 'LiteralRule'])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,105 @@
+#! /usr/bin/env python
+'''
+Created on Oct 15, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import unittest
+from RuleRegistry import RuleRegistry
+
+
+class FakeRule(object):
+    '''
+    Minimal stand in for a Rule instance.
+    '''
+
+    def __init__(self, num, name, database=False, mandatory=False,
+                 rootrequired=True):
+        self.num = num
+        self.name = name
+        self.database = database
+        self.mandatory = mandatory
+        self.rootrequired = rootrequired
+
+    def getrulenum(self):
+        return self.num
+
+    def getrulename(self):
+        return self.name
+
+    def isdatabaserule(self):
+        return self.database
+
+    def getmandatory(self):
+        return self.mandatory
+
+    def getisrootrequired(self):
+        return self.rootrequired
+
+
+class zzzTestFrameworkRuleRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = [FakeRule(1, 'RuleOne', database=True),
+                      FakeRule(2, 'RuleTwo', mandatory=True,
+                               rootrequired=False),
+                      FakeRule(3, 'RuleThree', database=True)]
+        self.registry = RuleRegistry(self.rules)
+
+    def tearDown(self):
+        pass
+
+    def testLookups(self):
+        self.assertEqual(len(self.registry), 3)
+        self.assertTrue(self.registry.getbynum(2) is self.rules[1])
+        self.assertTrue(self.registry.getbyname('RuleThree') is self.rules[2])
+        self.assertEqual(self.registry.getnumbyname('RuleOne'), 1)
+        self.assertEqual(self.registry.getnumbyname(u'RuleOne'), 1)
+        self.assertEqual(self.registry.getnumbyname('NoRule'), 0)
+        self.assertEqual(self.registry.getnamebynum(3), 'RuleThree')
+        self.assertTrue(self.registry.getnamebynum(99) is None)
+
+    def testCategories(self):
+        self.assertEqual(self.registry.getcategory('database'),
+                         [self.rules[0], self.rules[2]])
+        self.assertEqual(self.registry.getcategory('mandatory'),
+                         [self.rules[1]])
+        self.assertEqual(self.registry.getcategory('rootrequired'),
+                         [self.rules[0], self.rules[2]])
+        self.assertEqual(self.registry.getcategory('nosuchcategory'), [])
+
+    def testReload(self):
+        shared = self.registry
+        shared.load([FakeRule(4, 'RuleFour')])
+        self.assertEqual(self.registry.getrules(), shared.getrules())
+        self.assertTrue(self.registry.getbynum(1) is None)
+        self.assertEqual(self.registry.getnumbyname('RuleFour'), 4)
+        self.assertEqual(self.registry.getcategory('database'), [])
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,148 @@
+#! /usr/bin/env python
+'''
+Created on Oct 1, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import unittest
+import threading
+import time
+import RuleScheduler
+
+
+class FakeRule(object):
+    '''
+    Minimal stand in for a Rule object for scheduler testing.
+    '''
+
+    def __init__(self, name, resources):
+        self.name = name
+        self.resources = resources
+
+    def getrulename(self):
+        return self.name
+
+    def getresources(self):
+        return self.resources
+
+
+class FakeLogger(object):
+    '''
+    Collects log messages instead of dispatching them.
+    '''
+
+    def __init__(self):
+        self.messages = []
+
+    def log(self, priority, msg):
+        self.messages.append((priority, msg))
+
+
+class zzzTestFrameworkRuleScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = FakeLogger()
+        self.lock = threading.Lock()
+        self.active = {}
+        self.maxactive = 0
+        self.started = []
+
+    def tearDown(self):
+        pass
+
+    def action(self, rule):
+        self.lock.acquire()
+        self.started.append(rule.getrulename())
+        for resource in rule.getresources() or ['*']:
+            self.active[resource] = self.active.get(resource, 0) + 1
+            if self.active[resource] > 1:
+                self.fail('Resource shared by running rules: ' + resource)
+        self.maxactive = max(self.maxactive,
+                             threading.activeCount())
+        self.lock.release()
+        time.sleep(0.05)
+        self.lock.acquire()
+        for resource in rule.getresources() or ['*']:
+            self.active[resource] = self.active[resource] - 1
+        self.lock.release()
+
+    def testJobsBounds(self):
+        self.assertEqual(RuleScheduler.RuleScheduler(self.logger,
+                                                     0).getjobs(), 1)
+        self.assertEqual(RuleScheduler.RuleScheduler(self.logger,
+                                                     'x').getjobs(), 1)
+        self.assertEqual(RuleScheduler.RuleScheduler(self.logger,
+                                                     4).getjobs(), 4)
+
+    def testConflicts(self):
+        sched = RuleScheduler.RuleScheduler(self.logger, 4)
+        rule1 = FakeRule('one', ['/etc/sysctl.conf'])
+        rule2 = FakeRule('two', ['/etc/sysctl.conf', 'pkgdb'])
+        rule3 = FakeRule('three', ['/etc/passwd'])
+        rule4 = FakeRule('four', [])
+        self.assertTrue(sched.conflicts(rule1, rule2))
+        self.assertFalse(sched.conflicts(rule1, rule3))
+        self.assertTrue(sched.conflicts(rule3, rule4))
+
+    def testAllRulesRun(self):
+        rules = [FakeRule('rule' + str(num), ['/etc/file' + str(num % 3)])
+                 for num in range(9)]
+        rules.append(FakeRule('exclusive', []))
+        sched = RuleScheduler.RuleScheduler(self.logger, 3)
+        sched.run(rules, self.action)
+        self.assertEqual(sorted(self.started),
+                         sorted([rule.getrulename() for rule in rules]))
+
+    def testOrderedConflicts(self):
+        rules = [FakeRule('a1', ['/etc/a']), FakeRule('b1', ['/etc/b']),
+                 FakeRule('a2', ['/etc/a']), FakeRule('b2', ['/etc/b']),
+                 FakeRule('a3', ['/etc/a'])]
+        sched = RuleScheduler.RuleScheduler(self.logger, 4)
+        sched.run(rules, self.action, ordered=True)
+        astarts = [name for name in self.started if name.startswith('a')]
+        bstarts = [name for name in self.started if name.startswith('b')]
+        self.assertEqual(astarts, ['a1', 'a2', 'a3'])
+        self.assertEqual(bstarts, ['b1', 'b2'])
+
+    def testFailureDoesNotStopRun(self):
+        rules = [FakeRule('good1', ['/etc/a']), FakeRule('bad', ['/etc/b']),
+                 FakeRule('good2', ['/etc/c'])]
+
+        def action(rule):
+            if rule.getrulename() == 'bad':
+                raise ValueError('rule death')
+            self.action(rule)
+        sched = RuleScheduler.RuleScheduler(self.logger, 2)
+        sched.run(rules, action)
+        self.assertEqual(sorted(self.started), ['good1', 'good2'])
+        self.assertEqual(len(self.logger.messages), 1)
+        self.assertEqual(self.logger.messages[0][1][0], 'bad')
+
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
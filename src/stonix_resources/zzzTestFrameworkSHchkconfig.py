@@ -0,0 +1,116 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+import SHchkconfig
+
+FAKECHKCONFIG = '''#!/bin/sh
+echo "$*" >> %(log)s
+case "$*" in
+    --list)
+        head -c 200000 /dev/zero | tr '\\0' x >&2
+        printf 'sshd  0:off 1:off 2:on 3:on 4:on 5:on 6:off\\n'
+        printf 'cups  0:off 1:off 2:off 3:off 4:off 5:off 6:off\\n'
+        printf '\\nxinetd based services:\\n        rsync:  on\\n'
+        printf '        tftp:   off\\n';;
+    aliased)
+        exit 0;;
+    *" status")
+        ;;
+    *" "*)
+        ;;
+    *)
+        exit 1;;
+esac
+exit 0
+'''
+
+
+class FakeLogger(object):
+
+    def log(self, priority, msg):
+        pass
+
+
+class zzzTestFrameworkSHchkconfig(unittest.TestCase):
+
+    def setUp(self):
+        SHchkconfig.SNAPSHOT = None
+        self.tmpdir = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmpdir, 'calls')
+        script = os.path.join(self.tmpdir, 'chkconfig')
+        whandle = open(script, 'w')
+        whandle.write(FAKECHKCONFIG % {'log': self.log})
+        whandle.close()
+        os.chmod(script, stat.S_IRWXU)
+        self.helper = SHchkconfig.SHchkconfig.__new__(SHchkconfig.SHchkconfig)
+        self.helper.environment = None
+        self.helper.logdispatcher = FakeLogger()
+        self.helper.cmd = script + ' '
+        self.helper.svc = script + ' '
+
+    def tearDown(self):
+        SHchkconfig.SNAPSHOT = None
+        shutil.rmtree(self.tmpdir)
+
+    def calls(self, word):
+        return len([line for line in open(self.log) if word in line])
+
+    def testParse(self):
+        self.assertEqual(SHchkconfig.parsechkconfig(
+            ['sshd 0:off 1:off 2:on', 'cups 0:off 1:off', '',
+             'xinetd based services:', '  rsync: on', '  tftp: off']),
+            {'sshd': True, 'cups': False, 'rsync': True, 'tftp': False})
+
+    def testAudit(self):
+        self.assertTrue(self.helper.auditservice('sshd'))
+        self.assertFalse(self.helper.auditservice('cups'))
+        self.assertTrue(self.helper.auditservice('rsync'))
+        self.assertFalse(self.helper.auditservice('tftp'))
+        self.assertEqual(self.calls('--list'), 1)
+
+    def testFallback(self):
+        self.assertTrue(self.helper.auditservice('aliased'))
+        self.assertTrue(self.helper.auditservice('aliased'))
+        self.assertFalse(self.helper.auditservice('nosuch'))
+        self.assertEqual(self.calls('aliased'), 1)
+
+    def testInvalidate(self):
+        self.assertTrue(self.helper.auditservice('sshd'))
+        self.helper.disableservice('sshd')
+        self.assertEqual(SHchkconfig.SNAPSHOT, None)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,100 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+import SHrcupdate
+
+FAKERCUPDATE = '''#!/bin/sh
+echo "$*" >> %(log)s
+case "$*" in
+    show)
+        head -c 200000 /dev/zero | tr '\\0' x >&2
+        printf '               sshd | boot default\\n'
+        printf '              local |      default\\n'
+        printf '               cups |\\n';;
+esac
+exit 0
+'''
+
+
+class FakeLogger(object):
+
+    def log(self, priority, msg):
+        pass
+
+
+class zzzTestFrameworkSHrcupdate(unittest.TestCase):
+
+    def setUp(self):
+        SHrcupdate.SNAPSHOT = None
+        self.tmpdir = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmpdir, 'calls')
+        script = os.path.join(self.tmpdir, 'rc-update')
+        whandle = open(script, 'w')
+        whandle.write(FAKERCUPDATE % {'log': self.log})
+        whandle.close()
+        os.chmod(script, stat.S_IRWXU)
+        self.helper = SHrcupdate.SHrcupdate.__new__(SHrcupdate.SHrcupdate)
+        self.helper.environment = None
+        self.helper.logdispatcher = FakeLogger()
+        self.helper.cmd = script + ' '
+        self.helper.svc = script + ' '
+
+    def tearDown(self):
+        SHrcupdate.SNAPSHOT = None
+        shutil.rmtree(self.tmpdir)
+
+    def testParse(self):
+        self.assertEqual(SHrcupdate.parsercupdate(
+            [' sshd | boot default', ' cups |', 'junk']),
+            {'sshd': ['boot', 'default']})
+
+    def testSnapshot(self):
+        self.assertTrue(self.helper.auditservice('sshd'))
+        self.assertTrue(self.helper.auditservice('local'))
+        self.assertFalse(self.helper.auditservice('cups'))
+        self.assertFalse(self.helper.auditservice('ssh'))
+        self.assertEqual(self.helper.findrunlevel('sshd'), 'boot')
+        self.assertEqual(self.helper.findrunlevel('cups'), None)
+        self.assertEqual(len(open(self.log).readlines()), 1)
+
+    def testInvalidate(self):
+        self.assertTrue(self.helper.auditservice('sshd'))
+        self.helper.disableservice('sshd')
+        self.assertEqual(SHrcupdate.SNAPSHOT, None)
+        self.assertTrue('delete sshd boot' in open(self.log).read())
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,138 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+import SHsystemctl
+
+FAKESYSTEMCTL = '''#!/bin/sh
+echo "$*" >> %(log)s
+case "$*" in
+    *list-unit-files*)
+        # More than a pipe buffer of chatter on stderr
+        head -c 200000 /dev/zero | tr '\\0' x >&2
+        printf 'sshd.service enabled\\ncups.service disabled\\n';;
+    *list-units*)
+        printf '\\342\\227\\217 sshd.service loaded active running SSH\\n';;
+    *"is-enabled ssh")
+        exit 0;;
+    *is-enabled*)
+        exit 1;;
+    *"SubState ssh")
+        echo SubState=running;;
+esac
+exit 0
+'''
+
+
+class FakeLogger(object):
+
+    def log(self, priority, msg):
+        pass
+
+
+class FakeEnvironment(object):
+
+    def getinstallmode(self):
+        return False
+
+
+class zzzTestFrameworkSHsystemctl(unittest.TestCase):
+
+    def setUp(self):
+        SHsystemctl.resetsnapshot()
+        self.tmpdir = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmpdir, 'calls')
+        script = os.path.join(self.tmpdir, 'systemctl')
+        whandle = open(script, 'w')
+        whandle.write(FAKESYSTEMCTL % {'log': self.log})
+        whandle.close()
+        os.chmod(script, stat.S_IRWXU)
+        self.helper = SHsystemctl.SHsystemctl.__new__(SHsystemctl.SHsystemctl)
+        self.helper.environment = FakeEnvironment()
+        self.helper.logdispatcher = FakeLogger()
+        self.helper.cmd = script + ' '
+
+    def tearDown(self):
+        SHsystemctl.resetsnapshot()
+        shutil.rmtree(self.tmpdir)
+
+    def calls(self, word):
+        if not os.path.exists(self.log):
+            return 0
+        return len([line for line in open(self.log) if word in line])
+
+    def testParse(self):
+        self.assertEqual(SHsystemctl.parseunitfiles(['a.service enabled',
+                                                     '', 'b.socket static']),
+                         {'a.service': 'enabled', 'b.socket': 'static'})
+        self.assertEqual(SHsystemctl.parseunits(
+            ['* a.service loaded failed failed A',
+             'b.service loaded active running B', 'short']),
+            {'a.service': ('failed', 'failed'),
+             'b.service': ('active', 'running')})
+
+    def testSnapshot(self):
+        self.assertTrue(self.helper.auditservice('sshd'))
+        self.assertFalse(self.helper.auditservice('cups.service'))
+        self.assertTrue(self.helper.isrunning('sshd'))
+        self.assertFalse(self.helper.isrunning('cups'))
+        self.assertEqual(self.calls('list-unit-files'), 1)
+        self.assertEqual(self.calls('is-enabled'), 0)
+        self.assertEqual(self.calls('show'), 0)
+
+    def testFallback(self):
+        # ssh is an alias that list-unit-files does not show
+        self.assertTrue(self.helper.auditservice('ssh'))
+        self.assertTrue(self.helper.auditservice('ssh'))
+        self.assertFalse(self.helper.auditservice('nosuch'))
+        self.assertEqual(self.calls('is-enabled'), 2)
+        self.assertTrue(self.helper.isrunning('ssh'))
+        self.assertFalse(self.helper.isrunning('nosuch'))
+        self.assertEqual(self.calls('show'), 2)
+
+    def testInvalidate(self):
+        self.assertFalse(self.helper.auditservice('cups'))
+        self.assertTrue(self.helper.enableservice('cups'))
+        self.assertEqual(SHsystemctl.SNAPSHOT, None)
+        self.helper.auditservice('cups')
+        self.assertEqual(self.calls('list-unit-files'), 2)
+        self.assertTrue(self.helper.disableservice('sshd'))
+        self.assertEqual(SHsystemctl.SNAPSHOT, None)
+        self.helper.auditservice('sshd')
+        self.assertTrue(self.helper.reloadservice('sshd'))
+        self.assertEqual(SHsystemctl.SNAPSHOT, None)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
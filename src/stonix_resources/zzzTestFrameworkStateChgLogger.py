@@ -33,6 +33,22 @@ import logdispatcher
 import StateChgLogger
 import os
 import shutil
+import shelve
+import sqlite3
+import threading
+import whichdb
+
+
+class FakeLogger(object):
+    '''
+    Collects log messages instead of dispatching them.
+    '''
+
+    def __init__(self):
+        self.messages = []
+
+    def log(self, priority, msg):
+        self.messages.append((priority, msg))
 
 
 class zzzTestFrameworkStateChgLogger(unittest.TestCase):
@@ -43,6 +59,7 @@ class zzzTestFrameworkStateChgLogger(unittest.TestCase):
         self.logger = logdispatcher.LogDispatcher(self.environ)
         if os.path.exists('/usr/share/stonix/eventlog'):
             os.remove('/usr/share/stonix/eventlog')
+        self.removestore()
         self.testobj = StateChgLogger.StateChgLogger(self.logger, self.environ)
         self.srcfile = '/etc/stonixtest.conf'
         self.dstfile = '/etc/stonixtest.conf.tmp'
@@ -56,6 +73,13 @@ class zzzTestFrameworkStateChgLogger(unittest.TestCase):
         except OSError:
             pass
 
+    def removestore(self):
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(StateChgLogger.EVENTSTORE + suffix):
+                os.remove(StateChgLogger.EVENTSTORE + suffix)
+        if os.path.exists(StateChgLogger.BLOBDIR):
+            shutil.rmtree(StateChgLogger.BLOBDIR)
+
     def mktestfiles(self):
         whandle = open(self.srcfile, 'w')
         whandle2 = open(self.dstfile, 'w')
@@ -174,6 +198,135 @@ key4 = True
         self.failUnlessEqual(expected, myreturn2[0],
                              'expected event id not returned')
 
+    def testBatchedEvents(self):
+        mydict = {'eventtype': 'perm',
+                  'startstate': '0,0,420',
+                  'endstate': '0,0,416'}
+        reader = sqlite3.connect(StateChgLogger.EVENTSTORE)
+        query = '''SELECT COUNT(*) FROM events
+WHERE eventid IN ('9999006', '9999007')'''
+        self.testobj.startbatch()
+        self.testobj.startbatch()
+        self.testobj.recordchgevent('9999006', mydict)
+        self.testobj.recordchgevent('9999007', mydict)
+        self.failUnlessEqual(self.testobj.getchgevent('9999007'), mydict)
+        count = reader.execute(query).fetchone()[0]
+        self.failUnlessEqual(count, 2, 'Events inside a batch not committed')
+        depths = []
+        other = threading.Thread(target=lambda:
+                                 depths.append(self.testobj.getbatchdepth()))
+        other.start()
+        other.join()
+        self.failUnlessEqual(depths, [0], 'Batch depth shared by threads')
+        self.testobj.endbatch()
+        self.failUnlessEqual(self.testobj.getbatchdepth(), 1)
+        self.testobj.endbatch()
+        self.failUnlessEqual(self.testobj.getbatchdepth(), 0)
+        reader.close()
+
+    def testMigrateShelve(self):
+        self.testobj.closelog()
+        self.removestore()
+        mydict = {'eventtype': 'perm',
+                  'startstate': '0,0,420',
+                  'endstate': '0,0,416'}
+        legacy = shelve.open(StateChgLogger.LEGACYEVENTLOG, 'c')
+        legacy['9999008'] = mydict
+        legacy['0888002'] = mydict
+        legacy.close()
+        self.testobj = StateChgLogger.StateChgLogger(self.logger, self.environ)
+        self.failUnlessEqual(self.testobj.findrulechanges(9999), ['9999008'])
+        self.failUnlessEqual(self.testobj.getchgevent('0888002'), mydict)
+        self.failIf(whichdb.whichdb(StateChgLogger.LEGACYEVENTLOG),
+                    'Old eventlog not moved aside')
+        migrated = shelve.open(StateChgLogger.LEGACYEVENTLOG + '.migrated',
+                               'r')
+        self.failUnless('9999008' in migrated)
+        migrated.close()
+        for suffix in StateChgLogger.LEGACYSUFFIXES:
+            oldpath = StateChgLogger.LEGACYEVENTLOG + '.migrated' + suffix
+            if os.path.exists(oldpath):
+                os.remove(oldpath)
+
+    def testMissingEvent(self):
+        self.failUnlessRaises(KeyError, self.testobj.getchgevent, '9999999')
+        self.failUnless(self.testobj.deleteentry('9999999'))
+
+    def archivedblobs(self, path):
+        return self.testobj.eventlog.execute('''SELECT blob FROM archive
+WHERE path = ? AND kind = 'orig' ORDER BY stamp''', (path,)).fetchall()
+
+    def testArchiveDedup(self):
+        self.failUnless(self.testobj.recordfiledelete(self.srcfile, '9999009'))
+        self.failUnless(self.testobj.recordfiledelete(self.srcfile, '9999009'))
+        blobs = self.archivedblobs(self.srcfile)
+        self.failUnlessEqual(len(blobs), 1, 'Identical version stored twice')
+        blobpath = self.testobj.getblobpath(blobs[0][0])
+        self.failUnlessEqual(open(blobpath).read(), self.srcconf)
+        self.failUnless(self.testobj.recordfilechange(self.srcfile,
+                                                      self.dstfile, '9999010'))
+        self.failUnless(self.testobj.recordfilechange(self.srcfile,
+                                                      self.dstfile, '9999011'))
+        patches = self.testobj.eventlog.execute('''SELECT DISTINCT blob
+FROM archive WHERE kind = 'patch' ''').fetchall()
+        self.failUnlessEqual(len(patches), 1, 'Identical patch stored twice')
+
+    def testPruneArchive(self):
+        os.chmod(self.srcfile, 0640)
+        for version in range(4):
+            whandle = open(self.srcfile, 'a')
+            whandle.write('key' + str(version + 5) + ' = kiwi\n')
+            whandle.close()
+            self.failUnless(self.testobj.recordfiledelete(self.srcfile,
+                                                          '9999012'))
+        self.failUnlessEqual(len(self.archivedblobs(self.srcfile)), 4)
+        self.failUnlessEqual(self.testobj.prunearchive(2), 2)
+        self.failUnlessEqual(len(self.archivedblobs(self.srcfile)), 2)
+        expected = open(self.srcfile).read()
+        os.remove(self.srcfile)
+        self.failUnless(self.testobj.revertfiledelete(self.srcfile))
+        self.failUnlessEqual(open(self.srcfile).read(), expected)
+        self.failUnlessEqual(os.stat(self.srcfile).st_mode & 0777, 0640)
+
+    def testApplyPatchOffset(self):
+        self.failUnless(self.testobj.recordfilechange(self.srcfile,
+                                                      self.dstfile, '9999013'))
+        whandle = open(self.srcfile, 'w')
+        whandle.write('# local comment\n# another\n' +
+                      open(self.dstfile).read())
+        whandle.close()
+        os.chmod(self.srcfile, 0640)
+        self.failUnless(self.testobj.revertfilechanges(self.srcfile,
+                                                       '9999013'))
+        self.failUnlessEqual(open(self.srcfile).read(),
+                             '# local comment\n# another\n' + self.srcconf)
+        self.failUnlessEqual(os.stat(self.srcfile).st_mode & 0777, 0640)
+
+    def testApplyPatchConflict(self):
+        self.failUnless(self.testobj.recordfilechange(self.srcfile,
+                                                      self.dstfile, '9999014'))
+        conflict = 'key1 = orange\nkey2 = blue\n'
+        whandle = open(self.srcfile, 'w')
+        whandle.write(conflict)
+        whandle.close()
+        # Failures are logged as errors, keep them from being mailed.
+        fakelogger = FakeLogger()
+        self.testobj.logger = fakelogger
+        self.failIf(self.testobj.revertfilechanges(self.srcfile, '9999014'),
+                    'Conflicting patch applied')
+        self.failUnless(fakelogger.messages)
+        self.failUnlessEqual(open(self.srcfile).read(), conflict)
+
+    def testParsePatch(self):
+        patch = ['--- new\n', '+++ old\n', '@@ -1,2 +1,2 @@\n',
+                 ' a\n', '-b\n', '\\ No newline at end of file\n',
+                 '+c\n', '@@ -0,0 +1 @@\n']
+        self.failUnlessRaises(ValueError, StateChgLogger.parsepatch, patch)
+        hunks = StateChgLogger.parsepatch(patch[:-1])
+        self.failUnlessEqual(hunks, [(0, ['a\n', 'b'], ['a\n', 'c\n'])])
+        self.failUnlessEqual(StateChgLogger.patchlines(['a\n', 'b'], hunks),
+                             ['a\n', 'c\n'])
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,113 @@
+#! /usr/bin/env python
+'''
+Created on Oct 18, 2015
+
+###############################################################################
+#                                                                             #
+# Copyright 2015.  Los Alamos National Security, LLC. This material was       #
+# produced under U.S. Government contract DE-AC52-06NA25396 for Los Alamos    #
+# National Laboratory (LANL), which is operated by Los Alamos National        #
+# Security, LLC for the U.S. Department of Energy. The U.S. Government has    #
+# rights to use, reproduce, and distribute this software.  NEITHER THE        #
+# GOVERNMENT NOR LOS ALAMOS NATIONAL SECURITY, LLC MAKES ANY WARRANTY,        #
+# EXPRESS OR IMPLIED, OR ASSUMES ANY LIABILITY FOR THE USE OF THIS SOFTWARE.  #
+# If software is modified to produce derivative works, such modified software #
+# should be clearly marked, so as not to confuse it with the version          #
+# available from LANL.                                                        #
+#                                                                             #
+# Additionally, this program is free software; you can redistribute it and/or #
+# modify it under the terms of the GNU General Public License as published by #
+# the Free Software Foundation; either version 2 of the License, or (at your  #
+# option) any later version. Accordingly, this program is distributed in the  #
+# hope that it will be useful, but WITHOUT ANY WARRANTY; without even the     #
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.    #
+# See the GNU General Public License for more details.                        #
+#                                                                             #
+###############################################################################
+
+
+@author: dkennel
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from Sysctl import Sysctl
+
+
+class FakeLogger(object):
+
+    def log(self, priority, msg):
+        pass
+
+
+class zzzTestFrameworkSysctl(unittest.TestCase):
+
+    def setUp(self):
+        self.procsys = tempfile.mkdtemp()
+        self.writeproc('net.ipv4.ip_forward', '1\n')
+        self.writeproc('net.ipv4.tcp_rmem', '4096\t87380\t6291456\n')
+        self.writeproc('fs.suid_dumpable', '0\n')
+        self.sysctl = Sysctl(FakeLogger(), None, self.procsys)
+
+    def tearDown(self):
+        shutil.rmtree(self.procsys)
+
+    def writeproc(self, key, value):
+        path = os.path.join(self.procsys, key.replace('.', '/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        whandle = open(path, 'w')
+        whandle.write(value)
+        whandle.close()
+
+    def readproc(self, key):
+        return open(os.path.join(self.procsys,
+                                 key.replace('.', '/'))).read()
+
+    def testGetLive(self):
+        live = self.sysctl.getlive(['net.ipv4.ip_forward',
+                                    'net.ipv4.tcp_rmem',
+                                    'kernel.exec-shield'])
+        self.assertEqual(live, {'net.ipv4.ip_forward': '1',
+                                'net.ipv4.tcp_rmem': '4096 87380 6291456',
+                                'kernel.exec-shield': None})
+
+    def testAudit(self):
+        wanted = {'net.ipv4.ip_forward': '0',
+                  'net.ipv4.tcp_rmem': '4096 87380  6291456',
+                  'fs.suid_dumpable': '0',
+                  'kernel.exec-shield': '1'}
+        self.assertEqual(self.sysctl.audit(wanted),
+                         {'net.ipv4.ip_forward': '1'})
+
+    def testApply(self):
+        wanted = {'net.ipv4.ip_forward': '0', 'fs.suid_dumpable': '0',
+                  'kernel.exec-shield': '1'}
+        before = os.stat(os.path.join(self.procsys, 'fs', 'suid_dumpable'))
+        self.assertTrue(self.sysctl.apply(wanted))
+        self.assertEqual(self.readproc('net.ipv4.ip_forward'), '0\n')
+        self.assertEqual(os.stat(os.path.join(self.procsys, 'fs',
+                                              'suid_dumpable')).st_mtime,
+                         before.st_mtime)
+        self.assertFalse(os.path.exists(os.path.join(self.procsys, 'kernel')))
+        self.assertEqual(self.sysctl.audit(wanted), {})
+
+    def testDottedInterface(self):
+        vlan = os.path.join(self.procsys, 'net', 'ipv4', 'conf', 'eth0.100')
+        os.makedirs(vlan)
+        os.makedirs(os.path.join(self.procsys, 'net', 'ipv4', 'conf', 'eth0'))
+        whandle = open(os.path.join(vlan, 'rp_filter'), 'w')
+        whandle.write('0\n')
+        whandle.close()
+        dotted = 'net.ipv4.conf.eth0.100.rp_filter'
+        slashed = 'net/ipv4/conf/eth0.100/rp_filter'
+        self.assertEqual(self.sysctl.getlive([dotted, slashed]),
+                         {dotted: '0', slashed: '0'})
+        self.assertTrue(self.sysctl.apply({dotted: '1'}))
+        self.assertEqual(open(os.path.join(vlan, 'rp_filter')).read(), '1\n')
+        self.assertEqual(self.sysctl.audit({slashed: '1'}), {})
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -32,6 +32,10 @@ import environment
 import re
 import os
 import pwd
+import json
+import shutil
+import tempfile
+import time
 
 class zzzTestFrameworkenvironment(unittest.TestCase):
 
@@ -120,6 +124,66 @@ class zzzTestFrameworkenvironment(unittest.TestCase):
         self.assertFalse(self.to.ismobile(),
                          'This should fail on mobile systems')
         
+    def testNetworkIsLazy(self):
+        self.failIf(self.to.networkcollected)
+        self.to.gethostname()
+        self.failUnless(self.to.networkcollected)
+
+    def testGetDefaultIP(self):
+        defaultip = self.to.getdefaultip()
+        self.failUnless(defaultip == '127.0.0.1' or
+                        defaultip in self.to.getallips())
+
+    def testFactCache(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            self.to.factcache = os.path.join(tmpdir, 'facts.json')
+            calls = []
+
+            def lookup():
+                calls.append(1)
+                return 'ABC123'
+            self.failUnlessEqual(self.to.getfact('testfact', lookup),
+                                 'ABC123')
+            self.failUnlessEqual(self.to.getfact('testfact', lookup),
+                                 'ABC123')
+            self.failUnlessEqual(len(calls), 1)
+            if os.geteuid() != 0:
+                # The on disk cache is only used by root
+                return
+            other = environment.Environment()
+            other.factcache = self.to.factcache
+            self.failUnlessEqual(other.getfact('testfact', lookup), 'ABC123')
+            self.failUnlessEqual(len(calls), 1)
+            # Expired facts are looked up again
+            cached = {'testfact': [time.time() - environment.FACTTTL - 1,
+                                   'OLD']}
+            cachefile = open(self.to.factcache, 'w')
+            json.dump(cached, cachefile)
+            cachefile.close()
+            other = environment.Environment()
+            other.factcache = self.to.factcache
+            self.failUnlessEqual(other.getfact('testfact', lookup), 'ABC123')
+            self.failUnlessEqual(len(calls), 2)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testReadReleaseFile(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'os-release')
+            whandle = open(path, 'w')
+            whandle.write('# comment\nNAME="Debian GNU/Linux"\n' +
+                          "VERSION_ID='8'\nBROKEN\n")
+            whandle.close()
+            self.failUnlessEqual(self.to.readreleasefile(path),
+                                 {'NAME': 'Debian GNU/Linux',
+                                  'VERSION_ID': '8'})
+            self.failUnlessEqual(
+                self.to.readreleasefile(os.path.join(tmpdir, 'missing')), {})
+        finally:
+            shutil.rmtree(tmpdir)
+
     def testSetNumRules(self):
         num = 20
         self.to.setnumrules(num)
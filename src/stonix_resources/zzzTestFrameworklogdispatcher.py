@@ -29,8 +29,16 @@ Created on Sep 21, 2011
 @author: scmcleni
 '''
 import unittest
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import gzip
+import xml.etree.ElementTree as ET
 import logdispatcher
-from logdispatcher import LogDispatcher, LogPriority
+from logdispatcher import LogDispatcher, LogPriority, MessageData
+from logdispatcher import xmlReport, recoverreport
 import environment
 
 
@@ -40,11 +48,13 @@ class zzzTestFrameworklogdispatcher(unittest.TestCase):
         self.environ = environment.Environment()
         self.environ.setdebugmode(True)
         self.test_message = "my test message"
-        self.logger = LogDispatcher(self.environ)
+        self.spooldir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spooldir, True)
+        self.logger = LogDispatcher(self.environ, self.spooldir)
         self.priority = LogPriority()
 
     def tearDown(self):
-        pass
+        self.logger.flusherrors()
 
     def testLogError(self):
         try:
@@ -52,5 +62,156 @@ class zzzTestFrameworklogdispatcher(unittest.TestCase):
         except:
             self.fail("Failed to write ERROR to log file")
 
+    def testNoDeliveryBeforeReports(self):
+        # Errors are held until the run hands over its reports
+        self.logger.log(self.priority.ERROR, ['Test', 'held error'])
+        self.assertFalse(self.logger.delivering)
+        self.assertEqual(os.listdir(self.spooldir), [])
+
+    def testThreadedObservers(self):
+        # Observers are notified on the thread that logged and must see the
+        # message that thread logged, not one from another thread.
+        expected = threading.local()
+        mismatches = []
+
+        class Listener(object):
+            def update(self, subject):
+                if subject.getconsolemessage().Detail != expected.detail:
+                    mismatches.append(expected.detail)
+
+        def worker(name):
+            for count in xrange(500):
+                expected.detail = name + ' ' + str(count)
+                self.logger.log(self.priority.DEBUG, [name, expected.detail])
+
+        self.logger.register_listener(Listener())
+        threads = []
+        for num in range(4):
+            threads.append(threading.Thread(target=worker,
+                                            args=('thread' + str(num),)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.failIf(mismatches, str(len(mismatches)) + ' misattributed')
+
+    def testLogOverhead(self):
+        # A suppressed message must return before any formatting or caller
+        # lookup. The handlers are swapped for a NullHandler so that emitted
+        # messages go nowhere.
+        calls = []
+
+        def record(name, method):
+            def wrapper(*args):
+                calls.append(name)
+                return method(*args)
+            return wrapper
+        self.logger.format_message_data = \
+            record('format', self.logger.format_message_data)
+        self.logger._LogDispatcher__callerprefix = \
+            record('prefix', self.logger._LogDispatcher__callerprefix)
+        root = logging.getLogger('')
+        handlers = root.handlers
+        level = root.level
+        root.handlers = [logging.NullHandler()]
+        try:
+            root.setLevel(logging.WARNING)
+            self.logger.log(self.priority.DEBUG, ['Test', 'suppressed'])
+            self.assertEqual(calls, [])
+            root.setLevel(logging.DEBUG)
+            self.logger.log(self.priority.DEBUG, ['Test', 'emitted'])
+        finally:
+            root.handlers = handlers
+            root.setLevel(level)
+        self.assertEqual(sorted(calls), ['format', 'prefix'])
+
+    def testCallerPrefix(self):
+        root = logging.getLogger('')
+        handler = RecordHandler()
+        root.addHandler(handler)
+        level = root.level
+        root.setLevel(logging.DEBUG)
+        try:
+            self.logger.log(self.priority.DEBUG, ['Test', 'prefix'])
+        finally:
+            root.removeHandler(handler)
+            root.setLevel(level)
+        self.assertTrue(handler.messages[-1].startswith(
+            'DEBUG:zzzTestFrameworklogdispatcher:testCallerPrefix('))
+
+    def makeentry(self, tag, detail):
+        entry = MessageData()
+        entry.Tag = tag
+        entry.Detail = detail
+        return entry
+
+    def readreport(self, path):
+        metadata = {}
+        findings = {}
+        for section in ET.parse(path).getroot():
+            for elem in section:
+                if section.tag == 'metadata':
+                    metadata[elem.tag] = elem.attrib['val']
+                else:
+                    findings[elem.tag] = elem.attrib['val']
+        return metadata, findings
+
+    def testStreamedReport(self):
+        tmpdir = tempfile.mkdtemp()
+        interval = logdispatcher.FLUSHINTERVAL
+        logdispatcher.FLUSHINTERVAL = 0
+        try:
+            path = os.path.join(tmpdir, 'report.xml')
+            report = xmlReport(path, compress=True)
+            report.writeMetadata(self.makeentry('Hostname', 'host1'))
+            report.writeFinding(self.makeentry('FilePermissions',
+                                               '<a & "b">\nc'))
+            report.writeMetadata(self.makeentry('RuleCount', '1'))
+            # entries are on disk before the report is closed
+            self.assertTrue('FilePermissions' in open(path).read())
+            self.assertEqual(report.getUploadPath(), path)
+            report.closeReport()
+            self.assertEqual(report.getUploadPath(), path + '.gz')
+            self.assertEqual(self.readreport(path),
+                             ({'Hostname': 'host1', 'RuleCount': '1'},
+                              {'FilePermissions': '<a & "b">\nc'}))
+            self.assertEqual(gzip.open(path + '.gz').read(),
+                             open(path).read())
+        finally:
+            logdispatcher.FLUSHINTERVAL = interval
+            shutil.rmtree(tmpdir)
+
+    def testRecoverReport(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'report.xml')
+            report = xmlReport(path)
+            report.writeMetadata(self.makeentry('Hostname', 'host1'))
+            report.writeFinding(self.makeentry('SecureSSH', 'ok'))
+            report.handle.flush()
+            # simulate a crash part way through writing an entry
+            report.handle.write('<SetNTP val="no')
+            report.handle.close()
+            report.closed = True
+            self.assertTrue(recoverreport(path))
+            self.assertEqual(self.readreport(path),
+                             ({'Hostname': 'host1'}, {'SecureSSH': 'ok'}))
+            self.assertFalse(recoverreport(path))
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class RecordHandler(logging.Handler):
+    '''
+    Keeps the formatted messages it is handed.
+    '''
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
 if __name__ == "__main__":
     unittest.main()
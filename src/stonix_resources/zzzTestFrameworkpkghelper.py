@@ -32,6 +32,36 @@ import unittest
 import pkghelper
 from logdispatcher import LogPriority,LogDispatcher
 import environment
+
+
+class FakeBackend(object):
+    '''Package manager backend that keeps its packages in a set.'''
+
+    def __init__(self, installed):
+        self.installed = set(installed)
+        self.calls = []
+
+    def installpackage(self, package):
+        self.calls.append(package)
+        self.installed.add(package)
+        return True
+
+    def getInstalled(self):
+        return set(self.installed)
+
+    def checkInstall(self, package):
+        return package in self.installed
+
+
+class FakeBatchBackend(FakeBackend):
+    '''Backend that installs a list of packages in one transaction.'''
+
+    def installpackages(self, packages):
+        self.calls.append(list(packages))
+        self.installed.update(packages)
+        return True
+
+
 class zzzTestFrameworkpkghelper(unittest.TestCase):
     
     def setUp(self):
@@ -40,7 +70,7 @@ class zzzTestFrameworkpkghelper(unittest.TestCase):
         self.logger = LogDispatcher(self.enviro)
         self.helper = pkghelper.Pkghelper(self.logger,self.enviro)
     def tearDown(self):
-        pass
+        pkghelper.resetcache()
     def testInstall(self):
         print "inside test Install method...\n"
         self.failUnless(self.helper.install("php"))
@@ -55,5 +85,33 @@ class zzzTestFrameworkpkghelper(unittest.TestCase):
         self.failUnless(self.helper.check("php"))
         self.helper.remove("php")
         self.failIf(self.helper.check("php"))
+    def testCheckMany(self):
+        print "inside test check many method...\n"
+        self.helper.invalidateCache()
+        results = self.helper.checkMany(["php", "nosuchpackage-stonix"])
+        self.assertEqual(results["php"], self.helper.pckgr.checkInstall("php"))
+        self.failIf(results["nosuchpackage-stonix"])
+    def testInstallMany(self):
+        backend = FakeBackend(["bash"])
+        self.helper.pckgr = backend
+        pkghelper.resetcache()
+        self.failUnless(self.helper.installMany(["bash", "php", "vim"]))
+        self.assertEqual(backend.calls, ["php", "vim"])
+        self.failUnless(self.helper.check("vim"))
+        backend = FakeBatchBackend(["bash"])
+        self.helper.pckgr = backend
+        pkghelper.resetcache()
+        self.failUnless(self.helper.installMany(["bash", "php", "vim"]))
+        self.assertEqual(backend.calls, [["php", "vim"]])
+        self.failUnless(self.helper.check("php"))
+    def testResetCache(self):
+        backend = FakeBackend(["bash"])
+        self.helper.pckgr = backend
+        pkghelper.resetcache()
+        self.failIf(self.helper.check("php"))
+        backend.installed.add("php")
+        self.failIf(self.helper.check("php"))
+        pkghelper.resetcache()
+        self.failUnless(self.helper.check("php"))
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -268,6 +268,86 @@ class zzzTestFramework(unittest.TestCase):
         self.to.settargetstate('notconfigured')
         self.failUnlessEqual(self.to.gettargetstate(), 'notconfigured')
 
+
+class FakeEnviron(object):
+    '''
+    Stands in for the Environment when checking applicability.
+    '''
+
+    def __init__(self, family, ostype, version):
+        self.family = family
+        self.ostype = ostype
+        self.version = version
+
+    def getosfamily(self):
+        return self.family
+
+    def getostype(self):
+        return self.ostype
+
+    def getosver(self):
+        return self.version
+
+
+class FakeLogger(object):
+    '''
+    Discards log messages.
+    '''
+
+    def log(self, priority, msg):
+        pass
+
+
+class zzzTestFrameworkcheckapplicable(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = FakeLogger()
+        self.mac = FakeEnviron('darwin', 'Mac OS X', '10.10.3')
+        self.rhel = FakeEnviron('linux', 'Red Hat Enterprise Linux', '6.5')
+
+    def check(self, applicable, environ):
+        return rule.checkapplicable(applicable, environ, self.logger)
+
+    def testRange(self):
+        applicable = {'type': 'white',
+                      'os': {'Mac OS X': ['10.9', 'r', '10.10.5']}}
+        self.failUnlessEqual(self.check(applicable, self.mac), True)
+        # a second check must not see a modified dictionary
+        self.failUnlessEqual(self.check(applicable, self.mac), True)
+        self.failUnlessEqual(applicable['os']['Mac OS X'],
+                             ['10.9', 'r', '10.10.5'])
+        self.failUnlessEqual(self.check(applicable, self.rhel), False)
+        applicable = {'type': 'white',
+                      'os': {'Mac OS X': ['10.9', 'r', '10.9']}}
+        self.assertRaises(ValueError, self.check, applicable, self.mac)
+        self.failUnlessEqual(self.check(applicable, self.rhel), False)
+
+    def testFamilyAndVersions(self):
+        self.failUnlessEqual(self.check({'default': 'default'}, self.mac),
+                             True)
+        self.failUnlessEqual(self.check({'type': 'black',
+                                         'family': ['linux']}, self.rhel),
+                             False)
+        applicable = {'type': 'white',
+                      'os': {'Red Hat Enterprise Linux': ['6.0', '+'],
+                             'Mac OS X': ['10.9.5', '-']}}
+        self.failUnlessEqual(self.check(applicable, self.rhel), True)
+        self.failUnlessEqual(self.check(applicable, self.mac), False)
+        applicable = {'type': 'black',
+                      'os': {'Mac OS X': ['10.10.3', '10.9.5']}}
+        self.failUnlessEqual(self.check(applicable, self.mac), False)
+        self.assertRaises(AssertionError, self.check, {'type': 'brown'},
+                          self.mac)
+
+    def testCompiledOnce(self):
+        applicable = {'type': 'white', 'family': ['darwin']}
+        compiled = rule.compileapplicable(applicable)
+        self.failUnless(compiled is rule.compileapplicable(
+            {'family': ['darwin'], 'type': 'white'}))
+        self.failUnlessEqual(self.check(applicable, self.mac), True)
+        self.failUnlessEqual(compiled.results,
+                             {rule.getplatform(self.mac): True})
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()